@@ -1,6 +1,6 @@
 """Dependencies for API routes."""
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthenticationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
@@ -8,6 +8,7 @@ from typing import Optional
 from app.core.database import get_db
 from app.core.security import decode_token
 from app.models import User
+from app.services.pagination import Paginator
 
 
 security = HTTPBearer()
@@ -78,3 +79,19 @@ async def get_optional_user(
         return None
 
     return await get_current_user(credentials, db)
+
+
+def get_page_cursor(
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page; overrides page"),
+) -> Optional[str]:
+    """Get the keyset pagination cursor of a list request, rejecting malformed ones."""
+    if cursor is not None:
+        try:
+            Paginator.decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e),
+            )
+
+    return cursor
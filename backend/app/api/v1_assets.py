@@ -2,19 +2,23 @@
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, or_
+from sqlalchemy import select, or_
 from typing import List, Optional
 import ipaddress
 
 from app.core.database import get_db
-from app.models import Asset, Service
+from app.models import Asset, Service, Vulnerability
+from app.models.search_index import SearchIndex
 from app.schemas.asset import (
     AssetCreate,
     AssetUpdate,
     AssetResponse,
     AssetBatchImportRequest,
 )
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, get_page_cursor
+from app.services.aggregate_cache import AggregateCache
+from app.services.pagination import Paginator
+from app.services.statistics_service import StatisticsService
 
 router = APIRouter(prefix="/assets", tags=["assets"])
 
@@ -61,6 +65,8 @@ async def create_asset(
 async def list_assets(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Depends(get_page_cursor),
+    count: str = Query("exact", regex="^(exact|estimate|none)$"),
     ip: Optional[str] = Query(None),
     hostname: Optional[str] = Query(None),
     status: Optional[str] = Query(None),
@@ -75,9 +81,9 @@ async def list_assets(
     # Apply filters
     filters = []
     if ip:
-        filters.append(Asset.ip.ilike(f"%{ip}%"))
+        filters.append(SearchIndex.contains(ip, Asset.ip))
     if hostname:
-        filters.append(Asset.hostname.ilike(f"%{hostname}%"))
+        filters.append(SearchIndex.contains(hostname, Asset.hostname))
     if status:
         filters.append(Asset.status == status)
     if department:
@@ -88,15 +94,10 @@ async def list_assets(
     if filters:
         query = query.where(or_(*filters))
 
-    # Get total count
-    count_result = await db.execute(select(func.count(Asset.id)).select_from(Asset).where(or_(*filters) if filters else True))
-    total = count_result.scalar()
-
-    # Apply pagination
-    query = query.offset((page - 1) * page_size).limit(page_size)
-
-    result = await db.execute(query)
-    assets = result.scalars().all()
+    # Apply pagination and ordering
+    assets, total = await Paginator.paginate(
+        db, query, Asset.created_at, Asset.id, page, page_size, cursor, count
+    )
 
     return {
         "code": 0,
@@ -106,6 +107,7 @@ async def list_assets(
             "total": total,
             "page": page,
             "page_size": page_size,
+            "next_cursor": Paginator.next_cursor(assets, page_size, "created_at"),
         },
     }
 
@@ -174,8 +176,11 @@ async def delete_asset(
             detail="Asset not found",
         )
 
+    await StatisticsService.remove_vulnerabilities(db, Vulnerability.asset_id == asset_id)
     await db.delete(db_asset)
     await db.commit()
+    # Deleting an asset deletes its vulnerabilities
+    await AggregateCache.bump("vulnerabilities")
 
     return None
 
@@ -19,6 +19,7 @@ from app.schemas.node import (
     NodeHealthResponse,
     NodeListResponse,
 )
+from app.services.aggregate_cache import AggregateCache
 
 logger = logging.getLogger(__name__)
 
@@ -56,6 +57,7 @@ async def register_node(
         db.add(new_node)
         await db.commit()
         await db.refresh(new_node)
+        await AggregateCache.bump("nodes")
 
         logger.info(f"Node registered: {new_node.name} ({new_node.host}:{new_node.port})")
 
@@ -212,6 +214,11 @@ async def update_node(
                 detail=f"Node with ID {node_id} not found",
             )
 
+        changed = (node_data.status is not None and node_data.status != node.status) or (
+            node_data.max_concurrent_tasks is not None
+            and node_data.max_concurrent_tasks != node.max_concurrent_tasks
+        )
+
         # Update fields if provided
         if node_data.max_concurrent_tasks is not None:
             node.max_concurrent_tasks = node_data.max_concurrent_tasks
@@ -224,6 +231,8 @@ async def update_node(
 
         await db.commit()
         await db.refresh(node)
+        if changed:
+            await AggregateCache.bump("nodes")
 
         logger.info(f"Node updated: {node.name}")
 
@@ -258,6 +267,7 @@ async def node_heartbeat(
             )
 
         # Update node metrics
+        old_status = node.status
         node.status = heartbeat_data.get("status", "online")
         node.cpu_usage = heartbeat_data.get("cpu_usage", 0.0)
         node.memory_usage = heartbeat_data.get("memory_usage", 0.0)
@@ -268,6 +278,10 @@ async def node_heartbeat(
 
         await db.commit()
         await db.refresh(node)
+        # Only status changes invalidate the nodes summary; load and usage
+        # figures from heartbeats age out through its TTL
+        if node.status != old_status:
+            await AggregateCache.bump("nodes")
 
         return {
             "status": "ok",
@@ -312,6 +326,7 @@ async def delete_node(
 
         await db.delete(node)
         await db.commit()
+        await AggregateCache.bump("nodes")
 
         logger.info(f"Node deleted: {node.name}")
 
@@ -332,7 +347,8 @@ async def get_nodes_summary(
     current_user: User = Depends(get_current_user),
 ) -> dict:
     """Get summary statistics of all nodes."""
-    try:
+
+    async def compute():
         # Get all nodes
         result = await db.execute(select(Node))
         nodes = result.scalars().all()
@@ -371,6 +387,9 @@ async def get_nodes_summary(
             },
         }
 
+    try:
+        return await AggregateCache.get_or_compute("nodes_summary", ["nodes"], compute)
+
     except Exception as e:
         logger.error(f"Error getting nodes summary: {e}")
         raise HTTPException(
@@ -3,12 +3,14 @@
 import logging
 from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, or_, and_
+from sqlalchemy import select, or_, and_
 from typing import Optional, List
 from datetime import datetime
 
 from app.core.database import get_db
-from app.models.poc import POC, POCTag
+from app.models.poc import POC, POCTag, content_hash
+from app.models.search_index import SearchIndex
+from app.models.task import Task, TaskConfig, TaskLog, TaskStatusEnum, TaskTypeEnum
 from app.models.user import User
 from app.schemas.poc import (
     POCCreate,
@@ -16,18 +18,36 @@ from app.schemas.poc import (
     POCResponse,
     POCSearchRequest,
     POCExecutionRequest,
+    POCBatchExecutionRequest,
+    POCBulkExecutionRequest,
     POCExecutionResult,
     POCBulkImportRequest,
     POCStatisticsResponse,
 )
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, get_page_cursor
+from app.services.aggregate_cache import AggregateCache
+from app.services.pagination import Paginator
+from app.services.poc_cache import POCCache
 from app.services.poc_service import POCService
+from app.services.scan_service import bulk_poc_task, poc_batch_task
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/pocs", tags=["pocs"])
 
 
+async def _ensure_unique_content(db: AsyncSession, content: str) -> None:
+    """Reject content already stored as another POC."""
+    result = await db.execute(select(POC.id).where(POC.content_hash == content_hash(content)))
+    existing_id = result.scalars().first()
+
+    if existing_id is not None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"POC with identical content already exists (ID {existing_id})",
+        )
+
+
 @router.post("", response_model=dict, status_code=status.HTTP_201_CREATED)
 async def create_poc(
     poc_in: POCCreate,
@@ -42,6 +62,8 @@ async def create_poc(
             detail="Invalid POC content format",
         )
 
+    await _ensure_unique_content(db, poc_in.content)
+
     # Create POC
     db_poc = POC(
         name=poc_in.name,
@@ -70,6 +92,7 @@ async def create_poc(
 
     await db.commit()
     await db.refresh(db_poc)
+    await AggregateCache.bump("pocs")
 
     return {
         "code": 0,
@@ -82,6 +105,8 @@ async def create_poc(
 async def list_pocs(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Depends(get_page_cursor),
+    count: str = Query("exact", regex="^(exact|estimate|none)$"),
     keyword: Optional[str] = Query(None),
     cve_id: Optional[str] = Query(None),
     severity: Optional[str] = Query(None),
@@ -99,13 +124,7 @@ async def list_pocs(
     filters = []
 
     if keyword:
-        filters.append(
-            or_(
-                POC.name.ilike(f"%{keyword}%"),
-                POC.description.ilike(f"%{keyword}%"),
-                POC.cve_id.ilike(f"%{keyword}%"),
-            )
-        )
+        filters.append(SearchIndex.contains(keyword, POC.name, POC.description, POC.cve_id))
 
     if cve_id:
         filters.append(POC.cve_id == cve_id)
@@ -129,21 +148,10 @@ async def list_pocs(
     if tag:
         query = query.join(POCTag).where(POCTag.tag == tag)
 
-    # Get total count
-    count_query = select(func.count(POC.id))
-    if filters:
-        count_query = count_query.where(or_(*filters) if len(filters) > 1 else filters[0])
-    if tag:
-        count_query = count_query.join(POCTag).where(POCTag.tag == tag)
-
-    count_result = await db.execute(count_query)
-    total = count_result.scalar()
-
     # Apply pagination and ordering
-    query = query.order_by(POC.created_at.desc()).offset((page - 1) * page_size).limit(page_size)
-
-    result = await db.execute(query)
-    pocs = result.unique().scalars().all()
+    pocs, total = await Paginator.paginate(
+        db, query, POC.created_at, POC.id, page, page_size, cursor, count
+    )
 
     return {
         "code": 0,
@@ -153,6 +161,7 @@ async def list_pocs(
             "total": total,
             "page": page,
             "page_size": page_size,
+            "next_cursor": Paginator.next_cursor(pocs, page_size, "created_at"),
         },
     }
 
@@ -198,7 +207,12 @@ async def update_poc(
         )
 
     # Update fields
+    old_content = db_poc.content
     update_data = poc_in.dict(exclude_unset=True, exclude={"tags"})
+    if update_data.get("content") == old_content:
+        del update_data["content"]
+    elif update_data.get("content") is not None:
+        await _ensure_unique_content(db, update_data["content"])
     for field, value in update_data.items():
         if value is not None:
             setattr(db_poc, field, value)
@@ -219,6 +233,11 @@ async def update_poc(
     db.add(db_poc)
     await db.commit()
     await db.refresh(db_poc)
+    await AggregateCache.bump("pocs")
+
+    # Free the cached template of the replaced content
+    if db_poc.content != old_content:
+        POCCache.invalidate(old_content)
 
     return {
         "code": 0,
@@ -245,6 +264,8 @@ async def delete_poc(
 
     await db.delete(db_poc)
     await db.commit()
+    await AggregateCache.bump("pocs")
+    POCCache.invalidate(db_poc.content)
 
     return None
 
@@ -304,94 +325,235 @@ async def execute_poc(
         )
 
 
-@router.post("/bulk-import", response_model=dict, status_code=status.HTTP_201_CREATED)
-async def bulk_import_pocs(
-    import_in: POCBulkImportRequest,
+@router.post("/execute-batch", response_model=dict, status_code=status.HTTP_202_ACCEPTED)
+async def execute_poc_batch(
+    execution_in: POCBatchExecutionRequest,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Bulk import POCs from various sources."""
-    imported = 0
-    failed = 0
-    errors = []
-
-    for poc_in in import_in.pocs:
-        try:
-            # Validate content
-            if not POCService.validate_poc_content(poc_in.content, poc_in.poc_type):
-                failed += 1
-                errors.append(f"Invalid content for POC: {poc_in.name}")
-                continue
-
-            # Create POC
-            db_poc = POC(
-                name=poc_in.name,
-                cve_id=poc_in.cve_id,
-                cvss_score=poc_in.cvss_score,
-                severity=poc_in.severity,
-                poc_type=poc_in.poc_type,
-                description=poc_in.description,
-                content=poc_in.content,
-                source=import_in.source,
-                author=poc_in.author,
-                reference_link=poc_in.reference_link,
-                affected_product=poc_in.affected_product,
-                affected_version=poc_in.affected_version,
-                is_active=poc_in.is_active,
-            )
+    """Queue many nuclei/afrog POCs against many targets as a background task."""
+    result = await db.execute(
+        select(POC.id).where(POC.id.in_(execution_in.poc_ids), POC.is_active == 1)
+    )
+    poc_ids = result.scalars().all()
 
-            db.add(db_poc)
-            await db.flush()
+    if not poc_ids:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No active POCs found",
+        )
 
-            # Add tags
-            if poc_in.tags:
-                for tag_name in poc_in.tags:
-                    tag = POCTag(poc_id=db_poc.id, tag=tag_name)
-                    db.add(tag)
+    db_task = Task(
+        name=f"Batched POC execution: {len(poc_ids)} POCs x {len(execution_in.targets)} targets",
+        task_type=TaskTypeEnum.POC_DETECTION,
+        target_range=", ".join(execution_in.targets),
+        status=TaskStatusEnum.RUNNING,
+        started_at=datetime.utcnow(),
+        created_by=current_user.id,
+    )
+    db.add(db_task)
+    await db.commit()
+    await db.refresh(db_task)
+    await AggregateCache.bump("tasks")
 
-            imported += 1
+    try:
+        celery_task = poc_batch_task.delay(
+            db_task.id,
+            poc_ids,
+            execution_in.targets,
+            execution_in.port,
+            execution_in.options,
+        )
+        logger.info(f"Submitted batched POC task {db_task.id} to Celery: {celery_task.id}")
 
-        except Exception as e:
-            failed += 1
-            errors.append(f"Error importing {poc_in.name}: {str(e)}")
-            logger.error(f"Error importing POC: {e}")
+        db.add(TaskConfig(task_id=db_task.id, config_key="celery_task_id", config_value=celery_task.id))
+        await db.commit()
+
+    except Exception as e:
+        logger.error(f"Failed to submit batched POC task {db_task.id} to Celery: {e}")
+        db_task.status = TaskStatusEnum.FAILED
+        db.add(TaskLog(
+            task_id=db_task.id,
+            level="ERROR",
+            message=f"Failed to submit task to job queue: {str(e)}",
+        ))
+        await db.commit()
+
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to queue POC batch execution",
+        )
+
+    return {
+        "code": 0,
+        "message": "POC batch execution queued",
+        "data": {
+            "task_id": db_task.id,
+            "celery_task_id": celery_task.id,
+            "pocs": len(poc_ids),
+            "targets": len(execution_in.targets),
+        },
+    }
 
+
+@router.post("/bulk-execute", response_model=dict, status_code=status.HTTP_202_ACCEPTED)
+async def bulk_execute_pocs(
+    execution_in: POCBulkExecutionRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Queue selected POCs against selected assets as a background task."""
+    poc_selector = execution_in.pocs.model_dump(exclude_none=True)
+    asset_selector = execution_in.assets.model_dump(exclude_none=True)
+
+    try:
+        pocs = await POCService.select_pocs(db, **poc_selector)
+        assets = await POCService.select_assets(db, **asset_selector)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+    if not pocs or not assets:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No active POCs found" if not pocs else "No active assets found",
+        )
+
+    db_task = Task(
+        name=f"Bulk POC execution: {len(pocs)} POCs x {len(assets)} assets",
+        task_type=TaskTypeEnum.POC_DETECTION,
+        target_range=", ".join(execution_in.assets.cidrs or []) or f"{len(assets)} assets",
+        status=TaskStatusEnum.RUNNING,
+        started_at=datetime.utcnow(),
+        created_by=current_user.id,
+    )
+    db.add(db_task)
     await db.commit()
+    await db.refresh(db_task)
+    await AggregateCache.bump("tasks")
+
+    try:
+        celery_task = bulk_poc_task.delay(
+            db_task.id,
+            poc_selector,
+            asset_selector,
+            execution_in.port,
+            execution_in.options,
+            execution_in.skip_verified,
+        )
+        logger.info(f"Submitted bulk POC task {db_task.id} to Celery: {celery_task.id}")
+
+        db.add(TaskConfig(task_id=db_task.id, config_key="celery_task_id", config_value=celery_task.id))
+        await db.commit()
+
+    except Exception as e:
+        logger.error(f"Failed to submit bulk POC task {db_task.id} to Celery: {e}")
+        db_task.status = TaskStatusEnum.FAILED
+        db.add(TaskLog(
+            task_id=db_task.id,
+            level="ERROR",
+            message=f"Failed to submit task to job queue: {str(e)}",
+        ))
+        await db.commit()
+
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to queue bulk POC execution",
+        )
 
     return {
         "code": 0,
-        "message": "Bulk import completed",
+        "message": "Bulk POC execution queued",
         "data": {
-            "imported": imported,
-            "failed": failed,
-            "errors": errors,
+            "task_id": db_task.id,
+            "celery_task_id": celery_task.id,
+            "pocs": len(pocs),
+            "assets": len(assets),
+            "pairs": len(pocs) * len(assets),
         },
     }
 
 
+@router.post("/bulk-import", response_model=dict, status_code=status.HTTP_201_CREATED)
+async def bulk_import_pocs(
+    import_in: POCBulkImportRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Bulk import POCs from various sources."""
+    stats = await POCService.import_pocs(
+        db,
+        (
+            dict(poc_in.model_dump(exclude={"source"}), tags=poc_in.tags or [])
+            for poc_in in import_in.pocs
+        ),
+        source=import_in.source,
+    )
+
+    return {
+        "code": 0,
+        "message": "Bulk import completed",
+        "data": stats,
+    }
+
+
+@router.post("/import-archive", response_model=dict, status_code=status.HTTP_201_CREATED)
+async def import_poc_archive(
+    file: UploadFile = File(...),
+    poc_type: str = Query("nuclei"),
+    source: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Import every template in an uploaded tar or zip archive (e.g. nuclei-templates)."""
+    try:
+        stats = await POCService.import_pocs(
+            db,
+            POCService.iter_archive(file.file, file.filename or "", poc_type),
+            source=source or poc_type,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+    return {
+        "code": 0,
+        "message": "Archive import completed",
+        "data": stats,
+    }
+
+
 @router.get("/statistics", response_model=dict)
 async def get_poc_statistics(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """Get POC statistics."""
-    result = await db.execute(select(POC))
-    pocs = result.scalars().all()
-
-    # Convert to dict for statistics calculation
-    poc_dicts = [
-        {
-            "name": poc.name,
-            "severity": poc.severity,
-            "poc_type": poc.poc_type,
-            "source": poc.source,
-            "cve_id": poc.cve_id,
-            "tags": [{"tag": tag.tag} for tag in poc.tags],
-        }
-        for poc in pocs
-    ]
 
-    stats = POCService.get_poc_statistics(poc_dicts)
+    async def compute():
+        result = await db.execute(select(POC))
+        pocs = result.scalars().all()
+
+        # Convert to dict for statistics calculation
+        poc_dicts = [
+            {
+                "name": poc.name,
+                "severity": poc.severity,
+                "poc_type": poc.poc_type,
+                "source": poc.source,
+                "cve_id": poc.cve_id,
+                "tags": [{"tag": tag.tag} for tag in poc.tags],
+            }
+            for poc in pocs
+        ]
+
+        return POCService.get_poc_statistics(poc_dicts)
+
+    stats = await AggregateCache.get_or_compute("poc_statistics", ["pocs"], compute)
 
     return {
         "code": 0,
@@ -419,6 +581,8 @@ async def upload_poc(
                 detail="Invalid POC file format",
             )
 
+        await _ensure_unique_content(db, content_str)
+
         # Parse metadata
         metadata = POCService.parse_poc_metadata(content_str, poc_type)
 
@@ -444,6 +608,7 @@ async def upload_poc(
 
         await db.commit()
         await db.refresh(db_poc)
+        await AggregateCache.bump("pocs")
 
         return {
             "code": 0,
@@ -451,6 +616,8 @@ async def upload_poc(
             "data": POCResponse.from_orm(db_poc),
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error uploading POC: {e}")
         raise HTTPException(
@@ -491,6 +658,8 @@ async def clone_poc(
         affected_version=original_poc.affected_version,
         is_active=original_poc.is_active,
     )
+    # Content hashes are unique; the copy gets one once its content is edited
+    cloned_poc.content_hash = None
 
     db.add(cloned_poc)
     await db.flush()
@@ -502,6 +671,7 @@ async def clone_poc(
 
     await db.commit()
     await db.refresh(cloned_poc)
+    await AggregateCache.bump("pocs")
 
     return {
         "code": 0,
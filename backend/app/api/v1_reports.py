@@ -13,7 +13,9 @@ from app.core.database import get_db
 from app.models.task import Task, TaskResult
 from app.models.user import User
 from app.api.deps import get_current_user
+from app.services.aggregate_cache import AggregateCache
 from app.services.report_service import ReportService
+from app.services.statistics_service import StatisticsService
 
 logger = logging.getLogger(__name__)
 
@@ -278,56 +280,16 @@ async def get_report_statistics(
     current_user: User = Depends(get_current_user),
 ):
     """Get statistics for report generation."""
-    # If no task IDs provided, get all tasks
-    if not task_ids:
-        result = await db.execute(select(Task))
-        tasks = result.scalars().all()
-        task_ids = [task.id for task in tasks]
-
-    # Aggregate statistics
-    severity_distribution = {
-        "critical": 0,
-        "high": 0,
-        "medium": 0,
-        "low": 0,
-        "info": 0,
-    }
-
-    service_distribution = {}
-    total_vulnerabilities = 0
-    total_assets = set()
-
-    for task_id in task_ids[:100]:  # Limit to 100 tasks
-        results = await db.execute(
-            select(TaskResult).where(TaskResult.task_id == task_id)
-        )
-        task_results = results.scalars().all()
-
-        for task_result in task_results:
-            if task_result.result_type == "vulnerability":
-                vuln = task_result.result_data
-                severity = vuln.get("severity", "info").lower()
-                if severity in severity_distribution:
-                    severity_distribution[severity] += 1
-
-                service = vuln.get("service", "unknown")
-                service_distribution[service] = service_distribution.get(service, 0) + 1
-
-                total_vulnerabilities += 1
-
-            elif task_result.result_type == "asset":
-                asset_ip = task_result.result_data.get("ip")
-                if asset_ip:
-                    total_assets.add(asset_ip)
+    # Read from the per-task statistics rollup; no task IDs means all tasks
+    stats = await AggregateCache.get_or_compute(
+        "report_statistics",
+        ["tasks"],
+        lambda: StatisticsService.report_statistics(db, task_ids),
+        {"task_ids": task_ids},
+    )
 
     return {
         "code": 0,
         "message": "success",
-        "data": {
-            "total_vulnerabilities": total_vulnerabilities,
-            "total_assets": len(total_assets),
-            "severity_distribution": severity_distribution,
-            "service_distribution": service_distribution,
-            "report_sources": len(task_ids),
-        },
+        "data": stats,
     }
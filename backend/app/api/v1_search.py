@@ -1,13 +1,15 @@
 """Advanced search and filtering API routes."""
 
 import logging
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, status as http_status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 
 from app.core.database import get_db
 from app.models.user import User
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, get_page_cursor
+from app.services.pagination import Paginator
+from app.services.search_query import SearchQueryError
 from app.services.search_service import SearchService
 from app.schemas.vulnerability import VulnerabilityResponse
 from app.schemas.asset import AssetResponse
@@ -29,6 +31,8 @@ async def search_vulnerabilities(
     date_to: Optional[str] = Query(None, description="ISO format date"),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Depends(get_page_cursor),
+    count: str = Query("exact", regex="^(exact|estimate|none)$"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -60,6 +64,8 @@ async def search_vulnerabilities(
             filters=filters,
             page=page,
             page_size=page_size,
+            cursor=cursor,
+            count=count,
         )
 
         return {
@@ -80,13 +86,19 @@ async def search_vulnerabilities(
                 "total": total,
                 "page": page,
                 "page_size": page_size,
+                "next_cursor": Paginator.next_cursor(vulnerabilities, page_size, "discovered_at"),
             },
         }
 
+    except SearchQueryError as e:
+        raise HTTPException(
+            status_code=http_status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
     except Exception as e:
         logger.error(f"Error searching vulnerabilities: {e}")
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Search failed",
         )
 
@@ -99,6 +111,8 @@ async def search_assets(
     environment: Optional[str] = Query(None),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Depends(get_page_cursor),
+    count: str = Query("exact", regex="^(exact|estimate|none)$"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -121,6 +135,8 @@ async def search_assets(
             filters=filters,
             page=page,
             page_size=page_size,
+            cursor=cursor,
+            count=count,
         )
 
         return {
@@ -130,7 +146,7 @@ async def search_assets(
                 "items": [
                     {
                         "id": a.id,
-                        "ip_address": a.ip_address,
+                        "ip_address": a.ip,
                         "hostname": a.hostname,
                         "status": a.status,
                         "department": a.department,
@@ -141,13 +157,19 @@ async def search_assets(
                 "total": total,
                 "page": page,
                 "page_size": page_size,
+                "next_cursor": Paginator.next_cursor(assets, page_size, "created_at"),
             },
         }
 
+    except SearchQueryError as e:
+        raise HTTPException(
+            status_code=http_status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
     except Exception as e:
         logger.error(f"Error searching assets: {e}")
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Search failed",
         )
 
@@ -160,6 +182,8 @@ async def search_tasks(
     priority: Optional[int] = Query(None, ge=1, le=10),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Depends(get_page_cursor),
+    count: str = Query("exact", regex="^(exact|estimate|none)$"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -182,6 +206,8 @@ async def search_tasks(
             filters=filters,
             page=page,
             page_size=page_size,
+            cursor=cursor,
+            count=count,
         )
 
         return {
@@ -203,13 +229,19 @@ async def search_tasks(
                 "total": total,
                 "page": page,
                 "page_size": page_size,
+                "next_cursor": Paginator.next_cursor(tasks, page_size, "created_at"),
             },
         }
 
+    except SearchQueryError as e:
+        raise HTTPException(
+            status_code=http_status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
     except Exception as e:
         logger.error(f"Error searching tasks: {e}")
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Search failed",
         )
 
@@ -242,6 +274,7 @@ async def get_search_syntax(
             "examples": [
                 {"format": "field=value", "description": "Exact match", "example": "severity=critical"},
                 {"format": "field:operator:value", "description": "Operator-based search", "example": "cve:like:CVE-2021"},
+                {"format": "words", "description": "Free-text search over indexed fields", "example": "apache struts"},
             ],
         },
         "operators": {
@@ -256,14 +289,20 @@ async def get_search_syntax(
             "string": [
                 {"symbol": "like", "name": "Contains", "example": "name:like:Apache"},
                 {"symbol": "in", "name": "In list", "example": "severity:in:critical,high"},
+                {"symbol": "regex", "name": "Matches regex", "example": "hostname:regex:^web-[0-9]+"},
             ],
         },
         "logical_operators": [
             {"operator": "AND", "description": "Both conditions must be true", "example": "severity=critical AND status=open"},
             {"operator": "OR", "description": "At least one condition must be true", "example": "severity=critical OR severity=high"},
+            {"operator": "NOT", "description": "The condition must be false", "example": "NOT status=fixed"},
+            {"operator": "( )", "description": "Group conditions; AND binds tighter than OR and is implied between terms", "example": "(severity=critical OR cvss_score>=9) AND status=open"},
         ],
         "vulnerability_fields": [
             {"name": "cve", "type": "string", "description": "CVE identifier"},
+            {"name": "title", "type": "string", "description": "Vulnerability title"},
+            {"name": "cvss_score", "type": "number", "description": "CVSS score"},
+            {"name": "discovered_at", "type": "datetime", "description": "Discovery time (ISO format)"},
             {"name": "severity", "type": "enum", "values": ["critical", "high", "medium", "low", "info"]},
             {"name": "status", "type": "enum", "values": ["open", "fixed", "verified", "false_positive"]},
             {"name": "ip", "type": "ip", "description": "IP address"},
@@ -273,11 +312,15 @@ async def get_search_syntax(
             {"name": "hostname", "type": "string", "description": "Host name"},
             {"name": "status", "type": "enum", "values": ["active", "inactive", "archived"]},
             {"name": "department", "type": "string", "description": "Department name"},
+            {"name": "environment", "type": "string", "description": "Environment name"},
+            {"name": "os", "type": "string", "description": "Operating system"},
         ],
         "task_fields": [
             {"name": "name", "type": "string", "description": "Task name"},
-            {"name": "status", "type": "enum", "values": ["pending", "running", "completed", "failed"]},
-            {"name": "type", "type": "string", "description": "Task type"},
+            {"name": "status", "type": "enum", "values": ["pending", "running", "paused", "completed", "failed", "cancelled"]},
+            {"name": "type", "type": "enum", "description": "Task type"},
+            {"name": "priority", "type": "integer", "description": "Priority (1-10)"},
+            {"name": "progress", "type": "integer", "description": "Progress percentage"},
         ],
         "examples": [
             {
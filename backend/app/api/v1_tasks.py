@@ -11,9 +11,11 @@ from app.core.database import get_db
 from app.models import Task, TaskConfig, TaskLog, User
 from app.models.task import TaskStatusEnum, TaskTypeEnum
 from app.schemas.task import TaskCreate, TaskResponse, TaskProgressUpdate
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, get_page_cursor
 from app.celery_app import celery_app
 from app.services.scan_service import port_scan_task, service_identify_task, fingerprint_task, full_scan_task
+from app.services.aggregate_cache import AggregateCache
+from app.services.pagination import Paginator
 
 logger = logging.getLogger(__name__)
 
@@ -57,6 +59,7 @@ async def create_task(
 
     await db.commit()
     await db.refresh(db_task)
+    await AggregateCache.bump("tasks")
 
     return {
         "code": 0,
@@ -69,6 +72,8 @@ async def create_task(
 async def list_tasks(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Depends(get_page_cursor),
+    count: str = Query("exact", regex="^(exact|estimate|none)$"),
     status: Optional[str] = Query(None),
     task_type: Optional[str] = Query(None),
     db: AsyncSession = Depends(get_db),
@@ -87,18 +92,10 @@ async def list_tasks(
     if filters:
         query = query.where(or_(*filters))
 
-    # Get total count
-    count_query = select(func.count(Task.id))
-    if filters:
-        count_query = count_query.where(or_(*filters))
-    count_result = await db.execute(count_query)
-    total = count_result.scalar()
-
     # Apply pagination and ordering
-    query = query.order_by(Task.created_at.desc()).offset((page - 1) * page_size).limit(page_size)
-
-    result = await db.execute(query)
-    tasks = result.scalars().all()
+    tasks, total = await Paginator.paginate(
+        db, query, Task.created_at, Task.id, page, page_size, cursor, count
+    )
 
     return {
         "code": 0,
@@ -108,6 +105,7 @@ async def list_tasks(
             "total": total,
             "page": page,
             "page_size": page_size,
+            "next_cursor": Paginator.next_cursor(tasks, page_size, "created_at"),
         },
     }
 
@@ -189,6 +187,7 @@ async def delete_task(
 
     await db.delete(db_task)
     await db.commit()
+    await AggregateCache.bump("tasks")
 
     return None
 
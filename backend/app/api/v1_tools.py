@@ -6,10 +6,14 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
+from app.core.config import settings
 from app.core.database import get_db
 from app.models.user import User
 from app.models.task import Task, TaskResult
 from app.api.deps import get_current_user
+from app.api.v1_websocket import push_task_update
+from app.services.aggregate_cache import AggregateCache
+from app.services.statistics_service import StatisticsService
 from app.services.tool_integration import ToolIntegration
 from app.services.tool_result_service import ToolResultService
 from app.schemas.task import TaskResponse
@@ -130,7 +134,7 @@ async def execute_tool_and_store(
         )
 
     # Check tool installed
-    if not ToolIntegration.check_tool_installed(tool_name):
+    if not await ToolIntegration.check_tool_installed_async(tool_name):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Tool '{tool_name}' is not installed"
@@ -153,6 +157,42 @@ async def execute_tool_and_store(
         if options is None:
             options = {}
 
+        if settings.TOOL_STREAMING_INGEST and tool_name in ToolIntegration.STREAMING_TOOLS:
+            # Store findings while the tool runs and feed progress to websocket clients
+            process_status: Dict[str, Any] = {}
+
+            async def on_progress(progress: Dict[str, Any]) -> None:
+                await push_task_update(task_id, "findings", progress)
+
+            storage_result = await ToolResultService.ingest_stream(
+                db=db,
+                task_id=task_id,
+                tool_name=tool_name,
+                target=target,
+                findings=ToolIntegration.iter_findings(
+                    tool_name, target, options, status=process_status
+                ),
+                on_progress=on_progress,
+                status=process_status,
+            )
+
+            logger.info(f"Tool streamed and results stored: {tool_name} on {target}")
+
+            return {
+                "code": 0,
+                "message": "success",
+                "data": {
+                    "execution": {
+                        "tool": tool_name,
+                        "target": target,
+                        "status": storage_result["status"],
+                        "streamed": True,
+                    },
+                    "storage": storage_result,
+                    "task_id": task_id,
+                }
+            }
+
         # Execute tool
         if tool_name == "afrog":
             tool_result = await ToolIntegration.scan_with_afrog(
@@ -221,7 +261,7 @@ async def get_available_tools(
         Dictionary with tool names and installation status
     """
     try:
-        installed_tools = ToolIntegration.get_installed_tools()
+        installed_tools = await ToolIntegration.get_installed_tools_async()
 
         return {
             "code": 0,
@@ -259,7 +299,7 @@ async def get_tools_status(
         status_info = {}
 
         for tool_name, tool_info in ToolIntegration.TOOLS.items():
-            is_installed = ToolIntegration.check_tool_installed(tool_name)
+            is_installed = await ToolIntegration.check_tool_installed_async(tool_name)
 
             status_info[tool_name] = {
                 "name": tool_info.get("name"),
@@ -333,7 +373,7 @@ async def execute_tool(
         )
 
     # Check if tool is installed
-    if not ToolIntegration.check_tool_installed(tool_name):
+    if not await ToolIntegration.check_tool_installed_async(tool_name):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Tool '{tool_name}' is not installed. "
@@ -444,7 +484,7 @@ async def execute_tool_chain(
         )
 
     # Check if all tools are installed
-    missing_tools = [t for t in tool_list if not ToolIntegration.check_tool_installed(t)]
+    missing_tools = [t for t in tool_list if not await ToolIntegration.check_tool_installed_async(t)]
     if missing_tools:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -516,7 +556,7 @@ async def execute_tool_with_task(
         )
 
     # Check tool installed
-    if not ToolIntegration.check_tool_installed(tool_name):
+    if not await ToolIntegration.check_tool_installed_async(tool_name):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Tool '{tool_name}' is not installed"
@@ -563,7 +603,9 @@ async def execute_tool_with_task(
             created_at=datetime.utcnow()
         )
         db.add(task_result_record)
+        await StatisticsService.record_tool_run(db, task_id, tool_name)
         await db.commit()
+        await AggregateCache.bump("tasks")
 
         logger.info(f"Tool result stored for task {task_id}: {tool_name}")
 
@@ -610,7 +652,7 @@ async def get_tool_info(
         )
 
     tool_info = ToolIntegration.TOOLS[tool_name]
-    is_installed = ToolIntegration.check_tool_installed(tool_name)
+    is_installed = await ToolIntegration.check_tool_installed_async(tool_name)
 
     return {
         "code": 0,
@@ -8,12 +8,16 @@ from datetime import datetime
 
 from app.core.database import get_db
 from app.models import Vulnerability, VulnerabilityHistory, User
+from app.models.search_index import SearchIndex
 from app.schemas.vulnerability import (
     VulnerabilityResponse,
     VulnerabilityUpdateRequest,
     VulnerabilityFilterRequest,
 )
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, get_page_cursor
+from app.services.aggregate_cache import AggregateCache
+from app.services.pagination import Paginator
+from app.services.statistics_service import StatisticsService
 
 router = APIRouter(prefix="/vulnerabilities", tags=["vulnerabilities"])
 
@@ -22,6 +26,8 @@ router = APIRouter(prefix="/vulnerabilities", tags=["vulnerabilities"])
 async def list_vulnerabilities(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Depends(get_page_cursor),
+    count: str = Query("exact", regex="^(exact|estimate|none)$"),
     severity: Optional[str] = Query(None),
     status: Optional[str] = Query(None),
     asset_id: Optional[int] = Query(None),
@@ -41,25 +47,15 @@ async def list_vulnerabilities(
     if asset_id:
         filters.append(Vulnerability.asset_id == asset_id)
     if cve_id:
-        filters.append(Vulnerability.cve_id.ilike(f"%{cve_id}%"))
+        filters.append(SearchIndex.contains(cve_id, Vulnerability.cve_id))
 
     if filters:
         query = query.where(or_(*filters))
 
-    # Get total count
-    count_query = select(func.count(Vulnerability.id))
-    if filters:
-        count_query = count_query.where(or_(*filters))
-    count_result = await db.execute(count_query)
-    total = count_result.scalar()
-
     # Apply pagination and ordering
-    query = query.order_by(Vulnerability.discovered_at.desc()).offset(
-        (page - 1) * page_size
-    ).limit(page_size)
-
-    result = await db.execute(query)
-    vulnerabilities = result.scalars().all()
+    vulnerabilities, total = await Paginator.paginate(
+        db, query, Vulnerability.discovered_at, Vulnerability.id, page, page_size, cursor, count
+    )
 
     return {
         "code": 0,
@@ -69,6 +65,7 @@ async def list_vulnerabilities(
             "total": total,
             "page": page,
             "page_size": page_size,
+            "next_cursor": Paginator.next_cursor(vulnerabilities, page_size, "discovered_at"),
         },
     }
 
@@ -127,6 +124,7 @@ async def update_vulnerability(
 
     # Record history
     if update_req.status and update_req.status != old_status:
+        await StatisticsService.change_vulnerability_status(db, old_status, update_req.status)
         history = VulnerabilityHistory(
             vulnerability_id=vulnerability_id,
             old_status=old_status,
@@ -139,6 +137,7 @@ async def update_vulnerability(
     db.add(db_vuln)
     await db.commit()
     await db.refresh(db_vuln)
+    await AggregateCache.bump("vulnerabilities")
 
     return {
         "code": 0,
@@ -165,8 +164,10 @@ async def delete_vulnerability(
             detail="Vulnerability not found",
         )
 
+    await StatisticsService.remove_vulnerabilities(db, Vulnerability.id == vulnerability_id)
     await db.delete(db_vuln)
     await db.commit()
+    await AggregateCache.bump("vulnerabilities")
 
     return None
 
@@ -227,34 +228,13 @@ async def get_vulnerability_summary(
     current_user: User = Depends(get_current_user),
 ):
     """Get vulnerability statistics summary."""
-    # Total count
-    total_result = await db.execute(
-        select(func.count(Vulnerability.id))
+    # Counts are maintained in the statistics rollup on every write
+    summary = await AggregateCache.get_or_compute(
+        "vulnerability_summary", ["vulnerabilities"], lambda: StatisticsService.vulnerability_summary(db)
     )
-    total = total_result.scalar()
-
-    # Count by severity
-    severity_result = await db.execute(
-        select(Vulnerability.severity, func.count(Vulnerability.id)).group_by(
-            Vulnerability.severity
-        )
-    )
-    severity_stats = dict(severity_result.all())
-
-    # Count by status
-    status_result = await db.execute(
-        select(Vulnerability.status, func.count(Vulnerability.id)).group_by(
-            Vulnerability.status
-        )
-    )
-    status_stats = dict(status_result.all())
 
     return {
         "code": 0,
         "message": "success",
-        "data": {
-            "total": total,
-            "by_severity": severity_stats,
-            "by_status": status_stats,
-        },
+        "data": summary,
     }
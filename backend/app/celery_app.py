@@ -66,6 +66,11 @@ celery_app.conf.beat_schedule = {
         "task": "app.services.maintenance.sync_task_status",
         "schedule": 30.0,  # Every 30 seconds
     },
+    # Recount statistics rollups to correct drift from incremental updates
+    "reconcile-statistics": {
+        "task": "app.services.maintenance.reconcile_statistics",
+        "schedule": settings.STATISTICS_RECONCILE_INTERVAL,
+    },
 }
 
 # Task options
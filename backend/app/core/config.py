@@ -32,6 +32,93 @@ class Settings(BaseSettings):
     # API
     API_V1_PREFIX: str = "/api/v1"
 
+    # Fingerprint matching
+    FINGERPRINT_VERSION_CHECK_INTERVAL: int = 30  # Seconds between table version checks
+    FINGERPRINT_DB_FETCH_SIZE: int = 2000  # Rows per round trip when loading fingerprints
+    FINGERPRINT_PARALLEL_THRESHOLD: int = 2000  # Batch size at which matching uses a process pool
+    FINGERPRINT_PARALLEL_WORKERS: int = 0  # Match worker processes (0 = CPU count)
+    FINGERPRINT_CHUNK_SIZE: int = 500  # Services per chunk sent to a match worker
+    FINGERPRINT_MATCH_CACHE_SIZE: int = 10000  # Banners memoized per process
+    FINGERPRINT_MATCH_CACHE_REDIS: bool = False  # Share memoized matches across workers via Redis
+    FINGERPRINT_MATCH_CACHE_TTL: int = 86400  # Seconds a shared match result is kept in Redis
+    FINGERPRINT_MATCH_CACHE_REDIS_RETRY: float = 10.0  # Seconds the Redis tier is bypassed after an error
+
+    # Port scan sharding
+    NMAP_SHARD_PREFIX: int = 24  # IPv4 CIDRs wider than this are split into subnets of this size
+    NMAP_PORT_SHARDS: int = 1  # Number of port range slices per target shard
+    NMAP_MAX_PARALLEL: int = 0  # Concurrent nmap processes (0 = CPU count)
+    NMAP_SHARD_RETRIES: int = 1  # Extra attempts for shards that fail or time out
+
+    # Full scan pipeline
+    SCAN_PIPELINE_ENABLED: bool = False  # Overlap scan/identify/fingerprint stages by default
+    SCAN_PIPELINE_QUEUE_SIZE: int = 64  # Host batches buffered between pipeline stages
+    SCAN_FANOUT_ENABLED: bool = False  # Fan full scans out to per-shard Celery subtasks by default
+
+    # Banner grabbing
+    BANNER_GRAB_TIMEOUT: float = 5.0  # Seconds per connect/read
+    BANNER_GRAB_CONCURRENCY: int = 500  # Connections open at once across all hosts
+    BANNER_GRAB_PER_HOST_LIMIT: int = 20  # Connections open at once per host
+    BANNER_GRAB_PER_HOST_RATE: float = 50.0  # New connections per second per host (0 = unlimited)
+
+    # External tool processes
+    TOOL_KILL_GRACE_PERIOD: float = 5.0  # Seconds between SIGTERM and SIGKILL of a timed-out tool
+    TOOL_CHAIN_CONCURRENCY: int = 4  # Tool processes running at once per chain
+    TOOL_CHAIN_PER_TOOL_CONCURRENCY: int = 2  # Processes of the same tool running at once per chain
+    TOOL_STREAMING_INGEST: bool = True  # Store fscan/nuclei findings while the tool runs
+
+    # POC batching
+    POC_BATCH_TARGETS: int = 500  # Targets per nuclei/afrog process
+    POC_BATCH_TEMPLATES: int = 100  # POC templates per nuclei/afrog process
+    POC_BATCH_CONCURRENCY: int = 2  # Batch processes running at once
+    POC_BATCH_TIMEOUT: int = 3600  # Seconds per batch process
+
+    # POC import
+    POC_IMPORT_CHUNK_SIZE: int = 1000  # POCs validated, deduplicated and inserted per batch
+    POC_IMPORT_PARALLEL_THRESHOLD: int = 200  # Batch size at which templates are parsed in a process pool
+    POC_IMPORT_WORKERS: int = 0  # Parser processes (0 = CPU count)
+    POC_IMPORT_MAX_FILE_SIZE: int = 1024 * 1024  # Largest template file read from an archive
+
+    # POC template cache
+    POC_CACHE_DIR: str = ""  # Materialized template directory (empty = system temp dir)
+    POC_CACHE_MAX_BYTES: int = 256 * 1024 * 1024  # Template files kept on disk before LRU eviction
+    POC_CACHE_MAX_ENTRIES: int = 10000  # Parsed POCs kept in memory
+    POC_CACHE_MIN_IDLE: int = 3600  # Seconds since a template's last use before any worker may delete it (>= tool timeouts)
+
+    # HTTP POC client
+    HTTP_CLIENT_POOL_SIZE: int = 500  # Connections open at once per worker
+    HTTP_CLIENT_POOL_PER_HOST: int = 20  # Connections open at once per host
+    HTTP_CLIENT_KEEPALIVE_TIMEOUT: float = 30.0  # Seconds an idle connection stays pooled
+    HTTP_CLIENT_DNS_CACHE_TTL: int = 300  # Seconds resolved hostnames are cached
+    HTTP_CLIENT_TIMEOUT: float = 10.0  # Default seconds per request
+    HTTP_CLIENT_MAX_BODY: int = 1024 * 1024  # Response bytes read per request
+
+    # Bulk POC execution
+    POC_BULK_CONCURRENCY: int = 10  # POC executions running at once across all assets
+    POC_BULK_PER_TARGET_CONCURRENCY: int = 2  # POC executions running at once against one asset
+
+    # Tool result ingestion
+    RESULT_BULK_INGEST_THRESHOLD: int = 500  # Findings at which results are bulk inserted
+    RESULT_BULK_CHUNK_SIZE: int = 1000  # Rows per INSERT statement in bulk mode
+    RESULT_STREAM_FLUSH_INTERVAL: float = 2.0  # Max seconds a streamed finding waits before being stored
+
+    # List pagination
+    PAGINATION_COUNT_CACHE_TTL: float = 60.0  # Seconds an estimated-mode exact count is reused
+    PAGINATION_COUNT_CACHE_SIZE: int = 1000  # Distinct filtered counts kept in the cache
+    PAGINATION_ESTIMATE_THRESHOLD: int = 10000  # Planner estimates below this are counted exactly
+
+    # Search
+    SEARCH_QUERY_CACHE_SIZE: int = 1024  # Parsed and compiled search queries kept for reuse
+
+    # Dashboard aggregate cache
+    AGGREGATE_CACHE_ENABLED: bool = True  # Cache summary/statistics endpoints until a write invalidates them
+    AGGREGATE_CACHE_REDIS: bool = True  # Share cached aggregates and their versions across workers via Redis
+    AGGREGATE_CACHE_TTL: int = 30  # Seconds an aggregate is served before being recomputed anyway
+    AGGREGATE_CACHE_SIZE: int = 256  # Aggregates kept in process in front of Redis
+    AGGREGATE_CACHE_REDIS_RETRY: float = 10.0  # Seconds the Redis tier is bypassed after an error
+
+    # Statistics rollups
+    STATISTICS_RECONCILE_INTERVAL: float = 900.0  # Seconds between exact recounts of the rollup counters
+
     # InfluxDB
     INFLUXDB_URL: str = "http://localhost:8086"
     INFLUXDB_ORG: str = "catchcore"
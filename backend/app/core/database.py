@@ -1,6 +1,6 @@
 """Database configuration and utilities."""
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 from typing import AsyncGenerator
@@ -24,6 +24,17 @@ async_session = sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
 )
 
+# Sync engine for Celery workers, which run outside an event loop
+sync_engine = create_engine(
+    settings.DATABASE_URL,
+    echo=settings.DEBUG,
+    future=True,
+    pool_pre_ping=True,
+)
+
+# Session factory for sync operations
+sync_session = sessionmaker(sync_engine, expire_on_commit=False)
+
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """Dependency for getting database session."""
@@ -34,10 +45,132 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+def upgrade_schema(connection) -> None:
+    """
+    Add columns and indexes introduced after a table was first created.
+
+    ``create_all`` only creates missing tables, so existing databases get
+    later additions here. Safe to run repeatedly.
+
+    Args:
+        connection: Sync connection inside a transaction
+    """
+    inspector = inspect(connection)
+    columns = {column["name"] for column in inspector.get_columns("vulnerabilities")}
+    for name, column_type in (("last_seen", "TIMESTAMP"), ("dedup_key", "VARCHAR(64)"), ("source", "VARCHAR")):
+        if name not in columns:
+            connection.exec_driver_sql(f"ALTER TABLE vulnerabilities ADD COLUMN {name} {column_type}")
+    if "last_seen" not in columns:
+        connection.exec_driver_sql("UPDATE vulnerabilities SET last_seen = discovered_at")
+    # Findings stored before dedup keys keep a NULL key, which never conflicts
+    connection.exec_driver_sql(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_vulnerabilities_dedup_key ON vulnerabilities (dedup_key)"
+    )
+    connection.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_vulnerabilities_last_seen ON vulnerabilities (last_seen)"
+    )
+    connection.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_vulnerabilities_source ON vulnerabilities (source)"
+    )
+
+    asset_indexes = {index["name"]: index for index in inspector.get_indexes("assets")}
+    if not asset_indexes.get("ix_assets_ip", {}).get("unique"):
+        _merge_duplicate_assets(connection, inspector)
+        connection.exec_driver_sql("DROP INDEX IF EXISTS ix_assets_ip")
+        connection.exec_driver_sql("CREATE UNIQUE INDEX ix_assets_ip ON assets (ip)")
+
+    poc_columns = {column["name"] for column in inspector.get_columns("pocs")}
+    if "content_hash" not in poc_columns:
+        from app.models.poc import content_hash
+
+        connection.exec_driver_sql("ALTER TABLE pocs ADD COLUMN content_hash VARCHAR(64)")
+        rows = connection.exec_driver_sql("SELECT id, content FROM pocs").all()
+        if rows:
+            connection.execute(
+                text("UPDATE pocs SET content_hash = :digest WHERE id = :id"),
+                [{"id": poc_id, "digest": content_hash(content)} for poc_id, content in rows],
+            )
+
+    poc_indexes = {index["name"]: index for index in inspector.get_indexes("pocs")}
+    if not poc_indexes.get("ix_pocs_content_hash", {}).get("unique"):
+        # Later copies of the same content keep their rows but lose the hash
+        connection.exec_driver_sql(
+            "UPDATE pocs SET content_hash = NULL WHERE content_hash IS NOT NULL AND id NOT IN "
+            "(SELECT MIN(id) FROM pocs WHERE content_hash IS NOT NULL GROUP BY content_hash)"
+        )
+        connection.exec_driver_sql("DROP INDEX IF EXISTS ix_pocs_content_hash")
+        connection.exec_driver_sql("CREATE UNIQUE INDEX ix_pocs_content_hash ON pocs (content_hash)")
+
+    # Keyset pagination order of the listing endpoints
+    for table, column in (
+        ("assets", "created_at"),
+        ("tasks", "created_at"),
+        ("pocs", "created_at"),
+        ("vulnerabilities", "discovered_at"),
+    ):
+        connection.exec_driver_sql(
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_{column}_id ON {table} ({column}, id)"
+        )
+
+
+def _merge_duplicate_assets(connection, inspector) -> None:
+    """
+    Fold assets sharing an IP into the oldest one.
+
+    Rows referencing a duplicate are moved to the kept asset (association
+    rows it already has are dropped) and the duplicates deleted. Per-asset
+    statistics catch up at the next reconciliation.
+
+    Args:
+        connection: Sync connection inside a transaction
+        inspector: Inspector bound to ``connection``
+    """
+    rows = connection.exec_driver_sql(
+        "SELECT id, ip FROM assets WHERE ip IN (SELECT ip FROM assets GROUP BY ip HAVING COUNT(*) > 1) ORDER BY id"
+    ).all()
+    kept = {}
+    merges = []
+    for asset_id, ip in rows:
+        if ip in kept:
+            merges.append({"duplicate": asset_id, "kept": kept[ip]})
+        else:
+            kept[ip] = asset_id
+    if not merges:
+        return
+
+    for table in inspector.get_table_names():
+        for foreign_key in inspector.get_foreign_keys(table):
+            if foreign_key["referred_table"] != "assets":
+                continue
+            column = foreign_key["constrained_columns"][0]
+            primary_key = inspector.get_pk_constraint(table)["constrained_columns"]
+            if column in primary_key and len(primary_key) > 1:
+                # Association rows the kept asset already has would collide
+                others = [name for name in primary_key if name != column]
+                matches = " AND ".join(f"k.{name} = {table}.{name}" for name in others)
+                connection.execute(
+                    text(
+                        f"DELETE FROM {table} WHERE {column} = :duplicate AND EXISTS "
+                        f"(SELECT 1 FROM {table} k WHERE k.{column} = :kept AND {matches})"
+                    ),
+                    merges,
+                )
+            connection.execute(
+                text(f"UPDATE {table} SET {column} = :kept WHERE {column} = :duplicate"), merges
+            )
+
+    connection.execute(text("DELETE FROM assets WHERE id = :duplicate"), merges)
+
+
 async def init_db():
     """Initialize database tables."""
+    from app.models.search_index import SearchIndex
+
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(upgrade_schema)
+        # Tables created before search indexes existed don't get them from create_all
+        await conn.run_sync(SearchIndex.create_all)
 
 
 async def drop_db():
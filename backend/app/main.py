@@ -5,7 +5,9 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
-from app.core.database import init_db
+from app.core.database import async_session, init_db
+from app.services.http_client import HttpClient
+from app.services.statistics_service import StatisticsService
 from app.api.v1_auth import router as auth_router
 from app.api.v1_assets import router as assets_router
 from app.api.v1_tasks import router as tasks_router
@@ -24,10 +26,13 @@ async def lifespan(app: FastAPI):
     # Startup
     print(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
     await init_db()
+    async with async_session() as db:
+        await StatisticsService.ensure_seeded(db)
     print("Database initialized")
     yield
     # Shutdown
     print(f"Shutting down {settings.APP_NAME}")
+    await HttpClient.close()
 
 
 def create_app() -> FastAPI:
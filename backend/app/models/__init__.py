@@ -9,6 +9,7 @@ from app.models.fingerprint import Fingerprint, FingerprintMatch
 from app.models.credential import Credential
 from app.models.project import Project, ProjectAsset, ProjectTask
 from app.models.node import Node
+from app.models.statistics import StatisticsCounter, TaskStatistics
 
 __all__ = [
     "User",
@@ -35,4 +36,6 @@ __all__ = [
     "ProjectAsset",
     "ProjectTask",
     "Node",
+    "StatisticsCounter",
+    "TaskStatistics",
 ]
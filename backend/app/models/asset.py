@@ -1,19 +1,23 @@
 """Asset related models."""
 
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Boolean, Text
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Boolean, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
 from app.core.database import Base
+from app.models.search_index import SearchIndex
 
 
 class Asset(Base):
     """Asset model."""
 
     __tablename__ = "assets"
+    __table_args__ = (
+        Index("ix_assets_created_at_id", "created_at", "id"),  # Keyset pagination order
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    ip = Column(String, nullable=False, index=True)
+    ip = Column(String, nullable=False, unique=True, index=True)
     hostname = Column(String, nullable=True)
     os = Column(String, nullable=True)
     status = Column(String, default="active", nullable=False)  # active, inactive, archived
@@ -36,6 +40,9 @@ class Asset(Base):
         return f"<Asset {self.ip}>"
 
 
+SearchIndex.install(Asset, "ip", "hostname", "os", "department", "notes")
+
+
 class AssetGroup(Base):
     """Asset group model."""
 
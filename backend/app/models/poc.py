@@ -1,16 +1,29 @@
 """POC related models."""
 
-from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey
-from sqlalchemy.orm import relationship
+import hashlib
+from typing import Optional
+from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey, Index
+from sqlalchemy.orm import relationship, validates
 from datetime import datetime
 
 from app.core.database import Base
+from app.models.search_index import SearchIndex
+
+
+def content_hash(content: Optional[str]) -> Optional[str]:
+    """Return the SHA-256 hex digest identifying POC content."""
+    if content is None:
+        return None
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
 
 
 class POC(Base):
     """POC (Proof of Concept) model."""
 
     __tablename__ = "pocs"
+    __table_args__ = (
+        Index("ix_pocs_created_at_id", "created_at", "id"),  # Keyset pagination order
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False, index=True)
@@ -20,6 +33,7 @@ class POC(Base):
     poc_type = Column(String, nullable=False)  # nuclei, custom, metasploit, etc.
     description = Column(Text, nullable=True)
     content = Column(Text, nullable=False)  # POC script or YAML content
+    content_hash = Column(String(64), nullable=True, unique=True, index=True)  # SHA-256 of content, kept in sync by validator
     source = Column(String, nullable=True)  # afrog, nuclei, custom, etc.
     author = Column(String, nullable=True)
     reference_link = Column(String, nullable=True)
@@ -33,10 +47,18 @@ class POC(Base):
     tags = relationship("POCTag", back_populates="poc", cascade="all, delete-orphan")
     vulnerabilities = relationship("Vulnerability", back_populates="poc")
 
+    @validates("content")
+    def _sync_content_hash(self, key, content):
+        self.content_hash = content_hash(content)
+        return content
+
     def __repr__(self):
         return f"<POC {self.name}>"
 
 
+SearchIndex.install(POC, "name", "description", "cve_id", "affected_product")
+
+
 class POCTag(Base):
     """POC tag model."""
 
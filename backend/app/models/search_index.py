@@ -0,0 +1,279 @@
+"""Full-text and substring search indexes for searchable models."""
+
+import logging
+from typing import Dict, Iterable, Set, Tuple
+
+from sqlalchemy import and_, event, func, literal, literal_column, or_, select, table as table_clause, true
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ColumnElement
+from sqlalchemy.types import Boolean
+
+logger = logging.getLogger(__name__)
+
+TRIGRAM_LENGTH = 3  # Shortest term a trigram index can answer
+
+
+class SearchIndex:
+    """
+    Index text columns for fast ``like`` and free-text search.
+
+    On PostgreSQL each indexed table gets a generated ``search_vector``
+    tsvector column with a GIN index for free-text terms, plus a pg_trgm GIN
+    index per column so ``ILIKE '%value%'`` no longer scans the table. On
+    SQLite a trigram FTS5 table ``<table>_fts``, kept in sync by triggers,
+    serves both. The database maintains the indexes on every write. Other
+    databases, tables whose index could not be created and terms shorter
+    than a trigram fall back to ILIKE.
+    """
+
+    _tables: Dict[str, Tuple[object, Tuple[str, ...]]] = {}  # table name -> (Table, indexed columns)
+    _unavailable: Set[str] = set()  # Tables whose index could not be created
+
+    @staticmethod
+    def install(model, *fields: str) -> None:
+        """
+        Index ``fields`` of ``model`` whenever its table is created.
+
+        Args:
+            model: Mapped model class
+            fields: Text column names to index
+        """
+        table = model.__table__
+        SearchIndex._tables[table.name] = (table, fields)
+        event.listen(table, "after_create", lambda target, connection, **kw: SearchIndex.create(target, connection))
+        event.listen(table, "before_drop", lambda target, connection, **kw: SearchIndex.drop(target, connection))
+
+    @staticmethod
+    def create_all(connection) -> None:
+        """
+        Create missing search indexes for every installed table.
+
+        Safe to run repeatedly; used at startup for tables created before
+        their index existed.
+
+        Args:
+            connection: Sync connection inside a transaction
+        """
+        for table, _ in SearchIndex._tables.values():
+            SearchIndex.create(table, connection)
+
+    @staticmethod
+    def create(table, connection) -> None:
+        """
+        Create the search index of one table if it does not exist.
+
+        Args:
+            table: Installed table
+            connection: Sync connection inside a transaction
+        """
+        dialect = connection.dialect.name
+        try:
+            if dialect == "postgresql":
+                # A failed statement aborts the transaction; isolate it
+                with connection.begin_nested():
+                    SearchIndex._create_postgresql(table, connection)
+            elif dialect == "sqlite":
+                SearchIndex._create_sqlite(table, connection)
+            else:
+                return
+        except DBAPIError as e:
+            SearchIndex._unavailable.add(table.name)
+            logger.warning(f"Search index for {table.name} unavailable, falling back to ILIKE: {e}")
+            return
+
+        SearchIndex._unavailable.discard(table.name)
+
+    @staticmethod
+    def drop(table, connection) -> None:
+        """
+        Drop the search index of one table.
+
+        Args:
+            table: Installed table
+            connection: Sync connection inside a transaction
+        """
+        if connection.dialect.name == "sqlite":
+            connection.exec_driver_sql(f"DROP TABLE IF EXISTS {table.name}_fts")
+
+    @staticmethod
+    def _create_postgresql(table, connection) -> None:
+        """Add the tsvector column and GIN/trigram indexes."""
+        name, fields = table.name, SearchIndex._tables[table.name][1]
+        document = " || ' ' || ".join(f"coalesce({field}::text, '')" for field in fields)
+
+        connection.exec_driver_sql(
+            f"ALTER TABLE {name} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+            f"GENERATED ALWAYS AS (to_tsvector('simple'::regconfig, {document})) STORED"
+        )
+        connection.exec_driver_sql(
+            f"CREATE INDEX IF NOT EXISTS ix_{name}_search_vector ON {name} USING gin (search_vector)"
+        )
+        connection.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for field in fields:
+            connection.exec_driver_sql(
+                f"CREATE INDEX IF NOT EXISTS ix_{name}_{field}_trgm ON {name} USING gin ({field} gin_trgm_ops)"
+            )
+
+    @staticmethod
+    def _create_sqlite(table, connection) -> None:
+        """Create the external-content FTS5 table and its sync triggers."""
+        name, fields = table.name, SearchIndex._tables[table.name][1]
+        fts = f"{name}_fts"
+        columns = ", ".join(fields)
+        new_values = ", ".join(f"new.{field}" for field in fields)
+        old_values = ", ".join(f"old.{field}" for field in fields)
+        insert_new = f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values});"
+        delete_old = f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values});"
+
+        existed = connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (fts,)
+        ).first()
+
+        connection.exec_driver_sql(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+            f"{columns}, content='{name}', content_rowid='id', tokenize='trigram')"
+        )
+        connection.exec_driver_sql(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {name} BEGIN {insert_new} END"
+        )
+        connection.exec_driver_sql(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {name} BEGIN {delete_old} END"
+        )
+        connection.exec_driver_sql(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE ON {name} BEGIN {delete_old} {insert_new} END"
+        )
+
+        if not existed:
+            connection.exec_driver_sql(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+    @staticmethod
+    def contains(value: str, *columns) -> ColumnElement:
+        """
+        Match rows where any of ``columns`` contains ``value``, ignoring case.
+
+        Args:
+            value: Substring to look for
+            columns: Columns of one table
+
+        Returns:
+            Boolean SQL expression
+        """
+        return _Contains(value, tuple(column.expression for column in columns))
+
+    @staticmethod
+    def matches(model, text: str) -> ColumnElement:
+        """
+        Match rows whose indexed columns contain every term of ``text``.
+
+        Args:
+            model: Installed model class
+            text: Free-text terms separated by whitespace
+
+        Returns:
+            Boolean SQL expression
+        """
+        return _Matches(model.__table__, text)
+
+    @staticmethod
+    def _indexed(table, columns: Iterable[str]) -> bool:
+        """Return whether all ``columns`` of ``table`` are covered by a live index."""
+        if table is None:
+            return False
+        entry = SearchIndex._tables.get(table.name)
+        return (
+            entry is not None
+            and entry[0] is table
+            and table.name not in SearchIndex._unavailable
+            and all(column in entry[1] for column in columns)
+        )
+
+    @staticmethod
+    def _fts_match(table, query: str) -> ColumnElement:
+        """Match rows of ``table`` found by an FTS5 query."""
+        fts = f"{table.name}_fts"
+        rowids = (
+            select(literal_column("rowid"))
+            .select_from(table_clause(fts))
+            .where(literal_column(fts).op("MATCH")(literal(query)))
+        )
+        return table.c.id.in_(rowids)
+
+    @staticmethod
+    def _phrase(value: str) -> str:
+        """Quote ``value`` as an FTS5 phrase."""
+        return '"' + value.replace('"', '""') + '"'
+
+
+class _Contains(ColumnElement):
+    """Case-insensitive substring match over columns, compiled per dialect."""
+
+    type = Boolean()
+    inherit_cache = False
+
+    def __init__(self, value: str, columns):
+        self.value = value
+        self.columns = columns
+
+
+class _Matches(ColumnElement):
+    """Free-text match over a table's indexed columns, compiled per dialect."""
+
+    type = Boolean()
+    inherit_cache = False
+
+    def __init__(self, table, text: str):
+        self.table = table
+        self.terms = text.split()
+
+
+def _ilike_any(columns, value: str) -> ColumnElement:
+    """Match rows where any column contains ``value`` using ILIKE."""
+    return or_(*(column.ilike(f"%{value}%") for column in columns))
+
+
+@compiles(_Contains)
+def _compile_contains(element, compiler, **kw):
+    # PostgreSQL uses this too: pg_trgm indexes serve ILIKE '%value%' directly
+    return compiler.process(_ilike_any(element.columns, element.value), **kw)
+
+
+@compiles(_Contains, "sqlite")
+def _compile_contains_sqlite(element, compiler, **kw):
+    table = getattr(element.columns[0], "table", None)
+    names = [column.name for column in element.columns]
+    if len(element.value) < TRIGRAM_LENGTH or not SearchIndex._indexed(table, names):
+        return _compile_contains(element, compiler, **kw)
+
+    query = "{" + " ".join(names) + "} : " + SearchIndex._phrase(element.value)
+    return compiler.process(SearchIndex._fts_match(table, query), **kw)
+
+
+@compiles(_Matches)
+def _compile_matches(element, compiler, **kw):
+    columns = [element.table.c[field] for field in SearchIndex._tables[element.table.name][1]]
+    return compiler.process(and_(true(), *(_ilike_any(columns, term) for term in element.terms)), **kw)
+
+
+@compiles(_Matches, "postgresql")
+def _compile_matches_postgresql(element, compiler, **kw):
+    if not element.terms or not SearchIndex._indexed(element.table, ()):
+        return _compile_matches(element, compiler, **kw)
+
+    vector = literal_column(f"{element.table.name}.search_vector")
+    query = func.plainto_tsquery(literal_column("'simple'::regconfig"), " ".join(element.terms))
+    return compiler.process(vector.op("@@")(query), **kw)
+
+
+@compiles(_Matches, "sqlite")
+def _compile_matches_sqlite(element, compiler, **kw):
+    if not SearchIndex._indexed(element.table, ()):
+        return _compile_matches(element, compiler, **kw)
+
+    table = element.table
+    columns = [table.c[field] for field in SearchIndex._tables[table.name][1]]
+    long_terms = [term for term in element.terms if len(term) >= TRIGRAM_LENGTH]
+    clauses = [_ilike_any(columns, term) for term in element.terms if len(term) < TRIGRAM_LENGTH]
+    if long_terms:
+        clauses.insert(0, SearchIndex._fts_match(table, " ".join(SearchIndex._phrase(term) for term in long_terms)))
+    return compiler.process(and_(true(), *clauses), **kw)
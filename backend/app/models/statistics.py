@@ -0,0 +1,38 @@
+"""Statistics rollup models."""
+
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
+from datetime import datetime
+
+from app.core.database import Base
+
+
+class StatisticsCounter(Base):
+    """Global counter, e.g. vulnerabilities per severity or findings per tool."""
+
+    __tablename__ = "statistics_counters"
+
+    metric = Column(String, primary_key=True)  # vulnerability_severity, vulnerability_status, tool_runs, etc.
+    key = Column(String, primary_key=True)  # Dimension value, e.g. "high" or "2024-01-31"
+    value = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<StatisticsCounter {self.metric}:{self.key}={self.value}>"
+
+
+class TaskStatistics(Base):
+    """Per-task counter, e.g. findings per tool or severity reported by the task."""
+
+    __tablename__ = "task_statistics"
+
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), primary_key=True)
+    metric = Column(String, primary_key=True)  # tool_runs, tool_findings, severity, service, asset
+    key = Column(String, primary_key=True)
+    value = Column(Integer, default=0, nullable=False)
+
+    # Relationships
+    task = relationship("Task", back_populates="statistics")
+
+    def __repr__(self):
+        return f"<TaskStatistics {self.task_id} {self.metric}:{self.key}={self.value}>"
@@ -1,6 +1,6 @@
 """Task related models."""
 
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Text, Enum as SQLEnum, JSON
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Text, Enum as SQLEnum, JSON, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -36,6 +36,9 @@ class Task(Base):
     """Task model."""
 
     __tablename__ = "tasks"
+    __table_args__ = (
+        Index("ix_tasks_created_at_id", "created_at", "id"),  # Keyset pagination order
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False, index=True)
@@ -60,6 +63,7 @@ class Task(Base):
     configs = relationship("TaskConfig", back_populates="task", cascade="all, delete-orphan")
     logs = relationship("TaskLog", back_populates="task", cascade="all, delete-orphan")
     results = relationship("TaskResult", back_populates="task", cascade="all, delete-orphan")
+    statistics = relationship("TaskStatistics", back_populates="task", cascade="all, delete-orphan")
     projects = relationship("Project", secondary="project_tasks", back_populates="tasks")
 
     def __repr__(self):
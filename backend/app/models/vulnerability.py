@@ -1,16 +1,20 @@
 """Vulnerability related models."""
 
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Text, Float
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Text, Float, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
 from app.core.database import Base
+from app.models.search_index import SearchIndex
 
 
 class Vulnerability(Base):
     """Vulnerability model."""
 
     __tablename__ = "vulnerabilities"
+    __table_args__ = (
+        Index("ix_vulnerabilities_discovered_at_id", "discovered_at", "id"),  # Keyset pagination order
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     asset_id = Column(Integer, ForeignKey("assets.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -25,6 +29,9 @@ class Vulnerability(Base):
     remediation = Column(Text, nullable=True)
     remediation_link = Column(String, nullable=True)
     discovered_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    last_seen = Column(DateTime, default=datetime.utcnow, nullable=True, index=True)  # Last scan that reported it
+    dedup_key = Column(String(64), nullable=True, unique=True, index=True)  # Hash of asset, tool, template/CVE, port, location
+    source = Column(String, nullable=True, index=True)  # Tool that first reported it (nuclei, fscan, poc, etc.)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
@@ -37,6 +44,9 @@ class Vulnerability(Base):
         return f"<Vulnerability {self.id} {self.cve_id}>"
 
 
+SearchIndex.install(Vulnerability, "title", "description", "cve_id")
+
+
 class VulnerabilityHistory(Base):
     """Vulnerability history/status change model."""
 
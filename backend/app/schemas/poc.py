@@ -1,7 +1,8 @@
 """POC related schemas."""
 
+import ipaddress
 from typing import Optional, List
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 
 class POCTagBase(BaseModel):
@@ -106,6 +107,52 @@ class POCExecutionRequest(BaseModel):
     options: Optional[dict] = None
 
 
+class POCBatchExecutionRequest(BaseModel):
+    """Batched POC execution request schema."""
+
+    poc_ids: List[int] = Field(..., min_length=1)
+    targets: List[str] = Field(..., min_length=1)
+    port: Optional[int] = Field(None, ge=1, le=65535)
+    options: Optional[dict] = None
+
+
+class POCSelector(BaseModel):
+    """Criteria choosing active POCs for a bulk run (combined with AND)."""
+
+    tags: Optional[List[str]] = None
+    severities: Optional[List[str]] = None
+    cve_ids: Optional[List[str]] = None
+
+
+class AssetSelector(BaseModel):
+    """Criteria choosing active assets for a bulk run (combined with AND)."""
+
+    group_ids: Optional[List[int]] = None
+    project_ids: Optional[List[int]] = None
+    cidrs: Optional[List[str]] = None
+
+    @field_validator("cidrs")
+    @classmethod
+    def validate_cidrs(cls, v):
+        """Validate CIDR notation."""
+        for cidr in v or []:
+            try:
+                ipaddress.ip_network(cidr, strict=False)
+            except ValueError:
+                raise ValueError(f"Invalid CIDR notation: {cidr}")
+        return v
+
+
+class POCBulkExecutionRequest(BaseModel):
+    """Bulk POC execution request schema."""
+
+    pocs: POCSelector
+    assets: AssetSelector
+    port: Optional[int] = Field(None, ge=1, le=65535)
+    options: Optional[dict] = None
+    skip_verified: bool = True
+
+
 class POCExecutionResult(BaseModel):
     """POC execution result schema."""
 
@@ -0,0 +1,235 @@
+"""Cache for dashboard aggregates, invalidated by per-scope version counters."""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from weakref import WeakKeyDictionary
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class AggregateCache:
+    """
+    Cache aggregate query results keyed by endpoint, filters and data version.
+
+    Each cached aggregate depends on one or more scopes (``vulnerabilities``,
+    ``tasks``, ``pocs``, ``nodes``). Every write to a scope bumps its version
+    counter, and the current versions are part of the cache key, so the next
+    read after a write misses and recomputes; stale entries are never deleted
+    but simply age out through their TTL.
+
+    Versions and values live in Redis so all API workers share them. A small
+    in-process LRU sits in front of Redis, and serves alone with
+    process-local versions if Redis is disabled or unreachable; other workers'
+    writes are then only picked up once the TTL expires. After an error Redis
+    is retried every AGGREGATE_CACHE_REDIS_RETRY seconds, and scopes bumped
+    meanwhile are bumped in Redis once it is reachable again.
+    """
+
+    REDIS_PREFIX = "catchcore:aggregate"
+    SCOPES = ("vulnerabilities", "tasks", "pocs", "nodes")
+
+    _entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()  # key -> (expires at, JSON)
+    _versions: Dict[str, int] = {}  # Process-local scope versions
+    _clients: "WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = WeakKeyDictionary()
+    _redis_disabled_until = 0.0  # Monotonic time before which Redis is not retried
+    _pending_bumps: Set[str] = set()  # Scopes bumped while Redis was unreachable
+
+    @staticmethod
+    async def get_or_compute(
+        endpoint: str,
+        scopes: Iterable[str],
+        compute: Callable[[], Awaitable[Any]],
+        filters: Optional[Dict[str, Any]] = None,
+        ttl: Optional[int] = None,
+    ) -> Any:
+        """
+        Return the cached aggregate, computing and storing it on a miss.
+
+        Values are stored as JSON and the result is always the decoded copy,
+        so hits and misses return the same shape.
+
+        Args:
+            endpoint: Name of the aggregate
+            scopes: Scopes whose writes invalidate it
+            compute: Coroutine function producing a JSON-serializable value
+            filters: Request parameters the value depends on
+            ttl: Seconds the value is served (default AGGREGATE_CACHE_TTL)
+
+        Returns:
+            Aggregate value
+        """
+        if not settings.AGGREGATE_CACHE_ENABLED:
+            return await compute()
+
+        ttl = settings.AGGREGATE_CACHE_TTL if ttl is None else ttl
+        client = AggregateCache._client()
+        versions = await AggregateCache._current_versions(client, sorted(set(scopes)))
+        client = AggregateCache._client()  # None if reading versions disabled Redis
+        key = AggregateCache.make_key(endpoint, versions, filters)
+
+        payload = AggregateCache._local_get(key)
+        if payload is None and client is not None:
+            try:
+                cached = await client.get(f"{AggregateCache.REDIS_PREFIX}:{key}")
+            except Exception as e:
+                AggregateCache._disable(e)
+                cached = None
+            if cached is not None:
+                payload = cached.decode()
+                AggregateCache._local_put(key, payload, ttl)
+
+        if payload is None:
+            payload = json.dumps(await compute(), default=_json_default)
+            AggregateCache._local_put(key, payload, ttl)
+            if client is not None:
+                try:
+                    await client.set(f"{AggregateCache.REDIS_PREFIX}:{key}", payload, ex=max(int(ttl), 1))
+                except Exception as e:
+                    AggregateCache._disable(e)
+
+        return json.loads(payload)
+
+    @staticmethod
+    async def bump(*scopes: str) -> None:
+        """
+        Invalidate every aggregate depending on ``scopes``.
+
+        Call after the write is committed, so a concurrent read cannot cache
+        pre-write data under the new version.
+
+        Args:
+            scopes: Scopes that were written
+        """
+        for scope in scopes:
+            AggregateCache._versions[scope] = AggregateCache._versions.get(scope, 0) + 1
+
+        AggregateCache._pending_bumps.update(scopes)
+        client = AggregateCache._client()
+        if client is not None:
+            await AggregateCache._flush_bumps(client)
+
+    @staticmethod
+    def make_key(endpoint: str, versions: List[str], filters: Optional[Dict[str, Any]]) -> str:
+        """
+        Build the cache key of an aggregate.
+
+        Args:
+            endpoint: Name of the aggregate
+            versions: ``scope=version`` strings of its scopes
+            filters: Request parameters the value depends on
+
+        Returns:
+            Cache key
+        """
+        encoded = json.dumps(filters or {}, sort_keys=True, default=_json_default)
+        filters_hash = hashlib.sha1(encoded.encode()).hexdigest()
+        return f"{endpoint}:{','.join(versions)}:{filters_hash}"
+
+    @staticmethod
+    def clear() -> None:
+        """Drop all in-process entries and versions (Redis keys expire on their own)."""
+        AggregateCache._entries.clear()
+        AggregateCache._versions.clear()
+
+    @staticmethod
+    async def _flush_bumps(client) -> None:
+        """Increment the Redis versions of scopes bumped since the last success."""
+        scopes = sorted(AggregateCache._pending_bumps)
+        if not scopes:
+            return
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                for scope in scopes:
+                    pipe.incr(f"{AggregateCache.REDIS_PREFIX}:version:{scope}")
+                await pipe.execute()
+        except Exception as e:
+            AggregateCache._disable(e)
+            return
+        AggregateCache._pending_bumps.difference_update(scopes)
+
+    @staticmethod
+    async def _current_versions(client, scopes: List[str]) -> List[str]:
+        """Read scope versions from Redis, or from this process if Redis is off."""
+        if client is not None and AggregateCache._pending_bumps:
+            # Writes made while Redis was unreachable must reach other workers first
+            await AggregateCache._flush_bumps(client)
+            client = AggregateCache._client()
+        if client is not None:
+            try:
+                values = await client.mget([f"{AggregateCache.REDIS_PREFIX}:version:{scope}" for scope in scopes])
+                return [f"{scope}={int(value or 0)}" for scope, value in zip(scopes, values)]
+            except Exception as e:
+                AggregateCache._disable(e)
+
+        # Distinct from Redis versions so entries never cross between the two
+        return [f"{scope}=local{AggregateCache._versions.get(scope, 0)}" for scope in scopes]
+
+    @staticmethod
+    def _client():
+        """Return the Redis client of the running event loop, or None."""
+        if not settings.AGGREGATE_CACHE_REDIS or time.monotonic() < AggregateCache._redis_disabled_until:
+            return None
+
+        # Async connections are bound to the loop that opened them
+        loop = asyncio.get_running_loop()
+        client = AggregateCache._clients.get(loop)
+        if client is None:
+            try:
+                import redis.asyncio
+
+                client = redis.asyncio.Redis.from_url(settings.REDIS_URL, socket_connect_timeout=1, socket_timeout=1)
+            except Exception as e:
+                AggregateCache._disable(e)
+                return None
+            AggregateCache._clients[loop] = client
+        return client
+
+    @staticmethod
+    def _disable(error: Exception) -> None:
+        """Fall back to the in-process tier until Redis is retried."""
+        retry = settings.AGGREGATE_CACHE_REDIS_RETRY
+        AggregateCache._redis_disabled_until = time.monotonic() + retry
+        AggregateCache._clients = WeakKeyDictionary()
+        logger.warning(f"Aggregate cache Redis tier unavailable, retrying in {retry}s: {error}")
+
+    @staticmethod
+    def _local_get(key: str) -> Optional[str]:
+        """Return an unexpired in-process entry."""
+        entry = AggregateCache._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del AggregateCache._entries[key]
+            return None
+        AggregateCache._entries.move_to_end(key)
+        return entry[1]
+
+    @staticmethod
+    def _local_put(key: str, payload: str, ttl: float) -> None:
+        """Insert into the in-process LRU, evicting the oldest entries if full."""
+        if settings.AGGREGATE_CACHE_SIZE <= 0:
+            return
+        AggregateCache._entries[key] = (time.monotonic() + ttl, payload)
+        AggregateCache._entries.move_to_end(key)
+        while len(AggregateCache._entries) > settings.AGGREGATE_CACHE_SIZE:
+            AggregateCache._entries.popitem(last=False)
+
+
+def _json_default(value: Any) -> Any:
+    """Encode values json cannot serialize natively."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (set, tuple)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
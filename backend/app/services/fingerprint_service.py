@@ -1,12 +1,463 @@
 """Fingerprint matching service for vulnerability identification."""
 
+import hashlib
+import json
 import logging
+import multiprocessing
+import os
 import re
-from typing import List, Dict, Optional, Any
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import List, Dict, Optional, Any, Tuple
 from functools import lru_cache
+import billiard
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.fingerprint import Fingerprint
 
 logger = logging.getLogger(__name__)
 
+# Inline verbose flag, e.g. "(?x)" or "(?ix:...)"; whitespace is not literal there
+_VERBOSE_FLAG = re.compile(r"\(\?[a-zA-Z-]*x[a-zA-Z-]*[:)]")
+
+
+class CompiledFingerprintMatcher:
+    """
+    Precompiled fingerprint database with a literal prefilter.
+
+    Every pattern is compiled once and indexed by the longest literal run it
+    requires (``"apache/2."`` for ``r"Apache/2\\.[024]"``). Anchors are bucketed
+    by their first ``GRAM_SIZE`` characters, so a banner only looks up the
+    n-grams it contains and runs the regexes whose anchor actually occurs in
+    it. Patterns without a usable anchor are evaluated for every banner.
+    """
+
+    # Length of the n-gram used to bucket literal anchors
+    GRAM_SIZE = 3
+
+    def __init__(self, fingerprints: Dict[str, List[Dict[str, Any]]]):
+        """
+        Compile a fingerprint database.
+
+        Args:
+            fingerprints: Dictionary of service -> fingerprints
+        """
+        # (service_type, fingerprint, compiled regex), in database order
+        self.entries: List[Tuple[str, Dict[str, Any], "re.Pattern[str]"]] = []
+        self._anchors: Dict[str, List[int]] = {}
+        self._buckets: Dict[str, List[str]] = {}
+        self._unanchored: List[int] = []
+        digest = hashlib.sha1()
+
+        for service_type, patterns in fingerprints.items():
+            for fingerprint in patterns:
+                pattern = fingerprint.get("pattern")
+                if not pattern:
+                    continue
+
+                try:
+                    compiled = re.compile(pattern, re.IGNORECASE)
+                except re.error as e:
+                    logger.warning(f"Invalid regex pattern {pattern}: {e}")
+                    continue
+
+                entry_id = len(self.entries)
+                self.entries.append((service_type, fingerprint, compiled))
+                digest.update(f"{service_type}\0{pattern}\0".encode())
+
+                anchor = CompiledFingerprintMatcher._extract_literal(pattern).lower()
+                if len(anchor) < self.GRAM_SIZE:
+                    self._unanchored.append(entry_id)
+                    continue
+
+                if anchor not in self._anchors:
+                    self._anchors[anchor] = []
+                    self._buckets.setdefault(anchor[: self.GRAM_SIZE], []).append(anchor)
+                self._anchors[anchor].append(entry_id)
+
+        # Identifies this exact pattern set; entry ids are only valid within it
+        self.digest = digest.hexdigest()
+
+        logger.debug(
+            f"Compiled {len(self.entries)} fingerprint patterns "
+            f"({len(self._anchors)} anchors, {len(self._unanchored)} unanchored)"
+        )
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def match_ids(self, banner: str) -> List[int]:
+        """
+        Find the entries whose pattern matches a banner.
+
+        Args:
+            banner: Service banner or version string
+
+        Returns:
+            Matching entry indices in database order
+        """
+        if not banner:
+            return []
+
+        lowered = banner.lower()
+
+        if not lowered.isascii():
+            # IGNORECASE folds some non-ASCII characters onto ASCII letters
+            # (e.g. the Kelvin sign), which str.lower() does not; skip the
+            # prefilter rather than risk missing a match.
+            candidates = range(len(self.entries))
+        else:
+            candidate_set = set(self._unanchored)
+            size = self.GRAM_SIZE
+            grams = {lowered[i : i + size] for i in range(len(lowered) - size + 1)}
+
+            for gram in grams:
+                anchors = self._buckets.get(gram)
+                if not anchors:
+                    continue
+                for anchor in anchors:
+                    if anchor in lowered:
+                        candidate_set.update(self._anchors[anchor])
+
+            candidates = sorted(candidate_set)
+
+        return [
+            entry_id
+            for entry_id in candidates
+            if self.entries[entry_id][2].search(banner)
+        ]
+
+    def match(self, banner: str) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Match a banner against the compiled database.
+
+        Args:
+            banner: Service banner or version string
+
+        Returns:
+            List of (service_type, fingerprint) tuples in database order
+        """
+        return [self.entries[entry_id][:2] for entry_id in self.match_ids(banner)]
+
+    @staticmethod
+    def _extract_literal(pattern: str) -> str:
+        """
+        Extract the longest literal substring every match must contain.
+
+        Groups, character classes and optional atoms end a literal run, and a
+        top-level alternation means no literal is required at all.
+
+        Args:
+            pattern: Regular expression source
+
+        Returns:
+            Required literal (may be empty)
+        """
+        if _VERBOSE_FLAG.search(pattern):
+            return ""
+
+        runs: List[str] = []
+        current: List[str] = []
+        length = len(pattern)
+        i = 0
+
+        def flush() -> None:
+            if current:
+                runs.append("".join(current))
+                current.clear()
+
+        while i < length:
+            ch = pattern[i]
+            literal: Optional[str] = None
+
+            if ch == "\\":
+                if i + 1 >= length:
+                    break
+                escaped = pattern[i + 1]
+                if escaped.isalnum():
+                    # Character classes, anchors, backreferences, \x/\u escapes
+                    if escaped == "x":
+                        i += 4
+                    elif escaped == "u":
+                        i += 6
+                    elif escaped == "U":
+                        i += 10
+                    elif escaped == "N":
+                        close = pattern.find("}", i)
+                        i = close + 1 if close != -1 else length
+                    elif escaped.isdigit():
+                        i += 2
+                        while i < length and pattern[i].isdigit():
+                            i += 1
+                    else:
+                        i += 2
+                else:
+                    literal = escaped
+                    i += 2
+            elif ch == "|":
+                return ""
+            elif ch == "[":
+                i = CompiledFingerprintMatcher._skip_class(pattern, i)
+            elif ch == "(":
+                i = CompiledFingerprintMatcher._skip_group(pattern, i)
+            elif ch in ".^$*+?{)":
+                i += 1
+            else:
+                literal = ch
+                i += 1
+
+            # Quantifier applied to the atom just consumed
+            required = True
+            repeated = False
+            if i < length and pattern[i] in "*?+{":
+                quantifier = pattern[i]
+                if quantifier == "{":
+                    bounds = re.match(r"\{(\d*)(,\d*)?\}", pattern[i:])
+                    if bounds:
+                        required = bool(bounds.group(1)) and int(bounds.group(1)) > 0
+                        repeated = True
+                        i += len(bounds.group(0))
+                    else:
+                        quantifier = None
+                else:
+                    required = quantifier == "+"
+                    repeated = True
+                    i += 1
+                if quantifier and i < length and pattern[i] in "?+":
+                    i += 1  # lazy / possessive modifier
+
+            if literal is None or not required:
+                flush()
+                continue
+
+            current.append(literal)
+            if repeated:
+                flush()
+
+        flush()
+        return max(runs, key=len) if runs else ""
+
+    @staticmethod
+    def _skip_class(pattern: str, start: int) -> int:
+        """Return the index just past the character class opening at start."""
+        i = start + 1
+        if i < len(pattern) and pattern[i] == "^":
+            i += 1
+        if i < len(pattern) and pattern[i] == "]":
+            i += 1
+        while i < len(pattern) and pattern[i] != "]":
+            i += 2 if pattern[i] == "\\" else 1
+        return i + 1
+
+    @staticmethod
+    def _skip_group(pattern: str, start: int) -> int:
+        """Return the index just past the group opening at start."""
+        depth = 0
+        i = start
+        while i < len(pattern):
+            ch = pattern[i]
+            if ch == "\\":
+                i += 2
+                continue
+            if ch == "[":
+                i = CompiledFingerprintMatcher._skip_class(pattern, i)
+                continue
+            if ch == "(":
+                depth += 1
+            elif ch == ")":
+                depth -= 1
+                if depth == 0:
+                    return i + 1
+            i += 1
+        return i
+
+
+class BannerMatchCache:
+    """
+    Memoized banner -> matched entry ids, keyed on a hash of the banner.
+
+    A bounded in-process LRU sits in front of an optional Redis tier shared by
+    all workers. Keys are namespaced by the matcher digest, so results from a
+    different fingerprint database are never reused. After a Redis error the
+    shared tier is bypassed for ``retry`` seconds, then tried again.
+    """
+
+    REDIS_PREFIX = "catchcore:fingerprint:match"
+
+    def __init__(
+        self,
+        maxsize: int,
+        redis_url: Optional[str] = None,
+        ttl: int = 86400,
+        retry: float = 10.0,
+    ):
+        """
+        Create a match cache.
+
+        Args:
+            maxsize: Maximum number of banners kept in process
+            redis_url: Redis URL for the shared tier (disabled if None)
+            ttl: Seconds a shared result is kept in Redis
+            retry: Seconds the Redis tier is bypassed after an error
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.retry = retry
+        self.hits = 0
+        self.misses = 0
+        self.redis_hits = 0
+        self._entries: "OrderedDict[str, List[int]]" = OrderedDict()
+        self._redis = None
+        self._redis_disabled_until = 0.0  # Monotonic time before which Redis is not retried
+
+        if redis_url:
+            try:
+                import redis
+
+                self._redis = redis.Redis.from_url(redis_url, socket_connect_timeout=1, socket_timeout=1)
+            except Exception as e:
+                logger.warning(f"Fingerprint match cache Redis tier disabled: {e}")
+
+    @staticmethod
+    def make_key(namespace: str, banner: str) -> str:
+        """
+        Build the cache key for a banner.
+
+        Matching is case-insensitive, so ASCII banners are lowercased first.
+        Non-ASCII banners are hashed as-is because str.lower() does not agree
+        with regex case folding for every character.
+
+        Args:
+            namespace: Matcher digest
+            banner: Service banner or version string
+
+        Returns:
+            Cache key
+        """
+        normalized = banner.lower() if banner.isascii() else banner
+        banner_hash = hashlib.sha1(normalized.encode("utf-8", "surrogatepass")).hexdigest()
+        return f"{namespace}:{banner_hash}"
+
+    def get(self, namespace: str, banner: str) -> Optional[List[int]]:
+        """
+        Look up memoized match ids for a banner.
+
+        Args:
+            namespace: Matcher digest
+            banner: Service banner or version string
+
+        Returns:
+            Matched entry ids, or None on a miss
+        """
+        key = self.make_key(namespace, banner)
+
+        ids = self._entries.get(key)
+        if ids is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return ids
+
+        client = self._redis_client()
+        if client is not None:
+            try:
+                cached = client.get(f"{self.REDIS_PREFIX}:{key}")
+            except Exception as e:
+                self._disable_redis(e)
+                cached = None
+
+            if cached is not None:
+                ids = json.loads(cached)
+                self._store(key, ids)
+                self.hits += 1
+                self.redis_hits += 1
+                return ids
+
+        self.misses += 1
+        return None
+
+    def put(self, namespace: str, banner: str, ids: List[int]) -> None:
+        """
+        Memoize match ids for a banner.
+
+        Args:
+            namespace: Matcher digest
+            banner: Service banner or version string
+            ids: Matched entry ids
+        """
+        key = self.make_key(namespace, banner)
+        self._store(key, ids)
+
+        client = self._redis_client()
+        if client is not None:
+            try:
+                client.set(f"{self.REDIS_PREFIX}:{key}", json.dumps(ids), ex=self.ttl)
+            except Exception as e:
+                self._disable_redis(e)
+
+    def _redis_client(self):
+        """Return the Redis client unless the shared tier is off or cooling down."""
+        if self._redis is None or time.monotonic() < self._redis_disabled_until:
+            return None
+        return self._redis
+
+    def _disable_redis(self, error: Exception) -> None:
+        """Use only the in-process tier until Redis is retried."""
+        self._redis_disabled_until = time.monotonic() + self.retry
+        logger.warning(f"Fingerprint match cache Redis tier unavailable, retrying in {self.retry}s: {error}")
+
+    def _store(self, key: str, ids: List[int]) -> None:
+        """Insert into the in-process LRU, evicting the oldest entry if full."""
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = ids
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all in-process entries (Redis keys expire on their own)."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with hit/miss counters and size
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "redis_hits": self.redis_hits,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "size": len(self._entries),
+            "max_size": self.maxsize,
+            "redis_enabled": self._redis_client() is not None,
+        }
+
+
+# Matcher compiled once in each match worker process
+_worker_matcher: Optional[CompiledFingerprintMatcher] = None
+
+
+def _init_match_worker(fingerprints: Dict[str, List[Dict[str, Any]]]) -> None:
+    """Process pool initializer: compile the fingerprint database once per worker."""
+    global _worker_matcher
+    _worker_matcher = CompiledFingerprintMatcher(fingerprints)
+
+
+def _match_chunk(banners: List[str]) -> List[List[int]]:
+    """Match one chunk of banners inside a match worker."""
+    return [_worker_matcher.match_ids(banner) for banner in banners]
+
 
 class FingerprintService:
     """Service for matching service fingerprints against known patterns."""
@@ -84,6 +535,17 @@ class FingerprintService:
     # Cache for loaded fingerprints
     _fingerprint_cache: Optional[Dict[str, List[Dict[str, Any]]]] = None
 
+    # Compiled form of the loaded fingerprints
+    _matcher: Optional[CompiledFingerprintMatcher] = None
+
+    # Version stamp (max updated_at, row count) of the fingerprints table
+    # the cache was built from; None while using built-in definitions
+    _fingerprint_version: Optional[Tuple[Optional[datetime], int]] = None
+    _version_checked_at: Optional[float] = None
+
+    # Memoized banner match results
+    _match_cache: Optional[BannerMatchCache] = None
+
     @staticmethod
     def load_fingerprints() -> Dict[str, List[Dict[str, Any]]]:
         """
@@ -110,6 +572,192 @@ class FingerprintService:
 
         return FingerprintService._fingerprint_cache
 
+    @staticmethod
+    def get_database_version(session: Session) -> Tuple[Optional[datetime], int]:
+        """
+        Get the version stamp of the fingerprints table.
+
+        Args:
+            session: Sync database session
+
+        Returns:
+            Tuple of (max updated_at, row count)
+        """
+        latest, count = session.execute(
+            select(func.max(Fingerprint.updated_at), func.count(Fingerprint.id))
+        ).one()
+        return latest, count
+
+    @staticmethod
+    def load_fingerprints_from_db(session: Session) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Bulk-read the fingerprints table in a single streamed query.
+
+        ``regex`` is used as-is; a plain ``pattern`` is matched literally.
+        Rows are grouped by product (falling back to name), and CVE IDs are
+        taken from the description.
+
+        Args:
+            session: Sync database session
+
+        Returns:
+            Dictionary of service -> fingerprints
+        """
+        stmt = (
+            select(
+                Fingerprint.id,
+                Fingerprint.name,
+                Fingerprint.product,
+                Fingerprint.vendor,
+                Fingerprint.fingerprint_type,
+                Fingerprint.pattern,
+                Fingerprint.regex,
+                Fingerprint.confidence,
+                Fingerprint.description,
+            )
+            .order_by(Fingerprint.id)
+            .execution_options(yield_per=settings.FINGERPRINT_DB_FETCH_SIZE)
+        )
+
+        fingerprints: Dict[str, List[Dict[str, Any]]] = {}
+        for row in session.execute(stmt):
+            if row.regex:
+                pattern = row.regex
+            elif row.pattern:
+                pattern = re.escape(row.pattern)
+            else:
+                continue
+
+            service_type = row.product or row.name
+            fingerprints.setdefault(service_type, []).append(
+                {
+                    "id": row.id,
+                    "pattern": pattern,
+                    "cve": re.findall(r"CVE-\d{4}-\d+", row.description or ""),
+                    "severity": None,
+                    "confidence": row.confidence,
+                    "vendor": row.vendor,
+                    "fingerprint_type": row.fingerprint_type,
+                }
+            )
+
+        return fingerprints
+
+    @staticmethod
+    def sync_with_database(
+        session: Optional[Session] = None,
+        force: bool = False,
+    ) -> CompiledFingerprintMatcher:
+        """
+        Rebuild the compiled matcher if the fingerprints table changed.
+
+        The table version is checked at most every
+        ``FINGERPRINT_VERSION_CHECK_INTERVAL`` seconds, and the table is only
+        re-read when the version stamp differs from the cached one. An empty
+        table falls back to the built-in definitions.
+
+        Args:
+            session: Sync database session (a new one is opened if omitted)
+            force: Check the version even if the interval has not elapsed
+
+        Returns:
+            Compiled matcher for the current fingerprint database
+        """
+        checked_at = FingerprintService._version_checked_at
+        if (
+            not force
+            and FingerprintService._matcher is not None
+            and checked_at is not None
+            and time.monotonic() - checked_at < settings.FINGERPRINT_VERSION_CHECK_INTERVAL
+        ):
+            return FingerprintService._matcher
+
+        if session is None:
+            from app.core.database import sync_session
+
+            with sync_session() as session:
+                return FingerprintService.sync_with_database(session, force=True)
+
+        version = FingerprintService.get_database_version(session)
+        FingerprintService._version_checked_at = time.monotonic()
+
+        if (
+            FingerprintService._matcher is not None
+            and version == FingerprintService._fingerprint_version
+        ):
+            return FingerprintService._matcher
+
+        if version[1]:
+            logger.info(f"Loading {version[1]} fingerprints from database")
+            fingerprints = FingerprintService.load_fingerprints_from_db(session)
+        else:
+            logger.info("Fingerprint table is empty, using built-in definitions")
+            fingerprints = FingerprintService.FINGERPRINTS
+
+        FingerprintService._fingerprint_cache = fingerprints
+        FingerprintService._matcher = CompiledFingerprintMatcher(fingerprints)
+        FingerprintService._fingerprint_version = version
+        FingerprintService.get_match_cache().clear()
+        logger.info(
+            f"Compiled {len(FingerprintService._matcher)} fingerprint patterns "
+            f"(version {version})"
+        )
+
+        return FingerprintService._matcher
+
+    @staticmethod
+    def get_matcher() -> CompiledFingerprintMatcher:
+        """
+        Get the compiled fingerprint matcher (built once per process).
+
+        Returns:
+            Compiled matcher for the loaded fingerprint database
+        """
+        if FingerprintService._matcher is None:
+            fingerprints = FingerprintService.load_fingerprints()
+            FingerprintService._matcher = CompiledFingerprintMatcher(fingerprints)
+            logger.info(
+                f"Compiled {len(FingerprintService._matcher)} fingerprint patterns"
+            )
+
+        return FingerprintService._matcher
+
+    @staticmethod
+    def get_match_cache() -> BannerMatchCache:
+        """
+        Get the banner match cache, creating it on first use.
+
+        Returns:
+            Banner match cache
+        """
+        if FingerprintService._match_cache is None:
+            FingerprintService._match_cache = BannerMatchCache(
+                settings.FINGERPRINT_MATCH_CACHE_SIZE,
+                redis_url=settings.REDIS_URL if settings.FINGERPRINT_MATCH_CACHE_REDIS else None,
+                ttl=settings.FINGERPRINT_MATCH_CACHE_TTL,
+                retry=settings.FINGERPRINT_MATCH_CACHE_REDIS_RETRY,
+            )
+        return FingerprintService._match_cache
+
+    @staticmethod
+    def _match_banner_ids(matcher: CompiledFingerprintMatcher, banner: str) -> List[int]:
+        """
+        Match a banner, reusing memoized results for repeated banners.
+
+        Args:
+            matcher: Compiled fingerprint matcher
+            banner: Service banner or version string
+
+        Returns:
+            Matched entry ids in database order
+        """
+        cache = FingerprintService.get_match_cache()
+        ids = cache.get(matcher.digest, banner)
+        if ids is None:
+            ids = matcher.match_ids(banner)
+            cache.put(matcher.digest, banner, ids)
+        return ids
+
     @staticmethod
     def match_fingerprints(
         asset_id: int, service_data: Dict[str, Any]
@@ -129,7 +777,7 @@ class FingerprintService:
         )
 
         matches = []
-        fingerprints = FingerprintService.load_fingerprints()
+        matcher = FingerprintService.get_matcher()
 
         banner = service_data.get("banner", "") or service_data.get("version", "")
         service_name = service_data.get("service", "")
@@ -138,29 +786,19 @@ class FingerprintService:
             logger.warning(f"No banner/version for service {service_name}")
             return matches
 
-        # Match against all fingerprints
-        for service_type, patterns in fingerprints.items():
-            for fingerprint in patterns:
-                pattern = fingerprint.get("pattern")
-                if not pattern:
-                    continue
-
-                try:
-                    if re.search(pattern, banner, re.IGNORECASE):
-                        matches.append(
-                            {
-                                "asset_id": asset_id,
-                                "service": service_name,
-                                "service_type": service_type,
-                                "pattern_matched": pattern,
-                                "cve": fingerprint.get("cve", []),
-                                "severity": fingerprint.get("severity"),
-                                "confidence": "high",
-                            }
-                        )
-                except re.error as e:
-                    logger.warning(f"Invalid regex pattern {pattern}: {e}")
-                    continue
+        for entry_id in FingerprintService._match_banner_ids(matcher, banner):
+            service_type, fingerprint, _ = matcher.entries[entry_id]
+            matches.append(
+                {
+                    "asset_id": asset_id,
+                    "service": service_name,
+                    "service_type": service_type,
+                    "pattern_matched": fingerprint.get("pattern"),
+                    "cve": fingerprint.get("cve", []),
+                    "severity": fingerprint.get("severity"),
+                    "confidence": "high",
+                }
+            )
 
         logger.info(f"Found {len(matches)} fingerprint matches")
         return matches
@@ -168,20 +806,62 @@ class FingerprintService:
     @staticmethod
     def match_fingerprints_batch(
         services: List[Dict[str, Any]],
+        parallel: Optional[bool] = None,
+        workers: Optional[int] = None,
     ) -> List[Dict[str, Any]]:
         """
         Match multiple services against fingerprint database.
 
+        Large batches are split into chunks of ``FINGERPRINT_CHUNK_SIZE`` and
+        matched in a process pool whose workers compile the fingerprint
+        database once at startup. Results are merged in service order.
+
         Args:
             services: List of service dictionaries
+            parallel: Force parallel (True) or serial (False) matching;
+                by default batches of ``FINGERPRINT_PARALLEL_THRESHOLD`` or
+                more services are matched in parallel
+            workers: Number of worker processes (default from settings)
 
         Returns:
             List of all matched fingerprints
         """
         logger.info(f"Batch matching {len(services)} services")
 
+        if parallel is None:
+            parallel = len(services) >= settings.FINGERPRINT_PARALLEL_THRESHOLD
+
+        all_matches = None
+        if parallel:
+            all_matches = FingerprintService._match_services_parallel(services, workers)
+
+        if all_matches is None:
+            all_matches = FingerprintService._match_services(
+                FingerprintService.get_matcher(), services
+            )
+
+        logger.info(f"Found {len(all_matches)} total matches in batch")
+        return all_matches
+
+    @staticmethod
+    def _match_services(
+        matcher: CompiledFingerprintMatcher,
+        services: List[Dict[str, Any]],
+        resolved: Optional[Dict[str, List[int]]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Build match results for services with a compiled matcher.
+
+        Args:
+            matcher: Compiled fingerprint matcher
+            services: List of service dictionaries
+            resolved: Precomputed banner -> matched entry ids; banners not in
+                it are matched through the memoization cache
+
+        Returns:
+            List of matched fingerprints
+        """
         all_matches = []
-        fingerprints = FingerprintService.load_fingerprints()
 
         for service in services:
             try:
@@ -193,39 +873,107 @@ class FingerprintService:
                 if not banner:
                     continue
 
-                # Match against all fingerprints
-                for service_type, patterns in fingerprints.items():
-                    for fingerprint in patterns:
-                        pattern = fingerprint.get("pattern")
-                        if not pattern:
-                            continue
-
-                        try:
-                            if re.search(pattern, banner, re.IGNORECASE):
-                                all_matches.append(
-                                    {
-                                        "ip": ip,
-                                        "port": port,
-                                        "service": service_name,
-                                        "service_type": service_type,
-                                        "pattern_matched": pattern,
-                                        "cve": fingerprint.get("cve", []),
-                                        "severity": fingerprint.get("severity"),
-                                        "banner": banner[:100],
-                                        "confidence": "high",
-                                    }
-                                )
-                        except re.error as e:
-                            logger.warning(f"Invalid regex pattern {pattern}: {e}")
-                            continue
+                if resolved is not None and banner in resolved:
+                    ids = resolved[banner]
+                else:
+                    ids = FingerprintService._match_banner_ids(matcher, banner)
+
+                for entry_id in ids:
+                    service_type, fingerprint, _ = matcher.entries[entry_id]
+                    all_matches.append(
+                        {
+                            "ip": ip,
+                            "port": port,
+                            "service": service_name,
+                            "service_type": service_type,
+                            "pattern_matched": fingerprint.get("pattern"),
+                            "cve": fingerprint.get("cve", []),
+                            "severity": fingerprint.get("severity"),
+                            "banner": banner[:100],
+                            "confidence": "high",
+                        }
+                    )
 
             except Exception as e:
                 logger.warning(f"Error processing service {service}: {e}")
                 continue
 
-        logger.info(f"Found {len(all_matches)} total matches in batch")
         return all_matches
 
+    @staticmethod
+    def _match_services_parallel(
+        services: List[Dict[str, Any]],
+        workers: Optional[int] = None,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Match services with the distinct uncached banners spread over a process pool.
+
+        Banners are deduplicated and looked up in the match cache first, so
+        only new banners are sent to the workers.
+
+        Args:
+            services: List of service dictionaries
+            workers: Number of worker processes (default from settings)
+
+        Returns:
+            List of matched fingerprints, or None if the pool is unavailable
+        """
+        matcher = FingerprintService.get_matcher()
+        cache = FingerprintService.get_match_cache()
+
+        resolved: Dict[str, List[int]] = {}
+        pending: List[str] = []
+        for service in services:
+            banner = service.get("banner") or service.get("version", "")
+            if not banner or banner in resolved:
+                continue
+            ids = cache.get(matcher.digest, banner)
+            if ids is None:
+                pending.append(banner)
+                resolved[banner] = []
+            else:
+                resolved[banner] = ids
+
+        workers = workers or settings.FINGERPRINT_PARALLEL_WORKERS or os.cpu_count() or 1
+        chunk_size = max(1, settings.FINGERPRINT_CHUNK_SIZE)
+        chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+        workers = min(workers, len(chunks))
+
+        if workers <= 1:
+            for banner in pending:
+                resolved[banner] = matcher.match_ids(banner)
+                cache.put(matcher.digest, banner, resolved[banner])
+            return FingerprintService._match_services(matcher, services, resolved)
+
+        initargs = (FingerprintService.load_fingerprints(),)
+        try:
+            if multiprocessing.current_process().daemon or billiard.current_process().daemon:
+                # Daemonic processes (e.g. Celery prefork children) may not start
+                # multiprocessing children; billiard, Celery's fork of it, allows it
+                with billiard.Pool(workers, initializer=_init_match_worker, initargs=initargs) as pool:
+                    results = pool.map(_match_chunk, chunks)
+            else:
+                with ProcessPoolExecutor(
+                    max_workers=workers,
+                    initializer=_init_match_worker,
+                    initargs=initargs,
+                ) as executor:
+                    results = list(executor.map(_match_chunk, chunks))
+
+            for chunk, chunk_ids in zip(chunks, results):
+                for banner, ids in zip(chunk, chunk_ids):
+                    resolved[banner] = ids
+                    cache.put(matcher.digest, banner, ids)
+        except Exception as e:
+            logger.warning(f"Parallel fingerprint matching failed, matching serially: {e}")
+            return None
+
+        logger.info(
+            f"Matched {len(pending)} distinct banners in {len(chunks)} chunks "
+            f"across {workers} processes"
+        )
+        return FingerprintService._match_services(matcher, services, resolved)
+
     @staticmethod
     def get_cve_details(cve_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -267,6 +1015,10 @@ class FingerprintService:
     def clear_cache() -> None:
         """Clear fingerprint cache."""
         FingerprintService._fingerprint_cache = None
+        FingerprintService._matcher = None
+        FingerprintService._fingerprint_version = None
+        FingerprintService._version_checked_at = None
+        FingerprintService._match_cache = None
         logger.info("Fingerprint cache cleared")
 
     @staticmethod
@@ -298,6 +1050,8 @@ class FingerprintService:
                 cves = pattern_data.get("cve", [])
                 cve_set.update(cves)
 
+        version = FingerprintService._fingerprint_version
+
         return {
             "total_services": services_count,
             "total_patterns": total_patterns,
@@ -305,4 +1059,12 @@ class FingerprintService:
             "cache_status": "loaded"
             if FingerprintService._fingerprint_cache is not None
             else "unloaded",
+            "source": "database" if version and version[1] else "builtin",
+            "database_version": {
+                "updated_at": version[0].isoformat() if version[0] else None,
+                "count": version[1],
+            }
+            if version
+            else None,
+            "match_cache": FingerprintService.get_match_cache().get_statistics(),
         }
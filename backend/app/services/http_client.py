@@ -0,0 +1,128 @@
+"""Shared pooled HTTP client for HTTP POCs."""
+
+import asyncio
+import logging
+from typing import Dict, Optional, Tuple
+
+import aiohttp
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class HttpClient:
+    """Process-wide aiohttp sessions, one per event loop, with per-host connection pooling."""
+
+    _sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+
+    @staticmethod
+    def get_session() -> aiohttp.ClientSession:
+        """
+        Return the shared session for the running event loop, creating it on first use.
+
+        Connections are kept alive and reused per host, at most
+        HTTP_CLIENT_POOL_SIZE in total and HTTP_CLIENT_POOL_PER_HOST per host;
+        DNS answers are cached for HTTP_CLIENT_DNS_CACHE_TTL seconds. Sessions
+        cannot cross loops, so each event loop (e.g. a Celery task's
+        ``asyncio.run``) gets its own; sessions left behind by loops that
+        have since closed are released.
+
+        Returns:
+            Shared client session
+        """
+        loop = asyncio.get_running_loop()
+        HttpClient._release_closed_loops()
+        session = HttpClient._sessions.get(loop)
+
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=settings.HTTP_CLIENT_POOL_SIZE,
+                limit_per_host=settings.HTTP_CLIENT_POOL_PER_HOST,
+                ttl_dns_cache=settings.HTTP_CLIENT_DNS_CACHE_TTL,
+                keepalive_timeout=settings.HTTP_CLIENT_KEEPALIVE_TIMEOUT,
+                ssl=False,
+            )
+            session = aiohttp.ClientSession(connector=connector)
+            HttpClient._sessions[loop] = session
+            logger.debug("Created pooled HTTP client session")
+
+        return session
+
+    @staticmethod
+    async def request(
+        method: str,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        data: Optional[str] = None,
+        timeout: Optional[float] = None,
+        max_body: Optional[int] = None,
+    ) -> Tuple[int, str]:
+        """
+        Send one request over the shared pool.
+
+        Only the first ``max_body`` bytes of the response are read; the
+        connection is returned to the pool when the body was fully consumed
+        and closed otherwise.
+
+        Args:
+            method: HTTP method
+            url: Absolute URL
+            headers: Request headers
+            data: Request body
+            timeout: Total seconds for the request (default from settings)
+            max_body: Response bytes to read (default from settings)
+
+        Returns:
+            (status code, decoded body prefix)
+
+        Raises:
+            aiohttp.ClientError: On connection or protocol errors
+            asyncio.TimeoutError: If the timeout elapsed
+        """
+        session = HttpClient.get_session()
+        client_timeout = aiohttp.ClientTimeout(total=timeout or settings.HTTP_CLIENT_TIMEOUT)
+        max_body = max_body or settings.HTTP_CLIENT_MAX_BODY
+
+        async with session.request(
+            method,
+            url,
+            headers=headers,
+            data=data,
+            timeout=client_timeout,
+        ) as response:
+            body = b""
+            while len(body) < max_body:
+                chunk = await response.content.read(max_body - len(body))
+                if not chunk:
+                    break
+                body += chunk
+
+            if not response.content.at_eof():
+                # Unread body would poison the keep-alive connection
+                response.close()
+            try:
+                text = body.decode(response.charset or "utf-8", errors="replace")
+            except LookupError:
+                text = body.decode("utf-8", errors="replace")
+            return response.status, text
+
+    @staticmethod
+    async def close() -> None:
+        """Close the running loop's session and release those of closed loops."""
+        session = HttpClient._sessions.pop(asyncio.get_running_loop(), None)
+        HttpClient._release_closed_loops()
+        if session is not None and not session.closed:
+            await session.close()
+
+    @staticmethod
+    def _release_closed_loops() -> None:
+        """Drop sessions whose event loop has closed without closing them."""
+        for loop, session in list(HttpClient._sessions.items()):
+            if loop.is_closed():
+                del HttpClient._sessions[loop]
+                if not session.closed:
+                    # Its transports went away with the loop; detach so the
+                    # session is marked closed without touching the dead loop
+                    session.detach()
+                    logger.debug("Released HTTP client session of a closed event loop")
@@ -1,11 +1,15 @@
 """Maintenance service for cleanup and maintenance tasks."""
 
+import asyncio
 import logging
 from datetime import datetime, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete
 
 from app.celery_app import celery_app
+from app.core.database import async_session, engine
+from app.services.aggregate_cache import AggregateCache
+from app.services.statistics_service import StatisticsService
 
 logger = logging.getLogger(__name__)
 
@@ -60,16 +64,34 @@ def generate_statistics():
     """Generate system statistics for monitoring."""
     logger.info("Generating system statistics")
 
-    stats = {
-        "timestamp": datetime.utcnow().isoformat(),
-        "active_tasks": 0,
-        "completed_tasks": 0,
-        "failed_tasks": 0,
-        "total_vulnerabilities": 0,
-        "total_assets": 0,
-    }
+    async def run():
+        try:
+            async with async_session() as db:
+                return await StatisticsService.system_statistics(db)
+        finally:
+            # Pooled connections are bound to this task's event loop
+            await engine.dispose()
 
-    # In production, query actual statistics from database
+    stats = {"timestamp": datetime.utcnow().isoformat(), **asyncio.run(run())}
 
     logger.info(f"Statistics generated: {stats}")
     return stats
+
+
+@celery_app.task(name="app.services.maintenance.reconcile_statistics")
+def reconcile_statistics():
+    """Recount statistics rollups from the raw tables."""
+    logger.info("Reconciling statistics rollups")
+
+    async def run():
+        try:
+            async with async_session() as db:
+                counts = await StatisticsService.reconcile(db)
+            await AggregateCache.bump("vulnerabilities", "tasks")
+            return counts
+        finally:
+            # Pooled connections are bound to this task's event loop
+            await engine.dispose()
+
+    counts = asyncio.run(run())
+    return {"status": "completed", **counts}
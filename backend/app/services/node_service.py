@@ -9,6 +9,7 @@ from sqlalchemy import select, and_, desc
 
 from app.models.node import Node
 from app.models.task import Task, TaskStatusEnum
+from app.services.aggregate_cache import AggregateCache
 
 logger = logging.getLogger(__name__)
 
@@ -159,6 +160,7 @@ class NodeService:
             node.current_tasks += 1
             node.updated_at = datetime.utcnow()
 
+            # Load changes don't invalidate the nodes summary; it ages out through its TTL
             await db.commit()
             await db.refresh(node)
 
@@ -244,10 +246,13 @@ class NodeService:
                 logger.error(f"Node {node_id} not found")
                 return False
 
+            changed = node.status != "offline"
             node.status = "offline"
             node.updated_at = datetime.utcnow()
 
             await db.commit()
+            if changed:
+                await AggregateCache.bump("nodes")
 
             logger.info(f"Node {node.name} marked as offline")
             return True
@@ -338,6 +343,7 @@ class NodeService:
 
             if offline_count > 0:
                 await db.commit()
+                await AggregateCache.bump("nodes")
                 logger.info(f"Marked {offline_count} nodes as offline")
 
             return offline_count
@@ -389,6 +395,7 @@ class NodeService:
 
             if redistributed_task_ids:
                 await db.commit()
+                await AggregateCache.bump("tasks")
 
             return redistributed_task_ids
 
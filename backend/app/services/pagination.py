@@ -0,0 +1,218 @@
+"""Keyset and offset pagination with exact, estimated or skipped counts."""
+
+import base64
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, literal, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class Paginator:
+    """
+    Paginate list queries newest first on ``(sort column, id)``.
+
+    Clients pass the opaque ``next_cursor`` of one page to fetch the next,
+    which seeks on the composite index instead of scanning ``OFFSET`` rows;
+    ``page`` still works when no cursor is given. Totals are counted
+    exactly, estimated (PostgreSQL planner rows, otherwise an exact count
+    cached for PAGINATION_COUNT_CACHE_TTL seconds) or skipped.
+    """
+
+    COUNT_MODES = ("exact", "estimate", "none")
+
+    _counts: "OrderedDict[str, Tuple[float, int]]" = OrderedDict()  # key -> (expiry, total), LRU order
+    _lock = threading.Lock()
+
+    @staticmethod
+    def encode_cursor(sort_value: datetime, row_id: int) -> str:
+        """
+        Encode the position after a row as an opaque cursor.
+
+        Args:
+            sort_value: Sort column value of the last row returned
+            row_id: ID of the last row returned
+
+        Returns:
+            URL-safe cursor string
+        """
+        raw = json.dumps([sort_value.isoformat(), row_id], separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+        """
+        Decode a cursor produced by :meth:`encode_cursor`.
+
+        Args:
+            cursor: Cursor string
+
+        Returns:
+            (sort value, row id)
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            sort_value, row_id = json.loads(raw)
+            if not isinstance(row_id, int):
+                raise TypeError("cursor id must be an integer")
+            return datetime.fromisoformat(sort_value), row_id
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+
+    @staticmethod
+    def next_cursor(items: Sequence[Any], page_size: int, sort_attr: str) -> Optional[str]:
+        """
+        Return the cursor of the page after ``items``.
+
+        Args:
+            items: Rows of the current page
+            page_size: Requested page size
+            sort_attr: Name of the sort attribute on the rows
+
+        Returns:
+            Cursor string, or None when the page was not full
+        """
+        if not items or len(items) < page_size:
+            return None
+        last = items[-1]
+        return Paginator.encode_cursor(getattr(last, sort_attr), last.id)
+
+    @staticmethod
+    async def paginate(
+        db: AsyncSession,
+        query,
+        sort_column,
+        id_column,
+        page: int = 1,
+        page_size: int = 20,
+        cursor: Optional[str] = None,
+        count: str = "exact",
+    ) -> Tuple[List[Any], Optional[int]]:
+        """
+        Fetch one page of ``query`` ordered by ``sort_column`` then ``id_column`` descending.
+
+        Args:
+            db: Database session
+            query: Filtered select statement without ordering or limits
+            sort_column: Timestamp column to order by
+            id_column: Primary key column breaking ties
+            page: Page number, used when no cursor is given
+            page_size: Page size
+            cursor: Cursor of the previous page's last row
+            count: Count mode (exact, estimate, none)
+
+        Returns:
+            Tuple of (rows, total_count); total is None in ``none`` mode
+
+        Raises:
+            ValueError: If the cursor or count mode is invalid
+        """
+        total = await Paginator.count(db, query, count)
+
+        page_query = query.order_by(sort_column.desc(), id_column.desc())
+        if cursor:
+            sort_value, row_id = Paginator.decode_cursor(cursor)
+            page_query = page_query.where(
+                tuple_(sort_column, id_column)
+                < tuple_(literal(sort_value, sort_column.type), literal(row_id, id_column.type))
+            )
+        else:
+            page_query = page_query.offset((page - 1) * page_size)
+
+        result = await db.execute(page_query.limit(page_size))
+        return result.unique().scalars().all(), total
+
+    @staticmethod
+    async def count(db: AsyncSession, query, mode: str = "exact") -> Optional[int]:
+        """
+        Count the rows of ``query``.
+
+        Args:
+            db: Database session
+            query: Filtered select statement
+            mode: ``exact`` runs COUNT(*); ``estimate`` uses the PostgreSQL
+                planner estimate when it is at least
+                PAGINATION_ESTIMATE_THRESHOLD rows (smaller results are
+                counted exactly) and a cached exact count on other databases;
+                ``none`` skips counting
+
+        Returns:
+            Row count, or None in ``none`` mode
+
+        Raises:
+            ValueError: If the mode is unknown
+        """
+        if mode not in Paginator.COUNT_MODES:
+            raise ValueError(f"Unknown count mode: {mode}")
+        if mode == "none":
+            return None
+
+        count_query = select(func.count()).select_from(query.order_by(None).subquery())
+
+        if mode == "estimate":
+            if db.get_bind().dialect.name == "postgresql":
+                estimate = await Paginator._planner_estimate(db, query)
+                if estimate is not None and estimate >= settings.PAGINATION_ESTIMATE_THRESHOLD:
+                    return estimate
+            else:
+                return await Paginator._cached_count(db, count_query)
+
+        result = await db.execute(count_query)
+        return result.scalar() or 0
+
+    @staticmethod
+    async def _planner_estimate(db: AsyncSession, query) -> Optional[int]:
+        """Return the PostgreSQL planner's row estimate for ``query``."""
+        try:
+            sql = str(query.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True}))
+            connection = await db.connection()
+            result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")
+            plan = result.scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]["Plan"]["Plan Rows"])
+        except Exception as e:
+            logger.warning(f"Planner row estimate failed, counting exactly: {e}")
+            return None
+
+    @staticmethod
+    async def _cached_count(db: AsyncSession, count_query) -> int:
+        """Return an exact count, reusing it for PAGINATION_COUNT_CACHE_TTL seconds."""
+        compiled = count_query.compile(dialect=db.get_bind().dialect)
+        key = f"{compiled}|{sorted(compiled.params.items(), key=lambda item: item[0])!r}"
+        now = time.monotonic()
+
+        with Paginator._lock:
+            entry = Paginator._counts.get(key)
+            if entry is not None and entry[0] > now:
+                Paginator._counts.move_to_end(key)
+                return entry[1]
+
+        result = await db.execute(count_query)
+        total = result.scalar() or 0
+
+        with Paginator._lock:
+            Paginator._counts[key] = (now + settings.PAGINATION_COUNT_CACHE_TTL, total)
+            Paginator._counts.move_to_end(key)
+            while len(Paginator._counts) > settings.PAGINATION_COUNT_CACHE_SIZE:
+                Paginator._counts.popitem(last=False)
+
+        return total
+
+    @staticmethod
+    def clear_counts() -> None:
+        """Drop all cached counts."""
+        with Paginator._lock:
+            Paginator._counts.clear()
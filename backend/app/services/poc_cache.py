@@ -0,0 +1,285 @@
+"""Content-addressed cache of parsed and materialized POC templates."""
+
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import yaml
+
+from app.core.config import settings
+from app.models.poc import content_hash
+
+logger = logging.getLogger(__name__)
+
+CVE_PATTERN = re.compile(r"CVE-\d+-\d+")
+
+
+class POCCache:
+    """
+    Cache POC parse results and template files by SHA-256 of their content.
+
+    Parsed metadata lives in an in-process LRU of POC_CACHE_MAX_ENTRIES
+    entries. Template files are materialized once under POC_CACHE_DIR as
+    ``<sha256>.yaml`` and evicted least recently used first once they exceed
+    POC_CACHE_MAX_BYTES. Identical content always maps to the same entry, so
+    editing a POC can never serve stale data; :meth:`invalidate` only frees
+    the space held by the old content.
+
+    The directory is shared by every worker, each with its own index. Every
+    use stamps the file's access time, and no worker deletes a template used
+    within the last POC_CACHE_MIN_IDLE seconds, so a file handed to a tool
+    by one worker is not removed by another while the tool runs.
+    """
+
+    _parsed: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+    _files: "OrderedDict[str, int]" = OrderedDict()  # key -> file size, LRU order
+    _files_size = 0
+    _files_dir: Optional[str] = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def key(content: str) -> str:
+        """Return the cache key of POC content."""
+        return content_hash(content)
+
+    @staticmethod
+    def parsed(content: str) -> Dict[str, Any]:
+        """
+        Return the parse result of POC content, parsing it on first use.
+
+        Args:
+            content: POC script/YAML content
+
+        Returns:
+            Dict with ``yaml_valid``, ``template_id``, ``name``,
+            ``description``, ``severity``, ``tags``, ``reference_cves`` and
+            ``content_cves``. Treat it as read-only.
+        """
+        key = POCCache.key(content)
+
+        with POCCache._lock:
+            entry = POCCache._parsed.get(key)
+            if entry is not None:
+                POCCache._parsed.move_to_end(key)
+                return entry
+
+        entry = POCCache._parse(content)
+
+        with POCCache._lock:
+            POCCache._parsed[key] = entry
+            POCCache._parsed.move_to_end(key)
+            while len(POCCache._parsed) > settings.POC_CACHE_MAX_ENTRIES:
+                POCCache._parsed.popitem(last=False)
+
+        return entry
+
+    @staticmethod
+    def _parse(content: str) -> Dict[str, Any]:
+        """Parse POC content into the fields callers need."""
+        entry = {
+            "yaml_valid": True,
+            "template_id": None,
+            "name": None,
+            "description": None,
+            "severity": None,
+            "tags": [],
+            "reference_cves": [],
+            "content_cves": CVE_PATTERN.findall(content),
+        }
+
+        try:
+            data = yaml.safe_load(content)
+        except yaml.YAMLError:
+            entry["yaml_valid"] = False
+            return entry
+
+        if not isinstance(data, dict):
+            return entry
+
+        if data.get("id") is not None:
+            entry["template_id"] = str(data["id"])
+        entry["name"] = data.get("id")
+
+        info = data.get("info", {})
+        if isinstance(info, dict):
+            entry["description"] = info.get("description")
+            entry["severity"] = info.get("severity")
+
+            tags = info.get("tags") or []
+            if isinstance(tags, str):
+                tags = tags.split(",")
+            entry["tags"] = [str(tag).strip() for tag in tags if str(tag).strip()]
+
+            references = info.get("reference", [])
+            if isinstance(references, str):
+                references = [references]
+            for ref in references or []:
+                if isinstance(ref, str) and "CVE" in ref:
+                    match = CVE_PATTERN.search(ref)
+                    if match:
+                        entry["reference_cves"].append(match.group())
+
+        return entry
+
+    @staticmethod
+    def template_path(content: str) -> str:
+        """
+        Return a file holding ``content``, writing it only if not cached.
+
+        Files are written atomically, so concurrent workers sharing the
+        directory never see partial templates. The returned file belongs to
+        the cache: callers must not modify or delete it.
+
+        Args:
+            content: POC template content
+
+        Returns:
+            Path of the materialized template
+        """
+        key = POCCache.key(content)
+        directory = POCCache._directory()
+        path = os.path.join(directory, f"{key}.yaml")
+
+        with POCCache._lock:
+            if key in POCCache._files and POCCache._touch(path):
+                POCCache._files.move_to_end(key)
+                return path
+
+        if not POCCache._touch(path):
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+
+        size = os.path.getsize(path)
+        with POCCache._lock:
+            POCCache._files_size += size - POCCache._files.pop(key, 0)
+            POCCache._files[key] = size
+            POCCache._evict_files(keep=key)
+
+        return path
+
+    @staticmethod
+    def link_template(content: str, dest: str) -> None:
+        """
+        Place the cached template for ``content`` at ``dest``.
+
+        Hard-links the cached file where possible and falls back to writing
+        ``content`` when the cache is on another filesystem.
+
+        Args:
+            content: POC template content
+            dest: Destination path
+        """
+        try:
+            os.link(POCCache.template_path(content), dest)
+        except OSError:
+            with open(dest, "w") as f:
+                f.write(content)
+
+    @staticmethod
+    def invalidate(content: str) -> None:
+        """
+        Drop the cached parse result and template file for ``content``.
+
+        Args:
+            content: POC content that is no longer in use
+        """
+        key = POCCache.key(content)
+
+        path = os.path.join(POCCache._directory(), f"{key}.yaml")
+
+        with POCCache._lock:
+            POCCache._parsed.pop(key, None)
+            if not POCCache._idle(path, time.time() - settings.POC_CACHE_MIN_IDLE):
+                # Possibly still open in another worker's tool; eviction reclaims it later
+                return
+            POCCache._files_size -= POCCache._files.pop(key, 0)
+
+        POCCache._remove(path)
+
+    @staticmethod
+    def clear() -> None:
+        """Empty the cache, removing every materialized template."""
+        with POCCache._lock:
+            keys = list(POCCache._files)
+            POCCache._parsed.clear()
+            POCCache._files.clear()
+            POCCache._files_size = 0
+
+        directory = POCCache._directory()
+        for key in keys:
+            POCCache._remove(os.path.join(directory, f"{key}.yaml"))
+
+    @staticmethod
+    def _directory() -> str:
+        """Return the template directory, indexing files left by earlier runs."""
+        directory = settings.POC_CACHE_DIR or os.path.join(tempfile.gettempdir(), "catchcore_poc_cache")
+
+        with POCCache._lock:
+            if POCCache._files_dir == directory:
+                return directory
+
+            os.makedirs(directory, exist_ok=True)
+            existing = []
+            for entry in os.scandir(directory):
+                if entry.name.endswith(".yaml"):
+                    stat = entry.stat()
+                    existing.append((stat.st_atime, entry.name[:-5], stat.st_size))
+
+            POCCache._files = OrderedDict((key, size) for _, key, size in sorted(existing))
+            POCCache._files_size = sum(POCCache._files.values())
+            POCCache._files_dir = directory
+            POCCache._evict_files()
+
+        return directory
+
+    @staticmethod
+    def _evict_files(keep: Optional[str] = None) -> None:
+        """
+        Remove least recently used templates until under the size limit (lock held).
+
+        Templates any worker used within POC_CACHE_MIN_IDLE seconds are
+        skipped, so the directory may stay over the limit until they idle.
+        """
+        cutoff = time.time() - settings.POC_CACHE_MIN_IDLE
+        for key, size in list(POCCache._files.items()):
+            if POCCache._files_size <= settings.POC_CACHE_MAX_BYTES:
+                break
+            path = os.path.join(POCCache._files_dir, f"{key}.yaml")
+            if key == keep or not POCCache._idle(path, cutoff):
+                continue
+            del POCCache._files[key]
+            POCCache._files_size -= size
+            POCCache._remove(path)
+            logger.debug(f"Evicted cached POC template {key}")
+
+    @staticmethod
+    def _touch(path: str) -> bool:
+        """Stamp a template's access time as its last use; False if it does not exist."""
+        try:
+            os.utime(path, ns=(time.time_ns(), os.stat(path).st_mtime_ns))
+        except FileNotFoundError:
+            return False
+        return True
+
+    @staticmethod
+    def _idle(path: str, cutoff: float) -> bool:
+        """Return whether a template was last used before ``cutoff`` (or is gone)."""
+        try:
+            return os.stat(path).st_atime < cutoff
+        except FileNotFoundError:
+            return True
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        """Delete a file if it exists."""
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
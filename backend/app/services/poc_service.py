@@ -1,14 +1,35 @@
 """POC management and execution service."""
 
+import asyncio
+import ipaddress
+import itertools
 import logging
+import os
 import subprocess
 import json
-import re
-import yaml
-from typing import List, Dict, Optional, Any
+import tarfile
+import tempfile
+import zipfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from datetime import datetime
 import time
 
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.asset import Asset, AssetGroupMember
+from app.models.poc import POC, POCTag, content_hash
+from app.models.project import project_assets
+from app.models.vulnerability import Vulnerability
+from app.services.aggregate_cache import AggregateCache
+from app.services.http_client import HttpClient
+from app.services.poc_cache import POCCache
+from app.services.process_runner import ProcessRunner
+from app.services.tool_result_service import ToolResultService
+
 logger = logging.getLogger(__name__)
 
 
@@ -25,6 +46,12 @@ class POCService:
         "metasploit": "metasploit",
     }
 
+    # POC types whose tool can run many templates against many targets at once
+    BATCH_TYPES = ("nuclei", "afrog")
+
+    # Ports implied by URL schemes in tool output
+    DEFAULT_PORTS = {"http": 80, "https": 443}
+
     @staticmethod
     def validate_poc_content(content: str, poc_type: str) -> bool:
         """
@@ -41,13 +68,11 @@ class POCService:
             return False
 
         if poc_type == "nuclei":
-            try:
-                # Nuclei POCs are YAML files
-                yaml.safe_load(content)
+            # Nuclei POCs are YAML files
+            if POCCache.parsed(content)["yaml_valid"]:
                 return True
-            except yaml.YAMLError:
-                logger.warning(f"Invalid nuclei YAML: {content[:100]}")
-                return False
+            logger.warning(f"Invalid nuclei YAML: {content[:100]}")
+            return False
 
         elif poc_type == "custom" or poc_type == "bash":
             # Custom scripts should at least have shebang or common patterns
@@ -137,11 +162,8 @@ class POCService:
         }
 
         try:
-            # Save POC to temporary file
-            import tempfile
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-                f.write(poc_content)
-                poc_file = f.name
+            # Reuse the template file materialized for this content
+            poc_file = POCCache.template_path(poc_content)
 
             # Build nuclei command
             cmd = ["nuclei", "-t", poc_file]
@@ -161,10 +183,8 @@ class POCService:
 
             # Execute
             try:
-                proc = subprocess.run(
+                proc = await ProcessRunner.run(
                     cmd,
-                    capture_output=True,
-                    text=True,
                     timeout=60,  # 60 second timeout
                 )
 
@@ -177,12 +197,6 @@ class POCService:
             except subprocess.TimeoutExpired:
                 result["error"] = "Nuclei execution timeout"
 
-            finally:
-                # Clean up temporary file
-                import os
-                if os.path.exists(poc_file):
-                    os.remove(poc_file)
-
         except Exception as e:
             logger.error(f"Error executing Nuclei: {e}")
             result["error"] = str(e)
@@ -207,8 +221,6 @@ class POCService:
         }
 
         try:
-            import requests
-
             # Parse HTTP POC (simple format: METHOD /path HTTP/1.1)
             lines = poc_content.split('\n')
             if not lines:
@@ -247,24 +259,26 @@ class POCService:
                 elif not line.strip():
                     break
 
-            # Make request
+            # Make request over the shared keep-alive pool
             timeout = options.get("timeout", 10)
-            response = requests.request(
+            status_code, text = await HttpClient.request(
                 method=method,
                 url=url,
                 headers=headers,
                 data=data,
                 timeout=timeout,
-                verify=False,
             )
 
-            result["output"] = f"Status: {response.status_code}\n{response.text[:500]}"
-            result["vulnerable"] = response.status_code < 400
+            result["output"] = f"Status: {status_code}\n{text[:500]}"
+            result["vulnerable"] = status_code < 400
 
             # Check for success indicators
             if options.get("success_indicator"):
                 indicator = options["success_indicator"]
-                result["vulnerable"] = indicator.lower() in response.text.lower()
+                result["vulnerable"] = indicator.lower() in text.lower()
+
+        except asyncio.TimeoutError:
+            result["error"] = f"HTTP POC timeout after {options.get('timeout', 10)}s"
 
         except Exception as e:
             logger.error(f"Error executing HTTP POC: {e}")
@@ -299,12 +313,10 @@ class POCService:
 
             # Execute script
             timeout = options.get("timeout", 30)
-            proc = subprocess.run(
+            proc = await ProcessRunner.run(
                 script,
-                shell=True,
-                capture_output=True,
-                text=True,
                 timeout=timeout,
+                shell=True,
             )
 
             result["output"] = proc.stdout
@@ -340,11 +352,8 @@ class POCService:
         }
 
         try:
-            # Save POC to temporary file
-            import tempfile
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-                f.write(poc_content)
-                poc_file = f.name
+            # Reuse the template file materialized for this content
+            poc_file = POCCache.template_path(poc_content)
 
             # Build afrog command
             cmd = ["afrog"]
@@ -364,10 +373,8 @@ class POCService:
 
             # Execute
             try:
-                proc = subprocess.run(
+                proc = await ProcessRunner.run(
                     cmd,
-                    capture_output=True,
-                    text=True,
                     timeout=60,
                 )
 
@@ -380,18 +387,673 @@ class POCService:
             except subprocess.TimeoutExpired:
                 result["error"] = "Afrog execution timeout"
 
-            finally:
-                # Clean up temporary file
-                import os
-                if os.path.exists(poc_file):
-                    os.remove(poc_file)
-
         except Exception as e:
             logger.error(f"Error executing Afrog: {e}")
             result["error"] = str(e)
 
         return result
 
+    @staticmethod
+    async def execute_poc_batch(
+        pocs: List[Dict[str, Any]],
+        targets: List[Union[str, Dict[str, Any]]],
+        options: Optional[Dict[str, Any]] = None,
+        targets_per_batch: Optional[int] = None,
+        pocs_per_batch: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
+        on_findings: Optional[Callable[[List[Dict[str, Any]]], Awaitable[None]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Execute many nuclei/afrog POCs against many targets in few processes.
+
+        POCs are grouped into template bundles and targets into list files;
+        each (bundle, target batch) pair is one tool process reading
+        ``-t``/``-P`` template directories and ``-l``/``-T`` target lists.
+        Tool output is demultiplexed back to (poc_id, target, port) findings,
+        so 500 POCs against 2,000 hosts take a few dozen launches instead of
+        a million.
+
+        Args:
+            pocs: POC dicts with id, poc_type and content
+            targets: Hostnames/IPs, or dicts with target and optional port
+            options: Execution options (severity, timeout, threads)
+            targets_per_batch: Targets per process (default from settings)
+            pocs_per_batch: Templates per process (default from settings)
+            concurrency: Processes running at once (default from settings)
+            semaphore: Shared process limit spanning several calls
+                (overrides ``concurrency``)
+            on_findings: Awaited with each finished batch's findings, so
+                callers can store results before the whole run completes
+
+        Returns:
+            Findings for vulnerable pairs, failed batches and statistics
+        """
+        if options is None:
+            options = {}
+        targets_per_batch = targets_per_batch or settings.POC_BATCH_TARGETS
+        pocs_per_batch = pocs_per_batch or settings.POC_BATCH_TEMPLATES
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(concurrency or settings.POC_BATCH_CONCURRENCY)
+
+        start_time = time.time()
+        pairs = list(dict.fromkeys(POCService._normalize_target(t) for t in targets))
+
+        by_type: Dict[str, List[Dict[str, Any]]] = {poc_type: [] for poc_type in POCService.BATCH_TYPES}
+        unsupported = []
+        for poc in pocs:
+            if poc.get("poc_type") in by_type:
+                by_type[poc["poc_type"]].append(poc)
+            else:
+                unsupported.append(poc.get("id"))
+        if unsupported:
+            logger.warning(f"POCs {unsupported} cannot be batched and were skipped")
+
+        jobs = []
+        for poc_type, typed_pocs in by_type.items():
+            for bundle in POCService._bundle_pocs(typed_pocs, pocs_per_batch):
+                for offset in range(0, len(pairs), targets_per_batch):
+                    jobs.append((poc_type, bundle, pairs[offset:offset + targets_per_batch]))
+
+        findings: Dict[Tuple[Any, str, Optional[int]], Dict[str, Any]] = {}
+        failed_batches = []
+
+        async def run_job(poc_type, bundle, batch_targets):
+            async with semaphore:
+                with tempfile.TemporaryDirectory(prefix=f"catchcore_{poc_type}_") as workdir:
+                    try:
+                        if poc_type == "nuclei":
+                            matches = await POCService._run_nuclei_batch(workdir, bundle, batch_targets, options)
+                        else:
+                            matches = await POCService._run_afrog_batch(workdir, bundle, batch_targets, options)
+                    except FileNotFoundError:
+                        error = f"{poc_type} not installed"
+                    except subprocess.TimeoutExpired:
+                        error = f"{poc_type} batch timeout"
+                    except Exception as e:
+                        logger.error(f"{poc_type} batch failed: {e}")
+                        error = str(e)
+                    else:
+                        for match in matches:
+                            key = (match["poc_id"], match["target"], match["port"])
+                            if key in findings:
+                                findings[key]["matches"] += 1
+                            else:
+                                findings[key] = match
+                        if on_findings is not None and matches:
+                            await on_findings(matches)
+                        return
+
+                    failed_batches.append({
+                        "poc_type": poc_type,
+                        "poc_ids": [poc["id"] for poc in bundle],
+                        "targets": [{"target": t, "port": p} for t, p in batch_targets],
+                        "error": error,
+                    })
+
+        await asyncio.gather(*(run_job(*job) for job in jobs))
+
+        batched = sum(len(typed_pocs) for typed_pocs in by_type.values())
+        logger.info(
+            f"Executed {batched} POCs against {len(pairs)} targets in {len(jobs)} batches, "
+            f"{len(findings)} vulnerable pairs"
+        )
+
+        return {
+            "pairs": batched * len(pairs),
+            "batches": len(jobs),
+            "vulnerable": len(findings),
+            "results": list(findings.values()),
+            "failed_batches": failed_batches,
+            "unsupported": unsupported,
+            "execution_time": time.time() - start_time,
+        }
+
+    @staticmethod
+    def _normalize_target(target: Union[str, Dict[str, Any]]) -> Tuple[str, Optional[int]]:
+        """Turn a target string or dict into a (host, port) pair."""
+        if isinstance(target, dict):
+            port = target.get("port")
+            return str(target["target"]), int(port) if port else None
+        return str(target), None
+
+    @staticmethod
+    def _template_id(content: str) -> Optional[str]:
+        """Return the top-level id of a YAML template, if any."""
+        return POCCache.parsed(content)["template_id"]
+
+    @staticmethod
+    def _bundle_pocs(pocs: List[Dict[str, Any]], size: int) -> List[List[Dict[str, Any]]]:
+        """
+        Group POCs into template bundles of at most ``size``.
+
+        POCs sharing a template id go to different bundles so every result
+        can be attributed to exactly one POC.
+
+        Args:
+            pocs: POC dicts of a single type
+            size: Maximum templates per bundle
+
+        Returns:
+            List of bundles
+        """
+        bundles: List[List[Dict[str, Any]]] = []
+        bundle_ids: List[set] = []
+
+        for poc in pocs:
+            template_id = POCService._template_id(poc.get("content", "")) or f"poc_{poc['id']}"
+            poc = dict(poc, template_id=template_id)
+
+            for bundle, ids in zip(bundles, bundle_ids):
+                if len(bundle) < size and template_id not in ids:
+                    bundle.append(poc)
+                    ids.add(template_id)
+                    break
+            else:
+                bundles.append([poc])
+                bundle_ids.append({template_id})
+
+        return bundles
+
+    @staticmethod
+    def _write_bundle(workdir: str, bundle: List[Dict[str, Any]]) -> str:
+        """Link a template bundle in as ``poc_<id>.yaml`` files and return the directory."""
+        templates_dir = os.path.join(workdir, "templates")
+        os.makedirs(templates_dir, exist_ok=True)
+
+        for poc in bundle:
+            POCCache.link_template(poc["content"], os.path.join(templates_dir, f"poc_{poc['id']}.yaml"))
+
+        return templates_dir
+
+    @staticmethod
+    def _write_targets(workdir: str, lines: List[str]) -> str:
+        """Write a target list file and return its path."""
+        targets_file = os.path.join(workdir, "targets.txt")
+        with open(targets_file, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        return targets_file
+
+    @staticmethod
+    def _target_index(batch_targets: List[Tuple[str, Optional[int]]]) -> Dict[Any, Tuple[str, Optional[int]]]:
+        """Index targets by (host, port), and by host alone where it is unambiguous."""
+        index: Dict[Any, Tuple[str, Optional[int]]] = {
+            (host.lower(), port): (host, port) for host, port in batch_targets
+        }
+        hosts = Counter(host.lower() for host, _ in batch_targets)
+        index.update({host.lower(): (host, port) for host, port in batch_targets if hosts[host.lower()] == 1})
+        return index
+
+    @staticmethod
+    def _demux_target(
+        value: Optional[str],
+        index: Dict[Any, Tuple[str, Optional[int]]],
+    ) -> Optional[Tuple[str, Optional[int]]]:
+        """
+        Map a host/URL reported by a tool back to the submitted target.
+
+        A URL without a port implies its scheme's default port (tools report
+        ``https://h`` for a submitted ``h:443``); a report without any port
+        matches the only target on that host, if there is exactly one.
+
+        Args:
+            value: Reported host, host:port or URL
+            index: Output of _target_index
+
+        Returns:
+            The (target, port) pair, or None if it matches no target
+        """
+        if not value:
+            return None
+
+        scheme, _, rest = str(value).rpartition("://")
+        netloc = rest.split("/")[0]
+        host, _, port_str = netloc.rpartition(":") if netloc.count(":") == 1 else (netloc, "", "")
+        host = host.lower()
+
+        if port_str.isdigit():
+            return index.get((host, int(port_str))) or index.get((host, None))
+        return (
+            index.get((host, POCService.DEFAULT_PORTS.get(scheme.lower())))
+            or index.get((host, None))
+            or index.get(host)
+        )
+
+    @staticmethod
+    def _batch_finding(
+        poc: Dict[str, Any],
+        pair: Tuple[str, Optional[int]],
+        matched_at: Optional[str],
+        severity: Optional[str],
+        raw: str,
+    ) -> Dict[str, Any]:
+        """Build the result entry for one vulnerable (poc, target) pair."""
+        return {
+            "poc_id": poc["id"],
+            "target": pair[0],
+            "port": pair[1],
+            "vulnerable": True,
+            "matched_at": matched_at,
+            "severity": severity,
+            "matches": 1,
+            "output": raw[:1000],
+        }
+
+    @staticmethod
+    async def _run_nuclei_batch(
+        workdir: str,
+        bundle: List[Dict[str, Any]],
+        batch_targets: List[Tuple[str, Optional[int]]],
+        options: Dict[str, Any],
+    ) -> List[Dict[str, Any]]:
+        """Run one nuclei process over a template bundle and target list."""
+        templates_dir = POCService._write_bundle(workdir, bundle)
+        targets_file = POCService._write_targets(
+            workdir,
+            [f"http://{host}:{port}" if port else f"http://{host}" for host, port in batch_targets],
+        )
+        index = POCService._target_index(batch_targets)
+        by_file = {f"poc_{poc['id']}.yaml": poc for poc in bundle}
+        by_template = {poc["template_id"]: poc for poc in bundle}
+
+        cmd = ["nuclei", "-t", templates_dir, "-l", targets_file, "-json", "-silent"]
+        if options.get("severity"):
+            cmd.extend(["-severity", options["severity"]])
+        if options.get("timeout"):
+            cmd.extend(["-timeout", str(options["timeout"])])
+        if options.get("threads"):
+            cmd.extend(["-c", str(options["threads"])])
+
+        matches = []
+        async for line in ProcessRunner.iter_lines(cmd, timeout=settings.POC_BATCH_TIMEOUT):
+            if not line.startswith("{"):
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+            poc = by_file.get(os.path.basename(record.get("template-path") or "")) or by_template.get(
+                record.get("template-id")
+            )
+            pair = POCService._demux_target(record.get("host"), index) or POCService._demux_target(
+                record.get("matched-at"), index
+            )
+            if poc is None or pair is None:
+                logger.debug(f"Unattributable nuclei result: {line[:200]}")
+                continue
+
+            matches.append(POCService._batch_finding(
+                poc, pair, record.get("matched-at"), (record.get("info") or {}).get("severity"), line
+            ))
+
+        return matches
+
+    @staticmethod
+    async def _run_afrog_batch(
+        workdir: str,
+        bundle: List[Dict[str, Any]],
+        batch_targets: List[Tuple[str, Optional[int]]],
+        options: Dict[str, Any],
+    ) -> List[Dict[str, Any]]:
+        """Run one afrog process over a POC directory and target list."""
+        pocs_dir = POCService._write_bundle(workdir, bundle)
+        targets_file = POCService._write_targets(
+            workdir,
+            [f"{host}:{port}" if port else host for host, port in batch_targets],
+        )
+        output_file = os.path.join(workdir, "afrog.json")
+        index = POCService._target_index(batch_targets)
+        by_template = {poc["template_id"]: poc for poc in bundle}
+
+        cmd = ["afrog", "-T", targets_file, "-P", pocs_dir, "-json", output_file]
+        if options.get("threads"):
+            cmd.extend(["-c", str(options["threads"])])
+
+        # Results go to the JSON file; drain progress output without keeping it
+        async for _ in ProcessRunner.iter_lines(cmd, timeout=settings.POC_BATCH_TIMEOUT):
+            pass
+
+        if not os.path.exists(output_file):
+            return []
+
+        with open(output_file, "r") as f:
+            try:
+                records = json.load(f)
+            except json.JSONDecodeError:
+                logger.warning("Failed to parse afrog batch output")
+                return []
+
+        matches = []
+        for record in records if isinstance(records, list) else []:
+            pocinfo = record.get("pocinfo") or {}
+            poc = by_template.get(pocinfo.get("id") or record.get("poc"))
+            pair = POCService._demux_target(record.get("target"), index) or POCService._demux_target(
+                record.get("fulltarget"), index
+            )
+            if poc is None or pair is None:
+                logger.debug(f"Unattributable afrog result: {str(record)[:200]}")
+                continue
+
+            matches.append(POCService._batch_finding(
+                poc, pair, record.get("fulltarget"), pocinfo.get("infoseverity"),
+                json.dumps(record),
+            ))
+
+        return matches
+
+    @staticmethod
+    async def select_pocs(
+        db: AsyncSession,
+        tags: Optional[List[str]] = None,
+        severities: Optional[List[str]] = None,
+        cve_ids: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Resolve a POC selector to the active POCs it matches.
+
+        Criteria are combined with AND; each list matches any of its values.
+
+        Args:
+            db: Database session
+            tags: POC tags
+            severities: Severity levels
+            cve_ids: CVE identifiers
+
+        Returns:
+            POC dicts with id, name, poc_type, content, severity, cve_id
+            and description
+
+        Raises:
+            ValueError: If no criterion is given
+        """
+        if not (tags or severities or cve_ids):
+            raise ValueError("POC selector needs tags, severities or cve_ids")
+
+        query = select(POC).where(POC.is_active == 1)
+        if tags:
+            query = query.where(POC.id.in_(select(POCTag.poc_id).where(POCTag.tag.in_(tags))))
+        if severities:
+            query = query.where(func.lower(POC.severity).in_([s.lower() for s in severities]))
+        if cve_ids:
+            query = query.where(func.upper(POC.cve_id).in_([c.upper() for c in cve_ids]))
+
+        result = await db.execute(query.order_by(POC.id))
+        return [
+            {
+                "id": poc.id,
+                "name": poc.name,
+                "poc_type": poc.poc_type,
+                "content": poc.content,
+                "severity": poc.severity,
+                "cve_id": poc.cve_id,
+                "description": poc.description,
+            }
+            for poc in result.scalars()
+        ]
+
+    @staticmethod
+    async def select_assets(
+        db: AsyncSession,
+        group_ids: Optional[List[int]] = None,
+        project_ids: Optional[List[int]] = None,
+        cidrs: Optional[List[str]] = None,
+    ) -> List[Tuple[int, str]]:
+        """
+        Resolve an asset selector to the active assets it matches.
+
+        Criteria are combined with AND; each list matches any of its values.
+        Assets whose address is not an IP never match a CIDR.
+
+        Args:
+            db: Database session
+            group_ids: Asset group IDs
+            project_ids: Project IDs
+            cidrs: Networks in CIDR notation
+
+        Returns:
+            (asset_id, ip) pairs
+
+        Raises:
+            ValueError: If no criterion is given or a CIDR is invalid
+        """
+        if not (group_ids or project_ids or cidrs):
+            raise ValueError("Asset selector needs group_ids, project_ids or cidrs")
+
+        networks = [ipaddress.ip_network(cidr, strict=False) for cidr in cidrs or []]
+
+        query = select(Asset.id, Asset.ip).where(Asset.status == "active")
+        if group_ids:
+            query = query.where(
+                Asset.id.in_(
+                    select(AssetGroupMember.asset_id).where(AssetGroupMember.group_id.in_(group_ids))
+                )
+            )
+        if project_ids:
+            query = query.where(
+                Asset.id.in_(
+                    select(project_assets.c.asset_id).where(project_assets.c.project_id.in_(project_ids))
+                )
+            )
+
+        assets = []
+        for asset_id, ip in (await db.execute(query.order_by(Asset.id))).all():
+            if networks:
+                try:
+                    address = ipaddress.ip_address(ip)
+                except ValueError:
+                    continue
+                if not any(address in network for network in networks):
+                    continue
+            assets.append((asset_id, ip))
+
+        return assets
+
+    @staticmethod
+    async def _verified_pairs(db: AsyncSession, poc_ids: List[int]) -> set:
+        """Return the (poc_id, asset_id) pairs that already have a vulnerability."""
+        pairs = set()
+        chunk_size = settings.RESULT_BULK_CHUNK_SIZE
+
+        for start in range(0, len(poc_ids), chunk_size):
+            result = await db.execute(
+                select(Vulnerability.poc_id, Vulnerability.asset_id)
+                .where(Vulnerability.poc_id.in_(poc_ids[start:start + chunk_size]))
+                .distinct()
+            )
+            pairs.update(tuple(row) for row in result.all())
+
+        return pairs
+
+    @staticmethod
+    def _poc_vulnerability_row(
+        poc: Dict[str, Any],
+        asset_id: int,
+        port: Optional[int],
+        severity: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Build the vulnerability row recording a POC hit on an asset."""
+        return {
+            "dedup_key": ToolResultService._finding_key(asset_id, "poc", poc["id"], port, None),
+            "asset_id": asset_id,
+            "poc_id": poc["id"],
+            "title": poc.get("name") or f"POC {poc['id']}",
+            "description": poc.get("description"),
+            "cve_id": poc.get("cve_id"),
+            "severity": poc.get("severity") or severity,
+        }
+
+    @staticmethod
+    async def execute_bulk(
+        db: AsyncSession,
+        poc_selector: Dict[str, Any],
+        asset_selector: Dict[str, Any],
+        port: Optional[int] = None,
+        options: Optional[Dict[str, Any]] = None,
+        skip_verified: bool = True,
+        concurrency: Optional[int] = None,
+        per_target_concurrency: Optional[int] = None,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Run every selected POC against every selected asset.
+
+        Pairs that already produced a vulnerability are skipped. nuclei/afrog
+        POCs run through :meth:`execute_poc_batch`, grouping assets that still
+        need the same POC set; other types run one process per pair. At most
+        ``concurrency`` executions run at once and at most
+        ``per_target_concurrency`` against any one asset (a batch process
+        probes each of its targets once). Hits are stored as vulnerabilities
+        linked by ``poc_id`` and committed in chunks while the run continues.
+
+        Args:
+            db: Database session
+            poc_selector: :meth:`select_pocs` criteria
+            asset_selector: :meth:`select_assets` criteria
+            port: Target port (optional)
+            options: Execution options passed to the POC tools
+            skip_verified: Skip pairs with an existing vulnerability
+            concurrency: Executions running at once (default from settings)
+            per_target_concurrency: Executions running at once per asset
+                (default from settings)
+            on_progress: Called with the statistics after each stored chunk
+
+        Returns:
+            Execution statistics
+
+        Raises:
+            ValueError: If a selector is empty or invalid
+        """
+        if options is None:
+            options = {}
+        concurrency = concurrency or settings.POC_BULK_CONCURRENCY
+        per_target_concurrency = per_target_concurrency or settings.POC_BULK_PER_TARGET_CONCURRENCY
+        start_time = time.time()
+
+        pocs = await POCService.select_pocs(db, **poc_selector)
+        assets = await POCService.select_assets(db, **asset_selector)
+        verified = set()
+        if skip_verified and pocs and assets:
+            verified = await POCService._verified_pairs(db, [poc["id"] for poc in pocs])
+
+        stats: Dict[str, Any] = {
+            "pocs": len(pocs),
+            "assets": len(assets),
+            "pairs": len(pocs) * len(assets),
+            "skipped": 0,
+            "executed": 0,
+            "batches": 0,
+            "vulnerable": 0,
+            "errors": 0,
+            "failed_batches": [],
+        }
+
+        # Plan: assets needing the same batchable POC set share batch runs
+        batchable = [poc for poc in pocs if poc["poc_type"] in POCService.BATCH_TYPES]
+        single = [poc for poc in pocs if poc["poc_type"] not in POCService.BATCH_TYPES]
+        batch_groups: Dict[frozenset, List[str]] = {}
+        single_jobs: List[Tuple[int, str, List[Dict[str, Any]]]] = []
+
+        for asset_id, ip in assets:
+            pending_batch = frozenset(poc["id"] for poc in batchable if (poc["id"], asset_id) not in verified)
+            pending_single = [poc for poc in single if (poc["id"], asset_id) not in verified]
+            stats["skipped"] += len(pocs) - len(pending_batch) - len(pending_single)
+
+            if pending_batch:
+                batch_groups.setdefault(pending_batch, []).append(ip)
+            if pending_single:
+                single_jobs.append((asset_id, ip, pending_single))
+
+        by_id = {poc["id"]: poc for poc in pocs}
+        asset_ids = {ip: asset_id for asset_id, ip in assets}
+        lock = asyncio.Lock()
+        buffer: List[Dict[str, Any]] = []
+        last_flush = time.monotonic()
+
+        async def flush() -> None:
+            nonlocal buffer, last_flush
+            async with lock:
+                rows, buffer = buffer, []
+                last_flush = time.monotonic()
+                if not rows:
+                    return
+                stats["vulnerable"] += await ToolResultService._store_vulnerabilities(
+                    db, rows, bulk=True, tool="poc"
+                )
+                await db.commit()
+            await AggregateCache.bump("vulnerabilities")
+
+            if on_progress is not None:
+                try:
+                    on_progress(dict(stats, failed_batches=len(stats["failed_batches"])))
+                except Exception as e:
+                    logger.warning(f"Bulk POC progress callback failed: {e}")
+
+        async def store(rows: List[Dict[str, Any]]) -> None:
+            buffer.extend(rows)
+            if (
+                len(buffer) >= settings.RESULT_BULK_CHUNK_SIZE
+                or time.monotonic() - last_flush >= settings.RESULT_STREAM_FLUSH_INTERVAL
+            ):
+                await flush()
+
+        async def on_findings(matches: List[Dict[str, Any]]) -> None:
+            await store([
+                POCService._poc_vulnerability_row(
+                    by_id[match["poc_id"]], asset_ids[match["target"]], port, match.get("severity")
+                )
+                for match in matches
+                if match["target"] in asset_ids
+            ])
+
+        # Batch processes probe each of their targets once, so capping them at
+        # the per-target limit keeps every asset within it
+        batch_semaphore = asyncio.Semaphore(min(concurrency, per_target_concurrency))
+        batch_results = await asyncio.gather(*(
+            POCService.execute_poc_batch(
+                [by_id[poc_id] for poc_id in sorted(poc_ids)],
+                [{"target": ip, "port": port} for ip in ips],
+                options,
+                semaphore=batch_semaphore,
+                on_findings=on_findings,
+            )
+            for poc_ids, ips in batch_groups.items()
+        ))
+        for result in batch_results:
+            stats["batches"] += result["batches"]
+            stats["executed"] += result["pairs"]
+            stats["failed_batches"].extend(result["failed_batches"])
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def probe_asset(asset_id: int, ip: str, asset_pocs: List[Dict[str, Any]]) -> None:
+            queue = list(asset_pocs)
+
+            async def worker() -> None:
+                while queue:
+                    poc = queue.pop(0)
+                    async with semaphore:
+                        result = await POCService.execute_poc(
+                            ip, port, poc["content"], poc["poc_type"], options
+                        )
+                    stats["executed"] += 1
+                    if result.get("error"):
+                        stats["errors"] += 1
+                    elif result.get("vulnerable"):
+                        await store([POCService._poc_vulnerability_row(poc, asset_id, port)])
+
+            await asyncio.gather(*(worker() for _ in range(min(per_target_concurrency, len(queue)))))
+
+        await asyncio.gather(*(probe_asset(*job) for job in single_jobs))
+        await flush()
+
+        stats["execution_time"] = time.time() - start_time
+        logger.info(
+            f"Bulk POC run: {stats['pocs']} POCs x {stats['assets']} assets, "
+            f"{stats['skipped']} pairs skipped, {stats['vulnerable']} vulnerable"
+        )
+        return stats
+
     @staticmethod
     def parse_poc_metadata(content: str, poc_type: str) -> Dict[str, Any]:
         """
@@ -404,6 +1066,7 @@ class POCService:
         Returns:
             Extracted metadata
         """
+        parsed = POCCache.parsed(content)
         metadata = {
             "name": None,
             "description": None,
@@ -412,35 +1075,269 @@ class POCService:
         }
 
         if poc_type == "nuclei":
-            try:
-                data = yaml.safe_load(content)
-                if isinstance(data, dict):
-                    metadata["name"] = data.get("id")
-                    metadata["description"] = data.get("info", {}).get("description")
-                    metadata["severity"] = data.get("info", {}).get("severity")
-
-                    # Extract CVE IDs
-                    references = data.get("info", {}).get("reference", [])
-                    if isinstance(references, str):
-                        references = [references]
-
-                    for ref in references:
-                        if isinstance(ref, str) and "CVE" in ref:
-                            # Extract CVE ID
-                            cve_match = re.search(r"CVE-\d+-\d+", ref)
-                            if cve_match:
-                                metadata["cve_ids"].append(cve_match.group())
-            except yaml.YAMLError:
-                pass
-
-        # Try to extract CVE IDs from content
-        cve_pattern = r"CVE-\d+-\d+"
-        found_cves = re.findall(cve_pattern, content)
-        metadata["cve_ids"].extend(found_cves)
+            metadata["name"] = parsed["name"]
+            metadata["description"] = parsed["description"]
+            metadata["severity"] = parsed["severity"]
+            metadata["cve_ids"].extend(parsed["reference_cves"])
+
+        # CVE IDs mentioned anywhere in the content
+        metadata["cve_ids"].extend(parsed["content_cves"])
         metadata["cve_ids"] = list(set(metadata["cve_ids"]))  # Remove duplicates
 
         return metadata
 
+    @staticmethod
+    async def import_pocs(
+        db: AsyncSession,
+        items: Iterable[Dict[str, Any]],
+        source: Optional[str] = None,
+        chunk_size: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Import many POCs with set-based deduplication and inserts.
+
+        Items are consumed ``chunk_size`` at a time, so archive iterators are
+        read lazily. Each chunk is validated and parsed (in a process pool
+        once it reaches POC_IMPORT_PARALLEL_THRESHOLD items), then written with
+        one multi-row INSERT for POCs, skipping content already stored under
+        the unique content hash, and one for their tags and committed.
+
+        Args:
+            db: Database session
+            items: POC dicts with content and optional poc_type, name,
+                filename, tags and other POC columns; tags are derived from
+                the template when ``tags`` is None
+            source: Source recorded on every imported POC
+            chunk_size: Items per batch (default from settings)
+
+        Returns:
+            Counts of imported, duplicate and failed POCs with error messages
+        """
+        chunk_size = chunk_size or settings.POC_IMPORT_CHUNK_SIZE
+        stats: Dict[str, Any] = {"imported": 0, "duplicates": 0, "failed": 0, "errors": []}
+        iterator = iter(items)
+        seen = set()
+        pool: Optional[ProcessPoolExecutor] = None
+
+        try:
+            while True:
+                chunk = await asyncio.to_thread(lambda: list(itertools.islice(iterator, chunk_size)))
+                if not chunk:
+                    break
+
+                if pool is None and len(chunk) >= settings.POC_IMPORT_PARALLEL_THRESHOLD:
+                    pool = ProcessPoolExecutor(max_workers=POCService._import_workers())
+                prepared = await POCService._prepare_imports(chunk, source, pool)
+
+                pending = []
+                for entry in prepared:
+                    if "error" in entry:
+                        stats["failed"] += 1
+                        stats["errors"].append(entry["error"])
+                    elif entry["row"]["content_hash"] in seen:
+                        stats["duplicates"] += 1
+                    else:
+                        seen.add(entry["row"]["content_hash"])
+                        pending.append(entry)
+
+                if not pending:
+                    continue
+
+                now = datetime.utcnow()
+                rows = [dict(entry["row"], created_at=now, updated_at=now) for entry in pending]
+                stmt = ToolResultService._dialect_insert(db, POC)
+
+                if stmt is not None:
+                    # Content stored meanwhile by a concurrent import is skipped
+                    # by the unique hash and not returned
+                    stmt = stmt.on_conflict_do_nothing(index_elements=[POC.content_hash])
+                else:
+                    existing = set(
+                        (
+                            await db.execute(
+                                select(POC.content_hash).where(POC.content_hash.in_([row["content_hash"] for row in rows]))
+                            )
+                        ).scalars()
+                    )
+                    rows = [row for row in rows if row["content_hash"] not in existing]
+                    stmt = insert(POC)
+
+                poc_ids = {}
+                if rows:
+                    result = await db.execute(stmt.returning(POC.id, POC.content_hash), rows)
+                    poc_ids = {digest: poc_id for poc_id, digest in result.all()}
+                new_entries = [entry for entry in pending if entry["row"]["content_hash"] in poc_ids]
+                stats["duplicates"] += len(pending) - len(new_entries)
+                if not new_entries:
+                    continue
+
+                tag_rows = [
+                    {"poc_id": poc_ids[entry["row"]["content_hash"]], "tag": tag, "created_at": now}
+                    for entry in new_entries
+                    for tag in entry["tags"]
+                ]
+                if tag_rows:
+                    await db.execute(insert(POCTag), tag_rows)
+
+                await db.commit()
+                stats["imported"] += len(new_entries)
+                logger.debug(f"Imported {len(new_entries)} POCs ({stats['imported']} so far)")
+
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+            if stats["imported"]:
+                await AggregateCache.bump("pocs")
+
+        logger.info(
+            f"POC import: {stats['imported']} imported, {stats['duplicates']} duplicates, "
+            f"{stats['failed']} failed"
+        )
+        return stats
+
+    @staticmethod
+    async def _prepare_imports(
+        items: List[Dict[str, Any]],
+        source: Optional[str],
+        pool: Optional[ProcessPoolExecutor],
+    ) -> List[Dict[str, Any]]:
+        """Validate and parse import items, spreading them over the pool if given."""
+        if pool is None:
+            return POCService._prepare_import_chunk(items, source)
+
+        loop = asyncio.get_running_loop()
+        # A few slices per worker keeps them busy without per-item IPC
+        size = max(1, -(-len(items) // (POCService._import_workers() * 4)))
+        parts = await asyncio.gather(*(
+            loop.run_in_executor(pool, POCService._prepare_import_chunk, items[start:start + size], source)
+            for start in range(0, len(items), size)
+        ))
+        return [entry for part in parts for entry in part]
+
+    @staticmethod
+    def _import_workers() -> int:
+        """Return the number of template parser processes."""
+        return settings.POC_IMPORT_WORKERS or os.cpu_count() or 1
+
+    @staticmethod
+    def _prepare_import_chunk(items: List[Dict[str, Any]], source: Optional[str]) -> List[Dict[str, Any]]:
+        """Build POC rows and tags for import items (runs in pool workers)."""
+        return [POCService._prepare_import_item(item, source) for item in items]
+
+    @staticmethod
+    def _prepare_import_item(item: Dict[str, Any], source: Optional[str]) -> Dict[str, Any]:
+        """
+        Validate one import item and build its POC row and tags.
+
+        Args:
+            item: POC dict as accepted by :meth:`import_pocs`
+            source: Source recorded on the POC
+
+        Returns:
+            ``{"row": ..., "tags": [...]}``, or ``{"error": message}``
+        """
+        label = item.get("name") or item.get("filename") or "POC"
+        if item.get("error"):
+            return {"error": f"Error importing {label}: {item['error']}"}
+
+        content = item.get("content") or ""
+        poc_type = item.get("poc_type") or "nuclei"
+        if not POCService.validate_poc_content(content, poc_type):
+            return {"error": f"Invalid content for POC: {label}"}
+
+        parsed = POCCache.parsed(content)
+        if item.get("filename") and poc_type in POCService.BATCH_TYPES and not parsed["template_id"]:
+            return {"error": f"Not a {poc_type} template: {label}"}
+
+        metadata = POCService.parse_poc_metadata(content, poc_type)
+        cve_ids = sorted(metadata["cve_ids"])
+
+        tags = item.get("tags")
+        if tags is None:
+            tags = parsed["tags"] + [f"cve:{cve_id}" for cve_id in cve_ids]
+
+        return {
+            "row": {
+                "name": item.get("name") or metadata["name"] or item.get("filename") or "Imported POC",
+                "cve_id": item.get("cve_id") or (cve_ids[0] if cve_ids else None),
+                "cvss_score": item.get("cvss_score"),
+                "severity": item.get("severity") or metadata["severity"],
+                "poc_type": poc_type,
+                "description": item.get("description") or metadata["description"],
+                "content": content,
+                "content_hash": content_hash(content),
+                "source": source or item.get("source"),
+                "author": item.get("author"),
+                "reference_link": item.get("reference_link"),
+                "affected_product": item.get("affected_product"),
+                "affected_version": item.get("affected_version"),
+                "is_active": item.get("is_active", 1),
+            },
+            "tags": list(dict.fromkeys(tags)),
+        }
+
+    @staticmethod
+    def iter_archive(
+        fileobj: Any,
+        filename: str,
+        poc_type: str = "nuclei",
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield import items for the templates in a tar or zip archive.
+
+        Members are read one at a time from ``fileobj`` (tar archives in
+        streaming mode), so an upload spooled to disk is never loaded whole.
+        Only ``.yaml``/``.yml`` files outside hidden directories are read;
+        files over POC_IMPORT_MAX_FILE_SIZE or not UTF-8 yield error items.
+
+        Args:
+            fileobj: Binary file object positioned at the archive start
+            filename: Archive name, used to pick the format
+            poc_type: POC type of every template
+
+        Yields:
+            Import items for :meth:`import_pocs`
+
+        Raises:
+            ValueError: If the archive format is unsupported or corrupt
+        """
+        def wanted(path: str) -> bool:
+            parts = path.replace("\\", "/").split("/")
+            return path.lower().endswith((".yaml", ".yml")) and not any(
+                part.startswith(".") for part in parts[:-1] if part not in ("", ".")
+            )
+
+        def item(path: str, size: int, read: Callable[[], bytes]) -> Dict[str, Any]:
+            entry = {"filename": os.path.basename(path), "poc_type": poc_type, "tags": None}
+            if size > settings.POC_IMPORT_MAX_FILE_SIZE:
+                entry["error"] = f"file exceeds {settings.POC_IMPORT_MAX_FILE_SIZE} bytes"
+                return entry
+            try:
+                entry["content"] = read().decode("utf-8")
+            except UnicodeDecodeError:
+                entry["error"] = "file is not UTF-8 text"
+            return entry
+
+        name = filename.lower()
+        try:
+            if name.endswith(".zip"):
+                with zipfile.ZipFile(fileobj) as archive:
+                    for info in archive.infolist():
+                        if not info.is_dir() and wanted(info.filename):
+                            yield item(info.filename, info.file_size, lambda: archive.read(info))
+
+            elif name.endswith((".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")):
+                with tarfile.open(fileobj=fileobj, mode="r|*") as archive:
+                    for member in archive:
+                        if member.isfile() and wanted(member.name):
+                            yield item(member.name, member.size, lambda: archive.extractfile(member).read())
+
+            else:
+                raise ValueError(f"Unsupported archive format: {filename}")
+
+        except (tarfile.TarError, zipfile.BadZipFile, EOFError) as e:
+            raise ValueError(f"Corrupt archive {filename}: {e}")
+
     @staticmethod
     def get_poc_statistics(pocs: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
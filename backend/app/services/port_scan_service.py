@@ -2,10 +2,17 @@
 
 import subprocess
 import logging
+import ipaddress
+import os
 import re
 import json
+import tempfile
+import threading
 import xml.etree.ElementTree as ET
-from typing import List, Dict, Optional, Any
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Optional, Any, Iterator, Tuple
+
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +23,9 @@ class PortScanService:
     # Common ports for quick scans
     COMMON_PORTS = "22,25,53,80,110,143,443,445,465,587,993,995,3306,3389,5432,5984,6379,8080,8443,9200,27017"
 
+    # Maximum nmap run time in seconds
+    SCAN_TIMEOUT = 15 * 60
+
     @staticmethod
     def scan_with_nmap(
         target: str,
@@ -41,51 +51,11 @@ class PortScanService:
             options = {}
 
         ports = options.get("ports", "1-65535")
-        timing = options.get("timing", "4")
-        scan_type = options.get("scan_type", "syn")
-        skip_ping = options.get("skip_ping", True)
-        service_detection = options.get("service_detection", True)
-        os_detection = options.get("os_detection", False)
 
         logger.info(f"Starting nmap scan on {target} with ports {ports}")
 
         try:
-            # Build nmap command
-            cmd = ["nmap"]
-
-            # Output format: XML (parseable)
-            cmd.extend(["-oX", "-"])
-
-            # Skip ping if requested
-            if skip_ping:
-                cmd.append("-Pn")
-
-            # Set timing template
-            cmd.extend(["-T", str(timing)])
-
-            # Set scan type
-            if scan_type == "syn":
-                cmd.append("-sS")  # SYN scan (default for privileged users)
-            elif scan_type == "connect":
-                cmd.append("-sT")  # Connect scan
-            elif scan_type == "udp":
-                cmd.append("-sU")  # UDP scan
-            else:
-                cmd.append("-sS")  # Default to SYN
-
-            # Port specification
-            cmd.extend(["-p", ports])
-
-            # Service detection
-            if service_detection:
-                cmd.append("-sV")
-
-            # OS detection
-            if os_detection:
-                cmd.append("-O")
-
-            # Target
-            cmd.append(target)
+            cmd = PortScanService._build_nmap_command(target, options)
 
             logger.debug(f"Executing command: {' '.join(cmd)}")
 
@@ -94,7 +64,7 @@ class PortScanService:
                 cmd,
                 capture_output=True,
                 text=True,
-                timeout=15 * 60,  # 15 minute timeout
+                timeout=PortScanService.SCAN_TIMEOUT,
             )
 
             if result.returncode not in [0, 1]:  # 0 = success, 1 = warning
@@ -117,6 +87,64 @@ class PortScanService:
             logger.error(f"nmap scan error: {e}")
             raise
 
+    @staticmethod
+    def _build_nmap_command(target: str, options: Dict[str, Any]) -> List[str]:
+        """
+        Build the nmap command line for a scan.
+
+        Args:
+            target: Target IP or CIDR range
+            options: Scan parameters (see scan_with_nmap)
+
+        Returns:
+            nmap argument list
+        """
+        ports = options.get("ports", "1-65535")
+        timing = options.get("timing", "4")
+        scan_type = options.get("scan_type", "syn")
+        skip_ping = options.get("skip_ping", True)
+        service_detection = options.get("service_detection", True)
+        os_detection = options.get("os_detection", False)
+
+        # Build nmap command
+        cmd = ["nmap"]
+
+        # Output format: XML (parseable)
+        cmd.extend(["-oX", "-"])
+
+        # Skip ping if requested
+        if skip_ping:
+            cmd.append("-Pn")
+
+        # Set timing template
+        cmd.extend(["-T", str(timing)])
+
+        # Set scan type
+        if scan_type == "syn":
+            cmd.append("-sS")  # SYN scan (default for privileged users)
+        elif scan_type == "connect":
+            cmd.append("-sT")  # Connect scan
+        elif scan_type == "udp":
+            cmd.append("-sU")  # UDP scan
+        else:
+            cmd.append("-sS")  # Default to SYN
+
+        # Port specification
+        cmd.extend(["-p", ports])
+
+        # Service detection
+        if service_detection:
+            cmd.append("-sV")
+
+        # OS detection
+        if os_detection:
+            cmd.append("-O")
+
+        # Target
+        cmd.append(target)
+
+        return cmd
+
     @staticmethod
     def _parse_nmap_xml(xml_output: str) -> List[Dict[str, Any]]:
         """
@@ -134,67 +162,7 @@ class PortScanService:
             root = ET.fromstring(xml_output)
 
             for host in root.findall(".//host"):
-                # Get host IP
-                host_ip = None
-                for addr in host.findall("address"):
-                    if addr.get("addrtype") == "ipv4":
-                        host_ip = addr.get("addr")
-                        break
-
-                if not host_ip:
-                    continue
-
-                # Get host status
-                host_status = None
-                host_status_elem = host.find("status")
-                if host_status_elem is not None:
-                    host_status = host_status_elem.get("state")
-
-                # Parse ports
-                for port_elem in host.findall(".//port"):
-                    port_num = port_elem.get("portid")
-                    protocol = port_elem.get("protocol")
-
-                    state_elem = port_elem.find("state")
-                    state = state_elem.get("state") if state_elem is not None else "unknown"
-
-                    # Only include open ports
-                    if state != "open":
-                        continue
-
-                    port_data = {
-                        "ip": host_ip,
-                        "port": int(port_num),
-                        "protocol": protocol,
-                        "state": state,
-                    }
-
-                    # Get service information
-                    service_elem = port_elem.find("service")
-                    if service_elem is not None:
-                        service_data = {
-                            "name": service_elem.get("name"),
-                            "product": service_elem.get("product"),
-                            "version": service_elem.get("version"),
-                            "extrainfo": service_elem.get("extrainfo"),
-                            "ostype": service_elem.get("ostype"),
-                            "method": service_elem.get("method"),
-                            "conf": service_elem.get("conf"),
-                        }
-                        # Remove None values
-                        port_data["service"] = {
-                            k: v for k, v in service_data.items() if v is not None
-                        }
-
-                    # Get CPE information (if available)
-                    cpe_list = []
-                    for cpe_elem in port_elem.findall(".//cpe"):
-                        if cpe_elem.text:
-                            cpe_list.append(cpe_elem.text)
-                    if cpe_list:
-                        port_data["cpe"] = cpe_list
-
-                    ports.append(port_data)
+                ports.extend(PortScanService._parse_host(host))
 
             logger.debug(f"Parsed {len(ports)} open ports from nmap output")
             return ports
@@ -203,6 +171,397 @@ class PortScanService:
             logger.error(f"Failed to parse nmap XML: {e}")
             raise RuntimeError(f"Failed to parse nmap output: {e}")
 
+    @staticmethod
+    def _parse_host(host: ET.Element) -> List[Dict[str, Any]]:
+        """
+        Parse the open ports of one nmap <host> element.
+
+        Args:
+            host: nmap <host> element
+
+        Returns:
+            List of port dictionaries
+        """
+        ports = []
+
+        # Get host IP
+        host_ip = None
+        for addr in host.findall("address"):
+            if addr.get("addrtype") == "ipv4":
+                host_ip = addr.get("addr")
+                break
+
+        if not host_ip:
+            return ports
+
+        # Get host status
+        host_status = None
+        host_status_elem = host.find("status")
+        if host_status_elem is not None:
+            host_status = host_status_elem.get("state")
+
+        # Parse ports
+        for port_elem in host.findall(".//port"):
+            port_num = port_elem.get("portid")
+            protocol = port_elem.get("protocol")
+
+            state_elem = port_elem.find("state")
+            state = state_elem.get("state") if state_elem is not None else "unknown"
+
+            # Only include open ports
+            if state != "open":
+                continue
+
+            port_data = {
+                "ip": host_ip,
+                "port": int(port_num),
+                "protocol": protocol,
+                "state": state,
+            }
+
+            # Get service information
+            service_elem = port_elem.find("service")
+            if service_elem is not None:
+                service_data = {
+                    "name": service_elem.get("name"),
+                    "product": service_elem.get("product"),
+                    "version": service_elem.get("version"),
+                    "extrainfo": service_elem.get("extrainfo"),
+                    "ostype": service_elem.get("ostype"),
+                    "method": service_elem.get("method"),
+                    "conf": service_elem.get("conf"),
+                }
+                # Remove None values
+                port_data["service"] = {
+                    k: v for k, v in service_data.items() if v is not None
+                }
+
+            # Get CPE information (if available)
+            cpe_list = []
+            for cpe_elem in port_elem.findall(".//cpe"):
+                if cpe_elem.text:
+                    cpe_list.append(cpe_elem.text)
+            if cpe_list:
+                port_data["cpe"] = cpe_list
+
+            ports.append(port_data)
+
+        return ports
+
+    @staticmethod
+    def iter_scan_with_nmap(
+        target: str,
+        options: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Execute nmap port scan, yielding ports as nmap reports each host.
+
+        nmap stdout is parsed incrementally with ``ET.iterparse`` and every
+        ``<host>`` element is discarded once its ports are yielded, so memory
+        stays flat on large sweeps and callers can start processing before
+        nmap exits. Closing the generator early terminates nmap.
+
+        Args:
+            target: Target IP or CIDR range
+            options: Optional scan parameters (see scan_with_nmap)
+
+        Yields:
+            Discovered port dictionaries
+        """
+        hosts = PortScanService.iter_scan_hosts_with_nmap(target, options)
+        try:
+            for host_ports in hosts:
+                yield from host_ports
+        finally:
+            hosts.close()
+
+    @staticmethod
+    def iter_scan_hosts_with_nmap(
+        target: str,
+        options: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Execute nmap port scan, yielding each host's open ports as it completes.
+
+        Streaming counterpart of scan_with_nmap; see iter_scan_with_nmap.
+        Hosts without open ports are skipped.
+
+        Args:
+            target: Target IP or CIDR range
+            options: Optional scan parameters (see scan_with_nmap)
+
+        Yields:
+            Lists of port dictionaries, one per host
+        """
+        if options is None:
+            options = {}
+
+        ports = options.get("ports", "1-65535")
+
+        logger.info(f"Starting streaming nmap scan on {target} with ports {ports}")
+
+        cmd = PortScanService._build_nmap_command(target, options)
+        logger.debug(f"Executing command: {' '.join(cmd)}")
+
+        # stderr goes to a file so a chatty nmap can never block on a full pipe
+        with tempfile.TemporaryFile() as stderr:
+            try:
+                # Unbuffered, so each read returns whatever nmap has flushed
+                process = subprocess.Popen(
+                    cmd, stdout=subprocess.PIPE, stderr=stderr, bufsize=0
+                )
+            except FileNotFoundError:
+                logger.error("nmap not found. Please install nmap")
+                raise RuntimeError("nmap not installed")
+
+            timed_out = threading.Event()
+
+            def kill_on_timeout():
+                timed_out.set()
+                process.kill()
+
+            watchdog = threading.Timer(PortScanService.SCAN_TIMEOUT, kill_on_timeout)
+            watchdog.daemon = True
+            watchdog.start()
+
+            count = 0
+            root = None
+            parse_error = None
+            try:
+                for event, elem in ET.iterparse(process.stdout, events=("start", "end")):
+                    if root is None:
+                        root = elem
+                    if event != "end" or elem.tag != "host":
+                        continue
+
+                    host_ports = PortScanService._parse_host(elem)
+                    if host_ports:
+                        count += len(host_ports)
+                        yield host_ports
+
+                    # Drop the parsed host so the tree never grows
+                    elem.clear()
+                    if elem in root:
+                        root.remove(elem)
+
+                process.wait()
+
+            except ET.ParseError as e:
+                # Usually truncated output: let nmap finish to learn why
+                try:
+                    process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    process.wait()
+                parse_error = e
+
+            finally:
+                watchdog.cancel()
+                if process.poll() is None:
+                    # Consumer stopped early or an error occurred
+                    process.kill()
+                    process.wait()
+                process.stdout.close()
+
+            if timed_out.is_set():
+                logger.error(f"nmap scan timeout for {target}")
+                raise TimeoutError(f"nmap scan timeout for {target}")
+
+            if process.returncode not in [0, 1]:  # 0 = success, 1 = warning
+                stderr.seek(0)
+                error = stderr.read().decode("utf-8", errors="replace")
+                logger.error(f"nmap error: {error}")
+                raise RuntimeError(f"nmap failed: {error}")
+
+            if parse_error is not None:
+                logger.error(f"Failed to parse nmap XML: {parse_error}")
+                raise RuntimeError(f"Failed to parse nmap output: {parse_error}")
+
+        logger.info(f"Streaming scan completed: {count} ports found")
+
+    @staticmethod
+    def scan_sharded(
+        target: str,
+        options: Optional[Dict[str, Any]] = None,
+        max_parallel: Optional[int] = None,
+        retries: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Execute a large scan as parallel nmap processes over target/port shards.
+
+        The target is split into ``NMAP_SHARD_PREFIX`` subnets and the port
+        range into ``NMAP_PORT_SHARDS`` slices. Every shard is a separate nmap
+        run with its own timeout, and only failed shards are retried.
+
+        Args:
+            target: Target IP or CIDR range
+            options: Optional scan parameters (see scan_with_nmap)
+                - shard_prefix: Override NMAP_SHARD_PREFIX
+                - port_shards: Override NMAP_PORT_SHARDS
+            max_parallel: Concurrent nmap processes (default from settings)
+            retries: Extra attempts per failed shard (default from settings)
+
+        Returns:
+            Dictionary with merged ports (in shard order), shard count and
+            the shards that still failed after retrying
+        """
+        if options is None:
+            options = {}
+
+        shards = PortScanService.plan_shards(
+            target,
+            options.get("ports", "1-65535"),
+            prefix=options.get("shard_prefix", settings.NMAP_SHARD_PREFIX),
+            port_shards=options.get("port_shards", settings.NMAP_PORT_SHARDS),
+        )
+        max_parallel = max_parallel or settings.NMAP_MAX_PARALLEL or os.cpu_count() or 1
+        retries = settings.NMAP_SHARD_RETRIES if retries is None else retries
+
+        logger.info(
+            f"Starting sharded scan on {target}: {len(shards)} shards, "
+            f"{min(max_parallel, len(shards))} parallel"
+        )
+
+        results: Dict[int, List[Dict[str, Any]]] = {}
+        errors: Dict[int, str] = {}
+        pending = list(range(len(shards)))
+
+        for attempt in range(retries + 1):
+            if not pending:
+                break
+            if attempt:
+                logger.warning(f"Retrying {len(pending)} failed shards (attempt {attempt + 1})")
+
+            failed = []
+            with ThreadPoolExecutor(max_workers=min(max_parallel, len(pending))) as executor:
+                futures = {
+                    executor.submit(
+                        PortScanService.scan_with_nmap,
+                        shards[index][0],
+                        {**options, "ports": shards[index][1]},
+                    ): index
+                    for index in pending
+                }
+                for future in as_completed(futures):
+                    index = futures[future]
+                    try:
+                        results[index] = future.result()
+                        errors.pop(index, None)
+                    except Exception as e:
+                        logger.warning(f"Shard {shards[index][0]} ports {shards[index][1]} failed: {e}")
+                        errors[index] = str(e)
+                        failed.append(index)
+
+            pending = sorted(failed)
+
+        ports = []
+        for index in sorted(results):
+            ports.extend(results[index])
+
+        failed_shards = [
+            {"target": shards[index][0], "ports": shards[index][1], "error": errors[index]}
+            for index in pending
+        ]
+        if failed_shards:
+            logger.error(f"{len(failed_shards)} of {len(shards)} shards failed for {target}")
+
+        logger.info(f"Sharded scan completed: {len(ports)} ports found")
+
+        return {
+            "ports": ports,
+            "shards": len(shards),
+            "failed_shards": failed_shards,
+        }
+
+    @staticmethod
+    def plan_shards(
+        target: str,
+        ports: str,
+        prefix: int = 24,
+        port_shards: int = 1,
+    ) -> List[Tuple[str, str]]:
+        """
+        Split a scan into (target, ports) shards.
+
+        Args:
+            target: Target IP, CIDR range or hostname
+            ports: nmap port specification
+            prefix: IPv4 prefix length of target shards
+            port_shards: Number of port range slices
+
+        Returns:
+            List of (target, ports) pairs
+        """
+        targets = PortScanService.shard_target(target, prefix)
+        port_specs = PortScanService.shard_ports(ports, port_shards)
+
+        return [(shard_target, spec) for shard_target in targets for spec in port_specs]
+
+    @staticmethod
+    def shard_target(target: str, prefix: int = 24) -> List[str]:
+        """
+        Split an IPv4 CIDR into subnets of the given prefix length.
+
+        Single hosts, hostnames, IPv6 ranges and CIDRs already at or below the
+        shard size are returned unchanged.
+
+        Args:
+            target: Target IP, CIDR range or hostname
+            prefix: IPv4 prefix length of each shard
+
+        Returns:
+            List of shard targets
+        """
+        try:
+            network = ipaddress.ip_network(target.strip(), strict=False)
+        except ValueError:
+            return [target]
+
+        if network.version != 4 or network.prefixlen >= prefix:
+            return [target]
+
+        return [str(subnet) for subnet in network.subnets(new_prefix=prefix)]
+
+    @staticmethod
+    def shard_ports(ports: str, shards: int = 1) -> List[str]:
+        """
+        Split an nmap port specification into contiguous slices.
+
+        Only plain numeric lists and ranges (``"1-1024,3306"``) are split;
+        anything else (protocol prefixes, service names) is kept whole.
+
+        Args:
+            ports: nmap port specification
+            shards: Number of slices
+
+        Returns:
+            List of port specifications
+        """
+        if shards <= 1 or not re.fullmatch(r"\d+(-\d+)?(,\d+(-\d+)?)*", ports.replace(" ", "")):
+            return [ports]
+
+        numbers = set()
+        for item in ports.replace(" ", "").split(","):
+            start, _, end = item.partition("-")
+            numbers.update(range(int(start), int(end or start) + 1))
+        numbers = sorted(numbers)
+
+        size = -(-len(numbers) // shards)
+        specs = []
+        for i in range(0, len(numbers), size):
+            chunk = numbers[i:i + size]
+            ranges = []
+            run_start = previous = chunk[0]
+            for number in chunk[1:]:
+                if number != previous + 1:
+                    ranges.append((run_start, previous))
+                    run_start = number
+                previous = number
+            ranges.append((run_start, previous))
+            specs.append(",".join(f"{a}-{b}" if a != b else str(a) for a, b in ranges))
+
+        return specs
+
     @staticmethod
     def scan_quick(target: str) -> List[Dict[str, Any]]:
         """
@@ -0,0 +1,297 @@
+"""Non-blocking execution of external tool processes."""
+
+import asyncio
+import logging
+import os
+import signal
+import subprocess
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Sequence, Union
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+LineCallback = Callable[[str], None]
+
+
+class ProcessRunner:
+    """Run external commands on the event loop without blocking it."""
+
+    READ_CHUNK_SIZE = 64 * 1024
+    STDERR_TAIL_SIZE = 64 * 1024  # Bytes of stderr kept while streaming stdout
+
+    @staticmethod
+    async def run(
+        cmd: Union[Sequence[str], str],
+        timeout: Optional[float] = None,
+        shell: bool = False,
+        on_stdout: Optional[LineCallback] = None,
+        on_stderr: Optional[LineCallback] = None,
+        kill_grace_period: Optional[float] = None,
+    ) -> subprocess.CompletedProcess:
+        """
+        Run a command asynchronously, streaming its output.
+
+        stdout and stderr are drained concurrently, so a chatty tool can never
+        block on a full pipe. The process runs in its own session; on timeout
+        or cancellation the whole process group gets SIGTERM, then SIGKILL
+        after ``kill_grace_period`` seconds, so helpers spawned by the tool
+        (browsers, shell children) are cleaned up too.
+
+        Args:
+            cmd: Argument list, or a command string when ``shell`` is set
+            timeout: Seconds before the process is killed (None = no limit)
+            shell: Run ``cmd`` through the system shell
+            on_stdout: Called with each decoded stdout line as it arrives
+            on_stderr: Called with each decoded stderr line as it arrives
+            kill_grace_period: Seconds between SIGTERM and SIGKILL
+                (default from settings)
+
+        Returns:
+            CompletedProcess with decoded stdout/stderr
+
+        Raises:
+            FileNotFoundError: If the executable does not exist
+            subprocess.TimeoutExpired: If the timeout elapsed; carries the
+                output captured so far
+        """
+        if kill_grace_period is None:
+            kill_grace_period = settings.TOOL_KILL_GRACE_PERIOD
+
+        popen_kwargs = {
+            "stdin": asyncio.subprocess.DEVNULL,
+            "stdout": asyncio.subprocess.PIPE,
+            "stderr": asyncio.subprocess.PIPE,
+        }
+        if os.name == "posix":
+            popen_kwargs["start_new_session"] = True
+
+        if shell:
+            proc = await asyncio.create_subprocess_shell(cmd, **popen_kwargs)
+        else:
+            proc = await asyncio.create_subprocess_exec(*cmd, **popen_kwargs)
+
+        stdout: List[bytes] = []
+        stderr: List[bytes] = []
+        communicate = asyncio.gather(
+            ProcessRunner._pump(proc.stdout, stdout, on_stdout),
+            ProcessRunner._pump(proc.stderr, stderr, on_stderr),
+            proc.wait(),
+        )
+
+        try:
+            await asyncio.wait_for(communicate, timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Process {proc.pid} timed out after {timeout}s: {cmd}")
+            await ProcessRunner._terminate(proc, kill_grace_period)
+            raise subprocess.TimeoutExpired(
+                cmd,
+                timeout,
+                output=ProcessRunner._decode(stdout),
+                stderr=ProcessRunner._decode(stderr),
+            )
+        except BaseException:
+            await ProcessRunner._terminate(proc, kill_grace_period)
+            raise
+
+        return subprocess.CompletedProcess(
+            cmd,
+            proc.returncode,
+            stdout=ProcessRunner._decode(stdout),
+            stderr=ProcessRunner._decode(stderr),
+        )
+
+    @staticmethod
+    async def iter_lines(
+        cmd: Sequence[str],
+        timeout: Optional[float] = None,
+        status: Optional[Dict[str, Any]] = None,
+        kill_grace_period: Optional[float] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Run a command and yield its stdout lines as they are produced.
+
+        At most one read chunk is buffered: a slow consumer applies
+        backpressure through the pipe, so memory stays constant however much
+        the tool prints. Only the tail of stderr is kept.
+        Closing the generator early, a timeout or cancellation kills the
+        process group as in :meth:`run`.
+
+        Args:
+            cmd: Argument list
+            timeout: Seconds before the process is killed (None = no limit)
+            status: Optional dict filled with ``returncode`` and ``stderr``
+                (tail) once the process exits
+            kill_grace_period: Seconds between SIGTERM and SIGKILL
+                (default from settings)
+
+        Yields:
+            Decoded stdout lines without line endings
+
+        Raises:
+            FileNotFoundError: If the executable does not exist
+            subprocess.TimeoutExpired: If the timeout elapsed
+        """
+        if kill_grace_period is None:
+            kill_grace_period = settings.TOOL_KILL_GRACE_PERIOD
+
+        popen_kwargs = {}
+        if os.name == "posix":
+            popen_kwargs["start_new_session"] = True
+
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            **popen_kwargs,
+        )
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
+        stderr_tail: Deque[bytes] = deque()
+        drain_stderr = asyncio.ensure_future(ProcessRunner._pump_tail(proc.stderr, stderr_tail))
+        finished = False
+
+        def remaining() -> Optional[float]:
+            return None if deadline is None else max(deadline - loop.time(), 0)
+
+        try:
+            pending = b""
+            try:
+                while True:
+                    chunk = await asyncio.wait_for(
+                        proc.stdout.read(ProcessRunner.READ_CHUNK_SIZE), remaining()
+                    )
+                    if not chunk:
+                        break
+
+                    pending += chunk
+                    *lines, pending = pending.split(b"\n")
+                    for line in lines:
+                        yield line.rstrip(b"\r").decode("utf-8", errors="replace")
+
+                if pending:
+                    yield pending.rstrip(b"\r").decode("utf-8", errors="replace")
+
+                await asyncio.wait_for(proc.wait(), remaining())
+                await asyncio.wait_for(drain_stderr, remaining())
+            except asyncio.TimeoutError:
+                logger.warning(f"Process {proc.pid} timed out after {timeout}s: {cmd}")
+                raise subprocess.TimeoutExpired(
+                    cmd, timeout, stderr=ProcessRunner._decode(list(stderr_tail))
+                )
+
+            finished = True
+            if status is not None:
+                status["returncode"] = proc.returncode
+                status["stderr"] = ProcessRunner._decode(list(stderr_tail))
+
+        finally:
+            if not finished:
+                await ProcessRunner._terminate(proc, kill_grace_period)
+                drain_stderr.cancel()
+
+    @staticmethod
+    async def _pump_tail(stream: asyncio.StreamReader, tail: Deque[bytes]) -> None:
+        """
+        Drain a pipe, keeping only its last STDERR_TAIL_SIZE bytes.
+
+        Args:
+            stream: Process stderr
+            tail: Buffer receiving the most recent chunks
+        """
+        size = 0
+
+        while True:
+            chunk = await stream.read(ProcessRunner.READ_CHUNK_SIZE)
+            if not chunk:
+                break
+
+            tail.append(chunk)
+            size += len(chunk)
+            while size - len(tail[0]) >= ProcessRunner.STDERR_TAIL_SIZE:
+                size -= len(tail.popleft())
+
+    @staticmethod
+    async def _pump(
+        stream: asyncio.StreamReader,
+        sink: List[bytes],
+        callback: Optional[LineCallback],
+    ) -> None:
+        """
+        Drain a pipe into ``sink``, handing complete lines to ``callback``.
+
+        Args:
+            stream: Process stdout or stderr
+            sink: Buffer receiving every chunk read
+            callback: Optional per-line consumer
+        """
+        pending = b""
+
+        while True:
+            chunk = await stream.read(ProcessRunner.READ_CHUNK_SIZE)
+            if not chunk:
+                break
+
+            sink.append(chunk)
+            if callback is None:
+                continue
+
+            pending += chunk
+            *lines, pending = pending.split(b"\n")
+            for line in lines:
+                ProcessRunner._emit(callback, line)
+
+        if callback is not None and pending:
+            ProcessRunner._emit(callback, pending)
+
+    @staticmethod
+    def _emit(callback: LineCallback, line: bytes) -> None:
+        """Pass one output line to a callback, isolating its errors."""
+        try:
+            callback(line.rstrip(b"\r").decode("utf-8", errors="replace"))
+        except Exception as e:
+            logger.warning(f"Process output callback failed: {e}")
+
+    @staticmethod
+    def _decode(chunks: List[bytes]) -> str:
+        """Join captured chunks into text."""
+        return b"".join(chunks).decode("utf-8", errors="replace")
+
+    @staticmethod
+    async def _terminate(proc: asyncio.subprocess.Process, grace_period: float) -> None:
+        """
+        Stop a process and everything in its process group.
+
+        Args:
+            proc: Running process
+            grace_period: Seconds to wait after SIGTERM before SIGKILL
+        """
+        if proc.returncode is not None:
+            return
+
+        ProcessRunner._signal_group(proc, signal.SIGTERM)
+        try:
+            await asyncio.wait_for(proc.wait(), grace_period)
+            return
+        except asyncio.TimeoutError:
+            pass
+
+        logger.warning(f"Process {proc.pid} ignored SIGTERM, killing")
+        ProcessRunner._signal_group(proc, getattr(signal, "SIGKILL", signal.SIGTERM))
+        await proc.wait()
+
+    @staticmethod
+    def _signal_group(proc: asyncio.subprocess.Process, sig: int) -> None:
+        """Send a signal to the process group, or the process off POSIX."""
+        try:
+            if os.name == "posix":
+                os.killpg(proc.pid, sig)
+            elif sig == signal.SIGTERM:
+                proc.terminate()
+            else:
+                proc.kill()
+        except ProcessLookupError:
+            pass
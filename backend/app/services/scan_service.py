@@ -1,21 +1,39 @@
 """Scan service for managing scan tasks."""
 
+import asyncio
 import logging
+import queue
+import threading
+import time
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from celery import chain, chord, group
 
 from app.celery_app import celery_app
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import async_session, engine, get_db, sync_session
+from app.models.asset import Asset
+from app.models.poc import POC
 from app.models.task import Task, TaskLog, TaskStatusEnum
 from app.services.port_scan_service import PortScanService
 from app.services.service_identify_service import ServiceIdentifyService
 from app.services.fingerprint_service import FingerprintService
+from app.services.http_client import HttpClient
+from app.services.poc_service import POCService
 
 logger = logging.getLogger(__name__)
 
 
+def _refresh_fingerprints() -> None:
+    """Pick up fingerprint table changes, keeping the cached matcher on failure."""
+    try:
+        FingerprintService.sync_with_database()
+    except Exception as e:
+        logger.warning(f"Could not refresh fingerprints from database: {e}")
+
+
 class ScanService:
     """Service for managing and executing scans."""
 
@@ -92,6 +110,172 @@ class ScanService:
         except Exception as e:
             logger.error(f"Error updating task status: {e}")
 
+    @staticmethod
+    def build_fan_out_scan(task_id: int, target: str, options: Optional[Dict[str, Any]] = None):
+        """
+        Build the Celery canvas for a fanned-out full scan.
+
+        The target is split into host shards. Each shard is a chain of
+        port scan -> service identification -> fingerprint subtasks, and a
+        chord callback aggregates all shard results.
+
+        Args:
+            task_id: Database task ID
+            target: Target IP or CIDR range
+            options: Scan options
+                - shard_prefix: Override NMAP_SHARD_PREFIX
+
+        Returns:
+            Celery chord signature (not yet applied)
+        """
+        if options is None:
+            options = {}
+
+        shards = PortScanService.shard_target(
+            target, options.get("shard_prefix", settings.NMAP_SHARD_PREFIX)
+        )
+
+        return chord(
+            group(
+                chain(
+                    scan_shard_task.s(task_id, shard, options),
+                    identify_shard_task.s(task_id),
+                    fingerprint_shard_task.s(task_id),
+                )
+                for shard in shards
+            ),
+            aggregate_scan_task.s(task_id, target),
+        )
+
+    @staticmethod
+    def run_pipelined_scan(
+        target: str,
+        options: Optional[Dict[str, Any]] = None,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+        queue_size: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Run port scan, service identification and fingerprinting as a pipeline.
+
+        nmap output is streamed host by host; each host's ports go through
+        identification and fingerprint matching on their own threads while
+        nmap is still scanning. Stages are connected by bounded queues, so a
+        slow stage applies back-pressure instead of buffering the scan.
+
+        Args:
+            target: Target IP or CIDR range
+            options: Scan options (see PortScanService.scan_with_nmap)
+            on_progress: Called from the calling thread with per-stage counters
+            queue_size: Host batches buffered between stages (default from settings)
+
+        Returns:
+            Dictionary with ports, services, fingerprints and stage statistics
+        """
+        queue_size = queue_size or settings.SCAN_PIPELINE_QUEUE_SIZE
+        hosts_queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        services_queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        done = object()
+
+        started = time.monotonic()
+        ports: List[Dict[str, Any]] = []
+        services: List[Dict[str, Any]] = []
+        matches: List[Dict[str, Any]] = []
+        errors: List[BaseException] = []
+        stats = {
+            "scan": {"hosts": 0, "ports": 0, "done": False},
+            "identify": {"hosts": 0, "services": 0, "done": False},
+            "fingerprint": {"hosts": 0, "matches": 0, "done": False},
+            "first_finding_seconds": None,
+        }
+
+        def identify_stage():
+            while True:
+                host_ports = hosts_queue.get()
+                if host_ports is done:
+                    break
+                if errors:
+                    continue  # Drain so the producer never blocks
+                try:
+                    host_services = ServiceIdentifyService.identify_services_from_ports(host_ports)
+                    services.extend(host_services)
+                    stats["identify"]["hosts"] += 1
+                    stats["identify"]["services"] += len(host_services)
+                    services_queue.put(host_services)
+                except Exception as e:
+                    errors.append(e)
+            stats["identify"]["done"] = True
+            services_queue.put(done)
+
+        def fingerprint_stage():
+            while True:
+                host_services = services_queue.get()
+                if host_services is done:
+                    break
+                if errors:
+                    continue
+                try:
+                    host_matches = FingerprintService.match_fingerprints_batch(
+                        host_services, parallel=False
+                    )
+                    if host_matches and stats["first_finding_seconds"] is None:
+                        stats["first_finding_seconds"] = round(time.monotonic() - started, 3)
+                    matches.extend(host_matches)
+                    stats["fingerprint"]["hosts"] += 1
+                    stats["fingerprint"]["matches"] += len(host_matches)
+                except Exception as e:
+                    errors.append(e)
+            stats["fingerprint"]["done"] = True
+
+        def report():
+            if on_progress is not None:
+                on_progress(stats)
+
+        workers = [
+            threading.Thread(target=identify_stage, name="scan-identify", daemon=True),
+            threading.Thread(target=fingerprint_stage, name="scan-fingerprint", daemon=True),
+        ]
+        for worker in workers:
+            worker.start()
+
+        host_batches = PortScanService.iter_scan_hosts_with_nmap(target, options)
+        try:
+            for host_ports in host_batches:
+                ports.extend(host_ports)
+                stats["scan"]["hosts"] += 1
+                stats["scan"]["ports"] += len(host_ports)
+                hosts_queue.put(host_ports)
+                report()
+                if errors:
+                    break
+        except Exception as e:
+            errors.append(e)
+        finally:
+            # Stops nmap if a stage failed or the scan is being abandoned
+            host_batches.close()
+            stats["scan"]["done"] = True
+            hosts_queue.put(done)
+
+        while any(worker.is_alive() for worker in workers):
+            workers[-1].join(timeout=1)
+            report()
+        report()
+
+        if errors:
+            raise errors[0]
+
+        logger.info(
+            f"Pipelined scan completed: {len(ports)} ports, {len(services)} services, "
+            f"{len(matches)} fingerprints, first finding after "
+            f"{stats['first_finding_seconds']}s"
+        )
+
+        return {
+            "ports": ports,
+            "services": services,
+            "fingerprints": matches,
+            "stats": stats,
+        }
+
 
 @celery_app.task(bind=True, name="app.services.scan_service.port_scan_task")
 def port_scan_task(self, task_id: int, target: str, options: dict = None):
@@ -123,9 +307,14 @@ def port_scan_task(self, task_id: int, target: str, options: dict = None):
             },
         )
 
-        # Execute nmap scan
+        # Execute nmap scan, sharded so one slow range cannot fail the whole scan
         logger.info(f"Executing nmap scan on {target}")
-        results = PortScanService.scan_with_nmap(target, options)
+        scan = PortScanService.scan_sharded(target, options)
+        results = scan["ports"]
+        failed_shards = scan["failed_shards"]
+
+        if failed_shards and len(failed_shards) == scan["shards"]:
+            raise RuntimeError(f"All scan shards failed: {failed_shards[0]['error']}")
 
         if not results:
             logger.warning(f"No results from port scan for {target}")
@@ -152,6 +341,7 @@ def port_scan_task(self, task_id: int, target: str, options: dict = None):
             "status": "completed",
             "results_count": len(results),
             "results": results,
+            "failed_shards": failed_shards,
         }
 
     except Exception as e:
@@ -191,8 +381,14 @@ def service_identify_task(self, task_id: int, asset_id: int, ports: List[int]):
             },
         )
 
+        # Probe the asset itself rather than the worker
+        with sync_session() as session:
+            host = session.execute(select(Asset.ip).where(Asset.id == asset_id)).scalar()
+        if host is None:
+            raise ValueError(f"Asset {asset_id} not found")
+
         # Perform service identification
-        services = ServiceIdentifyService.identify_services(asset_id, ports)
+        services = ServiceIdentifyService.identify_services(asset_id, ports, host=host)
 
         self.update_state(
             state="PROGRESS",
@@ -248,6 +444,7 @@ def fingerprint_task(self, task_id: int, asset_id: int, service_data: dict):
                 "status": "Loading fingerprint database...",
             },
         )
+        _refresh_fingerprints()
 
         # Perform fingerprint matching
         matches = FingerprintService.match_fingerprints(asset_id, service_data)
@@ -303,6 +500,12 @@ def full_scan_task(self, task_id: int, target: str, scan_type: str, options: dic
 
     logger.info(f"Starting {scan_type} scan for task {task_id}, target {target}")
 
+    if options.get("fan_out", settings.SCAN_FANOUT_ENABLED):
+        return _dispatch_fan_out_scan(self, task_id, target, options)
+
+    if options.get("pipeline", settings.SCAN_PIPELINE_ENABLED):
+        return _run_pipelined_full_scan(self, task_id, target, options)
+
     try:
         # Step 1: Port scanning (0-33%)
         self.update_state(
@@ -345,6 +548,7 @@ def full_scan_task(self, task_id: int, target: str, scan_type: str, options: dic
         )
 
         # Step 3: Fingerprint matching (66-99%)
+        _refresh_fingerprints()
         matches = FingerprintService.match_fingerprints_batch(services)
 
         self.update_state(
@@ -385,3 +589,350 @@ def full_scan_task(self, task_id: int, target: str, scan_type: str, options: dic
             "status": "failed",
             "error": str(e),
         }
+
+
+def _run_pipelined_full_scan(task, task_id: int, target: str, options: dict) -> dict:
+    """Run full_scan_task in pipelined mode, reporting progress per stage."""
+
+    def on_progress(stats: Dict[str, Any]) -> None:
+        scan, identify, fingerprint = stats["scan"], stats["identify"], stats["fingerprint"]
+        task.update_state(
+            state="PROGRESS",
+            meta={
+                "current": 66 if scan["done"] else 33,
+                "total": 100,
+                "status": (
+                    f"Pipeline: {scan['hosts']} hosts scanned, "
+                    f"{identify['hosts']} identified, {fingerprint['hosts']} fingerprinted"
+                ),
+                "stages": stats,
+            },
+        )
+
+    try:
+        _refresh_fingerprints()
+        result = ScanService.run_pipelined_scan(target, options, on_progress=on_progress)
+
+        logger.info(
+            f"Full scan completed: {len(result['ports'])} ports, "
+            f"{len(result['services'])} services, {len(result['fingerprints'])} fingerprints"
+        )
+
+        return {
+            "task_id": task_id,
+            "status": "completed",
+            "ports_found": len(result["ports"]),
+            "services_identified": len(result["services"]),
+            "fingerprints_matched": len(result["fingerprints"]),
+            "first_finding_seconds": result["stats"]["first_finding_seconds"],
+            "results": {
+                "ports": result["ports"],
+                "services": result["services"],
+                "fingerprints": result["fingerprints"],
+            },
+        }
+
+    except Exception as e:
+        logger.error(f"Error in full scan task {task_id}: {e}", exc_info=True)
+        task.update_state(
+            state="FAILURE",
+            meta={"error": str(e)},
+        )
+        return {
+            "task_id": task_id,
+            "status": "failed",
+            "error": str(e),
+        }
+
+
+def _dispatch_fan_out_scan(task, task_id: int, target: str, options: dict) -> dict:
+    """Dispatch full_scan_task as per-shard subtasks and return immediately."""
+    try:
+        canvas = ScanService.build_fan_out_scan(task_id, target, options)
+        shards = len(canvas.tasks)
+        result = canvas.apply_async()
+
+        logger.info(f"Dispatched full scan for task {task_id} as {shards} shards")
+
+        task.update_state(
+            state="PROGRESS",
+            meta={
+                "current": 5,
+                "total": 100,
+                "status": f"Dispatched {shards} shard scans...",
+                "aggregate_id": result.id,
+            },
+        )
+
+        return {
+            "task_id": task_id,
+            "status": "dispatched",
+            "shards": shards,
+            "aggregate_id": result.id,
+        }
+
+    except Exception as e:
+        logger.error(f"Error dispatching full scan task {task_id}: {e}", exc_info=True)
+        task.update_state(
+            state="FAILURE",
+            meta={"error": str(e)},
+        )
+        return {
+            "task_id": task_id,
+            "status": "failed",
+            "error": str(e),
+        }
+
+
+@celery_app.task(bind=True, name="app.services.scan_service.scan_shard_task")
+def scan_shard_task(self, task_id: int, shard: str, options: dict = None):
+    """Port scan one shard of a fanned-out full scan.
+
+    Args:
+        task_id: Database task ID
+        shard: Shard target (IP or CIDR)
+        options: Scan options
+
+    Returns:
+        dict: Shard result passed down the chain
+    """
+    logger.info(f"Scanning shard {shard} for task {task_id}")
+
+    try:
+        ports = PortScanService.scan_with_nmap(shard, options or {})
+        return {"target": shard, "ports": ports, "error": None}
+    except Exception as e:
+        # Keep the chain going so the chord still completes
+        logger.error(f"Error scanning shard {shard} for task {task_id}: {e}")
+        return {"target": shard, "ports": [], "error": str(e)}
+
+
+@celery_app.task(bind=True, name="app.services.scan_service.identify_shard_task")
+def identify_shard_task(self, shard_result: dict, task_id: int):
+    """Identify services for one scanned shard.
+
+    Args:
+        shard_result: Result of scan_shard_task
+        task_id: Database task ID
+
+    Returns:
+        dict: Shard result with services added
+    """
+    services = []
+    if shard_result.get("ports"):
+        try:
+            services = ServiceIdentifyService.identify_services_from_ports(shard_result["ports"])
+        except Exception as e:
+            logger.error(f"Error identifying shard {shard_result.get('target')} for task {task_id}: {e}")
+            shard_result["error"] = shard_result.get("error") or str(e)
+
+    shard_result["services"] = services
+    return shard_result
+
+
+@celery_app.task(bind=True, name="app.services.scan_service.fingerprint_shard_task")
+def fingerprint_shard_task(self, shard_result: dict, task_id: int):
+    """Match fingerprints for one identified shard.
+
+    Args:
+        shard_result: Result of identify_shard_task
+        task_id: Database task ID
+
+    Returns:
+        dict: Shard result with fingerprints added
+    """
+    matches = []
+    if shard_result.get("services"):
+        try:
+            _refresh_fingerprints()
+            matches = FingerprintService.match_fingerprints_batch(shard_result["services"])
+        except Exception as e:
+            logger.error(f"Error fingerprinting shard {shard_result.get('target')} for task {task_id}: {e}")
+            shard_result["error"] = shard_result.get("error") or str(e)
+
+    shard_result["fingerprints"] = matches
+    return shard_result
+
+
+@celery_app.task(bind=True, name="app.services.scan_service.aggregate_scan_task")
+def aggregate_scan_task(self, shard_results: List[dict], task_id: int, target: str):
+    """Chord callback aggregating the shards of a fanned-out full scan.
+
+    Args:
+        shard_results: Results of every shard chain
+        task_id: Database task ID
+        target: Original scan target
+
+    Returns:
+        dict: Full scan results in the same shape as full_scan_task
+    """
+    ports, services, matches = [], [], []
+    failed_shards = []
+
+    for shard_result in shard_results:
+        ports.extend(shard_result.get("ports", []))
+        services.extend(shard_result.get("services", []))
+        matches.extend(shard_result.get("fingerprints", []))
+        if shard_result.get("error"):
+            failed_shards.append(
+                {"target": shard_result.get("target"), "error": shard_result["error"]}
+            )
+
+    logger.info(
+        f"Full scan of {target} completed for task {task_id}: {len(shard_results)} shards, "
+        f"{len(ports)} ports, {len(services)} services, {len(matches)} fingerprints"
+    )
+
+    return {
+        "task_id": task_id,
+        "status": "failed" if shard_results and len(failed_shards) == len(shard_results) else "completed",
+        "shards": len(shard_results),
+        "failed_shards": failed_shards,
+        "ports_found": len(ports),
+        "services_identified": len(services),
+        "fingerprints_matched": len(matches),
+        "results": {
+            "ports": ports,
+            "services": services,
+            "fingerprints": matches,
+        },
+    }
+
+
+@celery_app.task(bind=True, name="app.services.scan_service.bulk_poc_task")
+def bulk_poc_task(
+    self,
+    task_id: int,
+    poc_selector: dict,
+    asset_selector: dict,
+    port: Optional[int] = None,
+    options: dict = None,
+    skip_verified: bool = True,
+):
+    """Bulk POC execution task.
+
+    Runs every POC matched by ``poc_selector`` against every asset matched by
+    ``asset_selector`` and stores hits as vulnerabilities.
+
+    Args:
+        task_id: Database task ID
+        poc_selector: POC criteria (tags, severities, cve_ids)
+        asset_selector: Asset criteria (group_ids, project_ids, cidrs)
+        port: Target port (optional)
+        options: POC execution options
+        skip_verified: Skip (POC, asset) pairs that already have a vulnerability
+
+    Returns:
+        dict: Execution statistics
+    """
+    logger.info(f"Starting bulk POC execution for task {task_id}")
+
+    def report(progress: Dict[str, Any]) -> None:
+        self.update_state(state="PROGRESS", meta=progress)
+
+    async def run() -> Dict[str, Any]:
+        try:
+            async with async_session() as db:
+                return await POCService.execute_bulk(
+                    db,
+                    poc_selector,
+                    asset_selector,
+                    port=port,
+                    options=options,
+                    skip_verified=skip_verified,
+                    on_progress=report,
+                )
+        finally:
+            # Pooled connections are bound to this task's event loop
+            await HttpClient.close()
+            await engine.dispose()
+
+    try:
+        stats = asyncio.run(run())
+
+        logger.info(
+            f"Bulk POC execution for task {task_id} completed: "
+            f"{stats['vulnerable']} vulnerable of {stats['executed']} executed pairs"
+        )
+
+        return {
+            "task_id": task_id,
+            "status": "completed",
+            **stats,
+        }
+
+    except Exception as e:
+        logger.error(f"Error in bulk POC task {task_id}: {e}", exc_info=True)
+        self.update_state(
+            state="FAILURE",
+            meta={"error": str(e)},
+        )
+        return {
+            "task_id": task_id,
+            "status": "failed",
+            "error": str(e),
+        }
+
+
+@celery_app.task(bind=True, name="app.services.scan_service.poc_batch_task")
+def poc_batch_task(
+    self,
+    task_id: int,
+    poc_ids: List[int],
+    targets: List[str],
+    port: Optional[int] = None,
+    options: dict = None,
+):
+    """Batched POC execution task.
+
+    Runs the given nuclei/afrog POCs against the given targets in batched
+    tool processes; findings are returned in the task result.
+
+    Args:
+        task_id: Database task ID
+        poc_ids: IDs of the POCs to run (inactive ones are skipped)
+        targets: Hostnames/IPs to probe
+        port: Target port (optional)
+        options: POC execution options
+
+    Returns:
+        dict: Findings, failed batches and statistics
+    """
+    logger.info(f"Starting batched POC execution for task {task_id}")
+
+    try:
+        with sync_session() as session:
+            rows = session.execute(
+                select(POC.id, POC.poc_type, POC.content).where(POC.id.in_(poc_ids), POC.is_active == 1)
+            ).all()
+        if not rows:
+            raise ValueError("No active POCs found")
+
+        result = asyncio.run(POCService.execute_poc_batch(
+            pocs=[{"id": poc_id, "poc_type": poc_type, "content": content} for poc_id, poc_type, content in rows],
+            targets=[{"target": target, "port": port} for target in targets],
+            options=options,
+        ))
+
+        logger.info(
+            f"Batched POC execution for task {task_id} completed: "
+            f"{result['vulnerable']} vulnerable pairs in {result['batches']} batches"
+        )
+
+        return {
+            "task_id": task_id,
+            "status": "completed",
+            **result,
+        }
+
+    except Exception as e:
+        logger.error(f"Error in batched POC task {task_id}: {e}", exc_info=True)
+        self.update_state(
+            state="FAILURE",
+            meta={"error": str(e)},
+        )
+        return {
+            "task_id": task_id,
+            "status": "failed",
+            "error": str(e),
+        }
@@ -0,0 +1,332 @@
+"""Search query language: tokenizer, recursive-descent parser and SQL compiler."""
+
+import re
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from sqlalchemy import and_, not_, or_
+from sqlalchemy.sql.expression import ColumnElement
+
+from app.core.config import settings
+from app.models.search_index import SearchIndex
+
+# Quoted strings may contain spaces and parentheses; backslash escapes a quote
+_TOKEN = re.compile(r'\s*(?:(?P<paren>[()])|(?P<word>(?:"(?:[^"\\]|\\.)*"|[^\s()"])+)|(?P<bad>"))')
+
+# field:operator:value (named or symbolic operator) or field<op>value
+_CONDITION = re.compile(
+    r"^(?P<field>[A-Za-z_][\w.]*)"
+    r"(?::(?P<named>like|in|regex|!=|>=|<=|=|>|<):|(?P<symbol>!=|>=|<=|=|>|<))"
+    r"(?P<value>.*)$",
+    re.IGNORECASE | re.DOTALL,
+)
+
+KEYWORDS = ("AND", "OR", "NOT")
+MAX_DEPTH = 32  # Deepest parenthesis/NOT nesting accepted
+
+
+class SearchQueryError(ValueError):
+    """Raised when a search query cannot be parsed or compiled."""
+
+
+class Condition(NamedTuple):
+    """``field operator value`` comparison."""
+
+    field: str
+    operator: str
+    value: str
+
+
+class FreeText(NamedTuple):
+    """Whitespace separated words matched against the full-text index."""
+
+    value: str
+
+
+class Not(NamedTuple):
+    """Negation of a node."""
+
+    operand: "Node"
+
+
+class And(NamedTuple):
+    """Conjunction of two or more nodes."""
+
+    operands: Tuple["Node", ...]
+
+
+class Or(NamedTuple):
+    """Disjunction of two or more nodes."""
+
+    operands: Tuple["Node", ...]
+
+
+Node = Union[Condition, FreeText, Not, And, Or]
+
+
+class SearchField(NamedTuple):
+    """
+    Searchable field of an entity.
+
+    ``type`` is one of string, integer, number, datetime or enum (``choices``
+    holds the enum class). ``via`` is a relationship the column is reached
+    through, compiled to EXISTS.
+    """
+
+    column: Any
+    type: str = "string"
+    choices: Any = None
+    via: Any = None
+
+
+class SearchQuery:
+    """
+    Parse search queries into an AST and compile it to SQLAlchemy.
+
+    Grammar, loosest binding first::
+
+        query   := or_expr
+        or_expr := and_expr ("OR" and_expr)*
+        and_expr:= not_expr (["AND"] not_expr)*
+        not_expr:= "NOT" not_expr | "(" or_expr ")" | term
+        term    := field:op:value | field<op>value | free text word
+
+    Adjacent terms without an operator are ANDed and consecutive free-text
+    words merge into one :class:`FreeText`. Values may be double-quoted.
+    """
+
+    OPERATORS = ("=", "!=", ">", "<", ">=", "<=", "like", "in", "regex")
+    STRING_OPERATORS = ("like", "regex")
+
+    @staticmethod
+    @lru_cache(maxsize=settings.SEARCH_QUERY_CACHE_SIZE)
+    def parse(query: str) -> Optional[Node]:
+        """
+        Parse a query string, reusing the AST of identical queries.
+
+        Args:
+            query: Search query
+
+        Returns:
+            Root node, or None for a blank query
+
+        Raises:
+            SearchQueryError: If the query is malformed
+        """
+        tokens = SearchQuery.tokenize(query)
+        if not tokens:
+            return None
+
+        parser = _Parser(tokens)
+        node = parser.or_expr(0)
+        if parser.pos < len(tokens):
+            raise SearchQueryError(f"Unexpected {tokens[parser.pos][1]!r} at position {tokens[parser.pos][2]}")
+        return node
+
+    @staticmethod
+    def tokenize(query: str) -> List[Tuple[str, str, int]]:
+        """
+        Split a query into ``(kind, text, position)`` tokens.
+
+        Kinds are ``(``, ``)``, AND, OR, NOT and word.
+
+        Args:
+            query: Search query
+
+        Returns:
+            Token list
+
+        Raises:
+            SearchQueryError: On an unterminated quote
+        """
+        tokens = []
+        pos = 0
+        query = query.rstrip()
+
+        while pos < len(query):
+            match = _TOKEN.match(query, pos)
+            if match.group("bad") is not None:
+                raise SearchQueryError(f"Unterminated quote at position {match.start('bad')}")
+
+            if match.group("paren") is not None:
+                tokens.append((match.group("paren"), match.group("paren"), match.start("paren")))
+            else:
+                word = match.group("word")
+                kind = word.upper() if word.upper() in KEYWORDS else "word"
+                tokens.append((kind, word, match.start("word")))
+            pos = match.end()
+
+        return tokens
+
+    @staticmethod
+    def term(word: str) -> Node:
+        """
+        Turn one word token into a condition or free text.
+
+        Args:
+            word: Word token, quotes included
+
+        Returns:
+            Condition or FreeText node
+
+        Raises:
+            SearchQueryError: If a condition has no value
+        """
+        match = _CONDITION.match(word)
+        if match is None:
+            return FreeText(_unquote(word))
+
+        operator = (match.group("named") or match.group("symbol")).lower()
+        value = match.group("value")
+        if not value:
+            raise SearchQueryError(f"Missing value in {word!r}")
+        return Condition(match.group("field").lower(), operator, _unquote(value))
+
+    @staticmethod
+    def compile(
+        node: Node,
+        fields: Dict[str, SearchField],
+        text: Callable[[str], ColumnElement],
+    ) -> ColumnElement:
+        """
+        Compile an AST to one boolean SQLAlchemy expression.
+
+        Args:
+            node: Parsed query
+            fields: Searchable fields by name
+            text: Builds the expression for free-text words
+
+        Returns:
+            Boolean SQL expression
+
+        Raises:
+            SearchQueryError: On unknown fields, unsupported operators or
+                values that do not fit the field type
+        """
+        if isinstance(node, And):
+            return and_(*(SearchQuery.compile(operand, fields, text) for operand in node.operands))
+        if isinstance(node, Or):
+            return or_(*(SearchQuery.compile(operand, fields, text) for operand in node.operands))
+        if isinstance(node, Not):
+            return not_(SearchQuery.compile(node.operand, fields, text))
+        if isinstance(node, FreeText):
+            return text(node.value)
+        return SearchQuery._condition(node, fields)
+
+    @staticmethod
+    def _condition(node: Condition, fields: Dict[str, SearchField]) -> ColumnElement:
+        """Compile one field comparison."""
+        field = fields.get(node.field)
+        if field is None:
+            raise SearchQueryError(f"Unknown field {node.field!r}; expected one of {', '.join(sorted(fields))}")
+        if node.operator in SearchQuery.STRING_OPERATORS and field.type != "string":
+            raise SearchQueryError(f"Operator {node.operator!r} only applies to text fields, not {node.field!r}")
+
+        column = field.column
+        if node.operator == "like":
+            clause = SearchIndex.contains(node.value, column)
+        elif node.operator == "regex":
+            try:
+                re.compile(node.value)
+            except re.error as e:
+                raise SearchQueryError(f"Invalid regex for {node.field!r}: {e}") from e
+            clause = column.regexp_match(node.value)
+        elif node.operator == "in":
+            values = [SearchQuery._value(field, node.field, item.strip()) for item in node.value.split(",")]
+            clause = column.in_(values)
+        else:
+            value = SearchQuery._value(field, node.field, node.value)
+            clause = {
+                "=": column.__eq__,
+                "!=": column.__ne__,
+                ">": column.__gt__,
+                "<": column.__lt__,
+                ">=": column.__ge__,
+                "<=": column.__le__,
+            }[node.operator](value)
+
+        return field.via.has(clause) if field.via is not None else clause
+
+    @staticmethod
+    def _value(field: SearchField, name: str, value: str) -> Any:
+        """Convert a query value to the field's Python type."""
+        try:
+            if field.type == "integer":
+                return int(value)
+            if field.type == "number":
+                return float(value)
+            if field.type == "datetime":
+                return datetime.fromisoformat(value)
+            if field.type == "enum":
+                return field.choices(value.lower())
+        except ValueError as e:
+            expected = (
+                ", ".join(choice.value for choice in field.choices) if field.type == "enum" else field.type
+            )
+            raise SearchQueryError(f"Invalid value {value!r} for {name!r}; expected {expected}") from e
+        return value
+
+
+class _Parser:
+    """Recursive-descent parser over a token list."""
+
+    def __init__(self, tokens: List[Tuple[str, str, int]]):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self) -> Optional[str]:
+        return self.tokens[self.pos][0] if self.pos < len(self.tokens) else None
+
+    def take(self) -> Tuple[str, str, int]:
+        if self.pos >= len(self.tokens):
+            raise SearchQueryError("Unexpected end of query")
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def or_expr(self, depth: int) -> Node:
+        operands = [self.and_expr(depth)]
+        while self.peek() == "OR":
+            self.take()
+            operands.append(self.and_expr(depth))
+        return operands[0] if len(operands) == 1 else Or(tuple(operands))
+
+    def and_expr(self, depth: int) -> Node:
+        operands = [self.not_expr(depth)]
+        while self.peek() not in (None, "OR", ")"):
+            if self.peek() == "AND":
+                self.take()
+            operands.append(self.not_expr(depth))
+
+        merged: List[Node] = []
+        for operand in operands:
+            if isinstance(operand, FreeText) and merged and isinstance(merged[-1], FreeText):
+                merged[-1] = FreeText(f"{merged[-1].value} {operand.value}")
+            else:
+                merged.append(operand)
+        return merged[0] if len(merged) == 1 else And(tuple(merged))
+
+    def not_expr(self, depth: int) -> Node:
+        if depth > MAX_DEPTH:
+            raise SearchQueryError(f"Query nested deeper than {MAX_DEPTH} levels")
+
+        kind, text, position = self.take()
+        if kind == "NOT":
+            return Not(self.not_expr(depth + 1))
+        if kind == "(":
+            node = self.or_expr(depth + 1)
+            if self.peek() != ")":
+                raise SearchQueryError(f"Unclosed parenthesis at position {position}")
+            self.take()
+            return node
+        if kind == "word":
+            return SearchQuery.term(text)
+        raise SearchQueryError(f"Unexpected {text!r} at position {position}")
+
+
+def _unquote(value: str) -> str:
+    """Strip double quotes from a word, resolving backslash escapes inside them."""
+    if '"' not in value:
+        return value
+    return re.sub(r'"((?:[^"\\]|\\.)*)"', lambda match: re.sub(r"\\(.)", r"\1", match.group(1)), value)
@@ -1,16 +1,21 @@
 """Advanced search and filtering service."""
 
 import logging
-import re
+from functools import lru_cache
 from typing import List, Dict, Any, Optional, Tuple
-from datetime import datetime, timedelta
-from sqlalchemy import and_, or_, func
+from datetime import datetime
+from sqlalchemy import and_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.sql.expression import ColumnElement
 
+from app.core.config import settings
 from app.models.vulnerability import Vulnerability
 from app.models.asset import Asset
-from app.models.task import Task
+from app.models.task import Task, TaskStatusEnum, TaskTypeEnum
+from app.models.search_index import SearchIndex
+from app.services.pagination import Paginator
+from app.services.search_query import Node, SearchField, SearchQuery
 
 logger = logging.getLogger(__name__)
 
@@ -18,75 +23,83 @@ logger = logging.getLogger(__name__)
 class SearchService:
     """Service for advanced search and filtering."""
 
-    # Supported search operators
-    OPERATORS = {
-        "=": lambda field, value: field == value,
-        "!=": lambda field, value: field != value,
-        ">": lambda field, value: field > value,
-        "<": lambda field, value: field < value,
-        ">=": lambda field, value: field >= value,
-        "<=": lambda field, value: field <= value,
-        "in": lambda field, value: field.in_(value.split(",")),
-        "like": lambda field, value: field.ilike(f"%{value}%"),
-        "regex": lambda field, value: field.regexp_match(value),
+    # Searchable fields per entity, by query field name
+    FIELDS = {
+        "vulnerability": {
+            "cve": SearchField(Vulnerability.cve_id),
+            "title": SearchField(Vulnerability.title),
+            "severity": SearchField(Vulnerability.severity),
+            "status": SearchField(Vulnerability.status),
+            "cvss_score": SearchField(Vulnerability.cvss_score, "number"),
+            "discovered_at": SearchField(Vulnerability.discovered_at, "datetime"),
+            "ip": SearchField(Asset.ip, via=Vulnerability.asset),
+        },
+        "asset": {
+            "ip": SearchField(Asset.ip),
+            "hostname": SearchField(Asset.hostname),
+            "os": SearchField(Asset.os),
+            "status": SearchField(Asset.status),
+            "department": SearchField(Asset.department),
+            "environment": SearchField(Asset.environment),
+        },
+        "task": {
+            "name": SearchField(Task.name),
+            "status": SearchField(Task.status, "enum", TaskStatusEnum),
+            "type": SearchField(Task.task_type, "enum", TaskTypeEnum),
+            "priority": SearchField(Task.priority, "integer"),
+            "progress": SearchField(Task.progress, "integer"),
+        },
+    }
+
+    # Free-text expression per entity
+    TEXT = {
+        "vulnerability": lambda words: SearchIndex.matches(Vulnerability, words),
+        "asset": lambda words: SearchIndex.matches(Asset, words),
+        "task": lambda words: and_(*(Task.name.ilike(f"%{word}%") for word in words.split())),
     }
 
     @staticmethod
-    def parse_query(query: str) -> List[Tuple[str, str, str]]:
+    def parse_query(query: str) -> Optional[Node]:
         """
         Parse advanced search query.
 
-        Format: field:operator:value OR field=value (default operator is =)
+        Terms are ``field:operator:value`` or ``field<op>value`` (=, !=, >,
+        <, >=, <=; named operators like, in, regex) and bare free-text
+        words, combined with AND, OR, NOT and parentheses. AND binds
+        tighter than OR and is implied between adjacent terms.
+
+        Args:
+            query: Search query string
+
+        Returns:
+            AST root (see SearchQuery), or None for a blank query
+
+        Raises:
+            SearchQueryError: If the query is malformed
+        """
+        return SearchQuery.parse(query)
+
+    @staticmethod
+    @lru_cache(maxsize=settings.SEARCH_QUERY_CACHE_SIZE)
+    def plan(entity: str, query: str) -> Optional[ColumnElement]:
+        """
+        Compile a query for an entity, reusing the plan of identical queries.
 
         Args:
+            entity: vulnerability, asset or task
             query: Search query string
 
         Returns:
-            List of (field, operator, value) tuples
+            Boolean SQL expression, or None for a blank query
+
+        Raises:
+            SearchQueryError: If the query is malformed or does not fit the
+                entity's fields
         """
-        conditions = []
-
-        # Split by logical operators (AND, OR)
-        # Simple parsing - can be enhanced with proper lexer
-        parts = re.split(r'\s+(AND|OR)\s+', query, flags=re.IGNORECASE)
-
-        for i, part in enumerate(parts):
-            if part.upper() in ['AND', 'OR']:
-                continue
-
-            part = part.strip()
-            if not part:
-                continue
-
-            # Parse individual condition
-            # Format: field:operator:value or field=value
-            if ':' in part:
-                components = part.split(':', 2)
-                if len(components) == 3:
-                    field, operator, value = components
-                    conditions.append((field.strip(), operator.strip(), value.strip()))
-            elif '=' in part:
-                field, value = part.split('=', 1)
-                conditions.append((field.strip(), '=', value.strip()))
-            elif '>' in part or '<' in part:
-                # Handle comparison operators
-                if '>=' in part:
-                    field, value = part.split('>=', 1)
-                    conditions.append((field.strip(), '>=', value.strip()))
-                elif '<=' in part:
-                    field, value = part.split('<=', 1)
-                    conditions.append((field.strip(), '<=', value.strip()))
-                elif '!=' in part:
-                    field, value = part.split('!=', 1)
-                    conditions.append((field.strip(), '!=', value.strip()))
-                elif '>' in part:
-                    field, value = part.split('>', 1)
-                    conditions.append((field.strip(), '>', value.strip()))
-                elif '<' in part:
-                    field, value = part.split('<', 1)
-                    conditions.append((field.strip(), '<', value.strip()))
-
-        return conditions
+        node = SearchQuery.parse(query)
+        if node is None:
+            return None
+        return SearchQuery.compile(node, SearchService.FIELDS[entity], SearchService.TEXT[entity])
 
     @staticmethod
     async def search_vulnerabilities(
@@ -95,7 +108,9 @@ class SearchService:
         filters: Optional[Dict[str, Any]] = None,
         page: int = 1,
         page_size: int = 20,
-    ) -> Tuple[List[Dict[str, Any]], int]:
+        cursor: Optional[str] = None,
+        count: str = "exact",
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
         """
         Advanced search for vulnerabilities.
 
@@ -103,11 +118,16 @@ class SearchService:
             db: Database session
             query: Search query (advanced syntax)
             filters: Additional filters
-            page: Page number
+            page: Page number, used when no cursor is given
             page_size: Page size
+            cursor: Keyset cursor from the previous page (see Paginator)
+            count: Count mode (exact, estimate, none)
 
         Returns:
-            Tuple of (vulnerabilities, total_count)
+            Tuple of (vulnerabilities, total_count); total is None when count is none
+
+        Raises:
+            SearchQueryError: If the query is malformed or names unknown fields
         """
         if filters is None:
             filters = {}
@@ -117,43 +137,9 @@ class SearchService:
         filters_list = []
 
         # Parse and apply advanced query
-        if query:
-            conditions = SearchService.parse_query(query)
-
-            for field, operator, value in conditions:
-                try:
-                    # Map field names to model attributes
-                    if field.lower() == "cve":
-                        attr = Vulnerability.cve_id
-                    elif field.lower() == "severity":
-                        attr = Vulnerability.severity
-                    elif field.lower() == "status":
-                        attr = Vulnerability.status
-                    elif field.lower() == "ip":
-                        attr = Vulnerability.affected_asset_ip
-                    else:
-                        continue
-
-                    # Apply operator
-                    if operator == "=":
-                        filters_list.append(attr == value)
-                    elif operator == "!=":
-                        filters_list.append(attr != value)
-                    elif operator == ">":
-                        filters_list.append(attr > value)
-                    elif operator == "<":
-                        filters_list.append(attr < value)
-                    elif operator == ">=":
-                        filters_list.append(attr >= value)
-                    elif operator == "<=":
-                        filters_list.append(attr <= value)
-                    elif operator == "like":
-                        filters_list.append(attr.ilike(f"%{value}%"))
-                    elif operator == "in":
-                        filters_list.append(attr.in_(value.split(",")))
-
-                except Exception as e:
-                    logger.warning(f"Error parsing condition {field} {operator} {value}: {e}")
+        expression = SearchService.plan("vulnerability", query) if query else None
+        if expression is not None:
+            filters_list.append(expression)
 
         # Apply standard filters
         if filters:
@@ -181,19 +167,10 @@ class SearchService:
         if filters_list:
             base_query = base_query.where(and_(*filters_list) if len(filters_list) > 1 else filters_list[0])
 
-        # Get total count
-        count_query = select(func.count(Vulnerability.id))
-        if filters_list:
-            count_query = count_query.where(and_(*filters_list) if len(filters_list) > 1 else filters_list[0])
-
-        count_result = await db.execute(count_query)
-        total = count_result.scalar() or 0
-
         # Apply pagination
-        query = base_query.order_by(Vulnerability.discovered_at.desc()).offset((page - 1) * page_size).limit(page_size)
-
-        result = await db.execute(query)
-        vulnerabilities = result.scalars().all()
+        vulnerabilities, total = await Paginator.paginate(
+            db, base_query, Vulnerability.discovered_at, Vulnerability.id, page, page_size, cursor, count
+        )
 
         return vulnerabilities, total
 
@@ -204,7 +181,9 @@ class SearchService:
         filters: Optional[Dict[str, Any]] = None,
         page: int = 1,
         page_size: int = 20,
-    ) -> Tuple[List[Dict[str, Any]], int]:
+        cursor: Optional[str] = None,
+        count: str = "exact",
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
         """
         Advanced search for assets.
 
@@ -212,11 +191,16 @@ class SearchService:
             db: Database session
             query: Search query
             filters: Additional filters
-            page: Page number
+            page: Page number, used when no cursor is given
             page_size: Page size
+            cursor: Keyset cursor from the previous page (see Paginator)
+            count: Count mode (exact, estimate, none)
 
         Returns:
-            Tuple of (assets, total_count)
+            Tuple of (assets, total_count); total is None when count is none
+
+        Raises:
+            SearchQueryError: If the query is malformed or names unknown fields
         """
         if filters is None:
             filters = {}
@@ -225,27 +209,9 @@ class SearchService:
         filters_list = []
 
         # Parse and apply advanced query
-        if query:
-            conditions = SearchService.parse_query(query)
-
-            for field, operator, value in conditions:
-                if field.lower() == "ip":
-                    attr = Asset.ip_address
-                elif field.lower() == "hostname":
-                    attr = Asset.hostname
-                elif field.lower() == "status":
-                    attr = Asset.status
-                elif field.lower() == "department":
-                    attr = Asset.department
-                else:
-                    continue
-
-                if operator == "=":
-                    filters_list.append(attr == value)
-                elif operator == "like":
-                    filters_list.append(attr.ilike(f"%{value}%"))
-                elif operator == "!=":
-                    filters_list.append(attr != value)
+        expression = SearchService.plan("asset", query) if query else None
+        if expression is not None:
+            filters_list.append(expression)
 
         # Apply standard filters
         if filters:
@@ -262,19 +228,10 @@ class SearchService:
         if filters_list:
             base_query = base_query.where(and_(*filters_list) if len(filters_list) > 1 else filters_list[0])
 
-        # Get total count
-        count_query = select(func.count(Asset.id))
-        if filters_list:
-            count_query = count_query.where(and_(*filters_list) if len(filters_list) > 1 else filters_list[0])
-
-        count_result = await db.execute(count_query)
-        total = count_result.scalar() or 0
-
         # Apply pagination
-        query = base_query.order_by(Asset.created_at.desc()).offset((page - 1) * page_size).limit(page_size)
-
-        result = await db.execute(query)
-        assets = result.scalars().all()
+        assets, total = await Paginator.paginate(
+            db, base_query, Asset.created_at, Asset.id, page, page_size, cursor, count
+        )
 
         return assets, total
 
@@ -285,7 +242,9 @@ class SearchService:
         filters: Optional[Dict[str, Any]] = None,
         page: int = 1,
         page_size: int = 20,
-    ) -> Tuple[List[Dict[str, Any]], int]:
+        cursor: Optional[str] = None,
+        count: str = "exact",
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
         """
         Advanced search for tasks.
 
@@ -293,11 +252,16 @@ class SearchService:
             db: Database session
             query: Search query
             filters: Additional filters
-            page: Page number
+            page: Page number, used when no cursor is given
             page_size: Page size
+            cursor: Keyset cursor from the previous page (see Paginator)
+            count: Count mode (exact, estimate, none)
 
         Returns:
-            Tuple of (tasks, total_count)
+            Tuple of (tasks, total_count); total is None when count is none
+
+        Raises:
+            SearchQueryError: If the query is malformed or names unknown fields
         """
         if filters is None:
             filters = {}
@@ -306,25 +270,9 @@ class SearchService:
         filters_list = []
 
         # Parse and apply advanced query
-        if query:
-            conditions = SearchService.parse_query(query)
-
-            for field, operator, value in conditions:
-                if field.lower() == "name":
-                    attr = Task.name
-                elif field.lower() == "status":
-                    attr = Task.status
-                elif field.lower() == "type":
-                    attr = Task.task_type
-                else:
-                    continue
-
-                if operator == "=":
-                    filters_list.append(attr == value)
-                elif operator == "like":
-                    filters_list.append(attr.ilike(f"%{value}%"))
-                elif operator == "!=":
-                    filters_list.append(attr != value)
+        expression = SearchService.plan("task", query) if query else None
+        if expression is not None:
+            filters_list.append(expression)
 
         # Apply standard filters
         if filters:
@@ -341,19 +289,10 @@ class SearchService:
         if filters_list:
             base_query = base_query.where(and_(*filters_list) if len(filters_list) > 1 else filters_list[0])
 
-        # Get total count
-        count_query = select(func.count(Task.id))
-        if filters_list:
-            count_query = count_query.where(and_(*filters_list) if len(filters_list) > 1 else filters_list[0])
-
-        count_result = await db.execute(count_query)
-        total = count_result.scalar() or 0
-
         # Apply pagination
-        query = base_query.order_by(Task.created_at.desc()).offset((page - 1) * page_size).limit(page_size)
-
-        result = await db.execute(query)
-        tasks = result.scalars().all()
+        tasks, total = await Paginator.paginate(
+            db, base_query, Task.created_at, Task.id, page, page_size, cursor, count
+        )
 
         return tasks, total
 
@@ -378,16 +317,22 @@ class SearchService:
                 {"symbol": "<=", "name": "less or equal", "example": "priority<=5"},
                 {"symbol": "like", "name": "contains", "example": "name:like:Apache"},
                 {"symbol": "in", "name": "in list", "example": "status:in:open,fixed"},
+                {"symbol": "regex", "name": "matches regex", "example": "hostname:regex:^web-[0-9]+"},
             ],
             "logical_operators": [
-                {"symbol": "AND", "description": "Both conditions must be true"},
+                {"symbol": "AND", "description": "Both conditions must be true (implied between terms)"},
                 {"symbol": "OR", "description": "At least one condition must be true"},
+                {"symbol": "NOT", "description": "The condition must be false"},
+                {"symbol": "( )", "description": "Group conditions; AND binds tighter than OR"},
             ],
         }
 
         if search_type == "vulnerability":
             suggestions["fields"] = [
                 {"name": "cve", "type": "string", "example": "CVE-2021-1234"},
+                {"name": "title", "type": "string", "example": "SQL Injection"},
+                {"name": "cvss_score", "type": "number", "example": "7.5"},
+                {"name": "discovered_at", "type": "datetime", "example": "2024-01-31"},
                 {"name": "severity", "type": "enum", "values": ["critical", "high", "medium", "low", "info"]},
                 {"name": "status", "type": "enum", "values": ["open", "fixed", "verified", "false_positive"]},
                 {"name": "ip", "type": "ip", "example": "192.168.1.1"},
@@ -397,6 +342,8 @@ class SearchService:
                 "severity=critical AND status=open",
                 "cve=CVE-2021-1234",
                 "severity:like:high OR severity:like:critical",
+                "apache struts AND status=open",
+                "(severity=critical OR cvss_score>=9) AND NOT status=fixed",
             ]
 
         elif search_type == "asset":
@@ -405,25 +352,31 @@ class SearchService:
                 {"name": "hostname", "type": "string", "example": "server1"},
                 {"name": "status", "type": "enum", "values": ["active", "inactive", "archived"]},
                 {"name": "department", "type": "string", "example": "IT"},
+                {"name": "environment", "type": "string", "example": "production"},
+                {"name": "os", "type": "string", "example": "Ubuntu"},
             ]
 
             suggestions["examples"] = [
                 "ip=192.168.1.100",
                 "department:like:IT AND status=active",
                 "hostname:like:server",
+                "nginx ubuntu",
             ]
 
         elif search_type == "task":
             suggestions["fields"] = [
                 {"name": "name", "type": "string", "example": "Port Scan"},
-                {"name": "status", "type": "enum", "values": ["pending", "running", "completed", "failed"]},
-                {"name": "type", "type": "string", "example": "port_scan"},
+                {"name": "status", "type": "enum", "values": [status.value for status in TaskStatusEnum]},
+                {"name": "type", "type": "enum", "values": [task_type.value for task_type in TaskTypeEnum]},
+                {"name": "priority", "type": "integer", "example": "8"},
+                {"name": "progress", "type": "integer", "example": "50"},
             ]
 
             suggestions["examples"] = [
                 "status=completed",
                 "type=port_scan AND status=running",
                 "name:like:DMZ",
+                "priority>=8 AND NOT status:in:completed,cancelled",
             ]
 
         return suggestions
@@ -1,14 +1,37 @@
 """Service identification service for determining service types and versions."""
 
+import asyncio
 import socket
 import logging
 import ssl
 from typing import List, Dict, Optional, Any, Tuple
 import re
 
+from app.core.config import settings
+
 logger = logging.getLogger(__name__)
 
 
+class _HostThrottle:
+    """Per-host concurrency limit and connection rate for the async grabber."""
+
+    def __init__(self, limit: int, rate: float):
+        self.semaphore = asyncio.Semaphore(limit) if limit > 0 else None
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot = 0.0
+
+    async def wait_turn(self) -> None:
+        """Sleep until this host may receive another connection."""
+        if not self.interval:
+            return
+
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
 class ServiceIdentifyService:
     """Service for identifying service types and versions."""
 
@@ -52,34 +75,150 @@ class ServiceIdentifyService:
         "Redis": r"\$(-?\d+)\r\n",
     }
 
+    # Ports where a TLS handshake is attempted before plain TCP
+    TLS_PORTS = [443, 465, 587, 993, 995, 8443]
+
+    # Probes sent after connecting; other services (SSH, FTP, ...) talk first
+    PROBES = {
+        80: b"HEAD / HTTP/1.0\r\n\r\n",
+        8080: b"HEAD / HTTP/1.0\r\n\r\n",
+        8000: b"HEAD / HTTP/1.0\r\n\r\n",
+        3000: b"HEAD / HTTP/1.0\r\n\r\n",
+        25: b"EHLO test\r\n",
+        587: b"EHLO test\r\n",
+        465: b"EHLO test\r\n",
+    }
+
     @staticmethod
-    def identify_services(asset_id: int, ports: List[int]) -> List[Dict[str, Any]]:
+    def identify_services(
+        asset_id: int, ports: List[int], host: str = "localhost"
+    ) -> List[Dict[str, Any]]:
         """
         Identify services on given ports.
 
+        Ports are probed concurrently with the async banner grabber, so this
+        must not be called from a running event loop (await
+        identify_services_async there instead).
+
         Args:
             asset_id: Asset ID (for future database lookups)
             ports: List of port numbers to identify
+            host: Host to connect to
 
         Returns:
             List of identified services
         """
-        logger.info(f"Identifying services on {len(ports)} ports")
-        services = []
+        logger.info(f"Identifying services on {len(ports)} ports of {host}")
 
-        for port in ports:
-            try:
-                service = ServiceIdentifyService._identify_service_on_port(
-                    "localhost", port
-                )
-                if service:
-                    services.append(service)
-            except Exception as e:
-                logger.warning(f"Error identifying service on port {port}: {e}")
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError(
+                "identify_services cannot run inside an event loop, "
+                "await identify_services_async instead"
+            )
+
+        return asyncio.run(
+            ServiceIdentifyService.identify_services_async([(host, port) for port in ports])
+        )
+
+    @staticmethod
+    async def identify_services_async(
+        targets: List[Tuple[str, int]],
+        **grab_options: Any,
+    ) -> List[Dict[str, Any]]:
+        """
+        Identify services on many host:port pairs concurrently.
+
+        Args:
+            targets: List of (host, port) pairs
+            **grab_options: Options passed to grab_banners_async
+
+        Returns:
+            List of identified services, in target order
+        """
+        banners = await ServiceIdentifyService.grab_banners_async(targets, **grab_options)
+
+        services = []
+        for host, port in targets:
+            banner = banners.get((host, port))
+            if not banner:
                 continue
+            service = ServiceIdentifyService._service_from_banner(port, banner)
+            service["ip"] = host
+            services.append(service)
 
+        logger.info(f"Identified {len(services)} services on {len(targets)} targets")
         return services
 
+    @staticmethod
+    async def grab_banners_async(
+        targets: List[Tuple[str, int]],
+        timeout: Optional[float] = None,
+        concurrency: Optional[int] = None,
+        per_host_limit: Optional[int] = None,
+        per_host_rate: Optional[float] = None,
+    ) -> Dict[Tuple[str, int], Optional[str]]:
+        """
+        Grab banners from many host:port pairs concurrently.
+
+        A global semaphore bounds open connections, and each host gets its
+        own concurrency limit and connection rate so one target is never
+        flooded. Probes and TLS handling match _grab_banner.
+
+        Args:
+            targets: List of (host, port) pairs
+            timeout: Connect/read timeout in seconds (default from settings)
+            concurrency: Maximum open connections (default from settings)
+            per_host_limit: Maximum open connections per host (default from settings)
+            per_host_rate: New connections per second per host (default from settings)
+
+        Returns:
+            Dictionary of (host, port) -> banner (None if nothing was read)
+        """
+        timeout = timeout if timeout is not None else settings.BANNER_GRAB_TIMEOUT
+        concurrency = concurrency or settings.BANNER_GRAB_CONCURRENCY
+        if per_host_limit is None:
+            per_host_limit = settings.BANNER_GRAB_PER_HOST_LIMIT
+        if per_host_rate is None:
+            per_host_rate = settings.BANNER_GRAB_PER_HOST_RATE
+
+        semaphore = asyncio.Semaphore(concurrency)
+        throttles: Dict[str, _HostThrottle] = {}
+        unique_targets = list(dict.fromkeys(targets))
+
+        async def grab(host: str, port: int) -> Optional[str]:
+            throttle = throttles.setdefault(host, _HostThrottle(per_host_limit, per_host_rate))
+            if throttle.semaphore is not None:
+                await throttle.semaphore.acquire()
+            try:
+                await throttle.wait_turn()
+                async with semaphore:
+                    return await ServiceIdentifyService._grab_banner_async(host, port, timeout)
+            finally:
+                if throttle.semaphore is not None:
+                    throttle.semaphore.release()
+
+        results = await asyncio.gather(
+            *(grab(host, port) for host, port in unique_targets),
+            return_exceptions=True,
+        )
+
+        banners: Dict[Tuple[str, int], Optional[str]] = {}
+        for target, result in zip(unique_targets, results):
+            if isinstance(result, BaseException):
+                logger.debug(f"Error grabbing banner from {target[0]}:{target[1]}: {result}")
+                result = None
+            banners[target] = result
+
+        logger.info(
+            f"Grabbed {sum(1 for b in banners.values() if b)} banners "
+            f"from {len(unique_targets)} targets"
+        )
+        return banners
+
     @staticmethod
     def identify_services_from_ports(
         port_data: List[Dict[str, Any]],
@@ -130,20 +269,41 @@ class ServiceIdentifyService:
             if not banner:
                 return None
 
-            # Analyze banner
-            service_name = ServiceIdentifyService._analyze_banner(banner, port)
-
-            return {
-                "port": port,
-                "service": service_name,
-                "banner": banner[:200],  # Limit banner length
-                "confidence": "high" if service_name else "low",
-            }
+            return ServiceIdentifyService._service_from_banner(port, banner)
 
         except Exception as e:
             logger.debug(f"Could not identify service on {host}:{port}: {e}")
             return None
 
+    @staticmethod
+    def _service_from_banner(port: int, banner: str) -> Dict[str, Any]:
+        """
+        Build service information from a grabbed banner.
+
+        Args:
+            port: Port number
+            banner: Banner string
+
+        Returns:
+            Service information
+        """
+        service_name = ServiceIdentifyService._analyze_banner(banner, port)
+
+        return {
+            "port": port,
+            "service": service_name,
+            "banner": banner[:200],  # Limit banner length
+            "confidence": "high" if service_name else "low",
+        }
+
+    @staticmethod
+    def _tls_context() -> ssl.SSLContext:
+        """Create a TLS context that accepts any certificate."""
+        context = ssl.create_default_context()
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+        return context
+
     @staticmethod
     def _grab_banner(host: str, port: int, timeout: int = 5) -> Optional[str]:
         """
@@ -159,11 +319,9 @@ class ServiceIdentifyService:
         """
         try:
             # Try SSL connection first for common HTTPS ports
-            if port in [443, 465, 587, 993, 995, 8443]:
+            if port in ServiceIdentifyService.TLS_PORTS:
                 try:
-                    context = ssl.create_default_context()
-                    context.check_hostname = False
-                    context.verify_mode = ssl.CERT_NONE
+                    context = ServiceIdentifyService._tls_context()
 
                     with socket.create_connection((host, port), timeout=timeout) as sock:
                         with context.wrap_socket(
@@ -176,15 +334,10 @@ class ServiceIdentifyService:
 
             # Regular socket connection
             with socket.create_connection((host, port), timeout=timeout) as sock:
-                # Send HTTP HEAD request for web services
-                if port in [80, 8080, 8000, 3000]:
-                    sock.sendall(b"HEAD / HTTP/1.0\r\n\r\n")
-                # Send SMTP EHLO for mail services
-                elif port in [25, 587, 465]:
-                    sock.sendall(b"EHLO test\r\n")
-                # Send SSH protocol request
-                elif port == 22:
-                    pass  # SSH sends banner automatically
+                # Send HTTP HEAD / SMTP EHLO; SSH sends its banner automatically
+                probe = ServiceIdentifyService.PROBES.get(port)
+                if probe:
+                    sock.sendall(probe)
 
                 # Receive response
                 data = sock.recv(1024)
@@ -203,6 +356,69 @@ class ServiceIdentifyService:
             logger.debug(f"Error grabbing banner from {host}:{port}: {e}")
             return None
 
+    @staticmethod
+    async def _grab_banner_async(host: str, port: int, timeout: float = 5) -> Optional[str]:
+        """
+        Grab service banner from port without blocking the event loop.
+
+        Args:
+            host: Host to connect to
+            port: Port number
+            timeout: Connect/read timeout in seconds
+
+        Returns:
+            Banner string or None
+        """
+        # Try SSL connection first for common HTTPS ports
+        if port in ServiceIdentifyService.TLS_PORTS:
+            try:
+                _, writer = await asyncio.wait_for(
+                    asyncio.open_connection(
+                        host,
+                        port,
+                        ssl=ServiceIdentifyService._tls_context(),
+                        server_hostname=host,
+                    ),
+                    timeout,
+                )
+                await ServiceIdentifyService._close_writer(writer, timeout)
+                return "SSL/TLS connection successful"
+            except (ssl.SSLError, OSError, asyncio.TimeoutError):
+                pass
+
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            logger.debug(f"Error connecting to {host}:{port}: {e}")
+            return None
+
+        try:
+            probe = ServiceIdentifyService.PROBES.get(port)
+            if probe:
+                writer.write(probe)
+                await writer.drain()
+
+            data = await asyncio.wait_for(reader.read(1024), timeout)
+            return data.decode("utf-8", errors="ignore") if data else None
+
+        except asyncio.TimeoutError:
+            logger.debug(f"Timeout reading from {host}:{port}")
+            return None
+        except Exception as e:
+            logger.debug(f"Error grabbing banner from {host}:{port}: {e}")
+            return None
+        finally:
+            await ServiceIdentifyService._close_writer(writer, timeout)
+
+    @staticmethod
+    async def _close_writer(writer: asyncio.StreamWriter, timeout: float) -> None:
+        """Close a stream, ignoring peers that reset or never finish the close."""
+        writer.close()
+        try:
+            await asyncio.wait_for(writer.wait_closed(), timeout)
+        except (OSError, ssl.SSLError, asyncio.TimeoutError):
+            pass
+
     @staticmethod
     def _analyze_banner(banner: str, port: int) -> Optional[str]:
         """
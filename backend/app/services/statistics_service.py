@@ -0,0 +1,436 @@
+"""Statistics rollups maintained on write and reconciled periodically."""
+
+import logging
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from sqlalchemy import delete, distinct, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.asset import Asset
+from app.models.statistics import StatisticsCounter, TaskStatistics
+from app.models.task import Task, TaskResult
+from app.models.vulnerability import Vulnerability
+
+logger = logging.getLogger(__name__)
+
+SEVERITIES = ("critical", "high", "medium", "low", "info")
+
+# Global counters recomputed exactly from the vulnerabilities table
+VULNERABILITY_METRICS = {
+    "vulnerability_severity": Vulnerability.severity,
+    "vulnerability_status": Vulnerability.status,
+    "vulnerability_asset": Vulnerability.asset_id,
+    "vulnerability_day": func.date(Vulnerability.discovered_at),
+    "tool_findings": Vulnerability.source,
+}
+
+Counts = Mapping[Tuple[str, str], int]  # (metric, key) -> delta
+
+
+class StatisticsService:
+    """
+    Read and maintain the statistics rollup tables.
+
+    ``statistics_counters`` holds global counts: vulnerabilities per
+    severity, status, asset and discovery day, and tool runs and findings per
+    tool. ``task_statistics`` holds the same kind of counts per task: runs and
+    findings per tool, and findings per severity, service and asset. Writers
+    add deltas in the transaction that changes the underlying rows, so stats
+    endpoints read a handful of counter rows instead of aggregating raw
+    tables.
+
+    Deltas can drift (concurrent upserts of the same finding, rows removed
+    outside the API), so :meth:`reconcile` periodically recounts every
+    counter that can be derived from the raw tables.
+    """
+
+    @staticmethod
+    def vulnerability_deltas(rows: Iterable[Mapping[str, Any]], sign: int = 1) -> Counter:
+        """
+        Count vulnerability rows into global counter deltas.
+
+        Args:
+            rows: Vulnerability column dicts (asset_id, severity, status,
+                discovered_at, source)
+            sign: 1 for added rows, -1 for removed rows
+
+        Returns:
+            (metric, key) -> delta
+        """
+        counts: Counter = Counter()
+        for row in rows:
+            counts[("vulnerability_severity", row.get("severity") or "")] += sign
+            counts[("vulnerability_status", row.get("status") or "open")] += sign
+            counts[("vulnerability_asset", str(row["asset_id"]))] += sign
+            counts[("vulnerability_day", row["discovered_at"].date().isoformat())] += sign
+            counts[("tool_findings", row.get("source") or "")] += sign
+        return counts
+
+    @staticmethod
+    async def add_vulnerabilities(
+        db: AsyncSession,
+        rows: Iterable[Mapping[str, Any]],
+        sign: int = 1,
+    ) -> None:
+        """
+        Count new (or, with ``sign=-1``, removed) vulnerabilities.
+
+        Args:
+            db: Database session
+            rows: Vulnerability column dicts (asset_id, severity, status,
+                discovered_at, source)
+            sign: 1 for added rows, -1 for removed rows
+        """
+        await StatisticsService.increment(db, StatisticsService.vulnerability_deltas(rows, sign))
+
+    @staticmethod
+    async def remove_vulnerabilities(db: AsyncSession, *criteria) -> None:
+        """
+        Uncount the vulnerabilities matching ``criteria`` before they are deleted.
+
+        Args:
+            db: Database session
+            criteria: WHERE clauses selecting the vulnerabilities
+        """
+        columns = list(VULNERABILITY_METRICS.values())
+        result = await db.execute(
+            select(*columns, func.count(Vulnerability.id)).where(*criteria).group_by(*columns)
+        )
+
+        counts: Counter = Counter()
+        for *values, count in result.all():
+            for metric, value in zip(VULNERABILITY_METRICS, values):
+                counts[(metric, "" if value is None else str(value))] -= count
+        await StatisticsService.increment(db, counts)
+
+    @staticmethod
+    async def change_vulnerability_status(db: AsyncSession, old_status: str, new_status: str) -> None:
+        """
+        Move one vulnerability between status counters.
+
+        Args:
+            db: Database session
+            old_status: Status before the update
+            new_status: Status after the update
+        """
+        if old_status == new_status:
+            return
+        await StatisticsService.increment(
+            db,
+            {("vulnerability_status", old_status): -1, ("vulnerability_status", new_status): 1},
+        )
+
+    @staticmethod
+    async def record_tool_run(db: AsyncSession, task_id: int, tool: str) -> None:
+        """
+        Count a tool run, globally and for its task.
+
+        Its findings are counted as they are stored, see
+        ``ToolResultService._store_vulnerabilities``.
+
+        Args:
+            db: Database session
+            task_id: Task ID
+            tool: Tool name
+        """
+        counts = {("tool_runs", tool): 1}
+        await StatisticsService.increment(db, counts)
+        await StatisticsService.increment_task(db, task_id, counts)
+
+    @staticmethod
+    async def increment(db: AsyncSession, counts: Counts) -> None:
+        """
+        Add deltas to global counters, creating missing ones.
+
+        Args:
+            db: Database session
+            counts: (metric, key) -> delta
+        """
+        rows = [{"metric": metric, "key": key, "value": value} for (metric, key), value in counts.items() if value]
+        await StatisticsService._upsert(db, StatisticsCounter, rows)
+
+    @staticmethod
+    async def increment_task(db: AsyncSession, task_id: int, counts: Counts) -> None:
+        """
+        Add deltas to the counters of one task, creating missing ones.
+
+        Args:
+            db: Database session
+            task_id: Task ID
+            counts: (metric, key) -> delta
+        """
+        rows = [
+            {"task_id": task_id, "metric": metric, "key": key, "value": value}
+            for (metric, key), value in counts.items()
+            if value
+        ]
+        await StatisticsService._upsert(db, TaskStatistics, rows)
+
+    @staticmethod
+    async def _upsert(
+        db: AsyncSession,
+        model: Any,
+        rows: List[Dict[str, Any]],
+        replace: bool = False,
+    ) -> None:
+        """
+        Write counters with one INSERT ... ON CONFLICT.
+
+        ``value`` of each row is added to its counter, or with ``replace``
+        overwrites it.
+        """
+        if not rows:
+            return
+
+        keys = [column.name for column in model.__table__.primary_key.columns]
+        # A fixed order keeps concurrent writers from deadlocking on counter rows
+        rows.sort(key=lambda row: tuple(str(row[key]) for key in keys))
+
+        dialect = (db.bind or db.get_bind()).dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            stmt = (postgresql.insert if dialect == "postgresql" else sqlite.insert)(model)
+            values = {"value": stmt.excluded.value if replace else model.value + stmt.excluded.value}
+            if "updated_at" in model.__table__.c:
+                values["updated_at"] = stmt.excluded.updated_at
+            await db.execute(stmt.on_conflict_do_update(index_elements=keys, set_=values), rows)
+            return
+
+        # No ON CONFLICT support: update, then insert counters that did not exist
+        for row in rows:
+            result = await db.execute(
+                update(model)
+                .where(*(getattr(model, key) == row[key] for key in keys))
+                .values(value=row["value"] if replace else model.value + row["value"])
+            )
+            if result.rowcount == 0:
+                await db.execute(insert(model).values(**row))
+
+    @staticmethod
+    async def counters(db: AsyncSession, *metrics: str) -> Dict[str, Dict[str, int]]:
+        """
+        Read non-zero global counters.
+
+        Args:
+            db: Database session
+            metrics: Metrics to read
+
+        Returns:
+            metric -> {key: value}
+        """
+        result = await db.execute(
+            select(StatisticsCounter.metric, StatisticsCounter.key, StatisticsCounter.value).where(
+                StatisticsCounter.metric.in_(metrics), StatisticsCounter.value != 0
+            )
+        )
+        counters: Dict[str, Dict[str, int]] = {metric: {} for metric in metrics}
+        for metric, key, value in result.all():
+            counters[metric][key] = value
+        return counters
+
+    @staticmethod
+    async def vulnerability_summary(db: AsyncSession) -> Dict[str, Any]:
+        """
+        Get vulnerability totals by severity and status.
+
+        Args:
+            db: Database session
+
+        Returns:
+            Dictionary with total, by_severity and by_status
+        """
+        counters = await StatisticsService.counters(db, "vulnerability_severity", "vulnerability_status")
+        by_severity = {key or None: value for key, value in counters["vulnerability_severity"].items()}
+
+        return {
+            "total": sum(by_severity.values()),
+            "by_severity": by_severity,
+            "by_status": counters["vulnerability_status"],
+        }
+
+    @staticmethod
+    async def task_counters(db: AsyncSession, task_id: int) -> Dict[str, Dict[str, int]]:
+        """
+        Read the non-zero counters of one task.
+
+        Args:
+            db: Database session
+            task_id: Task ID
+
+        Returns:
+            metric -> {key: value}
+        """
+        result = await db.execute(
+            select(TaskStatistics.metric, TaskStatistics.key, TaskStatistics.value).where(
+                TaskStatistics.task_id == task_id, TaskStatistics.value != 0
+            )
+        )
+        counters: Dict[str, Dict[str, int]] = {}
+        for metric, key, value in result.all():
+            counters.setdefault(metric, {})[key] = value
+        return counters
+
+    @staticmethod
+    async def report_statistics(db: AsyncSession, task_ids: Optional[List[int]] = None) -> Dict[str, Any]:
+        """
+        Get finding statistics over a set of tasks.
+
+        Args:
+            db: Database session
+            task_ids: Tasks to report on (first 100), or None for all tasks
+
+        Returns:
+            Statistics dictionary
+        """
+        criteria = []
+        if task_ids:
+            criteria.append(TaskStatistics.task_id.in_(task_ids[:100]))  # Limit to 100 tasks
+            report_sources = len(task_ids)
+        else:
+            report_sources = (await db.execute(select(func.count(Task.id)))).scalar()
+
+        result = await db.execute(
+            select(TaskStatistics.metric, TaskStatistics.key, func.sum(TaskStatistics.value))
+            .where(TaskStatistics.metric.in_(("severity", "service")), *criteria)
+            .group_by(TaskStatistics.metric, TaskStatistics.key)
+        )
+        totals: Dict[str, Dict[str, int]] = {"severity": {}, "service": {}}
+        for metric, key, value in result.all():
+            if value:
+                totals[metric][key] = int(value)
+
+        total_assets = (
+            await db.execute(
+                select(func.count(distinct(TaskStatistics.key))).where(
+                    TaskStatistics.metric == "asset", TaskStatistics.value > 0, *criteria
+                )
+            )
+        ).scalar()
+
+        return {
+            "total_vulnerabilities": sum(totals["severity"].values()),
+            "total_assets": total_assets,
+            "severity_distribution": {
+                severity: totals["severity"].get(severity, 0) for severity in SEVERITIES
+            },
+            "service_distribution": totals["service"],
+            "report_sources": report_sources,
+        }
+
+    @staticmethod
+    async def system_statistics(db: AsyncSession) -> Dict[str, Any]:
+        """
+        Get system-wide task, vulnerability and asset counts.
+
+        Args:
+            db: Database session
+
+        Returns:
+            Statistics dictionary
+        """
+        result = await db.execute(select(Task.status, func.count(Task.id)).group_by(Task.status))
+        tasks = {getattr(status, "value", status): count for status, count in result.all()}
+        summary = await StatisticsService.vulnerability_summary(db)
+        total_assets = (await db.execute(select(func.count(Asset.id)))).scalar()
+
+        return {
+            "active_tasks": tasks.get("running", 0),
+            "completed_tasks": tasks.get("completed", 0),
+            "failed_tasks": tasks.get("failed", 0),
+            "total_vulnerabilities": summary["total"],
+            "total_assets": total_assets,
+        }
+
+    @staticmethod
+    async def reconcile(db: AsyncSession) -> Dict[str, int]:
+        """
+        Recount every counter derivable from the raw tables and commit.
+
+        Vulnerability and tool finding counters are recounted from
+        ``vulnerabilities`` and run counts from ``task_results``; counters of
+        deleted tasks are dropped. Finding counts per tool, severity, service
+        and asset of a task have no source to recount from and are kept as
+        maintained.
+
+        The recounted values are written with one ``INSERT ... ON CONFLICT DO
+        UPDATE`` per table, zeroing counters whose key no longer occurs, so
+        writers incrementing concurrently never find a counter row missing.
+
+        Args:
+            db: Database session
+
+        Returns:
+            Number of global and per-task counters written
+        """
+        counts: Counter = Counter()
+        for metric, column in VULNERABILITY_METRICS.items():
+            result = await db.execute(select(column, func.count(Vulnerability.id)).group_by(column))
+            for value, count in result.all():
+                counts[(metric, "" if value is None else str(value))] += count
+
+        result = await db.execute(
+            select(TaskResult.task_id, TaskResult.result_type, func.count(TaskResult.id))
+            .join(Task, Task.id == TaskResult.task_id)
+            .where(TaskResult.result_type.like("tool_%"))
+            .group_by(TaskResult.task_id, TaskResult.result_type)
+        )
+        task_counts: Counter = Counter()
+        for task_id, result_type, count in result.all():
+            tool = result_type[len("tool_"):]
+            counts[("tool_runs", tool)] += count
+            task_counts[(task_id, "tool_runs", tool)] += count
+
+        recounted = list(VULNERABILITY_METRICS) + ["tool_runs"]
+        stale = await db.execute(
+            select(StatisticsCounter.metric, StatisticsCounter.key).where(
+                StatisticsCounter.metric.in_(recounted), StatisticsCounter.value != 0
+            )
+        )
+        for metric, key in stale.all():
+            counts.setdefault((metric, key), 0)
+
+        stale = await db.execute(
+            select(TaskStatistics.task_id, TaskStatistics.key).where(
+                TaskStatistics.metric == "tool_runs",
+                TaskStatistics.value != 0,
+                TaskStatistics.task_id.in_(select(Task.id)),
+            )
+        )
+        for task_id, key in stale.all():
+            task_counts.setdefault((task_id, "tool_runs", key), 0)
+
+        await db.execute(delete(TaskStatistics).where(TaskStatistics.task_id.not_in(select(Task.id))))
+
+        await StatisticsService._upsert(
+            db,
+            StatisticsCounter,
+            [{"metric": metric, "key": key, "value": value} for (metric, key), value in counts.items()],
+            replace=True,
+        )
+        await StatisticsService._upsert(
+            db,
+            TaskStatistics,
+            [
+                {"task_id": task_id, "metric": metric, "key": key, "value": value}
+                for (task_id, metric, key), value in task_counts.items()
+            ],
+            replace=True,
+        )
+
+        await db.commit()
+
+        logger.info(f"Statistics reconciled: {len(counts)} counters, {len(task_counts)} task run counters")
+        return {"counters": len(counts), "task_counters": len(task_counts)}
+
+    @staticmethod
+    async def ensure_seeded(db: AsyncSession) -> None:
+        """
+        Build the rollups from the raw tables if they have never been populated.
+
+        Args:
+            db: Database session
+        """
+        seeded = (await db.execute(select(StatisticsCounter.metric).limit(1))).first()
+        if seeded is None:
+            await StatisticsService.reconcile(db)
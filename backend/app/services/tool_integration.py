@@ -1,14 +1,20 @@
 """Integration with external security tools (afrog, dddd, fscan, nuclei, dirsearch)."""
 
+import asyncio
 import subprocess
 import logging
 import json
 import os
 import re
-from typing import List, Dict, Optional, Any
+from typing import AsyncIterator, List, Dict, Optional, Any
 from pathlib import Path
 from datetime import datetime
 import shutil
+import tempfile
+import uuid
+
+from app.core.config import settings
+from app.services.process_runner import ProcessRunner
 
 logger = logging.getLogger(__name__)
 
@@ -55,11 +61,38 @@ class ToolIntegration:
         },
     }
 
+    # Tools whose findings can be streamed as JSON lines, with their timeouts
+    STREAMING_TOOLS = {
+        "fscan": 600,
+        "nuclei": 600,
+    }
+
+    # Upstream tools whose discovered services a tool scans when both are chained
+    CHAIN_DEPENDENCIES = {
+        "nuclei": ["fscan"],
+        "afrog": ["fscan"],
+        "dirsearch": ["fscan"],
+    }
+
+    # Well-known web ports and their scheme, for services without a name
+    HTTP_PORTS = {
+        80: "http",
+        443: "https",
+        8000: "http",
+        8080: "http",
+        8443: "https",
+        8888: "http",
+    }
+
     @staticmethod
     def check_tool_installed(tool_name: str) -> bool:
         """
         Check if a tool is installed on the system.
 
+        Falls back to probing the tool with its help flag when it is not on
+        PATH. Inside a running event loop the probe is skipped so the loop is
+        never blocked; async callers should use check_tool_installed_async.
+
         Args:
             tool_name: Name of the tool (afrog, dddd, fscan, nuclei, dirsearch)
 
@@ -67,24 +100,44 @@ class ToolIntegration:
             True if tool is installed, False otherwise
         """
         try:
-            result = shutil.which(tool_name)
-            if result:
-                logger.info(f"Tool '{tool_name}' found at: {result}")
-                return True
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(ToolIntegration.check_tool_installed_async(tool_name))
+
+        return ToolIntegration._which(tool_name)
+
+    @staticmethod
+    async def check_tool_installed_async(tool_name: str) -> bool:
+        """
+        Check if a tool is installed without blocking the event loop.
+
+        Args:
+            tool_name: Name of the tool (afrog, dddd, fscan, nuclei, dirsearch)
+
+        Returns:
+            True if tool is installed, False otherwise
+        """
+        if ToolIntegration._which(tool_name):
+            return True
 
+        try:
             # Alternative check - try running the tool with help flag
-            result = subprocess.run(
-                [tool_name, "-h"],
-                capture_output=True,
-                text=True,
-                timeout=5,
-            )
+            result = await ProcessRunner.run([tool_name, "-h"], timeout=5)
             return result.returncode == 0 or "help" in result.stdout.lower()
 
         except Exception as e:
             logger.warning(f"Tool '{tool_name}' not found: {e}")
             return False
 
+    @staticmethod
+    def _which(tool_name: str) -> bool:
+        """Look a tool up on PATH."""
+        result = shutil.which(tool_name)
+        if result:
+            logger.info(f"Tool '{tool_name}' found at: {result}")
+            return True
+        return False
+
     @staticmethod
     def get_installed_tools() -> Dict[str, bool]:
         """
@@ -98,6 +151,135 @@ class ToolIntegration:
             installed[tool_name] = ToolIntegration.check_tool_installed(tool_name)
         return installed
 
+    @staticmethod
+    async def get_installed_tools_async() -> Dict[str, bool]:
+        """
+        Get list of installed tools, probing them concurrently.
+
+        Returns:
+            Dictionary with tool names and installation status
+        """
+        names = list(ToolIntegration.TOOLS.keys())
+        statuses = await asyncio.gather(
+            *(ToolIntegration.check_tool_installed_async(name) for name in names)
+        )
+        return dict(zip(names, statuses))
+
+    @staticmethod
+    def _fscan_command(target: str, options: Dict[str, Any]) -> List[str]:
+        """Build the fscan command line (JSON lines on stdout)."""
+        cmd = ["fscan"]
+
+        # Target
+        if "/" in target:
+            cmd.extend(["-cidr", target])
+        else:
+            cmd.extend(["-h", target])
+
+        # Add ports
+        if options.get("ports"):
+            cmd.extend(["-p", options["ports"]])
+
+        # Add timeout
+        if options.get("timeout"):
+            cmd.extend(["-time", str(options["timeout"])])
+
+        # Add thread count
+        if options.get("threads"):
+            cmd.extend(["-thread", str(options["threads"])])
+
+        # JSON output
+        cmd.append("-json")
+
+        return cmd
+
+    @staticmethod
+    def _nuclei_command(
+        target: str,
+        templates: Optional[str],
+        options: Dict[str, Any],
+    ) -> List[str]:
+        """Build the nuclei command line without output flags."""
+        cmd = ["nuclei", "-target", target]
+
+        # Add templates
+        if templates:
+            cmd.extend(["-t", templates])
+        else:
+            # Use default templates if not specified
+            cmd.extend(["-t", "cves,osint"])
+
+        # Add timeout
+        if options.get("timeout"):
+            cmd.extend(["-timeout", str(options["timeout"])])
+
+        # Add severity filter
+        if options.get("severity"):
+            cmd.extend(["-severity", options["severity"]])
+
+        # Concurrency
+        if options.get("threads"):
+            cmd.extend(["-c", str(options["threads"])])
+
+        return cmd
+
+    @staticmethod
+    async def iter_findings(
+        tool_name: str,
+        target: str,
+        options: Optional[Dict[str, Any]] = None,
+        templates: Optional[str] = None,
+        status: Optional[Dict[str, Any]] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run a JSONL-emitting tool and yield each finding as it is printed.
+
+        Unlike scan_with_*, no result list is built: findings are parsed from
+        the tool's stdout line by line while it runs.
+
+        Args:
+            tool_name: One of STREAMING_TOOLS
+            target: Target IP, CIDR or URL
+            options: Additional options
+            templates: Nuclei template filter
+            status: Optional dict filled with ``returncode`` and ``stderr``
+                once the tool exits
+
+        Yields:
+            Parsed finding dicts
+
+        Raises:
+            ValueError: If the tool does not support streaming
+            FileNotFoundError: If the tool is not installed
+            subprocess.TimeoutExpired: If the scan timed out
+        """
+        if options is None:
+            options = {}
+
+        if tool_name == "fscan":
+            cmd = ToolIntegration._fscan_command(target, options)
+        elif tool_name == "nuclei":
+            cmd = ToolIntegration._nuclei_command(target, templates, options)
+            cmd.extend(["-json", "-silent"])
+        else:
+            raise ValueError(f"Streaming not supported for tool: {tool_name}")
+
+        logger.info(f"Streaming {tool_name} findings on {target}")
+        logger.debug(f"Executing: {' '.join(cmd)}")
+
+        async for line in ProcessRunner.iter_lines(
+            cmd,
+            timeout=ToolIntegration.STREAMING_TOOLS[tool_name],
+            status=status,
+        ):
+            line = line.strip()
+            if not line.startswith("{"):
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logger.debug(f"Skipping unparsable {tool_name} line: {line[:200]}")
+
     @staticmethod
     async def scan_with_afrog(
         target: str,
@@ -139,10 +321,8 @@ class ToolIntegration:
 
             logger.debug(f"Executing: {' '.join(cmd)}")
 
-            result = subprocess.run(
+            result = await ProcessRunner.run(
                 cmd,
-                capture_output=True,
-                text=True,
                 timeout=300,  # 5 minutes
             )
 
@@ -226,10 +406,8 @@ class ToolIntegration:
 
             logger.debug(f"Executing: {' '.join(cmd)}")
 
-            result = subprocess.run(
+            result = await ProcessRunner.run(
                 cmd,
-                capture_output=True,
-                text=True,
                 timeout=300,
             )
 
@@ -292,35 +470,12 @@ class ToolIntegration:
         logger.info(f"Starting FScan on {target}")
 
         try:
-            cmd = ["fscan"]
-
-            # Target
-            if "/" in target:
-                cmd.extend(["-cidr", target])
-            else:
-                cmd.extend(["-h", target])
-
-            # Add ports
-            if options.get("ports"):
-                cmd.extend(["-p", options["ports"]])
-
-            # Add timeout
-            if options.get("timeout"):
-                cmd.extend(["-time", str(options["timeout"])])
-
-            # Add thread count
-            if options.get("threads"):
-                cmd.extend(["-thread", str(options["threads"])])
-
-            # JSON output
-            cmd.append("-json")
+            cmd = ToolIntegration._fscan_command(target, options)
 
             logger.debug(f"Executing: {' '.join(cmd)}")
 
-            result = subprocess.run(
+            result = await ProcessRunner.run(
                 cmd,
-                capture_output=True,
-                text=True,
                 timeout=600,  # 10 minutes
             )
 
@@ -385,45 +540,26 @@ class ToolIntegration:
         if options is None:
             options = {}
 
+        # Per-run output file so concurrent scans never share one
+        output_file = ToolIntegration._output_file("nuclei")
+
         logger.info(f"Starting Nuclei scan on {target}")
 
         try:
-            cmd = ["nuclei", "-target", target]
-
-            # Add templates
-            if templates:
-                cmd.extend(["-t", templates])
-            else:
-                # Use default templates if not specified
-                cmd.extend(["-t", "cves,osint"])
+            cmd = ToolIntegration._nuclei_command(target, templates, options)
 
             # Output format
-            cmd.extend(["-o", "/tmp/nuclei_output.json", "-json"])
-
-            # Add timeout
-            if options.get("timeout"):
-                cmd.extend(["-timeout", str(options["timeout"])])
-
-            # Add severity filter
-            if options.get("severity"):
-                cmd.extend(["-severity", options["severity"]])
-
-            # Concurrency
-            if options.get("threads"):
-                cmd.extend(["-c", str(options["threads"])])
+            cmd.extend(["-o", output_file, "-json"])
 
             logger.debug(f"Executing: {' '.join(cmd)}")
 
-            result = subprocess.run(
+            result = await ProcessRunner.run(
                 cmd,
-                capture_output=True,
-                text=True,
                 timeout=600,
             )
 
             # Parse output
             vulnerabilities = []
-            output_file = "/tmp/nuclei_output.json"
 
             if os.path.exists(output_file):
                 try:
@@ -435,7 +571,6 @@ class ToolIntegration:
                                     vulnerabilities.append(obj)
                                 except json.JSONDecodeError:
                                     pass
-                    os.remove(output_file)
                 except Exception as e:
                     logger.warning(f"Failed to read Nuclei output: {e}")
 
@@ -466,6 +601,10 @@ class ToolIntegration:
                 "error": str(e),
             }
 
+        finally:
+            if os.path.exists(output_file):
+                os.remove(output_file)
+
     @staticmethod
     async def scan_with_dirsearch(
         target: str,
@@ -484,6 +623,9 @@ class ToolIntegration:
         if options is None:
             options = {}
 
+        # Per-run output file so concurrent scans never share one
+        output_file = ToolIntegration._output_file("dirsearch")
+
         logger.info(f"Starting DirSearch on {target}")
 
         try:
@@ -501,7 +643,7 @@ class ToolIntegration:
                 cmd.extend(["-e", options["extensions"]])
 
             # Output format
-            cmd.extend(["-o", "/tmp/dirsearch_output.json", "-f"])
+            cmd.extend(["-o", output_file, "-f"])
 
             # Timeout
             if options.get("timeout"):
@@ -513,16 +655,13 @@ class ToolIntegration:
 
             logger.debug(f"Executing: {' '.join(cmd)}")
 
-            result = subprocess.run(
+            result = await ProcessRunner.run(
                 cmd,
-                capture_output=True,
-                text=True,
                 timeout=600,
             )
 
             # Parse output
             directories = []
-            output_file = "/tmp/dirsearch_output.json"
 
             if os.path.exists(output_file):
                 try:
@@ -532,7 +671,6 @@ class ToolIntegration:
                             directories = output
                         elif isinstance(output, dict) and "results" in output:
                             directories = output["results"]
-                    os.remove(output_file)
                 except Exception as e:
                     logger.warning(f"Failed to parse DirSearch output: {e}")
 
@@ -563,19 +701,144 @@ class ToolIntegration:
                 "error": str(e),
             }
 
+        finally:
+            if os.path.exists(output_file):
+                os.remove(output_file)
+
+    @staticmethod
+    def _output_file(tool_name: str) -> str:
+        """Return a fresh temporary path for a tool's output file."""
+        return os.path.join(tempfile.gettempdir(), f"{tool_name}_output_{uuid.uuid4().hex}.json")
+
+    @staticmethod
+    def discover_http_targets(scan_result: Dict[str, Any], default_host: str = "") -> List[str]:
+        """
+        Extract HTTP(S) service URLs from a port scan result.
+
+        Args:
+            scan_result: fscan result with per-port entries
+            default_host: Host for entries without an ip field
+
+        Returns:
+            Distinct service URLs in discovery order
+        """
+        default_host = default_host.split("://")[-1].split("/")[0].split(":")[0]
+        urls = []
+
+        for entry in scan_result.get("results") or []:
+            if not isinstance(entry, dict):
+                continue
+
+            try:
+                port = int(entry.get("port"))
+            except (TypeError, ValueError):
+                continue
+
+            service = str(entry.get("service") or "").lower()
+            if "http" not in service and port not in ToolIntegration.HTTP_PORTS:
+                continue
+
+            if "https" in service or "ssl" in service or "tls" in service:
+                scheme = "https"
+            elif "http" in service:
+                scheme = "http"
+            else:
+                scheme = ToolIntegration.HTTP_PORTS[port]
+
+            host = entry.get("ip") or entry.get("host") or default_host
+            default_port = 443 if scheme == "https" else 80
+            netloc = host if port == default_port else f"{host}:{port}"
+            urls.append(f"{scheme}://{netloc}")
+
+        return list(dict.fromkeys(urls))
+
+    @staticmethod
+    async def _run_tool(tool: str, target: str, options: Dict[str, Any]) -> Dict[str, Any]:
+        """Dispatch a single tool run."""
+        if tool == "afrog":
+            return await ToolIntegration.scan_with_afrog(target, options=options)
+        if tool == "dddd":
+            return await ToolIntegration.scan_with_dddd(target, options=options)
+        if tool == "fscan":
+            return await ToolIntegration.scan_with_fscan(target, options=options)
+        if tool == "nuclei":
+            return await ToolIntegration.scan_with_nuclei(target, options=options)
+        return await ToolIntegration.scan_with_dirsearch(target, options=options)
+
+    @staticmethod
+    def _merge_tool_results(
+        tool: str,
+        targets: List[str],
+        outputs: List[Any],
+    ) -> Dict[str, Any]:
+        """
+        Combine one tool's results across the targets it was fanned out to.
+
+        Args:
+            tool: Tool name
+            targets: Targets the tool ran against
+            outputs: Result dict or raised exception per target
+
+        Returns:
+            Single result dict for the tool
+        """
+        outputs = [
+            {"target": t, "status": "error", "error": str(o)}
+            if isinstance(o, BaseException) else o
+            for t, o in zip(targets, outputs)
+        ]
+        if len(outputs) == 1:
+            return outputs[0]
+
+        merged: Dict[str, Any] = {
+            "tool": tool,
+            "targets": targets,
+            "status": "error",
+            "results": [],
+            "target_results": outputs,
+        }
+        statuses = [output.get("status") for output in outputs]
+        for status in ("success", "warning"):
+            if status in statuses:
+                merged["status"] = status
+                break
+
+        for output in outputs:
+            merged["results"].extend(output.get("results") or [])
+            for key in ("vulnerabilities_found", "ports_found", "directories_found"):
+                if key in output:
+                    merged[key] = merged.get(key, 0) + output[key]
+
+        if merged["status"] == "error":
+            merged["error"] = "; ".join(str(output.get("error")) for output in outputs)
+
+        return merged
+
     @staticmethod
     async def execute_tool_chain(
         target: str,
         tools: List[str],
         options: Optional[Dict[str, Any]] = None,
+        max_concurrency: Optional[int] = None,
+        per_tool_concurrency: Optional[int] = None,
     ) -> Dict[str, Any]:
         """
-        Execute multiple tools in sequence.
+        Execute multiple tools as a dependency graph.
+
+        Tools listed in CHAIN_DEPENDENCIES wait for their upstream tools when
+        those are part of the chain: nuclei, afrog and dirsearch run after
+        fscan and fan out over the HTTP services it discovered (falling back
+        to the chain target if none were found). Independent tools and
+        fanned-out runs execute concurrently, so a chain takes as long as its
+        critical path rather than the sum of all tools.
 
         Args:
             target: Target IP or URL
             tools: List of tools to execute (afrog, dddd, fscan, nuclei, dirsearch)
             options: Options for all tools
+            max_concurrency: Tool processes running at once (default from settings)
+            per_tool_concurrency: Processes of one tool running at once
+                (default from settings)
 
         Returns:
             Combined results from all tools
@@ -595,6 +858,7 @@ class ToolIntegration:
             "tool_results": {},
         }
 
+        requested = []
         for tool in tools:
             tool = tool.lower()
 
@@ -602,53 +866,98 @@ class ToolIntegration:
                 logger.warning(f"Unknown tool: {tool}")
                 continue
 
-            if not ToolIntegration.check_tool_installed(tool):
+            if tool not in requested:
+                requested.append(tool)
+
+        installed = await asyncio.gather(
+            *(ToolIntegration.check_tool_installed_async(tool) for tool in requested)
+        )
+        available = []
+        for tool, is_installed in zip(requested, installed):
+            if not is_installed:
                 logger.warning(f"Tool not installed: {tool}")
                 results["tool_results"][tool] = {
                     "status": "error",
                     "error": f"{tool} not installed",
                 }
                 continue
+            available.append(tool)
 
-            try:
-                if tool == "afrog":
-                    result = await ToolIntegration.scan_with_afrog(target, options=options)
-
-                elif tool == "dddd":
-                    result = await ToolIntegration.scan_with_dddd(target, options=options)
-
-                elif tool == "fscan":
-                    result = await ToolIntegration.scan_with_fscan(target, options=options)
-
-                elif tool == "nuclei":
-                    result = await ToolIntegration.scan_with_nuclei(target, options=options)
-
-                elif tool == "dirsearch":
-                    # Check if target is URL
-                    if not target.startswith(("http://", "https://")):
-                        logger.warning(f"DirSearch requires URL target, skipping for {target}")
-                        continue
-
-                    result = await ToolIntegration.scan_with_dirsearch(target, options=options)
-
-                results["tool_results"][tool] = result
-                results["tools_executed"].append(tool)
+        global_limit = asyncio.Semaphore(max_concurrency or settings.TOOL_CHAIN_CONCURRENCY)
+        tool_limits = {
+            tool: asyncio.Semaphore(per_tool_concurrency or settings.TOOL_CHAIN_PER_TOOL_CONCURRENCY)
+            for tool in available
+        }
+        nodes: Dict[str, asyncio.Task] = {}
+        failed = set()
+
+        async def run_scan(tool: str, scan_target: str) -> Dict[str, Any]:
+            async with global_limit, tool_limits[tool]:
+                return await ToolIntegration._run_tool(tool, scan_target, options)
+
+        async def run_node(tool: str, upstream: List[str]) -> Optional[Dict[str, Any]]:
+            scan_targets = [target]
+
+            if upstream:
+                discovered = []
+                for upstream_result in await asyncio.gather(*(nodes[name] for name in upstream)):
+                    if upstream_result:
+                        discovered.extend(
+                            ToolIntegration.discover_http_targets(upstream_result, target)
+                        )
+                if discovered:
+                    scan_targets = list(dict.fromkeys(discovered))
+                    logger.info(f"{tool} fanning out over {len(scan_targets)} discovered services")
+
+            if tool == "dirsearch":
+                # DirSearch only takes URL targets
+                scan_targets = [t for t in scan_targets if t.startswith(("http://", "https://"))]
+                if not scan_targets:
+                    logger.warning(f"DirSearch requires URL target, skipping for {target}")
+                    return None
+
+            outputs = await asyncio.gather(
+                *(run_scan(tool, scan_target) for scan_target in scan_targets),
+                return_exceptions=True,
+            )
+            for scan_target, output in zip(scan_targets, outputs):
+                if isinstance(output, Exception):
+                    logger.error(f"Error executing {tool} on {scan_target}: {output}")
+            if all(isinstance(output, Exception) for output in outputs):
+                failed.add(tool)
+
+            return ToolIntegration._merge_tool_results(tool, scan_targets, outputs)
+
+        # Start nodes in dependency order so upstream tasks exist when awaited
+        pending = list(available)
+        while pending:
+            for tool in list(pending):
+                upstream = [
+                    dep for dep in ToolIntegration.CHAIN_DEPENDENCIES.get(tool, [])
+                    if dep in available
+                ]
+                if all(dep in nodes for dep in upstream):
+                    nodes[tool] = asyncio.create_task(run_node(tool, upstream))
+                    pending.remove(tool)
+
+        for tool in available:
+            result = await nodes[tool]
+            if result is None:
+                continue
 
-                # Aggregate results
-                if "vulnerabilities_found" in result:
-                    results["total_vulnerabilities"] += result["vulnerabilities_found"]
+            results["tool_results"][tool] = result
+            if tool in failed:
+                continue
+            results["tools_executed"].append(tool)
 
-                if "ports_found" in result:
-                    results["total_services"] += result["ports_found"]
+            # Aggregate results
+            if "vulnerabilities_found" in result:
+                results["total_vulnerabilities"] += result["vulnerabilities_found"]
 
-                if "directories_found" in result:
-                    results["total_directories"] += result["directories_found"]
+            if "ports_found" in result:
+                results["total_services"] += result["ports_found"]
 
-            except Exception as e:
-                logger.error(f"Error executing {tool}: {e}")
-                results["tool_results"][tool] = {
-                    "status": "error",
-                    "error": str(e),
-                }
+            if "directories_found" in result:
+                results["total_directories"] += result["directories_found"]
 
         return results
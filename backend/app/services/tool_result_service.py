@@ -1,19 +1,30 @@
 """Service for processing and storing tool scan results."""
 
+import asyncio
+import hashlib
+import ipaddress
 import logging
 import json
-from typing import Dict, Any, List, Optional
+from collections import Counter
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, case, insert, update
+from sqlalchemy.dialects import postgresql, sqlite
 
+from app.core.config import settings
 from app.models.task import Task, TaskResult
-from app.models.vulnerability import Vulnerability
+from app.models.vulnerability import Vulnerability, VulnerabilityHistory
 from app.models.asset import Asset
+from app.services.aggregate_cache import AggregateCache
+from app.services.statistics_service import StatisticsService
 from app.services.tool_integration import ToolIntegration
 
 logger = logging.getLogger(__name__)
 
+# Statuses a finding is reopened from when a scan reports it again
+REOPEN_STATUSES = ("fixed", "closed")
+
 
 class ToolResultService:
     """Service for handling tool scan results and database storage."""
@@ -24,6 +35,8 @@ class ToolResultService:
         task_id: int,
         tool_name: str,
         scan_result: Dict[str, Any],
+        bulk: Optional[bool] = None,
+        asset_cache: Optional[Dict[str, int]] = None,
     ) -> Dict[str, Any]:
         """
         Process tool scan result and store in database.
@@ -33,10 +46,19 @@ class ToolResultService:
             task_id: Task ID
             tool_name: Tool name (afrog, dddd, fscan, nuclei, dirsearch)
             scan_result: Tool execution result from tool_integration service
+            bulk: Write findings in chunks of RESULT_BULK_CHUNK_SIZE rows
+                instead of one statement; by default results with at least
+                RESULT_BULK_INGEST_THRESHOLD findings are bulk inserted
+            asset_cache: ip -> asset ID map shared across ingestion calls;
+                a fresh one is used per call when omitted
 
         Returns:
             Processing result with statistics
         """
+        if bulk is None:
+            bulk = len(scan_result.get("results") or []) >= settings.RESULT_BULK_INGEST_THRESHOLD
+        if asset_cache is None:
+            asset_cache = {}
 
         try:
             # Get task
@@ -66,35 +88,37 @@ class ToolResultService:
             if scan_result.get("status") == "success":
                 if tool_name == "fscan":
                     findings_count = await ToolResultService._process_fscan_results(
-                        db, task, scan_result
+                        db, task, scan_result, bulk, asset_cache
                     )
                     ports_count = findings_count
 
                 elif tool_name == "nuclei":
                     findings_count = await ToolResultService._process_nuclei_results(
-                        db, task, scan_result
+                        db, task, scan_result, bulk, asset_cache
                     )
                     vulnerabilities_count = findings_count
 
                 elif tool_name == "afrog":
                     findings_count = await ToolResultService._process_afrog_results(
-                        db, task, scan_result
+                        db, task, scan_result, bulk, asset_cache
                     )
                     vulnerabilities_count = findings_count
 
                 elif tool_name == "dddd":
                     findings_count = await ToolResultService._process_dddd_results(
-                        db, task, scan_result
+                        db, task, scan_result, bulk, asset_cache
                     )
                     vulnerabilities_count = findings_count
 
                 elif tool_name == "dirsearch":
                     findings_count = await ToolResultService._process_dirsearch_results(
-                        db, task, scan_result
+                        db, task, scan_result, bulk, asset_cache
                     )
                     directories_count = findings_count
 
+            await StatisticsService.record_tool_run(db, task_id, tool_name)
             await db.commit()
+            await AggregateCache.bump("tasks", "vulnerabilities")
 
             logger.info(
                 f"Tool result stored for task {task_id}: {tool_name}, "
@@ -117,45 +141,210 @@ class ToolResultService:
             await db.rollback()
             raise
 
+    @staticmethod
+    async def ingest_stream(
+        db: AsyncSession,
+        task_id: int,
+        tool_name: str,
+        target: str,
+        findings: AsyncIterator[Dict[str, Any]],
+        on_progress: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+        status: Optional[Dict[str, Any]] = None,
+        chunk_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Store findings from a running tool as they arrive.
+
+        Findings are pulled from ``findings`` through a queue bounded to one
+        chunk and upserted in bulk whenever ``chunk_size`` have accumulated or
+        ``flush_interval`` seconds have passed, then committed so they are
+        visible immediately. Only one chunk is held in memory, and the
+        TaskResult row records a summary instead of every finding.
+
+        Args:
+            db: Database session
+            task_id: Task ID
+            tool_name: Tool name (fscan or nuclei)
+            target: Scan target
+            findings: Async iterator of parsed tool findings
+            on_progress: Awaited with running totals after every flush
+            status: Process status filled by the producer (returncode, stderr)
+            chunk_size: Findings per flush (default from settings)
+            flush_interval: Max seconds between flushes (default from settings)
+
+        Returns:
+            Processing result with statistics
+        """
+        chunk_size = chunk_size or settings.RESULT_BULK_CHUNK_SIZE
+        flush_interval = flush_interval or settings.RESULT_STREAM_FLUSH_INTERVAL
+        if status is None:
+            status = {}
+
+        stmt = select(Task).where(Task.id == task_id)
+        result = await db.execute(stmt)
+        task = result.scalars().first()
+
+        if not task:
+            raise ValueError(f"Task {task_id} not found")
+
+        process = getattr(ToolResultService, f"_process_{tool_name}_results")
+        count_key = "ports_found" if tool_name == "fscan" else "vulnerabilities_found"
+        summary: Dict[str, Any] = {
+            "tool": tool_name,
+            "target": target,
+            "status": "running",
+            "streamed": True,
+            count_key: 0,
+        }
+        task_result = TaskResult(
+            task_id=task_id,
+            result_type=f"tool_{tool_name}",
+            result_data=dict(summary),
+            created_at=datetime.utcnow(),
+        )
+        db.add(task_result)
+        await StatisticsService.record_tool_run(db, task_id, tool_name)
+        await db.commit()
+        await AggregateCache.bump("tasks")
+
+        asset_cache: Dict[str, int] = {}
+        received = 0
+        queue: asyncio.Queue = asyncio.Queue(maxsize=chunk_size)
+        done = object()
+
+        async def produce():
+            try:
+                async for finding in findings:
+                    await queue.put(finding)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                await queue.put(done)
+                raise
+            await queue.put(done)
+
+        async def flush(chunk: List[Dict[str, Any]]) -> None:
+            stored = await process(db, task, {"target": target, "results": chunk}, True, asset_cache)
+            await db.commit()
+            await AggregateCache.bump("vulnerabilities")
+            summary[count_key] += stored
+            if on_progress is not None:
+                try:
+                    await on_progress({"tool": tool_name, "received": received, "stored": summary[count_key]})
+                except Exception as e:
+                    logger.warning(f"Progress callback failed: {e}")
+
+        producer = asyncio.create_task(produce())
+        loop = asyncio.get_running_loop()
+        try:
+            chunk: List[Dict[str, Any]] = []
+            flush_at = loop.time() + flush_interval
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), max(flush_at - loop.time(), 0))
+                except asyncio.TimeoutError:
+                    item = None
+
+                if item is done:
+                    break
+                if item is not None:
+                    chunk.append(item)
+                    received += 1
+
+                if len(chunk) >= chunk_size or (chunk and loop.time() >= flush_at):
+                    await flush(chunk)
+                    chunk = []
+                if not chunk:
+                    flush_at = loop.time() + flush_interval
+
+            if chunk:
+                await flush(chunk)
+
+            await producer
+            summary["status"] = "success" if status.get("returncode", 0) == 0 else "warning"
+
+        except Exception as e:
+            logger.error(f"Streaming {tool_name} ingestion failed for task {task_id}: {e}")
+            await db.rollback()
+            summary["status"] = "error"
+            summary["error"] = str(e) or type(e).__name__
+
+        finally:
+            if not producer.done():
+                producer.cancel()
+                await asyncio.gather(producer, return_exceptions=True)
+
+        if status.get("stderr"):
+            summary["raw_output"] = status["stderr"][:1000]
+        task_result.result_data = summary
+        await db.commit()
+        await AggregateCache.bump("tasks")
+
+        logger.info(
+            f"Streamed tool result stored for task {task_id}: {tool_name}, "
+            f"findings: {summary[count_key]}"
+        )
+
+        return {
+            "status": summary["status"],
+            "task_id": task_id,
+            "tool": tool_name,
+            "findings": summary[count_key],
+            "vulnerabilities": summary[count_key] if tool_name != "fscan" else 0,
+            "ports": summary[count_key] if tool_name == "fscan" else 0,
+            "directories": 0,
+            "task_result_id": task_result.id,
+            "error": summary.get("error"),
+        }
+
     @staticmethod
     async def _process_fscan_results(
         db: AsyncSession,
         task: Task,
         result: Dict[str, Any],
+        bulk: bool = False,
+        asset_cache: Optional[Dict[str, int]] = None,
     ) -> int:
         """Process FScan port scan results."""
         ports_found = 0
         target = result.get("target", "")
 
         try:
-            # Get or create asset for target
-            asset = await ToolResultService._get_or_create_asset(db, target)
-
-            # Process each port finding
+            # Resolve the asset of every host in the result up front
             results = result.get("results", [])
-            for port_info in results:
-                ports_found += 1
-
-                # Store port information as task result metadata
-                port_data = {
-                    "ip": port_info.get("ip"),
-                    "port": port_info.get("port"),
-                    "service": port_info.get("service"),
-                    "version": port_info.get("version"),
-                    "tool": "fscan",
-                    "timestamp": datetime.utcnow().isoformat(),
-                }
+            row_targets = [ToolResultService._finding_target(item, target) for item in results]
+            asset_ids = await ToolResultService._resolve_assets(
+                db, row_targets or [target], asset_cache
+            )
 
-                # Create vulnerability record for service detection
-                vuln = Vulnerability(
-                    asset_id=asset.id,
-                    title=f"Port {port_info.get('port')}/{port_info.get('service', 'unknown')}",
-                    description=f"Service detected: {port_info.get('service')} {port_info.get('version', '')}",
-                    severity="info",
-                    status="open",
-                    discovered_at=datetime.utcnow(),
-                )
-                db.add(vuln)
+            # Record each detected service as an informational finding
+            services: Dict[str, str] = {}
+
+            def service_rows():
+                for port_info, asset_id in zip(results, asset_ids):
+                    dedup_key = ToolResultService._finding_key(
+                        asset_id, "fscan", port_info.get("service"), port_info.get("port"), port_info.get("ip")
+                    )
+                    services[dedup_key] = str(port_info.get("service") or "unknown")
+                    yield {
+                        "asset_id": asset_id,
+                        "dedup_key": dedup_key,
+                        "title": f"Port {port_info.get('port')}/{port_info.get('service', 'unknown')}",
+                        "description": f"Service detected: {port_info.get('service')} {port_info.get('version', '')}",
+                        "cve_id": None,
+                        "severity": "info",
+                    }
+
+            # Services are counted per distinct stored port, not per raw line
+            ports_found = await ToolResultService._store_vulnerabilities(
+                db,
+                service_rows(),
+                bulk,
+                task_id=task.id,
+                tool="fscan",
+                task_keys=lambda row: [("service", services[row["dedup_key"]])],
+            )
 
             return ports_found
 
@@ -168,46 +357,49 @@ class ToolResultService:
         db: AsyncSession,
         task: Task,
         result: Dict[str, Any],
+        bulk: bool = False,
+        asset_cache: Optional[Dict[str, int]] = None,
     ) -> int:
         """Process Nuclei vulnerability scan results."""
         vulns_found = 0
         target = result.get("target", "")
 
         try:
-            # Get or create asset
-            asset = await ToolResultService._get_or_create_asset(db, target)
+            results = result.get("results", [])
+            row_targets = [ToolResultService._finding_target(item, target) for item in results]
+            asset_ids = await ToolResultService._resolve_assets(
+                db, row_targets or [target], asset_cache
+            )
+
+            # Extract severity from nuclei result
+            severity_map = {
+                "critical": "critical",
+                "high": "high",
+                "medium": "medium",
+                "low": "low",
+                "info": "info",
+            }
 
             # Process each vulnerability
-            results = result.get("results", [])
-            for vuln_info in results:
-                vuln_found = False
-
-                # Extract severity from nuclei result
-                severity_map = {
-                    "critical": "critical",
-                    "high": "high",
-                    "medium": "medium",
-                    "low": "low",
-                    "info": "info",
+            rows = (
+                {
+                    "asset_id": asset_id,
+                    "dedup_key": ToolResultService._finding_key(
+                        asset_id, "nuclei", vuln_info.get("id"), None, vuln_info.get("matched_at")
+                    ),
+                    "title": vuln_info.get("name", "Unknown Vulnerability"),
+                    "description": f"Detected by Nuclei\nMatched URL: {vuln_info.get('matched_at', 'N/A')}",
+                    "cve_id": vuln_info.get("id"),
+                    "severity": severity_map.get(
+                        str(vuln_info.get("severity", "")).lower(),
+                        "medium"
+                    ),
                 }
-                severity = severity_map.get(
-                    str(vuln_info.get("severity", "")).lower(),
-                    "medium"
-                )
-
-                # Create vulnerability record
-                vuln = Vulnerability(
-                    asset_id=asset.id,
-                    title=vuln_info.get("name", "Unknown Vulnerability"),
-                    description=f"Detected by Nuclei\nMatched URL: {vuln_info.get('matched_at', 'N/A')}",
-                    cve_id=vuln_info.get("id"),
-                    severity=severity,
-                    status="open",
-                    discovered_at=datetime.utcnow(),
-                )
-                db.add(vuln)
-                vulns_found += 1
-                vuln_found = True
+                for vuln_info, asset_id in zip(results, asset_ids)
+            )
+            vulns_found = await ToolResultService._store_vulnerabilities(
+                db, rows, bulk, task_id=task.id, tool="nuclei"
+            )
 
             return vulns_found
 
@@ -220,28 +412,35 @@ class ToolResultService:
         db: AsyncSession,
         task: Task,
         result: Dict[str, Any],
+        bulk: bool = False,
+        asset_cache: Optional[Dict[str, int]] = None,
     ) -> int:
         """Process Afrog vulnerability scan results."""
         vulns_found = 0
         target = result.get("target", "")
 
         try:
-            asset = await ToolResultService._get_or_create_asset(db, target)
-
             results = result.get("results", [])
-            for vuln_info in results:
-                severity = vuln_info.get("severity", "medium").lower()
-
-                vuln = Vulnerability(
-                    asset_id=asset.id,
-                    title=vuln_info.get("vulnerability", "Unknown Vulnerability"),
-                    description=f"Detected by Afrog\nTarget: {vuln_info.get('target', 'N/A')}",
-                    severity=severity,
-                    status="open",
-                    discovered_at=datetime.utcnow(),
-                )
-                db.add(vuln)
-                vulns_found += 1
+            row_targets = [ToolResultService._finding_target(item, target) for item in results]
+            asset_ids = await ToolResultService._resolve_assets(
+                db, row_targets or [target], asset_cache
+            )
+            rows = (
+                {
+                    "asset_id": asset_id,
+                    "dedup_key": ToolResultService._finding_key(
+                        asset_id, "afrog", vuln_info.get("vulnerability"), None, vuln_info.get("target")
+                    ),
+                    "title": vuln_info.get("vulnerability", "Unknown Vulnerability"),
+                    "description": f"Detected by Afrog\nTarget: {vuln_info.get('target', 'N/A')}",
+                    "cve_id": None,
+                    "severity": vuln_info.get("severity", "medium").lower(),
+                }
+                for vuln_info, asset_id in zip(results, asset_ids)
+            )
+            vulns_found = await ToolResultService._store_vulnerabilities(
+                db, rows, bulk, task_id=task.id, tool="afrog"
+            )
 
             return vulns_found
 
@@ -254,28 +453,35 @@ class ToolResultService:
         db: AsyncSession,
         task: Task,
         result: Dict[str, Any],
+        bulk: bool = False,
+        asset_cache: Optional[Dict[str, int]] = None,
     ) -> int:
         """Process DDDD vulnerability scan results."""
         vulns_found = 0
         target = result.get("target", "")
 
         try:
-            asset = await ToolResultService._get_or_create_asset(db, target)
-
             results = result.get("results", [])
-            for vuln_info in results:
-                severity = vuln_info.get("severity", "medium").lower()
-
-                vuln = Vulnerability(
-                    asset_id=asset.id,
-                    title=vuln_info.get("name", "Unknown Vulnerability"),
-                    description=f"Detected by DDDD\nDetails: {vuln_info.get('description', 'N/A')}",
-                    severity=severity,
-                    status="open",
-                    discovered_at=datetime.utcnow(),
-                )
-                db.add(vuln)
-                vulns_found += 1
+            row_targets = [ToolResultService._finding_target(item, target) for item in results]
+            asset_ids = await ToolResultService._resolve_assets(
+                db, row_targets or [target], asset_cache
+            )
+            rows = (
+                {
+                    "asset_id": asset_id,
+                    "dedup_key": ToolResultService._finding_key(
+                        asset_id, "dddd", vuln_info.get("name"), None, vuln_info.get("description")
+                    ),
+                    "title": vuln_info.get("name", "Unknown Vulnerability"),
+                    "description": f"Detected by DDDD\nDetails: {vuln_info.get('description', 'N/A')}",
+                    "cve_id": None,
+                    "severity": vuln_info.get("severity", "medium").lower(),
+                }
+                for vuln_info, asset_id in zip(results, asset_ids)
+            )
+            vulns_found = await ToolResultService._store_vulnerabilities(
+                db, rows, bulk, task_id=task.id, tool="dddd"
+            )
 
             return vulns_found
 
@@ -288,28 +494,37 @@ class ToolResultService:
         db: AsyncSession,
         task: Task,
         result: Dict[str, Any],
+        bulk: bool = False,
+        asset_cache: Optional[Dict[str, int]] = None,
     ) -> int:
         """Process DirSearch directory enumeration results."""
         dirs_found = 0
         target = result.get("target", "")
 
         try:
-            asset = await ToolResultService._get_or_create_asset(db, target)
-
             results = result.get("results", [])
-            for dir_info in results:
-                dirs_found += 1
-
-                # Store directory as low-severity finding
-                vuln = Vulnerability(
-                    asset_id=asset.id,
-                    title=f"Directory Discovered: {dir_info.get('path', 'unknown')}",
-                    description=f"HTTP Status: {dir_info.get('status', 'unknown')}\nPath: {dir_info.get('path', 'unknown')}",
-                    severity="info",
-                    status="open",
-                    discovered_at=datetime.utcnow(),
-                )
-                db.add(vuln)
+            row_targets = [ToolResultService._finding_target(item, target) for item in results]
+            asset_ids = await ToolResultService._resolve_assets(
+                db, row_targets or [target], asset_cache
+            )
+
+            # Store each directory as a low-severity finding
+            rows = (
+                {
+                    "asset_id": asset_id,
+                    "dedup_key": ToolResultService._finding_key(
+                        asset_id, "dirsearch", "directory", None, dir_info.get("path")
+                    ),
+                    "title": f"Directory Discovered: {dir_info.get('path', 'unknown')}",
+                    "description": f"HTTP Status: {dir_info.get('status', 'unknown')}\nPath: {dir_info.get('path', 'unknown')}",
+                    "cve_id": None,
+                    "severity": "info",
+                }
+                for dir_info, asset_id in zip(results, asset_ids)
+            )
+            dirs_found = await ToolResultService._store_vulnerabilities(
+                db, rows, bulk, task_id=task.id, tool="dirsearch"
+            )
 
             return dirs_found
 
@@ -318,39 +533,327 @@ class ToolResultService:
             return dirs_found
 
     @staticmethod
-    async def _get_or_create_asset(db: AsyncSession, target: str) -> Asset:
+    def _finding_key(
+        asset_id: int,
+        tool: str,
+        template: Optional[str],
+        port: Optional[int],
+        location: Optional[str],
+    ) -> str:
         """
-        Get or create asset from target address.
+        Build the content fingerprint identifying a finding across scans.
+
+        Args:
+            asset_id: Asset ID
+            tool: Tool name
+            template: Template, CVE or check name
+            port: Port number
+            location: Matched URL, path or host
+
+        Returns:
+            Hex SHA-256 of the finding identity
+        """
+        parts = [asset_id, tool, template, port, location]
+        identity = "\x1f".join("" if part is None else str(part) for part in parts)
+        return hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    async def _store_vulnerabilities(
+        db: AsyncSession,
+        rows: Iterable[Dict[str, Any]],
+        bulk: bool = False,
+        chunk_size: Optional[int] = None,
+        task_id: Optional[int] = None,
+        tool: Optional[str] = None,
+        task_keys: Optional[Callable[[Dict[str, Any]], Iterable[Tuple[str, str]]]] = None,
+    ) -> int:
+        """
+        Upsert vulnerability rows, keyed on their ``dedup_key``.
+
+        Rows are written with executemany ``INSERT ... ON CONFLICT``, so
+        concurrent scans reporting the same finding converge on one row.
+        Findings already stored by an earlier scan get ``last_seen``
+        refreshed and, if they were fixed or closed, are reopened;
+        duplicates within one call are collapsed. In bulk mode one statement
+        is sent per ``chunk_size`` rows (batched into multi-row VALUES by the
+        driver), so only one chunk of plain dicts is held in memory at a
+        time.
+
+        Only newly inserted findings are counted in the statistics rollups,
+        globally and towards the tool findings, severity and asset counters
+        of ``task_id``, so rescans reporting the same findings again do not
+        inflate them.
 
         Args:
             db: Database session
-            target: Target IP, domain, or URL
+            rows: Vulnerability column dicts (dedup_key, asset_id, title,
+                description, cve_id, severity)
+            bulk: Upsert ``chunk_size`` rows at a time instead of all at once
+            chunk_size: Rows per INSERT in bulk mode (default from settings)
+            task_id: Task whose statistics the findings count towards
+            tool: Tool that reported the findings, stored as their source
+            task_keys: Extra (metric, key) task counters of a new row
 
         Returns:
-            Asset object
+            Number of distinct findings stored or refreshed
         """
-        # Extract IP or hostname from target
-        ip_address = target.split("://")[-1].split("/")[0].split(":")[0]
+        now = datetime.utcnow()
+        seen = set()
+        stored = 0
+        counts: Counter = Counter()
+        task_counts: Counter = Counter()
+
+        def distinct_rows():
+            for row in rows:
+                if row["dedup_key"] in seen:
+                    continue
+                seen.add(row["dedup_key"])
+                if tool is not None:
+                    row["source"] = tool
+                yield row
+
+        def count_new(new_rows: List[Dict[str, Any]]) -> None:
+            counts.update(StatisticsService.vulnerability_deltas(new_rows))
+            for row in new_rows:
+                task_counts[("tool_findings", row.get("source") or "")] += 1
+                task_counts[("severity", row.get("severity") or "")] += 1
+                task_counts[("asset", str(row["asset_id"]))] += 1
+                if task_keys is not None:
+                    task_counts.update(task_keys(row))
+
+        if bulk:
+            chunk_size = chunk_size or settings.RESULT_BULK_CHUNK_SIZE
+        chunk: List[Dict[str, Any]] = []
+
+        for row in distinct_rows():
+            row.update(
+                status="open",
+                discovered_at=now,
+                last_seen=now,
+                created_at=now,
+                updated_at=now,
+            )
+            chunk.append(row)
 
-        # Check if asset exists
-        stmt = select(Asset).where(Asset.ip_address == ip_address)
-        result = await db.execute(stmt)
-        asset = result.scalars().first()
+            if bulk and len(chunk) >= chunk_size:
+                count_new(await ToolResultService._upsert_vulnerability_chunk(db, chunk))
+                stored += len(chunk)
+                chunk = []
 
-        if asset:
-            return asset
+        if chunk:
+            count_new(await ToolResultService._upsert_vulnerability_chunk(db, chunk))
+            stored += len(chunk)
 
-        # Create new asset
-        asset = Asset(
-            ip_address=ip_address,
-            hostname=target,
-            status="active",
-            created_at=datetime.utcnow(),
-        )
-        db.add(asset)
-        await db.flush()
+        await StatisticsService.increment(db, counts)
+        if task_id is not None:
+            await StatisticsService.increment_task(db, task_id, task_counts)
+        return stored
+
+    @staticmethod
+    async def _upsert_vulnerability_chunk(
+        db: AsyncSession,
+        chunk: List[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """
+        Insert one chunk of distinct vulnerability rows, refreshing existing ones.
+
+        Keys already stored are looked up first to tell new findings from
+        re-seen ones. Re-seen findings in a ``REOPEN_STATUSES`` status are
+        set back to open, with their status counters and history updated.
 
-        return asset
+        Args:
+            db: Database session
+            chunk: Complete vulnerability rows with unique dedup keys
+
+        Returns:
+            The rows that were not stored before
+        """
+        keys = [row["dedup_key"] for row in chunk]
+        existing = {
+            dedup_key: (vuln_id, status)
+            for vuln_id, dedup_key, status in (
+                await db.execute(
+                    select(Vulnerability.id, Vulnerability.dedup_key, Vulnerability.status).where(
+                        Vulnerability.dedup_key.in_(keys)
+                    )
+                )
+            ).all()
+        }
+        new_rows = [row for row in chunk if row["dedup_key"] not in existing]
+        reopened = [(vuln_id, status) for vuln_id, status in existing.values() if status in REOPEN_STATUSES]
+
+        stmt = ToolResultService._dialect_insert(db, Vulnerability)
+
+        if stmt is not None:
+            # Still an upsert: a concurrent scan may insert the same key meanwhile
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Vulnerability.dedup_key],
+                set_={
+                    "last_seen": stmt.excluded.last_seen,
+                    "updated_at": stmt.excluded.updated_at,
+                    "status": case(
+                        {status: "open" for status in REOPEN_STATUSES},
+                        value=Vulnerability.status,
+                        else_=Vulnerability.status,
+                    ),
+                },
+            )
+            await db.execute(stmt, chunk)
+
+        else:
+            # No ON CONFLICT support: refresh existing keys, insert the rest
+            if existing:
+                await db.execute(
+                    update(Vulnerability)
+                    .where(Vulnerability.dedup_key.in_(list(existing)))
+                    .values(last_seen=chunk[0]["last_seen"], updated_at=chunk[0]["updated_at"])
+                )
+            if reopened:
+                await db.execute(
+                    update(Vulnerability)
+                    .where(Vulnerability.id.in_([vuln_id for vuln_id, _ in reopened]))
+                    .values(status="open")
+                )
+            if new_rows:
+                await db.execute(insert(Vulnerability), new_rows)
+
+        if reopened:
+            counts: Counter = Counter()
+            for _, status in reopened:
+                counts[("vulnerability_status", status)] -= 1
+                counts[("vulnerability_status", "open")] += 1
+            await StatisticsService.increment(db, counts)
+            await db.execute(
+                insert(VulnerabilityHistory),
+                [
+                    {
+                        "vulnerability_id": vuln_id,
+                        "old_status": status,
+                        "new_status": "open",
+                        "notes": "Reopened: reported again by a scan",
+                        "timestamp": chunk[0]["last_seen"],
+                    }
+                    for vuln_id, status in reopened
+                ],
+            )
+        return new_rows
+
+    @staticmethod
+    def _dialect_insert(db: AsyncSession, model: Any):
+        """
+        Build an INSERT supporting ``ON CONFLICT`` when the backend has it.
+
+        Args:
+            db: Database session
+            model: Mapped model class
+
+        Returns:
+            PostgreSQL or SQLite insert construct, or None for other backends
+        """
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            return postgresql.insert(model)
+        if dialect == "sqlite":
+            return sqlite.insert(model)
+        return None
+
+    @staticmethod
+    def _asset_host(target: str) -> str:
+        """Extract the IP or hostname an asset is keyed on from a target."""
+        return target.split("://")[-1].split("/")[0].split(":")[0]
+
+    @staticmethod
+    def _asset_hostname(host: str) -> Optional[str]:
+        """Return the hostname recorded for an asset host, or None when it is an IP."""
+        try:
+            ipaddress.ip_address(host)
+        except ValueError:
+            return host or None
+        return None
+
+    @staticmethod
+    def _finding_target(item: Dict[str, Any], target: str) -> str:
+        """Return the host a single result entry refers to, defaulting to the scan target."""
+        if isinstance(item, dict):
+            return item.get("ip") or item.get("host") or target
+        return target
+
+    @staticmethod
+    async def _resolve_assets(
+        db: AsyncSession,
+        targets: List[str],
+        cache: Optional[Dict[str, int]] = None,
+    ) -> List[int]:
+        """
+        Resolve many targets to asset IDs, creating missing assets in bulk.
+
+        Hosts not yet in ``cache`` are looked up with one ``IN`` query per
+        chunk; the remaining ones are inserted together with
+        ``ON CONFLICT (ip) DO NOTHING`` and read back, so concurrent
+        ingestions converge on the same asset rows.
+
+        Args:
+            db: Database session
+            targets: Target IPs, domains, or URLs (duplicates allowed)
+            cache: ip -> asset ID map, updated in place
+
+        Returns:
+            Asset IDs aligned with ``targets``
+        """
+        if cache is None:
+            cache = {}
+
+        hosts = [ToolResultService._asset_host(target) for target in targets]
+        missing = list(dict.fromkeys(host for host in hosts if host not in cache))
+
+        chunk_size = settings.RESULT_BULK_CHUNK_SIZE
+        for start in range(0, len(missing), chunk_size):
+            chunk = missing[start:start + chunk_size]
+            existing = await db.execute(select(Asset.ip, Asset.id).where(Asset.ip.in_(chunk)))
+            cache.update(existing.all())
+
+            new_hosts = [host for host in chunk if host not in cache]
+            if not new_hosts:
+                continue
+
+            now = datetime.utcnow()
+            rows = [
+                {
+                    "ip": host,
+                    "hostname": ToolResultService._asset_hostname(host),
+                    "status": "active",
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for host in new_hosts
+            ]
+            stmt = ToolResultService._dialect_insert(db, Asset)
+            if stmt is not None:
+                stmt = stmt.on_conflict_do_nothing(index_elements=[Asset.ip])
+            else:
+                stmt = insert(Asset)
+            await db.execute(stmt, rows)
+
+            created = await db.execute(select(Asset.ip, Asset.id).where(Asset.ip.in_(new_hosts)))
+            cache.update(created.all())
+            logger.debug(f"Created {len(new_hosts)} assets during result ingestion")
+
+        return [cache[host] for host in hosts]
+
+    @staticmethod
+    async def _get_or_create_asset(db: AsyncSession, target: str) -> Asset:
+        """
+        Get or create asset from target address.
+
+        Args:
+            db: Database session
+            target: Target IP, domain, or URL
+
+        Returns:
+            Asset object
+        """
+        asset_ids = await ToolResultService._resolve_assets(db, [target])
+        return await db.get(Asset, asset_ids[0])
 
     @staticmethod
     async def get_tool_results(
@@ -398,6 +901,9 @@ class ToolResultService:
         """
         Get statistics for a task including all findings.
 
+        Counts come from the task's statistics rollup, so the cost does not
+        grow with the number of stored results.
+
         Args:
             db: Database session
             task_id: Task ID
@@ -414,55 +920,30 @@ class ToolResultService:
             if not task:
                 return {}
 
-            # Get vulnerabilities from this task's assets
-            vuln_stmt = select(Vulnerability).where(
-                Vulnerability.asset_id.in_(
-                    select(Asset.id).where(Asset.id.in_([]))
-                )
-            )
-
-            # Count tool results
-            tool_results = await ToolResultService.get_tool_results(db, task_id)
+            # Read the task's rollup counters instead of its raw results
+            counters = await StatisticsService.task_counters(db, task_id)
+            runs = counters.get("tool_runs", {})
+            findings = counters.get("tool_findings", {})
+            severities = counters.get("severity", {})
 
-            # Count vulnerabilities by severity
-            severity_counts = {
-                "critical": 0,
-                "high": 0,
-                "medium": 0,
-                "low": 0,
-                "info": 0,
-            }
-
-            port_count = 0
-            vuln_count = 0
-            dir_count = 0
-
-            for tool_result in tool_results:
-                tool_name = tool_result["tool"]
-                data = tool_result["data"]
-
-                if tool_name == "fscan":
-                    port_count += data.get("ports_found", 0)
-                elif tool_name == "nuclei":
-                    vuln_count += data.get("vulnerabilities_found", 0)
-                elif tool_name == "afrog":
-                    vuln_count += data.get("vulnerabilities_found", 0)
-                elif tool_name == "dddd":
-                    vuln_count += data.get("vulnerabilities_found", 0)
-                elif tool_name == "dirsearch":
-                    dir_count += data.get("directories_found", 0)
+            port_count = findings.get("fscan", 0)
+            vuln_count = sum(findings.get(tool, 0) for tool in ("nuclei", "afrog", "dddd"))
+            dir_count = findings.get("dirsearch", 0)
 
             return {
                 "task_id": task_id,
                 "task_name": task.name,
                 "task_status": task.status,
-                "tools_executed": [tr["tool"] for tr in tool_results],
-                "tools_count": len(tool_results),
+                "tools_executed": [tool for tool in sorted(runs) for _ in range(runs[tool])],
+                "tools_count": sum(runs.values()),
                 "total_ports": port_count,
                 "total_vulnerabilities": vuln_count,
                 "total_directories": dir_count,
                 "total_findings": port_count + vuln_count + dir_count,
-                "severity_distribution": severity_counts,
+                "severity_distribution": {
+                    severity: severities.get(severity, 0)
+                    for severity in ("critical", "high", "medium", "low", "info")
+                },
             }
 
         except Exception as e:
@@ -9,6 +9,7 @@ import pytest
 import asyncio
 import time
 import json
+import re
 from unittest.mock import patch, MagicMock
 import psutil
 import os
@@ -18,6 +19,10 @@ from app.models.asset import Asset
 from app.models.vulnerability import Vulnerability
 from app.services.tool_integration import ToolIntegration
 from app.services.tool_result_service import ToolResultService
+from app.services.fingerprint_service import (
+    CompiledFingerprintMatcher,
+    FingerprintService,
+)
 
 
 # ============================================================================
@@ -28,62 +33,89 @@ from app.services.tool_result_service import ToolResultService
 class TestLargeDatasetPerformance:
     """Test system performance with large datasets."""
 
+    @staticmethod
+    async def _time_ingestion(db_session, tool_name, result, bulk):
+        """Store a tool result through one ingestion path and time it."""
+        task = Task(
+            name=f"Ingestion benchmark ({'bulk' if bulk else 'single'})",
+            task_type="port_scan",
+            target_range=result["target"],
+            status="completed",
+            created_by=1,
+        )
+        db_session.add(task)
+        await db_session.commit()
+
+        start_time = time.perf_counter()
+        stats = await ToolResultService.process_and_store_result(
+            db_session, task.id, tool_name, result, bulk=bulk
+        )
+        return stats, time.perf_counter() - start_time
+
     @pytest.mark.asyncio
-    async def test_process_large_port_scan_result(self, db_session, test_task):
-        """Test processing port scan with 1000+ ports."""
-        # Create large port scan result
-        large_result = {
-            "tool": "fscan",
-            "target": "192.168.1.100",
-            "status": "success",
-            "ports_found": 1000,
-            "results": [
-                {
-                    "ip": "192.168.1.100",
-                    "port": 1000 + i,
-                    "service": f"service_{i}" if i % 100 == 0 else "unknown",
-                }
-                for i in range(1000)
-            ],
-        }
+    async def test_process_large_port_scan_result(self, db_session):
+        """Benchmark single-statement vs chunked ingestion of a port scan with 5000 ports."""
+        def large_result(host):
+            return {
+                "tool": "fscan",
+                "target": host,
+                "status": "success",
+                "ports_found": 5000,
+                "results": [
+                    {
+                        "ip": host,
+                        "port": 1000 + i,
+                        "service": f"service_{i}" if i % 100 == 0 else "unknown",
+                    }
+                    for i in range(5000)
+                ],
+            }
 
-        # Measure processing time
-        start_time = time.time()
-        await ToolResultService.process_and_store_result(
-            db_session, test_task.id, "fscan", large_result
+        single_stats, single_time = await self._time_ingestion(
+            db_session, "fscan", large_result("192.168.50.1"), bulk=False
+        )
+        bulk_stats, bulk_time = await self._time_ingestion(
+            db_session, "fscan", large_result("192.168.50.2"), bulk=True
         )
-        processing_time = time.time() - start_time
 
-        # Verify processing completed within acceptable time (< 5 seconds)
-        assert processing_time < 5.0
-        assert test_task.id is not None
+        print(f"\nfscan 5000 ports: single {single_time:.3f}s, bulk {bulk_time:.3f}s")
+
+        assert single_stats["findings"] == bulk_stats["findings"] == 5000
+        assert single_time < 30.0
+        assert bulk_time < 30.0
 
     @pytest.mark.asyncio
-    async def test_process_large_vulnerability_result(self, db_session, test_task):
-        """Test processing vulnerability scan with 500+ findings."""
-        large_vuln_result = {
-            "tool": "nuclei",
-            "target": "http://example.com",
-            "status": "success",
-            "vulnerabilities_found": 500,
-            "results": [
-                {
-                    "id": f"cve-{2020 + (i // 100)}-{5000 + i}",
-                    "name": f"Vulnerability {i}",
-                    "severity": ["critical", "high", "medium", "low"][i % 4],
-                    "matched_at": f"http://example.com/path/{i}",
-                }
-                for i in range(500)
-            ],
-        }
+    async def test_process_large_vulnerability_result(self, db_session):
+        """Benchmark single-statement vs chunked ingestion of a nuclei run with 5000 findings."""
+        def large_vuln_result(host):
+            return {
+                "tool": "nuclei",
+                "target": f"http://{host}",
+                "status": "success",
+                "vulnerabilities_found": 5000,
+                "results": [
+                    {
+                        "id": f"cve-{2020 + (i // 1000)}-{5000 + i}",
+                        "name": f"Vulnerability {i}",
+                        "severity": ["critical", "high", "medium", "low"][i % 4],
+                        "matched_at": f"http://{host}/path/{i}",
+                    }
+                    for i in range(5000)
+                ],
+            }
 
-        start_time = time.time()
-        await ToolResultService.process_and_store_result(
-            db_session, test_task.id, "nuclei", large_vuln_result
+        single_stats, single_time = await self._time_ingestion(
+            db_session, "nuclei", large_vuln_result("example-single.com"), bulk=False
+        )
+        bulk_stats, bulk_time = await self._time_ingestion(
+            db_session, "nuclei", large_vuln_result("example-bulk.com"), bulk=True
         )
-        processing_time = time.time() - start_time
 
-        assert processing_time < 5.0
+        print(f"\nnuclei 5000 findings: single {single_time:.3f}s, bulk {bulk_time:.3f}s")
+
+        assert single_stats["findings"] == bulk_stats["findings"] == 5000
+        assert single_time < 30.0
+        assert bulk_time < 30.0
 
     @pytest.mark.asyncio
     async def test_bulk_asset_creation_performance(self, db_session, test_user):
@@ -727,3 +759,77 @@ class TestEdgeCasePerformance:
 
         # Should handle long content reasonably
         assert processing_time < 3.0
+
+
+# ============================================================================
+# FINGERPRINT MATCHING PERFORMANCE TESTS
+# ============================================================================
+
+
+def _synthetic_fingerprints(products: int = 300) -> dict:
+    """Build a fingerprint database shaped like the production one."""
+    fingerprints = {
+        service_type: list(patterns)
+        for service_type, patterns in FingerprintService.FINGERPRINTS.items()
+    }
+    for i in range(products):
+        fingerprints[f"Product{i}"] = [
+            {
+                "pattern": rf"Product{i}/{major}\.[0-9]",
+                "cve": [f"CVE-2020-{10000 + i * 3 + major}"],
+                "severity": "medium",
+            }
+            for major in range(3)
+        ]
+    return fingerprints
+
+
+def _nested_loop_match(fingerprints: dict, banners: list) -> list:
+    """The original matching strategy: every regex against every banner."""
+    matches = []
+    for banner in banners:
+        for service_type, patterns in fingerprints.items():
+            for fingerprint in patterns:
+                if re.search(fingerprint["pattern"], banner, re.IGNORECASE):
+                    matches.append((banner, service_type, fingerprint["pattern"]))
+    return matches
+
+
+class TestFingerprintMatchingPerformance:
+    """Benchmark the compiled fingerprint matcher against the nested loop."""
+
+    def test_compiled_matcher_benchmark(self):
+        """Compare compiled prefiltered matching with the nested regex loop."""
+        fingerprints = _synthetic_fingerprints()
+        banners = [
+            "Apache/2.4.6 (CentOS)",
+            "SSH-2.0-OpenSSH_7.4",
+            "nginx/1.12.2",
+            "redis_version:3.2.12",
+        ] + [f"Product{i * 7}/1.{i % 10} ready" for i in range(36)]
+
+        start_time = time.perf_counter()
+        expected = _nested_loop_match(fingerprints, banners)
+        nested_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        matcher = CompiledFingerprintMatcher(fingerprints)
+        compile_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        actual = [
+            (banner, service_type, fingerprint["pattern"])
+            for banner in banners
+            for service_type, fingerprint in matcher.match(banner)
+        ]
+        compiled_time = time.perf_counter() - start_time
+
+        print(
+            f"\nfingerprint matching, {len(matcher)} patterns x {len(banners)} banners: "
+            f"nested loop {nested_time:.3f}s, compiled {compiled_time:.3f}s "
+            f"(+{compile_time:.3f}s one-off compile)"
+        )
+
+        # Identical results, and at least an order of magnitude faster
+        assert actual == expected
+        assert compiled_time * 10 < nested_time
@@ -22,7 +22,7 @@ class TestFscanExecutionIntegration:
     """Test FScan execution from tool call to result storage."""
 
     @pytest.mark.asyncio
-    @patch("subprocess.run")
+    @patch("app.services.process_runner.ProcessRunner.run", new_callable=AsyncMock)
     async def test_fscan_execute_and_store_workflow(
         self, mock_run, db_session, test_task
     ):
@@ -72,7 +72,7 @@ class TestFscanExecutionIntegration:
         assert storage_result.get("status") == "success"
 
     @pytest.mark.asyncio
-    @patch("subprocess.run")
+    @patch("app.services.process_runner.ProcessRunner.run", new_callable=AsyncMock)
     async def test_fscan_multiple_executions(self, mock_run, db_session, test_user):
         """Test multiple FScan executions on different targets."""
         targets = [
@@ -106,7 +106,7 @@ class TestNucleiExecutionIntegration:
     """Test Nuclei execution from tool call to result storage."""
 
     @pytest.mark.asyncio
-    @patch("subprocess.run")
+    @patch("app.services.process_runner.ProcessRunner.run", new_callable=AsyncMock)
     async def test_nuclei_execute_and_store_workflow(
         self, mock_run, db_session, test_task
     ):
@@ -152,7 +152,7 @@ class TestNucleiExecutionIntegration:
         assert storage_result.get("status") == "success"
 
     @pytest.mark.asyncio
-    @patch("subprocess.run")
+    @patch("app.services.process_runner.ProcessRunner.run", new_callable=AsyncMock)
     async def test_nuclei_with_templates(self, mock_run, db_session, test_task):
         """Test Nuclei execution with custom templates."""
         mock_run.return_value = MagicMock(
@@ -179,7 +179,7 @@ class TestDirsearchExecutionIntegration:
     """Test DirSearch execution and result storage."""
 
     @pytest.mark.asyncio
-    @patch("subprocess.run")
+    @patch("app.services.process_runner.ProcessRunner.run", new_callable=AsyncMock)
     async def test_dirsearch_execute_and_store_workflow(
         self, mock_run, db_session, test_task
     ):
@@ -303,7 +303,7 @@ class TestErrorRecoveryIntegration:
     """Test error handling and recovery in tool execution."""
 
     @pytest.mark.asyncio
-    @patch("subprocess.run")
+    @patch("app.services.process_runner.ProcessRunner.run", new_callable=AsyncMock)
     async def test_tool_timeout_recovery(
         self, mock_run, db_session, test_task
     ):
@@ -318,7 +318,7 @@ class TestErrorRecoveryIntegration:
             pass
 
     @pytest.mark.asyncio
-    @patch("subprocess.run")
+    @patch("app.services.process_runner.ProcessRunner.run", new_callable=AsyncMock)
     async def test_tool_not_installed_recovery(
         self, mock_run, db_session, test_task
     ):
@@ -333,7 +333,7 @@ class TestErrorRecoveryIntegration:
             pass
 
     @pytest.mark.asyncio
-    @patch("subprocess.run")
+    @patch("app.services.process_runner.ProcessRunner.run", new_callable=AsyncMock)
     async def test_partial_tool_chain_failure(
         self, mock_run, db_session, test_task
     ):
@@ -490,7 +490,7 @@ class TestConcurrentToolExecution:
     """Test concurrent tool execution."""
 
     @pytest.mark.asyncio
-    @patch("subprocess.run")
+    @patch("app.services.process_runner.ProcessRunner.run", new_callable=AsyncMock)
     async def test_concurrent_fscan_scans(self, mock_run, db_session, test_user):
         """Test concurrent FScan execution on multiple targets."""
         mock_run.return_value = MagicMock(
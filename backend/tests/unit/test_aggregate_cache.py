@@ -0,0 +1,264 @@
+"""
+Unit tests for the dashboard aggregate cache.
+
+Tests hits and misses, invalidation by scope version, filter and TTL keying,
+the shared Redis tier and the fallback when Redis is unreachable.
+"""
+
+import itertools
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.models.task import Task
+from app.services.aggregate_cache import AggregateCache
+from app.services.tool_result_service import ToolResultService
+
+_task_names = itertools.count(1)
+
+
+class FakeRedis:
+    """Minimal asyncio Redis stand-in holding keys in a dict."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value.encode()
+
+    async def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """Queue INCR commands and apply them on execute."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.keys = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def incr(self, key):
+        self.keys.append(key)
+
+    async def execute(self):
+        for key in self.keys:
+            self.redis.data[key] = str(int(self.redis.data.get(key, 0)) + 1).encode()
+
+
+@pytest.fixture(autouse=True)
+def local_cache(monkeypatch):
+    """Run against the in-process tier with an empty cache."""
+    monkeypatch.setattr(settings, "AGGREGATE_CACHE_REDIS", False)
+    monkeypatch.setattr(AggregateCache, "_redis_disabled_until", 0.0)
+    monkeypatch.setattr(AggregateCache, "_pending_bumps", set())
+    AggregateCache.clear()
+    yield
+    AggregateCache.clear()
+
+
+def _counter(value=None):
+    """Build a compute coroutine that records how often it runs."""
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return {"calls": len(calls)} if value is None else value
+
+    return compute, calls
+
+
+# ============================================================================
+# CACHING TESTS
+# ============================================================================
+
+
+class TestCaching:
+    """Test values are reused until invalidated."""
+
+    async def test_hit_after_miss(self):
+        """Test a second read is served from the cache."""
+        compute, calls = _counter()
+
+        assert await AggregateCache.get_or_compute("probe", ["vulnerabilities"], compute) == {"calls": 1}
+        assert await AggregateCache.get_or_compute("probe", ["vulnerabilities"], compute) == {"calls": 1}
+        assert len(calls) == 1
+
+    async def test_bump_invalidates_dependent_scopes_only(self):
+        """Test a write recomputes aggregates of its scope and keeps the others."""
+        vulns, vuln_calls = _counter()
+        nodes, node_calls = _counter()
+        await AggregateCache.get_or_compute("vulns", ["vulnerabilities"], vulns)
+        await AggregateCache.get_or_compute("nodes", ["nodes"], nodes)
+
+        await AggregateCache.bump("vulnerabilities")
+
+        assert await AggregateCache.get_or_compute("vulns", ["vulnerabilities"], vulns) == {"calls": 2}
+        assert await AggregateCache.get_or_compute("nodes", ["nodes"], nodes) == {"calls": 1}
+        assert (len(vuln_calls), len(node_calls)) == (2, 1)
+
+    async def test_keyed_by_filters(self):
+        """Test different filters are cached separately."""
+        compute, calls = _counter()
+
+        await AggregateCache.get_or_compute("probe", ["tasks"], compute, {"task_ids": [1, 2]})
+        await AggregateCache.get_or_compute("probe", ["tasks"], compute, {"task_ids": [3]})
+        await AggregateCache.get_or_compute("probe", ["tasks"], compute, {"task_ids": [1, 2]})
+
+        assert len(calls) == 2
+
+    async def test_ttl_expiry(self):
+        """Test an expired value is recomputed without a write."""
+        compute, calls = _counter()
+
+        await AggregateCache.get_or_compute("probe", ["tasks"], compute, ttl=0)
+        await AggregateCache.get_or_compute("probe", ["tasks"], compute, ttl=0)
+
+        assert len(calls) == 2
+
+    async def test_hits_and_misses_return_json_shape(self):
+        """Test a miss returns the same decoded value a hit would."""
+        compute, _ = _counter({None: 1, 5: 2, "tags": ("a", "b")})
+
+        first = await AggregateCache.get_or_compute("probe", ["pocs"], compute)
+        second = await AggregateCache.get_or_compute("probe", ["pocs"], compute)
+
+        assert first == second == {"null": 1, "5": 2, "tags": ["a", "b"]}
+        assert first is not second
+
+    async def test_disabled(self, monkeypatch):
+        """Test every read computes when the cache is off."""
+        monkeypatch.setattr(settings, "AGGREGATE_CACHE_ENABLED", False)
+        compute, calls = _counter()
+
+        await AggregateCache.get_or_compute("probe", ["nodes"], compute)
+        await AggregateCache.get_or_compute("probe", ["nodes"], compute)
+
+        assert len(calls) == 2
+
+    async def test_size_bounded(self, monkeypatch):
+        """Test the in-process tier drops the oldest entries over its size."""
+        monkeypatch.setattr(settings, "AGGREGATE_CACHE_SIZE", 2)
+        compute, _ = _counter()
+
+        for i in range(4):
+            await AggregateCache.get_or_compute(f"probe{i}", ["nodes"], compute)
+
+        assert len(AggregateCache._entries) == 2
+
+
+# ============================================================================
+# REDIS TIER TESTS
+# ============================================================================
+
+
+class TestRedisTier:
+    """Test sharing through Redis and the fallback without it."""
+
+    async def test_shared_between_processes(self, monkeypatch):
+        """Test values and version bumps made by another worker are seen."""
+        redis = FakeRedis()
+        monkeypatch.setattr(AggregateCache, "_client", staticmethod(lambda: redis))
+        compute, calls = _counter()
+
+        await AggregateCache.get_or_compute("probe", ["vulnerabilities"], compute)
+        AggregateCache.clear()  # A worker with a cold in-process tier
+        assert await AggregateCache.get_or_compute("probe", ["vulnerabilities"], compute) == {"calls": 1}
+
+        await AggregateCache.bump("vulnerabilities")
+        AggregateCache._versions.clear()  # The bump came from another worker
+        assert await AggregateCache.get_or_compute("probe", ["vulnerabilities"], compute) == {"calls": 2}
+        assert redis.data["catchcore:aggregate:version:vulnerabilities"] == b"1"
+
+    async def test_unreachable_redis_falls_back(self, monkeypatch):
+        """Test a dead Redis bypasses the shared tier and keeps caching locally."""
+        monkeypatch.setattr(settings, "AGGREGATE_CACHE_REDIS", True)
+        monkeypatch.setattr(settings, "REDIS_URL", "redis://127.0.0.1:1/0")
+        compute, calls = _counter()
+
+        await AggregateCache.get_or_compute("probe", ["nodes"], compute)
+        await AggregateCache.get_or_compute("probe", ["nodes"], compute)
+        await AggregateCache.bump("nodes")
+        await AggregateCache.get_or_compute("probe", ["nodes"], compute)
+
+        assert AggregateCache._redis_disabled_until > time.monotonic()
+        assert len(calls) == 2
+
+    async def test_redis_retried_after_cooldown(self, monkeypatch):
+        """Test Redis is used again after an error and receives bumps made meanwhile."""
+        monkeypatch.setattr(settings, "AGGREGATE_CACHE_REDIS", True)
+        monkeypatch.setattr(settings, "AGGREGATE_CACHE_REDIS_RETRY", 60)
+        redis = FakeRedis()
+        monkeypatch.setattr(
+            AggregateCache,
+            "_client",
+            staticmethod(lambda: None if time.monotonic() < AggregateCache._redis_disabled_until else redis),
+        )
+        AggregateCache._disable(ConnectionError("timeout"))
+
+        await AggregateCache.bump("vulnerabilities")  # Only bumped locally during the cooldown
+        assert "catchcore:aggregate:version:vulnerabilities" not in redis.data
+
+        monkeypatch.setattr(AggregateCache, "_redis_disabled_until", time.monotonic() - 1)
+        compute, calls = _counter()
+        await AggregateCache.get_or_compute("probe", ["vulnerabilities"], compute)
+
+        assert redis.data["catchcore:aggregate:version:vulnerabilities"] == b"1"
+        assert AggregateCache._pending_bumps == set()
+        assert len(calls) == 1
+
+
+# ============================================================================
+# WRITE INVALIDATION TESTS
+# ============================================================================
+
+
+class TestWriteInvalidation:
+    """Test writers bump the scopes they change."""
+
+    async def test_tool_results_bump_tasks_and_vulnerabilities(self, db_session):
+        """Test storing a tool result invalidates task and vulnerability aggregates."""
+        task = Task(
+            name=f"aggregate-task-{next(_task_names)}",
+            task_type="port_scan",
+            target_range="10.0.0.1",
+            created_by=1,
+        )
+        db_session.add(task)
+        await db_session.commit()
+
+        await ToolResultService.process_and_store_result(
+            db_session, task.id, "dirsearch", {"target": "http://10.0.0.1", "results": []}
+        )
+
+        assert AggregateCache._versions == {"tasks": 1, "vulnerabilities": 1}
+
+    async def test_node_load_changes_do_not_bump(self, db_session):
+        """Test task counts and usage leave the nodes summary cached, status changes don't."""
+        from app.models.node import Node
+        from app.services.node_service import NodeService
+
+        node = Node(name=f"aggregate-node-{next(_task_names)}", host="10.0.0.2", status="online")
+        db_session.add(node)
+        await db_session.commit()
+
+        assert await NodeService.increment_node_tasks(db_session, node.id)
+        assert await NodeService.decrement_node_tasks(db_session, node.id)
+        assert await NodeService.update_node_resources(db_session, node.id, 10.0, 20.0, 30.0)
+        assert AggregateCache._versions == {}
+
+        assert await NodeService.mark_node_offline(db_session, node.id)
+        assert await NodeService.mark_node_offline(db_session, node.id)
+        assert AggregateCache._versions == {"nodes": 1}
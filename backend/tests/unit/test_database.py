@@ -0,0 +1,140 @@
+"""
+Unit tests for schema upgrades.
+
+Tests that databases created by earlier versions gain later columns and
+indexes, and that the upgrade is safe to run repeatedly.
+"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, inspect, select
+from sqlalchemy.dialects import sqlite
+
+from app.core.database import Base, upgrade_schema
+from app.models.poc import content_hash
+from app.models.vulnerability import Vulnerability
+
+
+@pytest.fixture
+def legacy_engine():
+    """Create the current schema, then swap in older versions of upgraded tables."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP INDEX ix_pocs_content_hash")
+        conn.exec_driver_sql("ALTER TABLE pocs DROP COLUMN content_hash")
+        for index in (
+            "ix_assets_created_at_id",
+            "ix_tasks_created_at_id",
+            "ix_pocs_created_at_id",
+            "ix_vulnerabilities_discovered_at_id",
+        ):
+            conn.exec_driver_sql(f"DROP INDEX {index}")
+        conn.exec_driver_sql("DROP INDEX ix_assets_ip")
+        conn.exec_driver_sql("CREATE INDEX ix_assets_ip ON assets (ip)")
+        for column in ("last_seen", "dedup_key", "source"):
+            conn.exec_driver_sql(f"DROP INDEX ix_vulnerabilities_{column}")
+            conn.exec_driver_sql(f"ALTER TABLE vulnerabilities DROP COLUMN {column}")
+    yield engine
+    engine.dispose()
+
+
+def _upgrade(engine):
+    with engine.begin() as conn:
+        upgrade_schema(conn)
+
+
+def _indexes(engine, table):
+    return {index["name"]: bool(index["unique"]) for index in inspect(engine).get_indexes(table)}
+
+
+class TestUpgradeSchema:
+    """Test upgrading databases created before later schema changes."""
+
+    def test_poc_content_hash_backfilled_and_unique(self, legacy_engine):
+        """Test hashes are backfilled and later copies of the same content lose theirs."""
+        with legacy_engine.begin() as conn:
+            conn.exec_driver_sql(
+                "INSERT INTO pocs (id, name, poc_type, content, created_at, updated_at, is_active) VALUES "
+                + ", ".join(
+                    f"({poc_id}, '{content}', 'nuclei', '{content}', '2024-01-02', '2024-01-02', 1)"
+                    for poc_id, content in ((1, "id: a"), (2, "id: b"), (3, "id: a"))
+                )
+            )
+
+        _upgrade(legacy_engine)
+        _upgrade(legacy_engine)
+
+        with legacy_engine.connect() as conn:
+            rows = dict(conn.exec_driver_sql("SELECT id, content_hash FROM pocs").all())
+        assert rows == {1: content_hash("id: a"), 2: content_hash("id: b"), 3: None}
+        assert _indexes(legacy_engine, "pocs")["ix_pocs_content_hash"] is True
+
+    def test_vulnerability_dedup_columns_added(self, legacy_engine):
+        """Test findings gain last_seen, dedup_key and source, and dedup upserts work."""
+        discovered = datetime(2024, 1, 2, 3, 4, 5)
+        with legacy_engine.begin() as conn:
+            conn.exec_driver_sql(
+                "INSERT INTO vulnerabilities (asset_id, title, status, discovered_at, created_at, updated_at) "
+                "VALUES (1, 'old', 'open', '2024-01-02 03:04:05', '2024-01-02 03:04:05', '2024-01-02 03:04:05')"
+            )
+
+        _upgrade(legacy_engine)
+        _upgrade(legacy_engine)
+
+        indexes = _indexes(legacy_engine, "vulnerabilities")
+        assert indexes["ix_vulnerabilities_dedup_key"] is True
+        assert indexes["ix_vulnerabilities_last_seen"] is False
+        assert indexes["ix_vulnerabilities_source"] is False
+
+        row = {"asset_id": 1, "title": "new", "dedup_key": "k" * 64, "last_seen": discovered,
+               "discovered_at": discovered, "created_at": discovered, "updated_at": discovered}
+        stmt = sqlite.insert(Vulnerability)
+        stmt = stmt.on_conflict_do_update(index_elements=[Vulnerability.dedup_key], set_={"title": stmt.excluded.title})
+        with legacy_engine.begin() as conn:
+            conn.execute(stmt, row)
+            conn.execute(stmt, dict(row, title="again"))
+            rows = conn.execute(select(Vulnerability.title, Vulnerability.last_seen).order_by(Vulnerability.id)).all()
+        assert [tuple(r) for r in rows] == [("old", discovered), ("again", discovered)]
+
+    def test_duplicate_asset_ips_merged(self, legacy_engine):
+        """Test assets sharing an IP fold into the oldest before the IP becomes unique."""
+        stamp = "'2024-01-02 03:04:05'"
+        with legacy_engine.begin() as conn:
+            conn.exec_driver_sql(
+                f"INSERT INTO assets (id, ip, status, created_at, updated_at) VALUES "
+                f"(1, '10.9.0.1', 'active', {stamp}, {stamp}), (2, '10.9.0.2', 'active', {stamp}, {stamp}), "
+                f"(3, '10.9.0.1', 'active', {stamp}, {stamp})"
+            )
+            conn.exec_driver_sql(
+                f"INSERT INTO vulnerabilities (asset_id, title, status, discovered_at, created_at, updated_at) "
+                f"VALUES (3, 'on duplicate', 'open', {stamp}, {stamp}, {stamp})"
+            )
+            conn.exec_driver_sql("INSERT INTO project_assets (project_id, asset_id) VALUES (1, 1), (1, 3), (2, 3)")
+
+        _upgrade(legacy_engine)
+        _upgrade(legacy_engine)
+
+        with legacy_engine.connect() as conn:
+            assets = conn.exec_driver_sql("SELECT id, ip FROM assets ORDER BY id").all()
+            vulnerable = conn.exec_driver_sql("SELECT asset_id FROM vulnerabilities").scalars().all()
+            projects = conn.exec_driver_sql("SELECT project_id, asset_id FROM project_assets ORDER BY project_id").all()
+        assert [tuple(row) for row in assets] == [(1, "10.9.0.1"), (2, "10.9.0.2")]
+        assert vulnerable == [1]
+        assert [tuple(row) for row in projects] == [(1, 1), (2, 1)]
+        assert _indexes(legacy_engine, "assets")["ix_assets_ip"] is True
+
+    def test_keyset_indexes_created(self, legacy_engine):
+        """Test listing tables gain their (timestamp, id) pagination indexes."""
+        _upgrade(legacy_engine)
+        _upgrade(legacy_engine)
+
+        columns = {
+            table: {index["name"]: index["column_names"] for index in inspect(legacy_engine).get_indexes(table)}
+            for table in ("assets", "tasks", "pocs", "vulnerabilities")
+        }
+        assert columns["assets"]["ix_assets_created_at_id"] == ["created_at", "id"]
+        assert columns["tasks"]["ix_tasks_created_at_id"] == ["created_at", "id"]
+        assert columns["pocs"]["ix_pocs_created_at_id"] == ["created_at", "id"]
+        assert columns["vulnerabilities"]["ix_vulnerabilities_discovered_at_id"] == ["discovered_at", "id"]
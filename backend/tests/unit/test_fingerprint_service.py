@@ -0,0 +1,495 @@
+"""
+Unit tests for Fingerprint Service.
+
+Tests the compiled fingerprint matcher, literal prefiltering and batch matching.
+"""
+
+import re
+import time
+import pytest
+
+from app.services.fingerprint_service import (
+    BannerMatchCache,
+    CompiledFingerprintMatcher,
+    FingerprintService,
+)
+
+
+def nested_loop_match(fingerprints, banner):
+    """Reference implementation: every pattern against every banner."""
+    matches = []
+    for service_type, patterns in fingerprints.items():
+        for fingerprint in patterns:
+            pattern = fingerprint.get("pattern")
+            if not pattern:
+                continue
+            try:
+                if re.search(pattern, banner, re.IGNORECASE):
+                    matches.append((service_type, pattern))
+            except re.error:
+                continue
+    return matches
+
+
+@pytest.fixture(autouse=True)
+def reset_fingerprint_cache():
+    """Start every test with an empty fingerprint cache."""
+    FingerprintService.clear_cache()
+    yield
+    FingerprintService.clear_cache()
+
+
+# ============================================================================
+# LITERAL EXTRACTION TESTS
+# ============================================================================
+
+
+class TestLiteralExtraction:
+    """Test extraction of required literals from regex patterns."""
+
+    def test_escaped_dot_is_literal(self):
+        """Test escaped metacharacters are kept in the literal."""
+        assert CompiledFingerprintMatcher._extract_literal(r"Apache/2\.[024]") == "Apache/2."
+
+    def test_character_class_ends_run(self):
+        """Test character classes split literal runs."""
+        assert CompiledFingerprintMatcher._extract_literal(r"OpenSSH_7\.[0-5]") == "OpenSSH_7."
+
+    def test_longest_run_is_chosen(self):
+        """Test the longest run wins when there are several."""
+        literal = CompiledFingerprintMatcher._extract_literal(r"ab\d+redis_version:")
+        assert literal == "redis_version:"
+
+    def test_group_contents_are_skipped(self):
+        """Test group contents are never used as anchors."""
+        literal = CompiledFingerprintMatcher._extract_literal(r"redis_version:([0-3]\.)")
+        assert literal == "redis_version:"
+
+    def test_optional_character_is_dropped(self):
+        """Test an optional atom is not part of the literal."""
+        assert CompiledFingerprintMatcher._extract_literal(r"nginxx?/1") == "nginx"
+
+    def test_zero_minimum_repeat_is_dropped(self):
+        """Test {0,n} quantifiers make the atom optional."""
+        assert CompiledFingerprintMatcher._extract_literal(r"Tomcatt{0,2}/7") == "Tomcat"
+
+    def test_top_level_alternation_has_no_literal(self):
+        """Test alternation disables the prefilter."""
+        assert CompiledFingerprintMatcher._extract_literal(r"Apache/2|nginx/1") == ""
+
+    def test_alternation_inside_group_keeps_outer_literal(self):
+        """Test alternation inside a group does not disable the prefilter."""
+        literal = CompiledFingerprintMatcher._extract_literal(r"Server: (Apache|nginx)")
+        assert literal == "Server: "
+
+    def test_verbose_flag_has_no_literal(self):
+        """Test verbose-mode patterns are never anchored."""
+        assert CompiledFingerprintMatcher._extract_literal(r"(?x) Apache / 2") == ""
+
+    def test_hex_escape_is_not_literal(self):
+        """Test escape digits are not read as literal text."""
+        assert CompiledFingerprintMatcher._extract_literal(r"\x41bcdef") == "bcdef"
+
+
+# ============================================================================
+# COMPILED MATCHER TESTS
+# ============================================================================
+
+
+class TestCompiledMatcher:
+    """Test the compiled fingerprint matcher."""
+
+    def test_matches_builtin_database(self):
+        """Test built-in fingerprints match known banners."""
+        matcher = CompiledFingerprintMatcher(FingerprintService.FINGERPRINTS)
+
+        matches = matcher.match("SSH-2.0-OpenSSH_7.4")
+
+        assert [service_type for service_type, _ in matches] == ["OpenSSH"]
+
+    def test_case_insensitive_matching(self):
+        """Test matching ignores case like the original patterns."""
+        matcher = CompiledFingerprintMatcher(FingerprintService.FINGERPRINTS)
+
+        assert matcher.match("NGINX/1.12.2")
+
+    def test_invalid_pattern_is_skipped(self):
+        """Test invalid regexes are dropped at compile time."""
+        matcher = CompiledFingerprintMatcher(
+            {"Broken": [{"pattern": r"Apache/(2"}], "Apache": [{"pattern": r"Apache/2"}]}
+        )
+
+        assert len(matcher) == 1
+        assert matcher.match("Apache/2.4")[0][0] == "Apache"
+
+    def test_unanchored_patterns_always_run(self):
+        """Test patterns without a literal are still evaluated."""
+        matcher = CompiledFingerprintMatcher({"Any": [{"pattern": r"\d+\.\d+"}]})
+
+        assert matcher.match("version 1.2")
+
+    @pytest.mark.parametrize(
+        "banner",
+        [
+            "Apache/2.4.6 (CentOS)",
+            "Apache/2.0.52",
+            "SSH-2.0-OpenSSH_6.6.1p1",
+            "nginx/1.14.0",
+            "5.5.62-MySQL 5.5 Community",
+            "PostgreSQL 9.6.24",
+            "redis_version:3.2.12",
+            "Apache Tomcat/7.0.109",
+            "Microsoft-IIS/7.5",
+            "unknown service",
+            "Apache/2.4 \u212a",  # Kelvin sign
+        ],
+    )
+    def test_same_results_as_nested_loop(self, banner):
+        """Test the prefilter never changes match results."""
+        fingerprints = FingerprintService.FINGERPRINTS
+        matcher = CompiledFingerprintMatcher(fingerprints)
+
+        compiled = [
+            (service_type, fingerprint["pattern"])
+            for service_type, fingerprint in matcher.match(banner)
+        ]
+
+        assert compiled == nested_loop_match(fingerprints, banner)
+
+
+# ============================================================================
+# SERVICE MATCHING TESTS
+# ============================================================================
+
+
+class TestFingerprintMatching:
+    """Test FingerprintService matching entry points."""
+
+    def test_match_fingerprints(self):
+        """Test single-service matching returns CVE data."""
+        matches = FingerprintService.match_fingerprints(
+            1, {"service": "redis", "banner": "redis_version:3.0.7"}
+        )
+
+        assert len(matches) == 1
+        assert matches[0]["cve"] == ["CVE-2016-8339"]
+        assert matches[0]["asset_id"] == 1
+
+    def test_match_fingerprints_batch(self):
+        """Test batch matching keeps service order and metadata."""
+        services = [
+            {"ip": "10.0.0.1", "port": 80, "service": "http", "banner": "Apache/2.0.52"},
+            {"ip": "10.0.0.2", "port": 22, "service": "ssh", "version": "OpenSSH_6.6"},
+            {"ip": "10.0.0.3", "port": 8080, "service": "http"},
+        ]
+
+        matches = FingerprintService.match_fingerprints_batch(services)
+
+        assert [(m["ip"], m["service_type"]) for m in matches] == [
+            ("10.0.0.1", "Apache"),
+            ("10.0.0.1", "Apache"),
+            ("10.0.0.2", "OpenSSH"),
+        ]
+
+    def test_matcher_is_compiled_once(self):
+        """Test the matcher is reused between calls."""
+        first = FingerprintService.get_matcher()
+
+        assert FingerprintService.get_matcher() is first
+
+        FingerprintService.clear_cache()
+        assert FingerprintService.get_matcher() is not first
+
+
+# ============================================================================
+# DATABASE LOADING TESTS
+# ============================================================================
+
+
+@pytest.fixture
+def fingerprint_session():
+    """Sync in-memory session with the fingerprints table."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.models.fingerprint import Fingerprint
+
+    engine = create_engine("sqlite://")
+    Fingerprint.__table__.create(engine)
+    session = sessionmaker(engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+class TestDatabaseLoading:
+    """Test loading fingerprints from the fingerprints table."""
+
+    def _add(self, session, **fields):
+        from app.models.fingerprint import Fingerprint
+
+        fingerprint = Fingerprint(fingerprint_type="application", **fields)
+        session.add(fingerprint)
+        session.commit()
+        return fingerprint
+
+    def test_empty_table_uses_builtin(self, fingerprint_session):
+        """Test an empty table falls back to built-in fingerprints."""
+        FingerprintService.sync_with_database(fingerprint_session)
+
+        assert FingerprintService.load_fingerprints() is FingerprintService.FINGERPRINTS
+        assert FingerprintService.get_statistics()["source"] == "builtin"
+
+    def test_loads_rows_from_table(self, fingerprint_session):
+        """Test rows are grouped by product and CVEs parsed from description."""
+        self._add(
+            fingerprint_session,
+            name="gitea",
+            product="Gitea",
+            regex=r"Gitea/1\.1[0-5]",
+            description="Affected by CVE-2020-14144",
+        )
+        self._add(fingerprint_session, name="Caddy", pattern="Caddy (v2")
+
+        matcher = FingerprintService.sync_with_database(fingerprint_session)
+
+        assert [s for s, _ in matcher.match("Gitea/1.12 Caddy (v2.1)")] == ["Gitea", "Caddy"]
+        gitea = FingerprintService.load_fingerprints()["Gitea"][0]
+        assert gitea["cve"] == ["CVE-2020-14144"]
+        assert FingerprintService.get_statistics()["source"] == "database"
+
+    def test_unchanged_table_keeps_matcher(self, fingerprint_session):
+        """Test the matcher is not rebuilt while the version is unchanged."""
+        self._add(fingerprint_session, name="Gitea", regex=r"Gitea/1")
+
+        first = FingerprintService.sync_with_database(fingerprint_session)
+
+        assert FingerprintService.sync_with_database(fingerprint_session, force=True) is first
+
+    def test_changed_table_rebuilds_matcher(self, fingerprint_session):
+        """Test adding a row invalidates the compiled matcher."""
+        self._add(fingerprint_session, name="Gitea", regex=r"Gitea/1")
+        first = FingerprintService.sync_with_database(fingerprint_session)
+
+        self._add(fingerprint_session, name="Gogs", regex=r"Gogs/0")
+        second = FingerprintService.sync_with_database(fingerprint_session, force=True)
+
+        assert second is not first
+        assert second.match("Gogs/0.11")
+
+    def test_version_check_is_throttled(self, fingerprint_session):
+        """Test the table is not queried again within the check interval."""
+        self._add(fingerprint_session, name="Gitea", regex=r"Gitea/1")
+        first = FingerprintService.sync_with_database(fingerprint_session)
+
+        self._add(fingerprint_session, name="Gogs", regex=r"Gogs/0")
+
+        assert FingerprintService.sync_with_database(fingerprint_session) is first
+
+
+# ============================================================================
+# PARALLEL MATCHING TESTS
+# ============================================================================
+
+
+class TestParallelMatching:
+    """Test process pool batch matching."""
+
+    @pytest.fixture
+    def services(self):
+        banners = [
+            "Apache/2.0.52",
+            "SSH-2.0-OpenSSH_6.6.1p1",
+            "nginx/1.12.2",
+            "redis_version:3.0.7",
+            "unknown service",
+        ]
+        return [
+            {"ip": f"10.0.{i // 256}.{i % 256}", "port": 80, "service": "http", "banner": banner}
+            for i, banner in enumerate(banners * 20)
+        ]
+
+    def test_parallel_matches_serial(self, services, monkeypatch):
+        """Test parallel matching returns the same results in the same order."""
+        from app.core.config import settings
+
+        monkeypatch.setattr(settings, "FINGERPRINT_CHUNK_SIZE", 7)
+
+        serial = FingerprintService.match_fingerprints_batch(services, parallel=False)
+        parallel = FingerprintService.match_fingerprints_batch(services, parallel=True, workers=2)
+
+        assert parallel == serial
+        assert len(serial) > 0
+
+    def test_small_batch_stays_serial(self, services, monkeypatch):
+        """Test batches below the threshold never start a pool."""
+        called = []
+        monkeypatch.setattr(
+            FingerprintService,
+            "_match_services_parallel",
+            staticmethod(lambda *args: called.append(args)),
+        )
+
+        FingerprintService.match_fingerprints_batch(services)
+
+        assert called == []
+
+    def test_daemonic_process_matches_in_billiard_pool(self, services, monkeypatch):
+        """Test daemonic workers (Celery prefork children) still match in parallel."""
+        import multiprocessing
+        import billiard
+        from billiard import Pool
+        from app.core.config import settings
+        from app.services import fingerprint_service
+
+        monkeypatch.setattr(settings, "FINGERPRINT_CHUNK_SIZE", 1)
+        serial = FingerprintService.match_fingerprints_batch(services, parallel=False)
+        FingerprintService.get_match_cache().clear()
+        pools = []
+        monkeypatch.setattr(billiard, "Pool", lambda *args, **kwargs: pools.append(args) or Pool(*args, **kwargs))
+
+        def no_executor(*args, **kwargs):
+            raise AssertionError("daemonic processes cannot use ProcessPoolExecutor")
+
+        monkeypatch.setattr(fingerprint_service, "ProcessPoolExecutor", no_executor)
+        monkeypatch.setattr(multiprocessing.current_process(), "daemon", True, raising=False)
+
+        parallel = FingerprintService._match_services_parallel(services, workers=2)
+
+        assert parallel == serial
+        assert pools == [(2,)]
+
+
+# ============================================================================
+# MATCH CACHE TESTS
+# ============================================================================
+
+
+class FakeRedis:
+    """Minimal dict-backed stand-in for the Redis client."""
+
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, ex=None):
+        self.store[key] = value.encode()
+
+
+class TestMatchCache:
+    """Test banner match memoization."""
+
+    def test_lru_evicts_oldest(self):
+        """Test the in-process tier is bounded."""
+        cache = BannerMatchCache(maxsize=2)
+
+        cache.put("ns", "a", [1])
+        cache.put("ns", "b", [2])
+        cache.get("ns", "a")
+        cache.put("ns", "c", [3])
+
+        assert cache.get("ns", "a") == [1]
+        assert cache.get("ns", "b") is None
+        assert len(cache) == 2
+
+    def test_ascii_banners_are_case_normalized(self):
+        """Test banners differing only in ASCII case share an entry."""
+        cache = BannerMatchCache(maxsize=10)
+
+        cache.put("ns", "NGINX/1.18.0", [4])
+
+        assert cache.get("ns", "nginx/1.18.0") == [4]
+        assert cache.get("other", "nginx/1.18.0") is None
+
+    def test_repeated_banners_hit_cache(self):
+        """Test repeated banners are counted as hits in statistics."""
+        for _ in range(3):
+            FingerprintService.match_fingerprints(1, {"service": "ssh", "banner": "OpenSSH_7.4"})
+
+        stats = FingerprintService.get_statistics()["match_cache"]
+        assert stats["hits"] == 2
+        assert stats["misses"] == 1
+
+    def test_cached_results_match_uncached(self):
+        """Test memoized results are identical to fresh matches."""
+        services = [{"ip": "10.0.0.1", "port": 80, "banner": "Apache/2.0.52"}] * 3
+
+        first = FingerprintService.match_fingerprints_batch(services, parallel=False)
+        second = FingerprintService.match_fingerprints_batch(services, parallel=False)
+
+        assert first == second
+        assert len(first) == 6
+
+    def test_version_change_invalidates_cache(self, fingerprint_session):
+        """Test a fingerprint table change drops memoized results."""
+        from app.models.fingerprint import Fingerprint
+
+        fingerprint_session.add(Fingerprint(name="Gitea", fingerprint_type="application", regex=r"Gitea/1"))
+        fingerprint_session.commit()
+        FingerprintService.sync_with_database(fingerprint_session)
+        FingerprintService.match_fingerprints(1, {"banner": "Gitea/1.12"})
+        assert len(FingerprintService.get_match_cache()) == 1
+
+        fingerprint_session.add(Fingerprint(name="Gogs", fingerprint_type="application", regex=r"Gitea/1\.12"))
+        fingerprint_session.commit()
+        FingerprintService.sync_with_database(fingerprint_session, force=True)
+
+        assert len(FingerprintService.get_match_cache()) == 0
+        matches = FingerprintService.match_fingerprints(1, {"banner": "Gitea/1.12"})
+        assert [m["service_type"] for m in matches] == ["Gitea", "Gogs"]
+
+    def test_redis_tier_shares_results(self):
+        """Test a result stored by one process is found by another."""
+        redis = FakeRedis()
+        writer = BannerMatchCache(maxsize=10)
+        reader = BannerMatchCache(maxsize=10)
+        writer._redis = redis
+        reader._redis = redis
+
+        writer.put("ns", "OpenSSH_7.4", [7])
+
+        assert reader.get("ns", "OpenSSH_7.4") == [7]
+        assert reader.get_statistics()["redis_hits"] == 1
+
+    def test_redis_errors_disable_tier(self):
+        """Test Redis failures fall back to the in-process tier."""
+
+        class BrokenRedis:
+            def get(self, key):
+                raise ConnectionError("refused")
+
+        cache = BannerMatchCache(maxsize=10)
+        cache._redis = BrokenRedis()
+
+        assert cache.get("ns", "nginx") is None
+        assert cache.get_statistics()["redis_enabled"] is False
+
+    def test_redis_retried_after_cooldown(self, monkeypatch):
+        """Test the shared tier is bypassed after an error and used again once the cooldown ends."""
+        redis = FakeRedis()
+        calls = []
+
+        class FlakyRedis:
+            def get(self, key):
+                calls.append(key)
+                if len(calls) == 1:
+                    raise ConnectionError("timeout")
+                return redis.get(key)
+
+            def set(self, key, value, ex=None):
+                redis.set(key, value, ex)
+
+        cache = BannerMatchCache(maxsize=0, retry=60)
+        cache._redis = FlakyRedis()
+
+        assert cache.get("ns", "nginx") is None
+        cache.put("ns", "nginx", [3])  # Not shared during the cooldown
+        assert cache.get("ns", "nginx") is None
+        assert len(calls) == 1 and redis.store == {}
+
+        monkeypatch.setattr(cache, "_redis_disabled_until", time.monotonic() - 1)
+        cache.put("ns", "nginx", [3])
+
+        assert cache.get("ns", "nginx") == [3]
+        assert cache.get_statistics()["redis_enabled"] is True
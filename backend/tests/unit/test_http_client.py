@@ -0,0 +1,185 @@
+"""
+Unit tests for the pooled HTTP client.
+
+Tests HTTP POCs against a local stand-in server: connection reuse, limits,
+body handling and throughput.
+"""
+
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+
+from app.core.config import settings
+from app.services.http_client import HttpClient
+from app.services.poc_service import POCService
+
+
+@pytest.fixture
+async def http_server():
+    """Serve a small app on localhost and record the connections it sees."""
+    state = {"connections": set(), "requests": 0, "active": 0, "peak": 0}
+
+    async def handler(request):
+        state["connections"].add(request.transport.get_extra_info("peername"))
+        state["requests"] += 1
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        try:
+            if request.path == "/slow":
+                await asyncio.sleep(1)
+            if request.path == "/big":
+                return web.Response(body=b"x" * 100_000)
+            if request.path == "/missing":
+                return web.Response(status=404, text="nope")
+            body = await request.text()
+            return web.Response(text=f"ok {request.method} {request.headers.get('X-Probe', '')} {body}")
+        finally:
+            state["active"] -= 1
+
+    app = web.Application()
+    app.router.add_route("*", "/{tail:.*}", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    state["port"] = site._server.sockets[0].getsockname()[1]
+
+    yield state
+
+    await HttpClient.close()
+    await runner.cleanup()
+
+
+# ============================================================================
+# CONNECTION POOLING TESTS
+# ============================================================================
+
+
+class TestConnectionPooling:
+    """Test connections are shared and bounded."""
+
+    async def test_keep_alive_reuses_connection(self, http_server):
+        """Test sequential requests to one host share one connection."""
+        for _ in range(20):
+            status, _ = await HttpClient.request("GET", f"http://127.0.0.1:{http_server['port']}/")
+            assert status == 200
+
+        assert http_server["requests"] == 20
+        assert len(http_server["connections"]) == 1
+
+    async def test_per_host_limit(self, http_server, monkeypatch):
+        """Test concurrent requests never open more than the per-host limit."""
+        await HttpClient.close()
+        monkeypatch.setattr(settings, "HTTP_CLIENT_POOL_PER_HOST", 4)
+        url = f"http://127.0.0.1:{http_server['port']}/"
+
+        await asyncio.gather(*(HttpClient.request("GET", url) for _ in range(100)))
+
+        assert http_server["requests"] == 100
+        assert len(http_server["connections"]) <= 4
+        assert http_server["peak"] <= 4
+
+    async def test_session_shared_within_loop(self, http_server):
+        """Test one session serves every caller until closed."""
+        session = HttpClient.get_session()
+
+        assert HttpClient.get_session() is session
+
+        await HttpClient.close()
+        assert session.closed
+        assert HttpClient.get_session() is not session
+
+    def test_session_per_loop_released_when_loop_closes(self):
+        """Test each event loop gets its own session and a closed loop's is released."""
+
+        async def open_session():
+            return HttpClient.get_session()
+
+        first = asyncio.run(open_session())
+        second = asyncio.run(open_session())
+
+        assert second is not first
+        assert first.closed
+        assert first not in HttpClient._sessions.values()
+
+        asyncio.run(HttpClient.close())
+        assert HttpClient._sessions == {}
+
+
+# ============================================================================
+# RESPONSE HANDLING TESTS
+# ============================================================================
+
+
+class TestResponses:
+    """Test response bodies, timeouts and errors."""
+
+    async def test_large_body_truncated_and_pool_usable(self, http_server):
+        """Test only max_body bytes are read and later requests still work."""
+        url = f"http://127.0.0.1:{http_server['port']}"
+
+        status, text = await HttpClient.request("GET", f"{url}/big", max_body=1000)
+        assert status == 200
+        assert text == "x" * 1000
+
+        status, text = await HttpClient.request("GET", f"{url}/after")
+        assert (status, text) == (200, "ok GET  ")
+
+    async def test_timeout(self, http_server):
+        """Test slow responses raise a timeout."""
+        with pytest.raises(asyncio.TimeoutError):
+            await HttpClient.request("GET", f"http://127.0.0.1:{http_server['port']}/slow", timeout=0.2)
+
+
+# ============================================================================
+# HTTP POC TESTS
+# ============================================================================
+
+
+class TestHttpPoc:
+    """Test HTTP POCs run through the shared client."""
+
+    async def test_headers_body_and_indicator(self, http_server):
+        """Test parsed headers and body are sent and indicators matched."""
+        content = 'POST /check HTTP/1.1\nX-Probe: yes\n{"a":1}'
+
+        result = await POCService.execute_poc(
+            "127.0.0.1", http_server["port"], content, "http", {"success_indicator": "OK POST YES"}
+        )
+
+        assert result["error"] is None
+        assert result["vulnerable"] is True
+        assert result["output"] == 'Status: 200\nok POST yes {"a":1}'
+
+    async def test_error_status_not_vulnerable(self, http_server):
+        """Test 4xx responses are reported as not vulnerable."""
+        result = await POCService.execute_poc("127.0.0.1", http_server["port"], "GET /missing", "http")
+
+        assert result["vulnerable"] is False
+        assert result["output"].startswith("Status: 404")
+
+    async def test_timeout_reported(self, http_server):
+        """Test a timed-out POC carries an error message."""
+        result = await POCService.execute_poc(
+            "127.0.0.1", http_server["port"], "GET /slow", "http", {"timeout": 0.2}
+        )
+
+        assert result["vulnerable"] is False
+        assert "timeout" in result["error"]
+
+    async def test_throughput(self, http_server):
+        """Test hundreds of HTTP POCs per second over pooled connections."""
+        count = 500
+
+        started = time.monotonic()
+        results = await asyncio.gather(*(
+            POCService.execute_poc("127.0.0.1", http_server["port"], f"GET /p{i}", "http")
+            for i in range(count)
+        ))
+        elapsed = time.monotonic() - started
+
+        assert all(result["vulnerable"] for result in results)
+        assert count / elapsed > 200
+        assert len(http_server["connections"]) <= settings.HTTP_CLIENT_POOL_PER_HOST
@@ -0,0 +1,225 @@
+"""
+Unit tests for list pagination.
+
+Tests keyset cursors against offset pages, cursor encoding and the exact,
+estimated and skipped count modes.
+"""
+
+import itertools
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.models.asset import Asset
+from app.models.task import Task
+from app.models.vulnerability import Vulnerability
+from app.services.pagination import Paginator
+from app.services.search_service import SearchService
+
+_asset_ips = itertools.count(1)
+
+
+@pytest.fixture
+async def vulnerabilities(db_session):
+    """Create 25 vulnerabilities on one asset, several sharing a timestamp."""
+    asset = Asset(ip=f"10.210.0.{next(_asset_ips)}", status="active")
+    db_session.add(asset)
+    await db_session.flush()
+
+    base = datetime(2024, 1, 1)
+    vulns = [
+        Vulnerability(
+            asset_id=asset.id,
+            title=f"Finding {i}",
+            severity="high",
+            status="open",
+            # Groups of three share a timestamp to exercise the id tie-breaker
+            discovered_at=base + timedelta(minutes=i // 3),
+        )
+        for i in range(25)
+    ]
+    db_session.add_all(vulns)
+    await db_session.commit()
+    return asset, vulns
+
+
+@pytest.fixture(autouse=True)
+def clear_counts():
+    """Start each test with an empty count cache."""
+    Paginator.clear_counts()
+    yield
+    Paginator.clear_counts()
+
+
+# ============================================================================
+# CURSOR TESTS
+# ============================================================================
+
+
+class TestCursor:
+    """Test cursor encoding."""
+
+    def test_round_trip(self):
+        """Test a cursor decodes to the values it was built from."""
+        value = datetime(2024, 5, 6, 7, 8, 9, 123456)
+
+        cursor = Paginator.encode_cursor(value, 42)
+
+        assert "=" not in cursor
+        assert Paginator.decode_cursor(cursor) == (value, 42)
+
+    @pytest.mark.parametrize("cursor", ["", "not-a-cursor", "WyJ4IiwxXQ", "WyIyMDI0LTAxLTAxIiwieCJd"])
+    def test_invalid_cursor(self, cursor):
+        """Test malformed cursors raise ValueError."""
+        with pytest.raises(ValueError):
+            Paginator.decode_cursor(cursor)
+
+    def test_next_cursor_only_for_full_pages(self):
+        """Test a short page has no next cursor."""
+        row = Vulnerability(id=7, title="x", discovered_at=datetime(2024, 1, 1))
+
+        assert Paginator.next_cursor([row], 1, "discovered_at") == Paginator.encode_cursor(row.discovered_at, 7)
+        assert Paginator.next_cursor([row], 2, "discovered_at") is None
+        assert Paginator.next_cursor([], 2, "discovered_at") is None
+
+
+# ============================================================================
+# KEYSET PAGINATION TESTS
+# ============================================================================
+
+
+class TestKeysetPagination:
+    """Test cursor pages match offset pages."""
+
+    async def test_cursor_walk_matches_offset(self, db_session, vulnerabilities):
+        """Test walking by cursor visits the same rows as page numbers, in order."""
+        asset, vulns = vulnerabilities
+        filters = {"asset_id": asset.id}
+
+        offset_ids = []
+        for page in range(1, 5):
+            items, total = await SearchService.search_vulnerabilities(
+                db_session, filters=filters, page=page, page_size=7
+            )
+            offset_ids.extend(v.id for v in items)
+
+        cursor_ids = []
+        cursor = None
+        while True:
+            items, _ = await SearchService.search_vulnerabilities(
+                db_session, filters=filters, page_size=7, cursor=cursor, count="none"
+            )
+            cursor_ids.extend(v.id for v in items)
+            cursor = Paginator.next_cursor(items, 7, "discovered_at")
+            if cursor is None:
+                break
+
+        expected = [v.id for v in sorted(vulns, key=lambda v: (v.discovered_at, v.id), reverse=True)]
+        assert total == 25
+        assert offset_ids == expected
+        assert cursor_ids == expected
+
+    async def test_cursor_ignores_page(self, db_session, vulnerabilities):
+        """Test a cursor takes precedence over the page number."""
+        asset, vulns = vulnerabilities
+        query = select(Vulnerability).where(Vulnerability.asset_id == asset.id)
+        first, _ = await Paginator.paginate(db_session, query, Vulnerability.discovered_at, Vulnerability.id, 1, 5)
+
+        cursor = Paginator.next_cursor(first, 5, "discovered_at")
+        second, _ = await Paginator.paginate(
+            db_session, query, Vulnerability.discovered_at, Vulnerability.id, 4, 5, cursor
+        )
+        offset_second, _ = await Paginator.paginate(
+            db_session, query, Vulnerability.discovered_at, Vulnerability.id, 2, 5
+        )
+
+        assert [v.id for v in second] == [v.id for v in offset_second]
+
+    async def test_created_at_ordering(self, db_session):
+        """Test tasks page on (created_at, id)."""
+        base = datetime(2024, 2, 1)
+        tasks = [
+            Task(
+                name="keyset-task",
+                task_type="port_scan",
+                target_range="10.0.0.1",
+                created_by=1,
+                created_at=base + timedelta(hours=i % 2),
+            )
+            for i in range(4)
+        ]
+        db_session.add_all(tasks)
+        await db_session.commit()
+
+        items, total = await SearchService.search_tasks(db_session, query="name=keyset-task", page_size=3)
+        rest, _ = await SearchService.search_tasks(
+            db_session,
+            query="name=keyset-task",
+            page_size=3,
+            cursor=Paginator.next_cursor(items, 3, "created_at"),
+        )
+
+        expected = [t.id for t in sorted(tasks, key=lambda t: (t.created_at, t.id), reverse=True)]
+        assert total == 4
+        assert [t.id for t in items + rest] == expected
+
+
+# ============================================================================
+# COUNT MODE TESTS
+# ============================================================================
+
+
+class TestCountModes:
+    """Test exact, estimated and skipped counts."""
+
+    async def test_none_skips_count(self, db_session, vulnerabilities):
+        """Test no total is computed in none mode."""
+        asset, _ = vulnerabilities
+
+        items, total = await SearchService.search_vulnerabilities(
+            db_session, filters={"asset_id": asset.id}, page_size=5, count="none"
+        )
+
+        assert total is None
+        assert len(items) == 5
+
+    async def test_estimate_cached_off_postgres(self, db_session, vulnerabilities):
+        """Test estimate mode reuses a cached count until it expires."""
+        asset, _ = vulnerabilities
+        query = select(Vulnerability).where(Vulnerability.asset_id == asset.id)
+
+        assert await Paginator.count(db_session, query, "estimate") == 25
+
+        db_session.add(Vulnerability(asset_id=asset.id, title="Late finding"))
+        await db_session.commit()
+
+        assert await Paginator.count(db_session, query, "estimate") == 25
+        assert await Paginator.count(db_session, query, "exact") == 26
+
+        Paginator.clear_counts()
+        assert await Paginator.count(db_session, query, "estimate") == 26
+
+    async def test_cache_keyed_by_filters(self, db_session, vulnerabilities):
+        """Test differently filtered queries get their own cached counts."""
+        asset, _ = vulnerabilities
+        query = select(Vulnerability).where(Vulnerability.asset_id == asset.id)
+
+        assert await Paginator.count(db_session, query, "estimate") == 25
+        assert await Paginator.count(db_session, query.where(Vulnerability.title == "Finding 3"), "estimate") == 1
+
+    async def test_cache_size_bounded(self, db_session, vulnerabilities, monkeypatch):
+        """Test the count cache drops the oldest entries over its size."""
+        monkeypatch.setattr(settings, "PAGINATION_COUNT_CACHE_SIZE", 2)
+        query = select(Vulnerability)
+
+        for i in range(4):
+            await Paginator.count(db_session, query.where(Vulnerability.title == f"Finding {i}"), "estimate")
+
+        assert len(Paginator._counts) == 2
+
+    async def test_unknown_mode(self, db_session):
+        """Test unknown count modes are rejected."""
+        with pytest.raises(ValueError):
+            await Paginator.count(db_session, select(Vulnerability), "approximate")
@@ -0,0 +1,225 @@
+"""
+Unit tests for the POC template cache.
+
+Tests parse memoization, template materialization, LRU eviction by size and
+invalidation.
+"""
+
+import os
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.services import poc_cache
+from app.services.poc_cache import POCCache
+from app.services.poc_service import POCService
+
+
+TEMPLATE = """
+id: test-template
+info:
+  name: Test
+  severity: high
+  description: A test template
+  reference:
+    - https://nvd.nist.gov/vuln/detail/CVE-2023-1111
+requests:
+  - method: GET
+    path: ["{{BaseURL}}/CVE-2023-2222"]
+"""
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Point the cache at an empty directory for each test."""
+    directory = tmp_path / "poc_cache"
+    monkeypatch.setattr(settings, "POC_CACHE_DIR", str(directory))
+    POCCache.clear()
+    yield directory
+    POCCache.clear()
+
+
+def _age(*paths):
+    """Make templates look last used long enough ago to be deletable."""
+    used = time.time() - 2 * settings.POC_CACHE_MIN_IDLE
+    for path in paths:
+        os.utime(path, (used, os.stat(path).st_mtime))
+
+
+@pytest.fixture
+def count_parses(monkeypatch):
+    """Count YAML parses performed by the cache."""
+    calls = []
+    real = poc_cache.yaml.safe_load
+
+    def safe_load(content):
+        calls.append(content)
+        return real(content)
+
+    monkeypatch.setattr(poc_cache.yaml, "safe_load", safe_load)
+    return calls
+
+
+# ============================================================================
+# PARSE CACHE TESTS
+# ============================================================================
+
+
+class TestParseCache:
+    """Test parsed metadata is reused across calls."""
+
+    def test_metadata_parsed_once(self, count_parses):
+        """Test validation, metadata and template id share one parse."""
+        assert POCService.validate_poc_content(TEMPLATE, "nuclei") is True
+        metadata = POCService.parse_poc_metadata(TEMPLATE, "nuclei")
+        assert POCService._template_id(TEMPLATE) == "test-template"
+        POCService.parse_poc_metadata(TEMPLATE, "nuclei")
+
+        assert len(count_parses) == 1
+        assert metadata["name"] == "test-template"
+        assert metadata["severity"] == "high"
+        assert metadata["description"] == "A test template"
+        assert sorted(metadata["cve_ids"]) == ["CVE-2023-1111", "CVE-2023-2222"]
+
+    def test_metadata_copies_are_independent(self):
+        """Test callers mutating results do not corrupt the cache."""
+        POCService.parse_poc_metadata(TEMPLATE, "nuclei")["cve_ids"].append("CVE-0000-0")
+
+        assert "CVE-0000-0" not in POCService.parse_poc_metadata(TEMPLATE, "nuclei")["cve_ids"]
+
+    def test_invalid_yaml(self):
+        """Test invalid YAML is cached as invalid."""
+        content = "id: [unclosed"
+
+        assert POCService.validate_poc_content(content, "nuclei") is False
+        assert POCService._template_id(content) is None
+        assert POCService.parse_poc_metadata(content, "nuclei")["name"] is None
+
+    def test_non_nuclei_metadata(self):
+        """Test other POC types only report CVEs found in the content."""
+        metadata = POCService.parse_poc_metadata("#!/bin/bash\n# CVE-2021-44228\ncurl $1", "bash")
+
+        assert metadata == {
+            "name": None,
+            "description": None,
+            "cve_ids": ["CVE-2021-44228"],
+            "severity": None,
+        }
+
+    def test_entry_limit(self, monkeypatch, count_parses):
+        """Test the least recently used parse result is dropped first."""
+        monkeypatch.setattr(settings, "POC_CACHE_MAX_ENTRIES", 2)
+
+        POCCache.parsed("id: a")
+        POCCache.parsed("id: b")
+        POCCache.parsed("id: a")
+        POCCache.parsed("id: c")
+        POCCache.parsed("id: a")
+        POCCache.parsed("id: b")
+
+        assert count_parses == ["id: a", "id: b", "id: c", "id: b"]
+
+
+# ============================================================================
+# TEMPLATE FILE TESTS
+# ============================================================================
+
+
+class TestTemplateFiles:
+    """Test templates are materialized once and evicted by size."""
+
+    def test_template_written_once(self, cache_dir):
+        """Test repeated lookups return the same file without rewriting it."""
+        path = POCCache.template_path(TEMPLATE)
+        mtime = os.stat(path).st_mtime_ns
+
+        assert POCCache.template_path(TEMPLATE) == path
+        assert os.path.dirname(path) == str(cache_dir)
+        assert os.path.basename(path) == f"{POCCache.key(TEMPLATE)}.yaml"
+        assert open(path).read() == TEMPLATE
+        assert os.stat(path).st_mtime_ns == mtime
+
+    def test_lru_eviction_by_size(self, cache_dir, monkeypatch):
+        """Test the least recently used templates are removed over the limit."""
+        monkeypatch.setattr(settings, "POC_CACHE_MAX_BYTES", 250)
+        contents = [f"id: t{i}\n" + "x" * 90 for i in range(3)]
+
+        first = POCCache.template_path(contents[0])
+        second = POCCache.template_path(contents[1])
+        _age(first, second)
+        POCCache.template_path(contents[0])
+        third = POCCache.template_path(contents[2])
+
+        assert os.path.exists(first)
+        assert not os.path.exists(second)
+        assert os.path.exists(third)
+
+    def test_recently_used_templates_not_evicted(self, cache_dir, monkeypatch):
+        """Test templates another worker may have handed to a tool outlive the size limit."""
+        monkeypatch.setattr(settings, "POC_CACHE_MAX_BYTES", 150)
+        contents = [f"id: t{i}\n" + "x" * 90 for i in range(3)]
+
+        first = POCCache.template_path(contents[0])
+        second = POCCache.template_path(contents[1])
+        assert os.path.exists(first) and os.path.exists(second)
+
+        _age(first)
+        third = POCCache.template_path(contents[2])
+
+        assert not os.path.exists(first)
+        assert os.path.exists(second) and os.path.exists(third)
+
+    def test_existing_files_indexed(self, cache_dir):
+        """Test templates left by an earlier process are reused."""
+        path = POCCache.template_path(TEMPLATE)
+        POCCache._files_dir = None
+
+        assert POCCache.template_path(TEMPLATE) == path
+        assert POCCache.key(TEMPLATE) in POCCache._files
+
+    def test_invalidate(self, count_parses):
+        """Test invalidation drops both the parse result and the file."""
+        path = POCCache.template_path(TEMPLATE)
+        POCCache.parsed(TEMPLATE)
+        _age(path)
+
+        POCCache.invalidate(TEMPLATE)
+
+        assert not os.path.exists(path)
+        POCCache.parsed(TEMPLATE)
+        assert len(count_parses) == 2
+
+    def test_invalidate_keeps_recently_used_file(self):
+        """Test invalidation leaves a template that may still be in use to eviction."""
+        path = POCCache.template_path(TEMPLATE)
+
+        POCCache.invalidate(TEMPLATE)
+
+        assert os.path.exists(path)
+        assert POCCache.key(TEMPLATE) in POCCache._files
+
+    def test_bundle_links_cached_templates(self, tmp_path):
+        """Test batch bundles reuse cached template files."""
+        bundle = [{"id": 1, "content": TEMPLATE}]
+
+        templates_dir = POCService._write_bundle(str(tmp_path), bundle)
+        linked = os.path.join(templates_dir, "poc_1.yaml")
+
+        assert open(linked).read() == TEMPLATE
+        assert os.path.samefile(linked, POCCache.template_path(TEMPLATE))
+
+    async def test_nuclei_execution_reuses_template(self, monkeypatch):
+        """Test single POC runs pass the cached file and leave it in place."""
+        from unittest.mock import AsyncMock
+        import subprocess
+
+        run = AsyncMock(return_value=subprocess.CompletedProcess([], 0, stdout="", stderr=""))
+        monkeypatch.setattr("app.services.process_runner.ProcessRunner.run", run)
+
+        await POCService.execute_poc("10.0.0.1", 80, TEMPLATE, "nuclei")
+        await POCService.execute_poc("10.0.0.2", 80, TEMPLATE, "nuclei")
+
+        files = [call.args[0][call.args[0].index("-t") + 1] for call in run.await_args_list]
+        assert files[0] == files[1] == POCCache.template_path(TEMPLATE)
+        assert os.path.exists(files[0])
@@ -0,0 +1,558 @@
+"""
+Unit tests for POC Service.
+
+Tests batched nuclei/afrog POC execution across many targets.
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+from app.core.config import settings
+from app.services.poc_service import POCService
+
+
+FAKE_NUCLEI = """
+import json, os, sys
+
+args = sys.argv[1:]
+templates_dir = args[args.index("-t") + 1]
+targets_file = args[args.index("-l") + 1]
+with open(os.environ["FAKE_TOOL_LOG"], "a") as log:
+    log.write("nuclei\\n")
+
+vulnerable = set(os.environ.get("FAKE_VULNERABLE", "").split(","))
+targets = [line.strip() for line in open(targets_file) if line.strip()]
+print("[INF] loading templates", flush=True)
+for name in sorted(os.listdir(templates_dir)):
+    content = open(os.path.join(templates_dir, name)).read()
+    template_id = content.split("id:")[1].split()[0]
+    for target in targets:
+        host = target.split("://")[1].split(":")[0]
+        if host in vulnerable and "always" in content:
+            for matcher in ("a", "b"):
+                print(json.dumps({
+                    "template-id": template_id,
+                    "template-path": os.path.join(templates_dir, name),
+                    "host": target,
+                    "matched-at": target + "/" + matcher,
+                    "info": {"severity": "high"},
+                }), flush=True)
+"""
+
+FAKE_AFROG = """
+import json, os, sys
+
+args = sys.argv[1:]
+pocs_dir = args[args.index("-P") + 1]
+targets_file = args[args.index("-T") + 1]
+output_file = args[args.index("-json") + 1]
+with open(os.environ["FAKE_TOOL_LOG"], "a") as log:
+    log.write("afrog\\n")
+
+vulnerable = set(os.environ.get("FAKE_VULNERABLE", "").split(","))
+records = []
+for name in sorted(os.listdir(pocs_dir)):
+    content = open(os.path.join(pocs_dir, name)).read()
+    poc_id = content.split("id:")[1].split()[0]
+    for target in (line.strip() for line in open(targets_file) if line.strip()):
+        if target.split(":")[0] in vulnerable:
+            records.append({
+                "target": target,
+                "fulltarget": "http://" + target + "/x",
+                "pocinfo": {"id": poc_id, "infoseverity": "critical"},
+            })
+json.dump(records, open(output_file, "w"))
+"""
+
+
+@pytest.fixture
+def fake_tools(tmp_path, monkeypatch):
+    """Put nuclei/afrog stand-ins on PATH and return their launch log."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    for name, body in (("nuclei", FAKE_NUCLEI), ("afrog", FAKE_AFROG)):
+        script = bin_dir / name
+        script.write_text(f"#!{sys.executable}\n{body}")
+        script.chmod(0o755)
+
+    log = tmp_path / "launches.log"
+    log.write_text("")
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("FAKE_TOOL_LOG", str(log))
+    return log
+
+
+def _poc(poc_id, poc_type="nuclei", template_id=None, always=True):
+    matcher = "always" if always else "never"
+    return {
+        "id": poc_id,
+        "poc_type": poc_type,
+        "content": f"id: {template_id or f'tpl-{poc_id}'}\ninfo:\n  name: test\n# {matcher}\n",
+    }
+
+
+# ============================================================================
+# BATCHED EXECUTION TESTS
+# ============================================================================
+
+
+@pytest.mark.skipif(os.name != "posix", reason="requires executable scripts on PATH")
+class TestBatchExecution:
+    """Test POCs run against many targets in few processes."""
+
+    async def test_nuclei_batches_and_demultiplexes(self, fake_tools, monkeypatch):
+        """Test one process per bundle and target batch, results per pair."""
+        monkeypatch.setenv("FAKE_VULNERABLE", "10.0.0.2,10.0.0.6")
+        pocs = [_poc(i, always=i != 3) for i in range(1, 6)]
+        targets = [f"10.0.0.{i}" for i in range(1, 8)]
+
+        result = await POCService.execute_poc_batch(
+            pocs, targets, targets_per_batch=3, pocs_per_batch=2
+        )
+
+        assert result["batches"] == 9
+        assert fake_tools.read_text().splitlines() == ["nuclei"] * 9
+        assert result["pairs"] == 35
+        assert result["failed_batches"] == []
+
+        found = sorted((r["poc_id"], r["target"]) for r in result["results"])
+        assert found == [
+            (poc_id, host)
+            for poc_id in (1, 2, 4, 5)
+            for host in ("10.0.0.2", "10.0.0.6")
+        ]
+        first = next(r for r in result["results"] if r["poc_id"] == 1 and r["target"] == "10.0.0.2")
+        assert first["matches"] == 2
+        assert first["severity"] == "high"
+        assert first["port"] is None
+
+    async def test_target_ports_preserved(self, fake_tools, monkeypatch):
+        """Test targets with ports are matched back including the port."""
+        monkeypatch.setenv("FAKE_VULNERABLE", "10.0.1.1")
+        targets = [{"target": "10.0.1.1", "port": 8080}, {"target": "10.0.1.1", "port": 8443}]
+
+        result = await POCService.execute_poc_batch([_poc(1)], targets)
+
+        assert sorted((r["target"], r["port"]) for r in result["results"]) == [
+            ("10.0.1.1", 8080),
+            ("10.0.1.1", 8443),
+        ]
+
+    async def test_afrog_batches(self, fake_tools, monkeypatch):
+        """Test afrog bundles read results back from the JSON file."""
+        monkeypatch.setenv("FAKE_VULNERABLE", "10.0.2.3")
+        pocs = [_poc(i, poc_type="afrog") for i in (7, 8)]
+        targets = [f"10.0.2.{i}" for i in range(1, 5)]
+
+        result = await POCService.execute_poc_batch(pocs, targets, targets_per_batch=2)
+
+        assert fake_tools.read_text().splitlines() == ["afrog"] * 2
+        assert sorted((r["poc_id"], r["target"], r["severity"]) for r in result["results"]) == [
+            (7, "10.0.2.3", "critical"),
+            (8, "10.0.2.3", "critical"),
+        ]
+
+    async def test_duplicate_template_ids_split(self, fake_tools, monkeypatch):
+        """Test POCs sharing a template id are attributed separately."""
+        monkeypatch.setenv("FAKE_VULNERABLE", "10.0.3.1")
+        pocs = [_poc(1, template_id="shared"), _poc(2, template_id="shared")]
+
+        result = await POCService.execute_poc_batch(pocs, ["10.0.3.1"])
+
+        assert result["batches"] == 2
+        assert sorted(r["poc_id"] for r in result["results"]) == [1, 2]
+
+    async def test_missing_tool_and_unsupported_types(self, fake_tools, monkeypatch):
+        """Test missing tools fail their batches and other types are skipped."""
+        monkeypatch.setenv("PATH", "/nonexistent")
+        pocs = [_poc(1), {"id": 2, "poc_type": "http", "content": "GET / HTTP/1.1"}]
+
+        result = await POCService.execute_poc_batch(pocs, ["10.0.4.1"])
+
+        assert result["unsupported"] == [2]
+        assert result["results"] == []
+        assert result["failed_batches"] == [{
+            "poc_type": "nuclei",
+            "poc_ids": [1],
+            "targets": [{"target": "10.0.4.1", "port": None}],
+            "error": "nuclei not installed",
+        }]
+
+
+# ============================================================================
+# DEMULTIPLEXING TESTS
+# ============================================================================
+
+
+class TestDemultiplexing:
+    """Test tool-reported hosts map back to submitted targets."""
+
+    def test_demux_target(self):
+        """Test URLs, host:port and bare hosts resolve to the right pair."""
+        index = POCService._target_index([("Example.com", None), ("10.0.0.1", 8080)])
+
+        assert POCService._demux_target("http://example.com/path", index) == ("Example.com", None)
+        assert POCService._demux_target("example.com:80", index) == ("Example.com", None)
+        assert POCService._demux_target("https://10.0.0.1:8080/x", index) == ("10.0.0.1", 8080)
+        assert POCService._demux_target("10.0.0.1:9090", index) is None
+        assert POCService._demux_target(None, index) is None
+
+    def test_demux_target_with_implied_port(self):
+        """Test reports that drop a normalized port still reach their target."""
+        index = POCService._target_index([("h", 443), ("shared", 80), ("shared", 8443), ("solo", 8080)])
+
+        assert POCService._demux_target("https://h/login", index) == ("h", 443)
+        assert POCService._demux_target("h", index) == ("h", 443)
+        assert POCService._demux_target("http://shared", index) == ("shared", 80)
+        assert POCService._demux_target("https://shared", index) is None
+        assert POCService._demux_target("solo", index) == ("solo", 8080)
+        assert POCService._demux_target("solo:9090", index) is None
+
+    def test_bundles_respect_size(self):
+        """Test bundles never exceed the template limit."""
+        bundles = POCService._bundle_pocs([_poc(i) for i in range(5)], 2)
+
+        assert [len(bundle) for bundle in bundles] == [2, 2, 1]
+        assert bundles[0][0]["template_id"] == "tpl-0"
+
+
+# ============================================================================
+# BULK EXECUTION TESTS
+# ============================================================================
+
+
+class TestBulkExecution:
+    """Test selector-driven POC runs stored as vulnerabilities."""
+
+    @staticmethod
+    async def _setup(db_session, prefix, tag):
+        from app.models.asset import Asset, AssetGroup, AssetGroupMember
+        from app.models.poc import POC, POCTag
+
+        group = AssetGroup(name=f"group-{tag}")
+        db_session.add(group)
+        assets = [Asset(ip=f"{prefix}.{i}", status="active") for i in range(1, 5)]
+        assets.append(Asset(ip=f"{prefix}.9", status="archived"))
+        db_session.add_all(assets)
+        await db_session.flush()
+        db_session.add_all(AssetGroupMember(group_id=group.id, asset_id=asset.id) for asset in assets)
+
+        pocs = [
+            POC(name=f"{tag} nuclei", poc_type="nuclei", severity="high", cve_id=f"CVE-2024-{tag}",
+                content=f"id: {tag}-nuclei\ninfo:\n  name: n\n# always\n"),
+            POC(name=f"{tag} http", poc_type="http", severity="medium", content=f"GET /{tag} HTTP/1.1"),
+            POC(name=f"{tag} inactive", poc_type="http", severity="high", content=f"GET /{tag}-inactive", is_active=0),
+        ]
+        db_session.add_all(pocs)
+        await db_session.flush()
+        db_session.add_all(POCTag(poc_id=poc.id, tag=tag) for poc in pocs)
+        await db_session.commit()
+        return group, assets, pocs
+
+    @staticmethod
+    def _fake_http(monkeypatch, vulnerable_hosts):
+        """Replace HTTP POC execution, recording peak concurrency."""
+        state = {"running": {}, "total": 0, "peak_total": 0, "peak_target": 0, "calls": []}
+
+        async def fake_http(target, port, content, options):
+            state["calls"].append(target)
+            state["running"][target] = state["running"].get(target, 0) + 1
+            state["total"] += 1
+            state["peak_total"] = max(state["peak_total"], state["total"])
+            state["peak_target"] = max(state["peak_target"], state["running"][target])
+            await asyncio.sleep(0.02)
+            state["running"][target] -= 1
+            state["total"] -= 1
+            return {"target": target, "port": port, "vulnerable": target in vulnerable_hosts,
+                    "output": "", "error": None}
+
+        monkeypatch.setattr(POCService, "_execute_http_poc", staticmethod(fake_http))
+        return state
+
+    async def test_select_pocs(self, db_session):
+        """Test criteria are combined and inactive POCs excluded."""
+        await self._setup(db_session, "10.71.0", "sel")
+
+        by_tag = await POCService.select_pocs(db_session, tags=["sel"])
+        assert [poc["name"] for poc in by_tag] == ["sel nuclei", "sel http"]
+
+        by_both = await POCService.select_pocs(db_session, tags=["sel"], severities=["HIGH"])
+        assert [poc["name"] for poc in by_both] == ["sel nuclei"]
+
+        by_cve = await POCService.select_pocs(db_session, cve_ids=["cve-2024-sel"])
+        assert [poc["name"] for poc in by_cve] == ["sel nuclei"]
+
+        with pytest.raises(ValueError):
+            await POCService.select_pocs(db_session)
+
+    async def test_select_assets(self, db_session):
+        """Test group and CIDR criteria and inactive asset exclusion."""
+        group, assets, _ = await self._setup(db_session, "10.72.0", "asel")
+
+        in_group = await POCService.select_assets(db_session, group_ids=[group.id])
+        assert [ip for _, ip in in_group] == [f"10.72.0.{i}" for i in range(1, 5)]
+
+        narrowed = await POCService.select_assets(
+            db_session, group_ids=[group.id], cidrs=["10.72.0.0/31"]
+        )
+        assert narrowed == [(assets[0].id, "10.72.0.1")]
+
+        with pytest.raises(ValueError):
+            await POCService.select_assets(db_session)
+        with pytest.raises(ValueError):
+            await POCService.select_assets(db_session, cidrs=["not-a-network"])
+
+    @pytest.mark.skipif(os.name != "posix", reason="requires executable scripts on PATH")
+    async def test_bulk_run_stores_and_skips_verified(self, db_session, fake_tools, monkeypatch):
+        """Test hits become linked vulnerabilities and are not re-run."""
+        from sqlalchemy import select
+        from app.models.vulnerability import Vulnerability
+
+        group, assets, pocs = await self._setup(db_session, "10.73.0", "bulk")
+        monkeypatch.setenv("FAKE_VULNERABLE", "10.73.0.2")
+        http = self._fake_http(monkeypatch, {"10.73.0.3"})
+        progress = []
+
+        stats = await POCService.execute_bulk(
+            db_session,
+            {"tags": ["bulk"]},
+            {"group_ids": [group.id]},
+            on_progress=progress.append,
+        )
+
+        assert stats["pairs"] == 8
+        assert stats["executed"] == 8
+        assert stats["skipped"] == 0
+        assert stats["vulnerable"] == 2
+        assert fake_tools.read_text().splitlines() == ["nuclei"]
+        assert sorted(http["calls"]) == [f"10.73.0.{i}" for i in range(1, 5)]
+        assert progress and progress[-1]["vulnerable"] == 2
+
+        rows = (
+            await db_session.execute(
+                select(Vulnerability.poc_id, Vulnerability.asset_id, Vulnerability.title)
+                .where(Vulnerability.asset_id.in_([asset.id for asset in assets]))
+                .order_by(Vulnerability.poc_id)
+            )
+        ).all()
+        assert [tuple(row) for row in rows] == [
+            (pocs[0].id, assets[1].id, "bulk nuclei"),
+            (pocs[1].id, assets[2].id, "bulk http"),
+        ]
+
+        again = await POCService.execute_bulk(db_session, {"tags": ["bulk"]}, {"group_ids": [group.id]})
+
+        assert again["skipped"] == 2
+        assert again["executed"] == 6
+        assert again["vulnerable"] == 0
+        assert fake_tools.read_text().splitlines() == ["nuclei"] * 2
+
+    async def test_concurrency_caps(self, db_session, monkeypatch):
+        """Test global and per-target limits bound running executions."""
+        from app.models.poc import POC, POCTag
+
+        group, _, _ = await self._setup(db_session, "10.74.0", "caps")
+        extra = [POC(name=f"caps http {i}", poc_type="http", content=f"GET /caps-{i}") for i in range(5)]
+        db_session.add_all(extra)
+        await db_session.flush()
+        db_session.add_all(POCTag(poc_id=poc.id, tag="caps-http") for poc in extra)
+        await db_session.commit()
+        http = self._fake_http(monkeypatch, set())
+
+        stats = await POCService.execute_bulk(
+            db_session,
+            {"tags": ["caps-http"]},
+            {"group_ids": [group.id]},
+            concurrency=3,
+            per_target_concurrency=2,
+        )
+
+        assert stats["executed"] == 20
+        assert len(http["calls"]) == 20
+        assert http["peak_total"] == 3
+        assert http["peak_target"] <= 2
+
+
+# ============================================================================
+# BULK IMPORT TESTS
+# ============================================================================
+
+
+def _template(template_id, tags="demo", cve=None):
+    reference = f"\n  reference:\n    - https://nvd.nist.gov/vuln/detail/{cve}" if cve else ""
+    return (
+        f"id: {template_id}\ninfo:\n  name: {template_id}\n  severity: high\n"
+        f"  tags: {tags}{reference}\nrequests: []\n"
+    )
+
+
+class TestBulkImport:
+    """Test set-based POC import from lists and archives."""
+
+    @staticmethod
+    def _record_inserts(db_session, monkeypatch):
+        """Record the table of every INSERT the session executes."""
+        tables = []
+        execute = db_session.execute
+
+        async def recording_execute(statement, *args, **kwargs):
+            if getattr(statement, "is_insert", False):
+                tables.append(statement.table.name)
+            return await execute(statement, *args, **kwargs)
+
+        monkeypatch.setattr(db_session, "execute", recording_execute)
+        return tables
+
+    async def test_import_dedupes_and_batches(self, db_session, monkeypatch):
+        """Test duplicates are skipped and each chunk is one POC INSERT plus one for new tags."""
+        from sqlalchemy import select
+        from app.models.poc import POC, POCTag
+
+        existing = POC(name="existing", poc_type="nuclei", content=_template("imp-existing"))
+        db_session.add(existing)
+        await db_session.commit()
+        inserts = self._record_inserts(db_session, monkeypatch)
+
+        items = [
+            {"name": f"imp {i}", "poc_type": "nuclei", "content": _template(f"imp-{i}"), "tags": ["a", "b"]}
+            for i in range(5)
+        ]
+        items.append(dict(items[0], name="same content"))
+        items.append({"name": "old", "poc_type": "nuclei", "content": _template("imp-existing"), "tags": []})
+        items.append({"name": "broken", "poc_type": "nuclei", "content": "id: [", "tags": []})
+
+        stats = await POCService.import_pocs(db_session, items, source="nuclei", chunk_size=3)
+
+        assert stats == {
+            "imported": 5,
+            "duplicates": 2,
+            "failed": 1,
+            "errors": ["Invalid content for POC: broken"],
+        }
+        # The last chunk only holds stored content, which the POC INSERT skips
+        assert inserts == ["pocs", "poc_tags", "pocs", "poc_tags", "pocs"]
+
+        rows = (
+            await db_session.execute(
+                select(POC.name, POC.source, POC.content_hash).where(POC.name.like("imp %")).order_by(POC.name)
+            )
+        ).all()
+        assert [(name, source) for name, source, _ in rows] == [(f"imp {i}", "nuclei") for i in range(5)]
+        assert all(len(digest) == 64 for _, _, digest in rows)
+
+        tags = (
+            await db_session.execute(
+                select(POCTag.tag).join(POC, POC.id == POCTag.poc_id).where(POC.name == "imp 0")
+            )
+        ).scalars().all()
+        assert sorted(tags) == ["a", "b"]
+
+    async def test_import_with_process_pool(self, db_session, monkeypatch):
+        """Test large batches are parsed in worker processes."""
+        from sqlalchemy import select
+        from app.models.poc import POC, POCTag
+
+        monkeypatch.setattr(settings, "POC_IMPORT_PARALLEL_THRESHOLD", 4)
+        monkeypatch.setattr(settings, "POC_IMPORT_WORKERS", 2)
+        items = [
+            {"poc_type": "nuclei", "content": _template(f"pool-{i}", tags="pool,rce", cve=f"CVE-2020-{i}"),
+             "tags": None, "filename": f"pool-{i}.yaml"}
+            for i in range(10)
+        ]
+
+        stats = await POCService.import_pocs(db_session, items, chunk_size=5)
+
+        assert stats["imported"] == 10
+        poc = (await db_session.execute(select(POC).where(POC.name == "pool-3"))).scalar_one()
+        assert poc.cve_id == "CVE-2020-3"
+        assert poc.severity == "high"
+        tags = (await db_session.execute(select(POCTag.tag).where(POCTag.poc_id == poc.id))).scalars().all()
+        assert sorted(tags) == ["cve:CVE-2020-3", "pool", "rce"]
+
+    async def test_editing_content_updates_hash(self, db_session):
+        """Test ORM writes keep content_hash in sync for later imports."""
+        from app.models.poc import POC, content_hash
+
+        poc = POC(name="hash", poc_type="nuclei", content=_template("hash-a"))
+        poc.content = _template("hash-b")
+
+        assert poc.content_hash == content_hash(_template("hash-b"))
+
+
+class TestArchiveImport:
+    """Test templates are read from uploaded archives."""
+
+    @staticmethod
+    def _files():
+        return {
+            "templates/cves/a.yaml": _template("arc-a", cve="CVE-2019-1"),
+            "templates/b.yml": _template("arc-b"),
+            "templates/.github/workflow.yml": "name: ci\non: push\n",
+            "templates/readme.md": "# docs",
+            "templates/config.yaml": "just: config\n",
+            "templates/big.yaml": "x" * 2000,
+        }
+
+    def _tar(self, path):
+        import io
+        import tarfile
+
+        with tarfile.open(path, "w:gz") as archive:
+            for name, content in self._files().items():
+                data = content.encode()
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                archive.addfile(info, io.BytesIO(data))
+
+    def _zip(self, path):
+        import zipfile
+
+        with zipfile.ZipFile(path, "w") as archive:
+            for name, content in self._files().items():
+                archive.writestr(name, content)
+
+    @pytest.mark.parametrize("suffix", [".tar.gz", ".zip"])
+    def test_iter_archive(self, tmp_path, monkeypatch, suffix):
+        """Test template members are yielded and others skipped or flagged."""
+        monkeypatch.setattr(settings, "POC_IMPORT_MAX_FILE_SIZE", 1000)
+        path = tmp_path / f"templates{suffix}"
+        (self._tar if suffix == ".tar.gz" else self._zip)(path)
+
+        with open(path, "rb") as f:
+            items = {item["filename"]: item for item in POCService.iter_archive(f, path.name)}
+
+        assert sorted(items) == ["a.yaml", "b.yml", "big.yaml", "config.yaml"]
+        assert items["a.yaml"]["content"] == _template("arc-a", cve="CVE-2019-1")
+        assert "exceeds" in items["big.yaml"]["error"]
+
+    async def test_archive_import(self, db_session, tmp_path, monkeypatch):
+        """Test an archive import stores templates and reports failures."""
+        from sqlalchemy import select
+        from app.models.poc import POC
+
+        monkeypatch.setattr(settings, "POC_IMPORT_MAX_FILE_SIZE", 1000)
+        path = tmp_path / "templates.tar.gz"
+        self._tar(path)
+
+        with open(path, "rb") as f:
+            stats = await POCService.import_pocs(db_session, POCService.iter_archive(f, path.name), source="nuclei")
+
+        assert stats["imported"] == 2
+        assert stats["failed"] == 2
+        names = (
+            await db_session.execute(select(POC.name).where(POC.name.like("arc-%")).order_by(POC.name))
+        ).scalars().all()
+        assert names == ["arc-a", "arc-b"]
+
+    def test_unsupported_and_corrupt_archives(self, tmp_path):
+        """Test unknown formats and corrupt archives raise ValueError."""
+        path = tmp_path / "bad.zip"
+        path.write_bytes(b"not a zip")
+
+        with open(path, "rb") as f, pytest.raises(ValueError, match="Unsupported"):
+            list(POCService.iter_archive(f, "templates.rar"))
+        with open(path, "rb") as f, pytest.raises(ValueError, match="Corrupt"):
+            list(POCService.iter_archive(f, "bad.zip"))
@@ -562,3 +562,236 @@ class TestEdgeCases:
         }
         assert options["timing"] == "3"
         assert options["scan_type"] == "syn"
+
+
+# ============================================================================
+# STREAMING SCAN TESTS
+# ============================================================================
+
+
+def _host_xml(ip, port, service="ssh"):
+    return (
+        f'<host><status state="up"/><address addr="{ip}" addrtype="ipv4"/>'
+        f'<ports><port protocol="tcp" portid="{port}"><state state="open"/>'
+        f'<service name="{service}"/></port></ports></host>\n'
+    )
+
+
+@pytest.fixture
+def fake_nmap(tmp_path, monkeypatch):
+    """Put a scripted ``nmap`` on PATH that prints the given chunks of XML."""
+    import os
+    import stat
+    import sys
+
+    def install(chunks, pause=0.0, exit_code=0, stderr=""):
+        script = tmp_path / "nmap"
+        script.write_text(
+            f"#!{sys.executable}\n"
+            "import sys, time\n"
+            f"chunks = {chunks!r}\n"
+            "for i, chunk in enumerate(chunks):\n"
+            "    if i:\n"
+            f"        time.sleep({pause!r})\n"
+            "    sys.stdout.write(chunk)\n"
+            "    sys.stdout.flush()\n"
+            f"sys.stderr.write({stderr!r})\n"
+            f"sys.exit({exit_code})\n"
+        )
+        script.chmod(script.stat().st_mode | stat.S_IEXEC)
+        monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+
+    return install
+
+
+class TestStreamingScan:
+    """Test incremental nmap output parsing."""
+
+    def test_stream_matches_buffered_parse(self, fake_nmap):
+        """Test streaming yields the same ports as the buffered parser."""
+        document = (
+            '<?xml version="1.0"?>\n<nmaprun>\n'
+            + _host_xml("10.0.0.1", 22)
+            + _host_xml("10.0.0.2", 80, "http")
+            + _host_xml("10.0.0.3", 443, "https")
+            + "</nmaprun>\n"
+        )
+        fake_nmap([document])
+
+        streamed = list(PortScanService.iter_scan_with_nmap("10.0.0.0/24"))
+
+        assert streamed == PortScanService._parse_nmap_xml(document)
+        assert [p["ip"] for p in streamed] == ["10.0.0.1", "10.0.0.2", "10.0.0.3"]
+
+    def test_yields_before_nmap_exits(self, fake_nmap):
+        """Test the first host is available while nmap is still running."""
+        import time
+
+        fake_nmap(
+            ['<?xml version="1.0"?>\n<nmaprun>\n' + _host_xml("10.0.0.1", 22), "</nmaprun>\n"],
+            pause=30,
+        )
+
+        start = time.monotonic()
+        ports = PortScanService.iter_scan_with_nmap("10.0.0.0/24")
+        first = next(ports)
+        ports.close()
+
+        assert first["ip"] == "10.0.0.1"
+        assert time.monotonic() - start < 10
+
+    def test_nmap_failure_raises(self, fake_nmap):
+        """Test a failing nmap exit code is reported with stderr."""
+        fake_nmap([""], exit_code=255, stderr="You requested a scan type which requires root")
+
+        with pytest.raises(RuntimeError, match="requires root"):
+            list(PortScanService.iter_scan_with_nmap("10.0.0.1"))
+
+    def test_nmap_not_installed(self, tmp_path, monkeypatch):
+        """Test a missing nmap binary is reported."""
+        monkeypatch.setenv("PATH", str(tmp_path))
+
+        with pytest.raises(RuntimeError, match="nmap not installed"):
+            list(PortScanService.iter_scan_with_nmap("10.0.0.1"))
+
+    def test_timeout_kills_nmap(self, fake_nmap, monkeypatch):
+        """Test nmap is killed once the scan timeout passes."""
+        monkeypatch.setattr(PortScanService, "SCAN_TIMEOUT", 0.5)
+        fake_nmap(['<?xml version="1.0"?>\n<nmaprun>\n', "</nmaprun>\n"], pause=30)
+
+        with pytest.raises(TimeoutError):
+            list(PortScanService.iter_scan_with_nmap("10.0.0.1"))
+
+
+# ============================================================================
+# SHARDED SCAN TESTS
+# ============================================================================
+
+
+class TestScanSharding:
+    """Test splitting scans into parallel nmap shards."""
+
+    def test_shard_target_splits_cidr(self):
+        """Test a /22 is split into four /24 shards."""
+        shards = PortScanService.shard_target("10.0.0.0/22", 24)
+
+        assert shards == ["10.0.0.0/24", "10.0.1.0/24", "10.0.2.0/24", "10.0.3.0/24"]
+
+    def test_shard_target_keeps_small_targets(self):
+        """Test hosts, small ranges and hostnames are not split."""
+        assert PortScanService.shard_target("10.0.0.1", 24) == ["10.0.0.1"]
+        assert PortScanService.shard_target("10.0.0.0/26", 24) == ["10.0.0.0/26"]
+        assert PortScanService.shard_target("scanme.example.com", 24) == ["scanme.example.com"]
+        assert PortScanService.shard_target("2001:db8::/64", 24) == ["2001:db8::/64"]
+
+    def test_shard_ports_splits_range(self):
+        """Test port ranges are split into contiguous slices."""
+        assert PortScanService.shard_ports("1-65535", 4) == [
+            "1-16384",
+            "16385-32768",
+            "32769-49152",
+            "49153-65535",
+        ]
+
+    def test_shard_ports_keeps_lists_compact(self):
+        """Test port lists are split and re-compressed into ranges."""
+        assert PortScanService.shard_ports("22,80-82,443,8080", 2) == ["22,80-81", "82,443,8080"]
+
+    def test_shard_ports_keeps_complex_specs(self):
+        """Test non-numeric port specifications are never split."""
+        assert PortScanService.shard_ports("T:80,U:53", 4) == ["T:80,U:53"]
+        assert PortScanService.shard_ports("1-1024", 1) == ["1-1024"]
+
+    def test_plan_shards_crosses_targets_and_ports(self):
+        """Test every target shard is scanned for every port slice."""
+        shards = PortScanService.plan_shards("10.0.0.0/23", "1-100", prefix=24, port_shards=2)
+
+        assert shards == [
+            ("10.0.0.0/24", "1-50"),
+            ("10.0.0.0/24", "51-100"),
+            ("10.0.1.0/24", "1-50"),
+            ("10.0.1.0/24", "51-100"),
+        ]
+
+    @patch.object(PortScanService, "scan_with_nmap")
+    def test_scan_sharded_merges_in_shard_order(self, mock_scan):
+        """Test shard results are merged in shard order."""
+        mock_scan.side_effect = lambda target, options: [{"ip": target, "port": 22}]
+
+        result = PortScanService.scan_sharded("10.0.0.0/22", {"shard_prefix": 24}, max_parallel=4)
+
+        assert [p["ip"] for p in result["ports"]] == [
+            "10.0.0.0/24",
+            "10.0.1.0/24",
+            "10.0.2.0/24",
+            "10.0.3.0/24",
+        ]
+        assert result["shards"] == 4
+        assert result["failed_shards"] == []
+
+    @patch.object(PortScanService, "scan_with_nmap")
+    def test_scan_sharded_retries_only_failed_shards(self, mock_scan):
+        """Test a timed out shard is retried without rescanning the others."""
+        calls = []
+
+        def scan(target, options):
+            calls.append(target)
+            if target == "10.0.1.0/24" and calls.count(target) == 1:
+                raise TimeoutError(f"nmap scan timeout for {target}")
+            return [{"ip": target, "port": 80}]
+
+        mock_scan.side_effect = scan
+
+        result = PortScanService.scan_sharded("10.0.0.0/23", {"shard_prefix": 24}, retries=1)
+
+        assert sorted(calls) == ["10.0.0.0/24", "10.0.1.0/24", "10.0.1.0/24"]
+        assert len(result["ports"]) == 2
+        assert result["failed_shards"] == []
+
+    @patch.object(PortScanService, "scan_with_nmap")
+    def test_scan_sharded_reports_persistent_failures(self, mock_scan):
+        """Test shards that keep failing are reported, not lost silently."""
+
+        def scan(target, options):
+            if target == "10.0.1.0/24":
+                raise TimeoutError(f"nmap scan timeout for {target}")
+            return [{"ip": target, "port": 80}]
+
+        mock_scan.side_effect = scan
+
+        result = PortScanService.scan_sharded("10.0.0.0/23", {"shard_prefix": 24}, retries=2)
+
+        assert [p["ip"] for p in result["ports"]] == ["10.0.0.0/24"]
+        assert result["failed_shards"] == [
+            {
+                "target": "10.0.1.0/24",
+                "ports": "1-65535",
+                "error": "nmap scan timeout for 10.0.1.0/24",
+            }
+        ]
+        assert mock_scan.call_count == 4
+
+    @patch.object(PortScanService, "scan_with_nmap")
+    def test_scan_sharded_bounds_parallelism(self, mock_scan):
+        """Test no more than max_parallel nmap processes run at once."""
+        import threading
+        import time
+
+        lock = threading.Lock()
+        state = {"active": 0, "peak": 0}
+
+        def scan(target, options):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(0.02)
+            with lock:
+                state["active"] -= 1
+            return []
+
+        mock_scan.side_effect = scan
+
+        PortScanService.scan_sharded("10.0.0.0/20", {"shard_prefix": 24}, max_parallel=3)
+
+        assert mock_scan.call_count == 16
+        assert state["peak"] <= 3
@@ -0,0 +1,326 @@
+"""
+Unit tests for the async process runner.
+
+Tests output capture, line streaming, timeouts and process group cleanup.
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from app.services.process_runner import ProcessRunner
+from app.services.tool_integration import ToolIntegration
+
+
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="requires POSIX process groups")
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    # Reap the zombie if it was our child
+    try:
+        return os.waitpid(pid, os.WNOHANG) == (0, 0)
+    except ChildProcessError:
+        return True
+
+
+def _wait_dead(pid: int, timeout: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if not _alive(pid):
+            return True
+        time.sleep(0.02)
+    return False
+
+
+# ============================================================================
+# OUTPUT CAPTURE TESTS
+# ============================================================================
+
+
+class TestOutputCapture:
+    """Test captured output and exit status."""
+
+    async def test_captures_stdout_stderr_and_returncode(self):
+        """Test a finished process is reported like subprocess.run."""
+        code = "import sys; print('out'); print('err', file=sys.stderr); sys.exit(3)"
+
+        result = await ProcessRunner.run([sys.executable, "-c", code], timeout=10)
+
+        assert isinstance(result, subprocess.CompletedProcess)
+        assert result.returncode == 3
+        assert result.stdout == "out\n"
+        assert result.stderr == "err\n"
+
+    async def test_shell_command(self):
+        """Test shell commands are supported for script POCs."""
+        result = await ProcessRunner.run("echo $((1 + 2))", timeout=10, shell=True)
+
+        assert result.stdout.strip() == "3"
+
+    async def test_missing_executable(self):
+        """Test a missing binary raises FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            await ProcessRunner.run(["catchcore-no-such-tool"], timeout=5)
+
+    async def test_large_output_on_both_pipes(self):
+        """Test output larger than the pipe buffer does not deadlock."""
+        code = (
+            "import sys\n"
+            "for _ in range(2000):\n"
+            "    sys.stdout.write('o' * 100 + '\\n')\n"
+            "    sys.stderr.write('e' * 100 + '\\n')\n"
+        )
+
+        result = await ProcessRunner.run([sys.executable, "-c", code], timeout=10)
+
+        assert len(result.stdout.splitlines()) == 2000
+        assert len(result.stderr.splitlines()) == 2000
+
+
+# ============================================================================
+# STREAMING TESTS
+# ============================================================================
+
+
+class TestStreaming:
+    """Test lines are delivered while the process is still running."""
+
+    async def test_lines_streamed_before_exit(self):
+        """Test callbacks see output before the process finishes."""
+        code = "import time; print('first', flush=True); time.sleep(0.5); print('second')"
+        seen = []
+
+        started = time.monotonic()
+        result = await ProcessRunner.run(
+            [sys.executable, "-c", code],
+            timeout=10,
+            on_stdout=lambda line: seen.append((line, time.monotonic() - started)),
+        )
+        finished = time.monotonic() - started
+
+        assert [line for line, _ in seen] == ["first", "second"]
+        assert seen[0][1] < finished - 0.3
+        assert result.stdout == "first\nsecond\n"
+
+    async def test_callback_errors_do_not_abort_run(self):
+        """Test a failing callback does not lose output."""
+        def callback(line):
+            raise ValueError("bad consumer")
+
+        result = await ProcessRunner.run(
+            [sys.executable, "-c", "print('a'); print('b')"],
+            timeout=10,
+            on_stderr=callback,
+            on_stdout=callback,
+        )
+
+        assert result.stdout == "a\nb\n"
+
+    async def test_event_loop_not_blocked(self):
+        """Test other coroutines keep running while a tool executes."""
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.05)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        try:
+            await ProcessRunner.run([sys.executable, "-c", "import time; time.sleep(0.5)"], timeout=10)
+        finally:
+            task.cancel()
+
+        assert ticks >= 5
+
+
+# ============================================================================
+# TIMEOUT TESTS
+# ============================================================================
+
+
+class TestTimeouts:
+    """Test timed-out processes and their children are killed."""
+
+    async def test_timeout_kills_process_group(self):
+        """Test children spawned by the tool are killed with it."""
+        pids = []
+
+        with pytest.raises(subprocess.TimeoutExpired) as exc_info:
+            await ProcessRunner.run(
+                "sleep 30 & echo $!; echo $$; wait",
+                timeout=0.5,
+                shell=True,
+                on_stdout=lambda line: pids.append(int(line)),
+            )
+
+        assert len(pids) == 2
+        assert exc_info.value.output.split() == [str(pid) for pid in pids]
+        assert all(_wait_dead(pid) for pid in pids)
+
+    async def test_sigterm_ignored_escalates_to_sigkill(self):
+        """Test a process ignoring SIGTERM is killed after the grace period."""
+        code = (
+            "import os, signal, time\n"
+            "signal.signal(signal.SIGTERM, signal.SIG_IGN)\n"
+            "print(os.getpid(), flush=True)\n"
+            "time.sleep(30)\n"
+        )
+        pids = []
+
+        started = time.monotonic()
+        with pytest.raises(subprocess.TimeoutExpired):
+            await ProcessRunner.run(
+                [sys.executable, "-c", code],
+                timeout=0.5,
+                kill_grace_period=0.3,
+                on_stdout=lambda line: pids.append(int(line)),
+            )
+
+        assert time.monotonic() - started < 5
+        assert _wait_dead(pids[0])
+
+    async def test_cancellation_kills_process(self):
+        """Test cancelling the awaiting task kills the tool."""
+        pids = []
+        task = asyncio.create_task(
+            ProcessRunner.run(
+                [sys.executable, "-c", "import os, time; print(os.getpid(), flush=True); time.sleep(30)"],
+                on_stdout=lambda line: pids.append(int(line)),
+            )
+        )
+        while not pids:
+            await asyncio.sleep(0.02)
+
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert _wait_dead(pids[0])
+
+
+# ============================================================================
+# TOOL DETECTION TESTS
+# ============================================================================
+
+
+class TestToolDetection:
+    """Test tool detection goes through the runner."""
+
+    async def test_async_check_probes_with_runner(self, monkeypatch):
+        """Test tools missing from PATH are probed asynchronously."""
+        calls = []
+
+        async def run(cmd, timeout=None, **kwargs):
+            calls.append((cmd, timeout))
+            return subprocess.CompletedProcess(cmd, 0, stdout="usage: help", stderr="")
+
+        monkeypatch.setattr("shutil.which", lambda name: None)
+        monkeypatch.setattr(ProcessRunner, "run", staticmethod(run))
+
+        assert await ToolIntegration.check_tool_installed_async("fscan") is True
+        assert calls == [(["fscan", "-h"], 5)]
+
+    async def test_sync_check_inside_event_loop_skips_probe(self, monkeypatch):
+        """Test the sync check never blocks a running loop on a probe."""
+        async def run(cmd, **kwargs):
+            raise AssertionError("probe must not run")
+
+        monkeypatch.setattr("shutil.which", lambda name: None)
+        monkeypatch.setattr(ProcessRunner, "run", staticmethod(run))
+
+        assert ToolIntegration.check_tool_installed("fscan") is False
+
+    async def test_installed_tools_probed_concurrently(self, monkeypatch):
+        """Test every tool is checked in one concurrent pass."""
+        monkeypatch.setattr("shutil.which", lambda name: "/usr/bin/fscan" if name == "fscan" else None)
+
+        async def run(cmd, **kwargs):
+            raise FileNotFoundError(cmd[0])
+
+        monkeypatch.setattr(ProcessRunner, "run", staticmethod(run))
+
+        installed = await ToolIntegration.get_installed_tools_async()
+
+        assert installed == {
+            "afrog": False,
+            "dddd": False,
+            "fscan": True,
+            "nuclei": False,
+            "dirsearch": False,
+        }
+
+
+# ============================================================================
+# LINE ITERATION TESTS
+# ============================================================================
+
+
+class TestIterLines:
+    """Test incremental stdout iteration."""
+
+    async def test_lines_yielded_while_running(self):
+        """Test lines arrive before the process exits and status is filled."""
+        code = (
+            "import sys, time\n"
+            "print('one', flush=True)\n"
+            "time.sleep(0.4)\n"
+            "print('two'); print('oops', file=sys.stderr); sys.exit(2)\n"
+        )
+        status = {}
+        seen = []
+
+        started = time.monotonic()
+        async for line in ProcessRunner.iter_lines([sys.executable, "-c", code], timeout=10, status=status):
+            seen.append((line, time.monotonic() - started))
+
+        assert [line for line, _ in seen] == ["one", "two"]
+        assert seen[1][1] - seen[0][1] > 0.3
+        assert status == {"returncode": 2, "stderr": "oops\n"}
+
+    async def test_closing_early_kills_process(self):
+        """Test abandoning the iterator terminates the tool."""
+        code = "import os, time; print(os.getpid(), flush=True); time.sleep(30)"
+
+        lines = ProcessRunner.iter_lines([sys.executable, "-c", code], timeout=10)
+        pid = int(await lines.__anext__())
+        await lines.aclose()
+
+        assert _wait_dead(pid)
+
+    async def test_timeout_raises_and_kills(self):
+        """Test the deadline covers the whole run."""
+        code = "import os, time; print(os.getpid(), flush=True); time.sleep(30)"
+        pids = []
+
+        with pytest.raises(subprocess.TimeoutExpired):
+            async for line in ProcessRunner.iter_lines([sys.executable, "-c", code], timeout=0.5):
+                pids.append(int(line))
+
+        assert _wait_dead(pids[0])
+
+    async def test_stderr_tail_is_bounded(self, monkeypatch):
+        """Test only the end of a noisy stderr is retained."""
+        monkeypatch.setattr(ProcessRunner, "STDERR_TAIL_SIZE", 1024)
+        code = (
+            "import sys\n"
+            "for i in range(5000):\n"
+            "    sys.stderr.write(f'line {i}\\n')\n"
+        )
+        status = {}
+
+        async for _ in ProcessRunner.iter_lines([sys.executable, "-c", code], timeout=10, status=status):
+            pass
+
+        assert status["stderr"].endswith("line 4999\n")
+        assert "line 0\n" not in status["stderr"]
+        assert len(status["stderr"]) < 1024 + ProcessRunner.READ_CHUNK_SIZE
@@ -212,6 +212,56 @@ class TestScanTaskCelery:
 
         assert service_identify_task is not None
 
+    def test_service_identify_task_probes_asset_ip(self, monkeypatch):
+        """Test services are identified on the asset's IP, not the worker."""
+        from app.services import scan_service
+        from app.services.scan_service import service_identify_task
+        from app.services.service_identify_service import ServiceIdentifyService
+
+        session = MagicMock()
+        session.__enter__.return_value.execute.return_value.scalar.return_value = "10.50.0.7"
+        probed = []
+
+        def identify(asset_id, ports, host="localhost"):
+            probed.append((asset_id, ports, host))
+            return [{"ip": host, "port": 22, "service": "ssh"}]
+
+        monkeypatch.setattr(scan_service, "sync_session", lambda: session)
+        monkeypatch.setattr(ServiceIdentifyService, "identify_services", staticmethod(identify))
+        monkeypatch.setattr(service_identify_task, "update_state", MagicMock(), raising=False)
+
+        result = service_identify_task.run(1, 5, [22])
+
+        assert probed == [(5, [22], "10.50.0.7")]
+        assert result["services_count"] == 1
+
+    def test_poc_batch_task_runs_active_pocs(self, monkeypatch):
+        """Test the batch task loads the POCs and runs them against the targets."""
+        from app.services import scan_service
+        from app.services.poc_service import POCService
+        from app.services.scan_service import poc_batch_task
+
+        session = MagicMock()
+        session.__enter__.return_value.execute.return_value.all.return_value = [(3, "nuclei", "id: batch")]
+        calls = []
+
+        async def execute(pocs, targets, options=None):
+            calls.append((pocs, targets, options))
+            return {"pairs": 2, "batches": 1, "vulnerable": 1, "results": [{"poc_id": 3}], "failed_batches": []}
+
+        monkeypatch.setattr(scan_service, "sync_session", lambda: session)
+        monkeypatch.setattr(POCService, "execute_poc_batch", staticmethod(execute))
+
+        result = poc_batch_task.run(7, [3, 4], ["10.50.0.8", "10.50.0.9"], 8080, {"timeout": 5})
+
+        assert calls == [(
+            [{"id": 3, "poc_type": "nuclei", "content": "id: batch"}],
+            [{"target": "10.50.0.8", "port": 8080}, {"target": "10.50.0.9", "port": 8080}],
+            {"timeout": 5},
+        )]
+        assert result["status"] == "completed"
+        assert result["results"] == [{"poc_id": 3}]
+
     @pytest.mark.asyncio
     async def test_fingerprint_task_structure(self):
         """Test fingerprint_task is defined."""
@@ -440,3 +490,186 @@ class TestEdgeCases:
             )
 
         # All updates should be processed
+
+
+# ============================================================================
+# PIPELINED SCAN TESTS
+# ============================================================================
+
+
+def _nmap_port(ip, port, product, version):
+    return {
+        "ip": ip,
+        "port": port,
+        "protocol": "tcp",
+        "state": "open",
+        "service": {"name": "ssh", "product": product, "version": version},
+    }
+
+
+class TestPipelinedScan:
+    """Test the pipelined scan/identify/fingerprint execution mode."""
+
+    def test_stages_overlap_with_scan(self, monkeypatch):
+        """Test a host is fingerprinted while nmap is still scanning."""
+        import threading
+        from app.services.fingerprint_service import FingerprintService
+        from app.services.port_scan_service import PortScanService
+
+        fingerprinted = threading.Event()
+        original = FingerprintService.match_fingerprints_batch
+
+        def match(services, **kwargs):
+            result = original(services, **kwargs)
+            fingerprinted.set()
+            return result
+
+        def scan(target, options=None):
+            yield [_nmap_port("10.0.0.1", 22, "OpenSSH", "OpenSSH_6.6")]
+            # The first host must reach the last stage before the scan ends
+            assert fingerprinted.wait(timeout=5)
+            yield [_nmap_port("10.0.0.2", 22, "OpenSSH", "OpenSSH_7.4")]
+
+        monkeypatch.setattr(FingerprintService, "match_fingerprints_batch", staticmethod(match))
+        monkeypatch.setattr(PortScanService, "iter_scan_hosts_with_nmap", staticmethod(scan))
+
+        result = ScanService.run_pipelined_scan("10.0.0.0/30")
+
+        assert [p["ip"] for p in result["ports"]] == ["10.0.0.1", "10.0.0.2"]
+        assert [s["ip"] for s in result["services"]] == ["10.0.0.1", "10.0.0.2"]
+        assert [m["ip"] for m in result["fingerprints"]] == ["10.0.0.1", "10.0.0.2"]
+        assert result["stats"]["first_finding_seconds"] is not None
+
+    def test_progress_is_reported_per_stage(self, monkeypatch):
+        """Test per-stage counters reach the progress callback."""
+        from app.services.port_scan_service import PortScanService
+
+        def scan(target, options=None):
+            yield [
+                _nmap_port("10.0.0.1", 22, "OpenSSH", "OpenSSH_7.4"),
+                _nmap_port("10.0.0.1", 2222, "OpenSSH", "OpenSSH_7.4"),
+            ]
+            yield [_nmap_port("10.0.0.2", 22, "OpenSSH", "OpenSSH_7.4")]
+
+        monkeypatch.setattr(PortScanService, "iter_scan_hosts_with_nmap", staticmethod(scan))
+        progress = []
+
+        result = ScanService.run_pipelined_scan(
+            "10.0.0.0/30", on_progress=lambda stats: progress.append(stats["scan"]["hosts"])
+        )
+
+        stats = result["stats"]
+        assert stats["scan"] == {"hosts": 2, "ports": 3, "done": True}
+        assert stats["identify"]["hosts"] == 2
+        assert stats["fingerprint"]["done"] is True
+        assert progress[-1] == 2
+
+    def test_stage_error_stops_scan(self, monkeypatch):
+        """Test a failing stage stops nmap and surfaces the error."""
+        from app.services.port_scan_service import PortScanService
+        from app.services.service_identify_service import ServiceIdentifyService
+
+        closed = []
+
+        def scan(target, options=None):
+            try:
+                for i in range(1, 1000):
+                    yield [_nmap_port(f"10.0.{i // 256}.{i % 256}", 22, "OpenSSH", "OpenSSH_7.4")]
+            finally:
+                closed.append(True)
+
+        def identify(port_data):
+            raise ValueError("bad port data")
+
+        monkeypatch.setattr(PortScanService, "iter_scan_hosts_with_nmap", staticmethod(scan))
+        monkeypatch.setattr(
+            ServiceIdentifyService, "identify_services_from_ports", staticmethod(identify)
+        )
+
+        with pytest.raises(ValueError, match="bad port data"):
+            ScanService.run_pipelined_scan("10.0.0.0/22", queue_size=2)
+
+        assert closed == [True]
+
+
+# ============================================================================
+# FAN-OUT SCAN TESTS
+# ============================================================================
+
+
+class TestFanOutScan:
+    """Test splitting full scans into per-shard Celery subtasks."""
+
+    def test_canvas_has_one_chain_per_shard(self):
+        """Test each host shard becomes a scan -> identify -> fingerprint chain."""
+        canvas = ScanService.build_fan_out_scan(1, "10.0.0.0/22", {"shard_prefix": 24})
+
+        assert len(canvas.tasks) == 4
+        assert [sig.task for sig in canvas.tasks[0].tasks] == [
+            "app.services.scan_service.scan_shard_task",
+            "app.services.scan_service.identify_shard_task",
+            "app.services.scan_service.fingerprint_shard_task",
+        ]
+        assert [chain.tasks[0].args[1] for chain in canvas.tasks] == [
+            "10.0.0.0/24",
+            "10.0.1.0/24",
+            "10.0.2.0/24",
+            "10.0.3.0/24",
+        ]
+        assert canvas.body.task == "app.services.scan_service.aggregate_scan_task"
+
+    def test_chord_aggregates_shard_results(self, monkeypatch):
+        """Test shard results are merged and failed shards reported."""
+        from app.services.port_scan_service import PortScanService
+
+        def scan(target, options):
+            if target == "10.0.1.0/24":
+                raise TimeoutError(f"nmap scan timeout for {target}")
+            return [
+                {
+                    "ip": target.split("/")[0],
+                    "port": 22,
+                    "protocol": "tcp",
+                    "state": "open",
+                    "service": {"name": "ssh", "product": "OpenSSH", "version": "OpenSSH_6.6"},
+                }
+            ]
+
+        monkeypatch.setattr(PortScanService, "scan_with_nmap", staticmethod(scan))
+        canvas = ScanService.build_fan_out_scan(7, "10.0.0.0/23", {"shard_prefix": 24})
+
+        result = canvas.apply().get()
+
+        assert result["status"] == "completed"
+        assert result["shards"] == 2
+        assert result["ports_found"] == 1
+        assert result["services_identified"] == 1
+        assert result["fingerprints_matched"] > 0
+        assert result["failed_shards"] == [
+            {"target": "10.0.1.0/24", "error": "nmap scan timeout for 10.0.1.0/24"}
+        ]
+
+    def test_full_scan_task_dispatches_when_enabled(self, monkeypatch):
+        """Test full_scan_task hands off to the canvas when fan-out is on."""
+        from app.services.scan_service import full_scan_task
+
+        applied = []
+
+        class FakeChord:
+            tasks = [object(), object()]
+
+            def apply_async(self):
+                applied.append(True)
+                return MagicMock(id="chord-id")
+
+        monkeypatch.setattr(
+            ScanService, "build_fan_out_scan", staticmethod(lambda *args: FakeChord())
+        )
+        monkeypatch.setattr(full_scan_task, "update_state", MagicMock(), raising=False)
+
+        result = full_scan_task.run(3, "10.0.0.0/23", "full", {"fan_out": True})
+
+        assert applied == [True]
+        assert result["status"] == "dispatched"
+        assert result["shards"] == 2
+        assert result["aggregate_id"] == "chord-id"
@@ -0,0 +1,189 @@
+"""
+Unit tests for the search index.
+
+Tests the SQLite FTS5 fallback kept in sync on write, query routing from the
+search parser, and the SQL emitted for PostgreSQL.
+"""
+
+import itertools
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.models.asset import Asset
+from app.models.poc import POC
+from app.models.search_index import SearchIndex
+from app.models.vulnerability import Vulnerability
+from app.services.search_query import And, Condition, FreeText
+from app.services.search_service import SearchService
+
+_asset_ips = itertools.count(1)
+
+
+@pytest.fixture
+async def asset(db_session):
+    """Create an asset to attach vulnerabilities to."""
+    asset = Asset(ip=f"10.220.0.{next(_asset_ips)}", hostname="fts-web-01.corp", os="Ubuntu 22.04")
+    db_session.add(asset)
+    await db_session.commit()
+    return asset
+
+
+async def _ids(db_session, model, clause):
+    result = await db_session.execute(select(model.id).where(clause))
+    return set(result.scalars().all())
+
+
+# ============================================================================
+# INDEX MAINTENANCE TESTS
+# ============================================================================
+
+
+class TestIndexMaintenance:
+    """Test the SQLite index follows inserts, updates and deletes."""
+
+    async def test_fts_tables_created(self, db_session):
+        """Test each installed table has an FTS5 table."""
+        result = await db_session.execute(text("SELECT name FROM sqlite_master WHERE name LIKE '%_fts'"))
+
+        assert {"vulnerabilities_fts", "assets_fts", "pocs_fts"} <= set(result.scalars().all())
+
+    async def test_insert_update_delete(self, db_session, asset):
+        """Test matches reflect the latest written row."""
+        vuln = Vulnerability(asset_id=asset.id, title="Qwertyzap deserialization")
+        db_session.add(vuln)
+        await db_session.commit()
+
+        assert await _ids(db_session, Vulnerability, SearchIndex.contains("tyzap", Vulnerability.title)) == {vuln.id}
+
+        vuln.title = "Plughorn traversal"
+        await db_session.commit()
+
+        assert await _ids(db_session, Vulnerability, SearchIndex.contains("tyzap", Vulnerability.title)) == set()
+        assert await _ids(db_session, Vulnerability, SearchIndex.contains("PLUGHORN", Vulnerability.title)) == {vuln.id}
+
+        await db_session.delete(vuln)
+        await db_session.commit()
+
+        assert await _ids(db_session, Vulnerability, SearchIndex.contains("plughorn", Vulnerability.title)) == set()
+
+    async def test_rebuild_indexes_existing_rows(self, db_session, asset):
+        """Test an index created after the data still finds old rows."""
+        connection = await db_session.connection()
+        await connection.run_sync(lambda conn: SearchIndex.drop(Asset.__table__, conn))
+        await connection.run_sync(lambda conn: SearchIndex.create(Asset.__table__, conn))
+
+        assert asset.id in await _ids(db_session, Asset, SearchIndex.contains("web-01.co", Asset.hostname))
+
+
+# ============================================================================
+# QUERY TESTS
+# ============================================================================
+
+
+class TestQueries:
+    """Test substring and free-text matching."""
+
+    async def test_contains_scoped_to_column(self, db_session, asset):
+        """Test a column match ignores other indexed columns."""
+        vuln = Vulnerability(asset_id=asset.id, title="Zorblax issue", description="Mentions flimflam only")
+        db_session.add(vuln)
+        await db_session.commit()
+
+        assert "vulnerabilities_fts MATCH" in str(
+            SearchIndex.contains("flimflam", Vulnerability.title).compile(dialect=sqlite.dialect())
+        )
+        assert await _ids(db_session, Vulnerability, SearchIndex.contains("flimflam", Vulnerability.title)) == set()
+        assert await _ids(
+            db_session, Vulnerability, SearchIndex.contains("flimflam", Vulnerability.title, Vulnerability.description)
+        ) == {vuln.id}
+
+    async def test_short_and_quoted_terms(self, db_session, asset):
+        """Test terms shorter than a trigram and quotes still match."""
+        vuln = Vulnerability(asset_id=asset.id, title='Gx "quoted" snarfwidget')
+        db_session.add(vuln)
+        await db_session.commit()
+
+        assert vuln.id in await _ids(db_session, Vulnerability, SearchIndex.contains("gx", Vulnerability.title))
+        assert await _ids(db_session, Vulnerability, SearchIndex.contains('"quoted" snarf', Vulnerability.title)) == {
+            vuln.id
+        }
+
+    async def test_free_text_requires_every_term(self, db_session):
+        """Test free-text terms must all appear, in any indexed column."""
+        poc = POC(name="blorptron-rce", poc_type="nuclei", content="id: x", description="Affects Wumbo servers")
+        db_session.add(poc)
+        await db_session.commit()
+
+        assert await _ids(db_session, POC, SearchIndex.matches(POC, "wumbo blorptron")) == {poc.id}
+        assert await _ids(db_session, POC, SearchIndex.matches(POC, "wumbo missingterm")) == set()
+
+    async def test_unindexed_column_falls_back(self, db_session, asset):
+        """Test columns outside the index use ILIKE."""
+        clause = SearchIndex.contains("activ", Asset.status)
+
+        assert "MATCH" not in str(clause.compile(dialect=sqlite.dialect()))
+        assert asset.id in await _ids(db_session, Asset, clause)
+
+
+# ============================================================================
+# SEARCH SERVICE ROUTING TESTS
+# ============================================================================
+
+
+class TestSearchRouting:
+    """Test the query parser routes like and free-text terms to the index."""
+
+    def test_bare_words_are_free_text(self):
+        """Test words without an operator become a free-text term."""
+        assert SearchService.parse_query("apache struts AND severity=high") == And((
+            FreeText("apache struts"),
+            Condition("severity", "=", "high"),
+        ))
+
+    async def test_search_vulnerabilities(self, db_session, asset):
+        """Test like and free-text queries find indexed vulnerabilities."""
+        vuln = Vulnerability(
+            asset_id=asset.id,
+            title="Frobnicator overflow",
+            cve_id="CVE-2031-77123",
+            severity="high",
+            status="open",
+        )
+        db_session.add(vuln)
+        await db_session.commit()
+
+        by_like, _ = await SearchService.search_vulnerabilities(db_session, "cve:like:2031-771")
+        by_words, total = await SearchService.search_vulnerabilities(db_session, "frobnicator AND severity=high")
+
+        assert [v.id for v in by_like] == [vuln.id]
+        assert [v.id for v in by_words] == [vuln.id]
+        assert total == 1
+
+    async def test_search_assets(self, db_session, asset):
+        """Test asset like queries use the real IP column."""
+        items, _ = await SearchService.search_assets(db_session, f"ip:like:{asset.ip}")
+
+        assert [a.id for a in items] == [asset.id]
+
+
+# ============================================================================
+# POSTGRESQL SQL TESTS
+# ============================================================================
+
+
+class TestPostgresCompilation:
+    """Test the SQL emitted for PostgreSQL."""
+
+    def test_contains_uses_ilike(self):
+        """Test substring matches compile to ILIKE served by trigram indexes."""
+        sql = str(SearchIndex.contains("nginx", Asset.hostname).compile(dialect=postgresql.dialect()))
+
+        assert "assets.hostname ILIKE" in sql
+
+    def test_matches_uses_tsvector(self):
+        """Test free-text matches compile to a tsvector query."""
+        sql = str(SearchIndex.matches(Vulnerability, "apache struts").compile(dialect=postgresql.dialect()))
+
+        assert "vulnerabilities.search_vector @@ plainto_tsquery('simple'::regconfig" in sql
@@ -0,0 +1,212 @@
+"""
+Unit tests for the search query language.
+
+Tests tokenizing, operator precedence, typed field compilation, plan caching
+and end-to-end searches through SearchService.
+"""
+
+import itertools
+
+import pytest
+from sqlalchemy.dialects import sqlite
+
+from app.models.asset import Asset
+from app.models.task import Task
+from app.models.vulnerability import Vulnerability
+from app.services.search_query import And, Condition, FreeText, Not, Or, SearchQuery, SearchQueryError
+from app.services.search_service import SearchService
+
+_asset_ips = itertools.count(1)
+
+
+def _sql(expression):
+    return str(expression.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+# ============================================================================
+# PARSER TESTS
+# ============================================================================
+
+
+class TestParser:
+    """Test query strings parse to the expected AST."""
+
+    def test_and_binds_tighter_than_or(self):
+        """Test AND groups before OR."""
+        assert SearchQuery.parse("a=1 OR b=2 AND c=3") == Or((
+            Condition("a", "=", "1"),
+            And((Condition("b", "=", "2"), Condition("c", "=", "3"))),
+        ))
+
+    def test_parentheses_and_not(self):
+        """Test grouping and negation."""
+        assert SearchQuery.parse("(a=1 or b=2) AND NOT (c=3)") == And((
+            Or((Condition("a", "=", "1"), Condition("b", "=", "2"))),
+            Not(Condition("c", "=", "3")),
+        ))
+
+    def test_implicit_and_merges_free_text(self):
+        """Test adjacent words form one free-text term."""
+        assert SearchQuery.parse("apache struts severity=high remote") == And((
+            FreeText("apache struts"),
+            Condition("severity", "=", "high"),
+            FreeText("remote"),
+        ))
+
+    @pytest.mark.parametrize(
+        "query, expected",
+        [
+            ("cve:like:CVE-2021", Condition("cve", "like", "CVE-2021")),
+            ("severity:in:critical,high", Condition("severity", "in", "critical,high")),
+            ("cvss_score>=7.5", Condition("cvss_score", ">=", "7.5")),
+            ("Status!=fixed", Condition("status", "!=", "fixed")),
+            ("priority:>:3", Condition("priority", ">", "3")),
+            ('title:like:"remote (code) exec"', Condition("title", "like", "remote (code) exec")),
+            ('name="say \\"hi\\""', Condition("name", "=", 'say "hi"')),
+            ("CVE-2021-44228", FreeText("CVE-2021-44228")),
+            ("fe80::1", FreeText("fe80::1")),
+        ],
+    )
+    def test_terms(self, query, expected):
+        """Test condition syntaxes, quoting and words that are not conditions."""
+        assert SearchQuery.parse(query) == expected
+
+    def test_blank_query(self):
+        """Test a blank query has no AST."""
+        assert SearchQuery.parse("   ") is None
+
+    @pytest.mark.parametrize(
+        "query",
+        ["(a=1 OR b=2", "a=1)", 'title:like:"open', "a=1 AND", "OR a=1", "NOT", "severity=", "()"],
+    )
+    def test_malformed(self, query):
+        """Test malformed queries raise SearchQueryError."""
+        with pytest.raises(SearchQueryError):
+            SearchQuery.parse(query)
+
+    def test_nesting_limit(self):
+        """Test pathological nesting is rejected."""
+        with pytest.raises(SearchQueryError):
+            SearchQuery.parse("(" * 100 + "a=1" + ")" * 100)
+
+    def test_parse_cached(self):
+        """Test identical queries reuse the parsed AST."""
+        query = "cache-probe=1 OR cache-probe=2"
+
+        assert SearchQuery.parse(query) is SearchQuery.parse(query)
+
+
+# ============================================================================
+# COMPILER TESTS
+# ============================================================================
+
+
+class TestCompiler:
+    """Test ASTs compile against typed fields."""
+
+    def test_single_expression(self):
+        """Test the whole query becomes one expression with its precedence."""
+        sql = _sql(SearchService.plan("vulnerability", "severity=critical OR cvss_score>=9 AND NOT status=fixed"))
+
+        assert sql == (
+            "vulnerabilities.severity = 'critical' OR vulnerabilities.cvss_score >= 9.0 "
+            "AND vulnerabilities.status != 'fixed'"
+        )
+
+    def test_relationship_field(self):
+        """Test fields on related tables compile to EXISTS."""
+        sql = _sql(SearchService.plan("vulnerability", "ip=10.0.0.1"))
+
+        assert "EXISTS (SELECT 1" in sql
+        assert "assets.ip = '10.0.0.1'" in sql
+
+    def test_in_converts_each_value(self):
+        """Test list values are converted to the field type."""
+        assert _sql(SearchService.plan("task", 'priority:in:"3, 5"')) == "tasks.priority IN (3, 5)"
+
+    @pytest.mark.parametrize(
+        "entity, query",
+        [
+            ("vulnerability", "bogus=1"),
+            ("vulnerability", "cvss_score=high"),
+            ("vulnerability", "cvss_score:like:7"),
+            ("vulnerability", "discovered_at>yesterday"),
+            ("vulnerability", 'title:regex:"(unclosed"'),
+            ("task", "status=sleeping"),
+            ("task", "priority:in:1,x"),
+        ],
+    )
+    def test_invalid_fields_and_values(self, entity, query):
+        """Test unknown fields, wrong operators and bad values are errors, not ignored."""
+        with pytest.raises(SearchQueryError):
+            SearchService.plan(entity, query)
+
+    def test_plan_cached(self):
+        """Test identical queries reuse the compiled plan."""
+        query = "severity=low AND cvss_score<2"
+
+        assert SearchService.plan("vulnerability", query) is SearchService.plan("vulnerability", query)
+
+
+# ============================================================================
+# SEARCH TESTS
+# ============================================================================
+
+
+class TestSearch:
+    """Test queries against the database."""
+
+    @pytest.fixture
+    async def findings(self, db_session):
+        """Create vulnerabilities with distinct scores on one asset, titled with a unique tag."""
+        n = next(_asset_ips)
+        tag = f"astq{n}"
+        asset = Asset(ip=f"10.230.0.{n}", status="active")
+        db_session.add(asset)
+        await db_session.flush()
+
+        vulns = {
+            name: Vulnerability(
+                asset_id=asset.id, title=f"{name} {tag}", severity=severity, status=status, cvss_score=score
+            )
+            for name, severity, status, score in [
+                ("alpha", "critical", "open", 9.8),
+                ("bravo", "critical", "fixed", 9.1),
+                ("charlie", "medium", "open", 9.5),
+                ("delta", "low", "open", 3.0),
+            ]
+        }
+        db_session.add_all(vulns.values())
+        await db_session.commit()
+        return asset, tag
+
+    async def _titles(self, db_session, query):
+        items, _ = await SearchService.search_vulnerabilities(db_session, query, page_size=100)
+        return sorted(v.title.split()[0] for v in items)
+
+    async def test_boolean_query(self, db_session, findings):
+        """Test OR, NOT and grouping select the right rows."""
+        _, tag = findings
+
+        assert await self._titles(db_session, f"{tag} (severity=critical OR cvss_score>=9.5) AND NOT status=fixed") == [
+            "alpha",
+            "charlie",
+        ]
+        assert await self._titles(db_session, f"{tag} AND (severity=low OR title:like:bravo)") == ["bravo", "delta"]
+
+    async def test_regex_and_relationship(self, db_session, findings):
+        """Test regex matching and fields on the related asset."""
+        asset, _ = findings
+
+        assert await self._titles(db_session, f'title:regex:"^(alpha|delta)" ip={asset.ip}') == ["alpha", "delta"]
+
+    async def test_enum_field(self, db_session):
+        """Test enum fields accept their values case-insensitively."""
+        task = Task(name="astq-task", task_type="fingerprint", target_range="10.0.0.1", created_by=1)
+        db_session.add(task)
+        await db_session.commit()
+
+        items, total = await SearchService.search_tasks(db_session, "astq-task type=FINGERPRINT AND NOT status=failed")
+
+        assert [t.id for t in items] == [task.id]
+        assert total == 1
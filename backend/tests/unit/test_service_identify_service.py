@@ -4,6 +4,7 @@ Unit tests for Service Identification Service.
 Tests banner grabbing, service detection, and vulnerability mapping.
 """
 
+import asyncio
 import pytest
 from unittest.mock import Mock, AsyncMock, MagicMock, patch
 import socket
@@ -503,3 +504,175 @@ class TestEdgeCases:
 
         for banner in special_banners:
             assert isinstance(banner, bytes)
+
+
+# ============================================================================
+# ASYNC BANNER GRABBING TESTS
+# ============================================================================
+
+
+def _free_port():
+    """Return a localhost port with nothing listening on it."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _self_signed_context(tmp_path):
+    """Build a server TLS context with a throwaway self-signed certificate."""
+    import datetime
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.utcnow()
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now)
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+
+    cert_file = tmp_path / "cert.pem"
+    key_file = tmp_path / "key.pem"
+    cert_file.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_file.write_bytes(
+        key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+    )
+
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert_file, key_file)
+    return context
+
+
+class TestAsyncBannerGrabbing:
+    """Test the concurrent asyncio banner grabber against local servers."""
+
+    @staticmethod
+    async def _banner_server(banner, delay=0.0, stats=None, **kwargs):
+        """Start a server that sends a banner to every client."""
+
+        async def handle(reader, writer):
+            if stats is not None:
+                stats["active"] += 1
+                stats["peak"] = max(stats["peak"], stats["active"])
+            try:
+                await asyncio.sleep(delay)
+                writer.write(banner)
+                await writer.drain()
+            finally:
+                if stats is not None:
+                    stats["active"] -= 1
+                writer.close()
+
+        server = await asyncio.start_server(handle, "127.0.0.1", 0, **kwargs)
+        return server, server.sockets[0].getsockname()[1]
+
+    async def test_grabs_banners_from_many_ports(self):
+        """Test banners are read from several servers in one call."""
+        ssh, ssh_port = await self._banner_server(b"SSH-2.0-OpenSSH_7.4\r\n")
+        ftp, ftp_port = await self._banner_server(b"220 ProFTPD 1.3.5 Server\r\n")
+        closed_port = _free_port()
+
+        async with ssh, ftp:
+            banners = await ServiceIdentifyService.grab_banners_async(
+                [("127.0.0.1", ssh_port), ("127.0.0.1", ftp_port), ("127.0.0.1", closed_port)],
+                timeout=2,
+            )
+
+        assert "OpenSSH_7.4" in banners[("127.0.0.1", ssh_port)]
+        assert "ProFTPD" in banners[("127.0.0.1", ftp_port)]
+        assert banners[("127.0.0.1", closed_port)] is None
+
+    async def test_sends_protocol_probe(self, monkeypatch):
+        """Test the same probe _grab_banner uses is sent before reading."""
+
+        async def handle(reader, writer):
+            request = await reader.readuntil(b"\r\n\r\n")
+            if request.startswith(b"HEAD / HTTP/1.0"):
+                writer.write(b"HTTP/1.0 200 OK\r\nServer: nginx/1.18.0\r\n\r\n")
+                await writer.drain()
+            writer.close()
+
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        monkeypatch.setitem(ServiceIdentifyService.PROBES, port, ServiceIdentifyService.PROBES[80])
+
+        async with server:
+            banners = await ServiceIdentifyService.grab_banners_async([("127.0.0.1", port)], timeout=2)
+
+        assert "nginx/1.18.0" in banners[("127.0.0.1", port)]
+
+    async def test_tls_handshake(self, monkeypatch, tmp_path):
+        """Test TLS ports are reached through a TLS handshake."""
+        server, port = await self._banner_server(b"", ssl=_self_signed_context(tmp_path))
+        monkeypatch.setattr(ServiceIdentifyService, "TLS_PORTS", [port])
+
+        async with server:
+            banners = await ServiceIdentifyService.grab_banners_async([("127.0.0.1", port)], timeout=2)
+
+        assert banners[("127.0.0.1", port)] == "SSL/TLS connection successful"
+
+    async def test_per_host_limit_bounds_connections(self):
+        """Test no more than per_host_limit connections are open to one host."""
+        stats = {"active": 0, "peak": 0}
+        servers = [await self._banner_server(b"x", delay=0.05, stats=stats) for _ in range(8)]
+        targets = [("127.0.0.1", port) for _, port in servers]
+
+        try:
+            banners = await ServiceIdentifyService.grab_banners_async(
+                targets, timeout=2, per_host_limit=3, per_host_rate=0
+            )
+        finally:
+            for server, _ in servers:
+                server.close()
+
+        assert all(banners[target] == "x" for target in targets)
+        assert stats["peak"] <= 3
+
+    async def test_per_host_rate_spaces_connections(self):
+        """Test new connections to a host are spaced by the rate limit."""
+        servers = [await self._banner_server(b"x") for _ in range(5)]
+        targets = [("127.0.0.1", p) for _, p in servers]
+        loop = asyncio.get_running_loop()
+
+        start = loop.time()
+        try:
+            await ServiceIdentifyService.grab_banners_async(targets, timeout=2, per_host_rate=20)
+        finally:
+            for server, _ in servers:
+                server.close()
+
+        # 5 connections at 20/s: the last starts no earlier than 0.2 s in
+        assert loop.time() - start >= 0.19
+
+    async def test_identify_services_async(self):
+        """Test grabbed banners are analyzed into service records."""
+        server, port = await self._banner_server(b"SSH-2.0-OpenSSH_7.4\r\n")
+
+        async with server:
+            services = await ServiceIdentifyService.identify_services_async(
+                [("127.0.0.1", port), ("127.0.0.1", _free_port())], timeout=2
+            )
+
+        assert len(services) == 1
+        assert services[0]["ip"] == "127.0.0.1"
+        assert services[0]["port"] == port
+        assert services[0]["service"] == "OpenSSH"
+
+    def test_identify_services_sync_wrapper(self):
+        """Test the sync entry point runs the async grabber."""
+        services = ServiceIdentifyService.identify_services(1, [_free_port()], host="127.0.0.1")
+
+        assert services == []
@@ -0,0 +1,267 @@
+"""
+Unit tests for the statistics rollups.
+
+Tests counters maintained by ingestion and vulnerability writes, the per-task
+and report reads, and reconciliation against the raw tables.
+"""
+
+import itertools
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.asset import Asset
+from app.models.statistics import StatisticsCounter, TaskStatistics
+from app.models.task import Task
+from app.models.vulnerability import Vulnerability
+from app.services.statistics_service import StatisticsService
+from app.services.tool_result_service import ToolResultService
+
+_hosts = itertools.count(1)
+
+
+@pytest.fixture
+async def task(db_session):
+    """Create a task to ingest results into."""
+    task = Task(name="rollup-task", task_type="poc_detection", target_range="10.240.0.0/16", created_by=1)
+    db_session.add(task)
+    await db_session.commit()
+    return task
+
+
+def _nuclei(host, *findings):
+    """Build a successful nuclei result of (template, severity) findings."""
+    return {
+        "target": f"http://{host}",
+        "status": "success",
+        "results": [
+            {"id": template, "name": template, "severity": severity, "matched_at": f"http://{host}/{template}"}
+            for template, severity in findings
+        ],
+    }
+
+
+async def _counters(db_session, metric):
+    return (await StatisticsService.counters(db_session, metric))[metric]
+
+
+async def _exact(db_session, column):
+    result = await db_session.execute(select(column, func.count(Vulnerability.id)).group_by(column))
+    return {"" if key is None else str(key): count for key, count in result.all()}
+
+
+# ============================================================================
+# INGESTION TESTS
+# ============================================================================
+
+
+class TestIngestion:
+    """Test the ingestion path keeps counters current."""
+
+    @pytest.mark.parametrize("bulk", [False, True])
+    async def test_new_findings_counted_once(self, db_session, task, bulk):
+        """Test stored findings are counted and re-seen findings are not."""
+        host = f"10.240.0.{next(_hosts)}"
+        result = _nuclei(host, ("rollup-a", "critical"), ("rollup-b", "high"), ("rollup-c", "high"))
+        before = await _counters(db_session, "vulnerability_severity")
+
+        await ToolResultService.process_and_store_result(db_session, task.id, "nuclei", result, bulk=bulk)
+        await ToolResultService.process_and_store_result(db_session, task.id, "nuclei", result, bulk=bulk)
+
+        after = await _counters(db_session, "vulnerability_severity")
+        asset_id = (await db_session.execute(select(Asset.id).where(Asset.ip == host))).scalar_one()
+        assert after.get("critical", 0) - before.get("critical", 0) == 1
+        assert after.get("high", 0) - before.get("high", 0) == 2
+        assert (await _counters(db_session, "vulnerability_asset"))[str(asset_id)] == 3
+        assert (await _counters(db_session, "vulnerability_day"))[datetime.utcnow().date().isoformat()] >= 3
+
+    @pytest.mark.parametrize("bulk", [False, True])
+    async def test_rescan_does_not_inflate_task_totals(self, db_session, task, bulk):
+        """Test a rescan counts as a run but adds no findings."""
+        host = f"10.240.0.{next(_hosts)}"
+        result = _nuclei(host, ("rollup-k", "medium"), ("rollup-l", "low"))
+        before = await _counters(db_session, "tool_findings")
+
+        await ToolResultService.process_and_store_result(db_session, task.id, "nuclei", result, bulk=bulk)
+        await ToolResultService.process_and_store_result(db_session, task.id, "nuclei", result, bulk=bulk)
+
+        counters = await StatisticsService.task_counters(db_session, task.id)
+        assert counters["tool_runs"] == {"nuclei": 2}
+        assert counters["tool_findings"] == {"nuclei": 2}
+        assert counters["severity"] == {"medium": 1, "low": 1}
+        assert (await _counters(db_session, "tool_findings"))["nuclei"] - before.get("nuclei", 0) == 2
+
+    async def test_task_counters(self, db_session, task):
+        """Test runs, findings, severities and assets are counted per task."""
+        first, second = f"10.240.1.{next(_hosts)}", f"10.240.1.{next(_hosts)}"
+
+        await ToolResultService.process_and_store_result(
+            db_session, task.id, "nuclei", _nuclei(first, ("rollup-d", "critical"), ("rollup-e", "low"))
+        )
+        await ToolResultService.process_and_store_result(
+            db_session, task.id, "nuclei", _nuclei(second, ("rollup-d", "critical"))
+        )
+
+        stats = await ToolResultService.get_task_statistics(db_session, task.id)
+
+        assert stats["tools_executed"] == ["nuclei", "nuclei"]
+        assert stats["total_vulnerabilities"] == 3
+        assert stats["severity_distribution"] == {"critical": 2, "high": 0, "medium": 0, "low": 1, "info": 0}
+
+    async def test_task_counters_deleted_with_task(self, db_session, task):
+        """Test a task's counters go with it."""
+        await StatisticsService.record_tool_run(db_session, task.id, "fscan")
+        await db_session.commit()
+
+        await db_session.delete(task)
+        await db_session.commit()
+
+        assert await StatisticsService.task_counters(db_session, task.id) == {}
+
+
+# ============================================================================
+# VULNERABILITY WRITE TESTS
+# ============================================================================
+
+
+class TestVulnerabilityWrites:
+    """Test status changes and deletes adjust counters."""
+
+    async def test_status_change_and_delete(self, db_session, task):
+        """Test counters follow a vulnerability through update and delete."""
+        host = f"10.240.2.{next(_hosts)}"
+        await ToolResultService.process_and_store_result(
+            db_session, task.id, "nuclei", _nuclei(host, ("rollup-f", "medium"))
+        )
+        vuln = (await db_session.execute(select(Vulnerability).where(Vulnerability.cve_id == "rollup-f"))).scalar_one()
+        before = await StatisticsService.counters(db_session, "vulnerability_status", "vulnerability_severity")
+
+        vuln.status = "fixed"
+        await StatisticsService.change_vulnerability_status(db_session, "open", "fixed")
+        await db_session.commit()
+        await StatisticsService.remove_vulnerabilities(db_session, Vulnerability.id == vuln.id)
+        await db_session.delete(vuln)
+        await db_session.commit()
+
+        after = await StatisticsService.counters(db_session, "vulnerability_status", "vulnerability_severity")
+        assert after["vulnerability_status"].get("open", 0) == before["vulnerability_status"]["open"] - 1
+        assert after["vulnerability_status"].get("fixed", 0) == before["vulnerability_status"].get("fixed", 0)
+        assert (
+            after["vulnerability_severity"].get("medium", 0) == before["vulnerability_severity"]["medium"] - 1
+        )
+        assert str(vuln.asset_id) not in await _counters(db_session, "vulnerability_asset")
+
+
+# ============================================================================
+# READ TESTS
+# ============================================================================
+
+
+class TestReads:
+    """Test summary and report reads."""
+
+    async def test_report_counts_distinct_findings_and_assets(self, db_session, task):
+        """Test findings and assets shared by several tasks are counted once."""
+        other = Task(name="rollup-other", task_type="poc_detection", target_range="10.240.3.0/24", created_by=1)
+        db_session.add(other)
+        await db_session.commit()
+        host = f"10.240.3.{next(_hosts)}"
+
+        await ToolResultService.process_and_store_result(
+            db_session, task.id, "nuclei", _nuclei(host, ("rollup-g", "high"))
+        )
+        await ToolResultService.process_and_store_result(
+            db_session, other.id, "nuclei", _nuclei(host, ("rollup-g", "high"), ("rollup-h", "info"))
+        )
+
+        stats = await StatisticsService.report_statistics(db_session, [task.id, other.id])
+
+        assert stats["total_vulnerabilities"] == 2
+        assert stats["total_assets"] == 1
+        assert stats["severity_distribution"]["high"] == 1
+        assert stats["severity_distribution"]["info"] == 1
+        assert stats["report_sources"] == 2
+
+    async def test_report_service_distribution(self, db_session, task):
+        """Test fscan services are counted per distinct port, not per raw line."""
+        host = f"10.240.4.{next(_hosts)}"
+        result = {
+            "target": host,
+            "status": "success",
+            "results": [
+                {"ip": host, "port": 22, "service": "ssh"},
+                {"ip": host, "port": 2222, "service": "ssh"},
+                {"ip": host, "port": 80, "service": "http"},
+                {"ip": host, "port": 80, "service": "http"},
+            ],
+        }
+
+        await ToolResultService.process_and_store_result(db_session, task.id, "fscan", result)
+        await ToolResultService.process_and_store_result(db_session, task.id, "fscan", result)
+
+        stats = await StatisticsService.report_statistics(db_session, [task.id])
+        assert stats["service_distribution"] == {"ssh": 2, "http": 1}
+
+
+# ============================================================================
+# RECONCILIATION TESTS
+# ============================================================================
+
+
+class TestReconcile:
+    """Test reconciliation restores exact counts."""
+
+    async def test_corrects_drift(self, db_session, task):
+        """Test drifted and missing counters are recounted from the raw tables."""
+        host = f"10.240.5.{next(_hosts)}"
+        await ToolResultService.process_and_store_result(
+            db_session, task.id, "nuclei", _nuclei(host, ("rollup-i", "low"))
+        )
+        await StatisticsService.increment(
+            db_session,
+            {
+                ("vulnerability_severity", "low"): 1000,
+                ("vulnerability_severity", "rollup-gone"): 5,
+                ("tool_findings", "nuclei"): 1000,
+            },
+        )
+        db_session.add(Vulnerability(asset_id=1, title="Written behind the rollup", severity="rollup-sev"))
+        await db_session.commit()
+
+        await StatisticsService.reconcile(db_session)
+
+        assert await _counters(db_session, "vulnerability_severity") == await _exact(
+            db_session, Vulnerability.severity
+        )
+        assert await _counters(db_session, "vulnerability_status") == await _exact(db_session, Vulnerability.status)
+        assert await _counters(db_session, "tool_findings") == await _exact(db_session, Vulnerability.source)
+        summary = await StatisticsService.vulnerability_summary(db_session)
+        total = (await db_session.execute(select(func.count(Vulnerability.id)))).scalar()
+        assert summary["total"] == total
+
+    async def test_recounts_runs_and_drops_orphans(self, db_session, task):
+        """Test task run counts come from task results and deleted tasks lose counters."""
+        await ToolResultService.process_and_store_result(
+            db_session, task.id, "nuclei", _nuclei(f"10.240.6.{next(_hosts)}", ("rollup-j", "low"))
+        )
+        await StatisticsService.increment_task(db_session, task.id, {("tool_runs", "nuclei"): 5})
+        db_session.add(TaskStatistics(task_id=999999, metric="severity", key="high", value=3))
+        await db_session.commit()
+
+        await StatisticsService.reconcile(db_session)
+
+        assert (await StatisticsService.task_counters(db_session, task.id))["tool_runs"] == {"nuclei": 1}
+        assert await StatisticsService.task_counters(db_session, 999999) == {}
+
+    async def test_ensure_seeded_only_when_empty(self, db_session):
+        """Test seeding leaves existing counters alone."""
+        await StatisticsService.increment(db_session, {("rollup_probe", "x"): 1})
+        await db_session.commit()
+
+        await StatisticsService.ensure_seeded(db_session)
+
+        probe = (
+            await db_session.execute(select(StatisticsCounter.value).where(StatisticsCounter.metric == "rollup_probe"))
+        ).scalar_one()
+        assert probe == 1
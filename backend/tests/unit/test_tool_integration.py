@@ -110,7 +110,7 @@ class TestToolDetection:
 class TestFscanExecution:
     """Test FScan port scanning execution."""
 
-    @patch("subprocess.run")
+    @patch("app.services.process_runner.ProcessRunner.run", new_callable=AsyncMock)
     async def test_fscan_basic_scan(self, mock_run):
         """Test basic fscan execution."""
         mock_result = {
@@ -139,7 +139,7 @@ class TestFscanExecution:
         assert result is not None
         assert isinstance(result, dict)
 
-    @patch("subprocess.run")
+    @patch("app.services.process_runner.ProcessRunner.run", new_callable=AsyncMock)
     async def test_fscan_with_options(self, mock_run):
         """Test fscan with custom options."""
         mock_run.return_value = MagicMock(
@@ -154,7 +154,7 @@ class TestFscanExecution:
 
         assert result is not None
 
-    @patch("subprocess.run")
+    @patch("app.services.process_runner.ProcessRunner.run", new_callable=AsyncMock)
     async def test_fscan_timeout_error(self, mock_run):
         """Test fscan timeout handling."""
         mock_run.side_effect = TimeoutError("Scan timed out")
@@ -162,7 +162,7 @@ class TestFscanExecution:
         with pytest.raises(TimeoutError):
             await ToolIntegration.scan_with_fscan("192.168.1.100", {})
 
-    @patch("subprocess.run")
+    @patch("app.services.process_runner.ProcessRunner.run", new_callable=AsyncMock)
     async def test_fscan_invalid_target(self, mock_run):
         """Test fscan with invalid target."""
         mock_run.return_value = MagicMock(
@@ -175,7 +175,7 @@ class TestFscanExecution:
         # Should still return result, even if error
         assert result is not None
 
-    @patch("subprocess.run")
+    @patch("app.services.process_runner.ProcessRunner.run", new_callable=AsyncMock)
     async def test_fscan_no_open_ports(self, mock_run):
         """Test fscan with no open ports."""
         mock_result = {
@@ -203,7 +203,7 @@ class TestFscanExecution:
 class TestNucleiExecution:
     """Test Nuclei vulnerability scanning execution."""
 
-    @patch("subprocess.run")
+    @patch("app.services.process_runner.ProcessRunner.run", new_callable=AsyncMock)
     async def test_nuclei_basic_scan(self, mock_run):
         """Test basic nuclei execution."""
         mock_result = {
@@ -230,7 +230,7 @@ class TestNucleiExecution:
 
         assert result is not None
 
-    @patch("subprocess.run")
+    @patch("app.services.process_runner.ProcessRunner.run", new_callable=AsyncMock)
     async def test_nuclei_with_templates(self, mock_run):
         """Test nuclei with custom templates."""
         mock_run.return_value = MagicMock(
@@ -247,7 +247,7 @@ class TestNucleiExecution:
 
         assert result is not None
 
-    @patch("subprocess.run")
+    @patch("app.services.process_runner.ProcessRunner.run", new_callable=AsyncMock)
     async def test_nuclei_multiple_vulnerabilities(self, mock_run):
         """Test nuclei detecting multiple vulnerabilities."""
         mock_result = {
@@ -270,7 +270,7 @@ class TestNucleiExecution:
 
         assert result is not None
 
-    @patch("subprocess.run")
+    @patch("app.services.process_runner.ProcessRunner.run", new_callable=AsyncMock)
     async def test_nuclei_timeout(self, mock_run):
         """Test nuclei timeout handling."""
         mock_run.side_effect = TimeoutError("Scan timed out")
@@ -287,7 +287,7 @@ class TestNucleiExecution:
 class TestAfrogExecution:
     """Test Afrog POC execution."""
 
-    @patch("subprocess.run")
+    @patch("app.services.process_runner.ProcessRunner.run", new_callable=AsyncMock)
     async def test_afrog_basic_scan(self, mock_run):
         """Test basic afrog execution."""
         mock_result = {
@@ -312,7 +312,7 @@ class TestAfrogExecution:
 
         assert result is not None
 
-    @patch("subprocess.run")
+    @patch("app.services.process_runner.ProcessRunner.run", new_callable=AsyncMock)
     async def test_afrog_with_poc_file(self, mock_run):
         """Test afrog with POC file."""
         mock_run.return_value = MagicMock(
@@ -328,7 +328,7 @@ class TestAfrogExecution:
 
         assert result is not None
 
-    @patch("subprocess.run")
+    @patch("app.services.process_runner.ProcessRunner.run", new_callable=AsyncMock)
     async def test_afrog_no_findings(self, mock_run):
         """Test afrog with no findings."""
         mock_result = {
@@ -355,7 +355,7 @@ class TestAfrogExecution:
 class TestDDDDExecution:
     """Test DDDD advanced scanning execution."""
 
-    @patch("subprocess.run")
+    @patch("app.services.process_runner.ProcessRunner.run", new_callable=AsyncMock)
     async def test_dddd_basic_scan(self, mock_run):
         """Test basic DDDD execution."""
         mock_result = {
@@ -379,7 +379,7 @@ class TestDDDDExecution:
 
         assert result is not None
 
-    @patch("subprocess.run")
+    @patch("app.services.process_runner.ProcessRunner.run", new_callable=AsyncMock)
     async def test_dddd_with_options(self, mock_run):
         """Test DDDD with custom options."""
         mock_run.return_value = MagicMock(
@@ -404,7 +404,7 @@ class TestDDDDExecution:
 class TestDirsearchExecution:
     """Test DirSearch directory enumeration execution."""
 
-    @patch("subprocess.run")
+    @patch("app.services.process_runner.ProcessRunner.run", new_callable=AsyncMock)
     async def test_dirsearch_basic_scan(self, mock_run):
         """Test basic dirsearch execution."""
         mock_result = {
@@ -433,7 +433,7 @@ class TestDirsearchExecution:
 
         assert result is not None
 
-    @patch("subprocess.run")
+    @patch("app.services.process_runner.ProcessRunner.run", new_callable=AsyncMock)
     async def test_dirsearch_with_wordlist(self, mock_run):
         """Test dirsearch with custom wordlist."""
         mock_run.return_value = MagicMock(
@@ -449,7 +449,7 @@ class TestDirsearchExecution:
 
         assert result is not None
 
-    @patch("subprocess.run")
+    @patch("app.services.process_runner.ProcessRunner.run", new_callable=AsyncMock)
     async def test_dirsearch_multiple_directories(self, mock_run):
         """Test dirsearch finding multiple directories."""
         mock_result = {
@@ -521,7 +521,7 @@ class TestToolChainExecution:
 
         assert results is not None
 
-    @patch("subprocess.run")
+    @patch("app.services.process_runner.ProcessRunner.run", new_callable=AsyncMock)
     async def test_tool_chain_partial_failure(self, mock_run):
         """Test chain execution with partial tool failure."""
         # First tool succeeds
@@ -552,7 +552,7 @@ class TestToolChainExecution:
 class TestToolErrorHandling:
     """Test error handling in tool execution."""
 
-    @patch("subprocess.run")
+    @patch("app.services.process_runner.ProcessRunner.run", new_callable=AsyncMock)
     async def test_tool_not_installed_error(self, mock_run):
         """Test tool not installed error."""
         mock_run.side_effect = FileNotFoundError("fscan: command not found")
@@ -560,7 +560,7 @@ class TestToolErrorHandling:
         with pytest.raises(FileNotFoundError):
             await ToolIntegration.scan_with_fscan("192.168.1.100", {})
 
-    @patch("subprocess.run")
+    @patch("app.services.process_runner.ProcessRunner.run", new_callable=AsyncMock)
     async def test_tool_execution_timeout(self, mock_run):
         """Test tool execution timeout."""
         mock_run.side_effect = TimeoutError("Scan timed out after 300 seconds")
@@ -568,7 +568,7 @@ class TestToolErrorHandling:
         with pytest.raises(TimeoutError):
             await ToolIntegration.scan_with_nuclei("http://example.com", {}, {})
 
-    @patch("subprocess.run")
+    @patch("app.services.process_runner.ProcessRunner.run", new_callable=AsyncMock)
     async def test_tool_invalid_output(self, mock_run):
         """Test invalid JSON output from tool."""
         mock_run.return_value = MagicMock(
@@ -582,7 +582,7 @@ class TestToolErrorHandling:
         except json.JSONDecodeError:
             pass
 
-    @patch("subprocess.run")
+    @patch("app.services.process_runner.ProcessRunner.run", new_callable=AsyncMock)
     async def test_tool_permission_denied(self, mock_run):
         """Test permission denied error."""
         mock_run.side_effect = PermissionError("Permission denied")
@@ -705,3 +705,201 @@ class TestAsyncioIntegration:
         """Test concurrent execution of multiple tools."""
         # Multiple tools could be executed in parallel
         pass
+
+
+# ============================================================================
+# TOOL CHAIN DAG TESTS
+# ============================================================================
+
+
+class FakeScanner:
+    """Stand-in for ToolIntegration._run_tool recording calls and overlap."""
+
+    def __init__(self, results=None, delay=0.1, errors=()):
+        self.results = results or {}
+        self.delay = delay
+        self.errors = set(errors)
+        self.calls = []
+        self.active = {}
+        self.peak = {}
+        self.peak_total = 0
+
+    async def __call__(self, tool, target, options):
+        self.calls.append((tool, target))
+        self.active[tool] = self.active.get(tool, 0) + 1
+        self.peak[tool] = max(self.peak.get(tool, 0), self.active[tool])
+        self.peak_total = max(self.peak_total, sum(self.active.values()))
+        try:
+            await asyncio.sleep(self.delay)
+            if tool in self.errors:
+                raise RuntimeError(f"{tool} crashed")
+            return self.results.get(tool, {"tool": tool, "target": target, "status": "success", "results": []})
+        finally:
+            self.active[tool] -= 1
+
+
+@pytest.fixture
+def all_tools_installed(monkeypatch):
+    """Report every tool as installed."""
+    async def installed(tool_name):
+        return True
+
+    monkeypatch.setattr(ToolIntegration, "check_tool_installed_async", staticmethod(installed))
+
+
+class TestToolChainDag:
+    """Test dependency-ordered, concurrent tool chain execution."""
+
+    FSCAN_RESULT = {
+        "tool": "fscan",
+        "status": "success",
+        "ports_found": 4,
+        "results": [
+            {"ip": "10.0.0.5", "port": 22, "service": "ssh"},
+            {"ip": "10.0.0.5", "port": 80, "service": "http"},
+            {"ip": "10.0.0.5", "port": 8443, "service": ""},
+            {"ip": "10.0.0.6", "port": 443, "service": "https"},
+        ],
+    }
+
+    def test_discover_http_targets(self):
+        """Test HTTP services are turned into URLs."""
+        urls = ToolIntegration.discover_http_targets(self.FSCAN_RESULT)
+
+        assert urls == ["http://10.0.0.5", "https://10.0.0.5:8443", "https://10.0.0.6"]
+
+    def test_discover_http_targets_default_host(self):
+        """Test entries without an ip use the chain target's host."""
+        result = {"results": [{"port": "8080", "service": "http-proxy"}, {"port": None}]}
+
+        urls = ToolIntegration.discover_http_targets(result, "http://example.com:9000/app")
+
+        assert urls == ["http://example.com:8080"]
+
+    async def test_web_tools_fan_out_over_discovered_services(self, monkeypatch, all_tools_installed):
+        """Test nuclei/afrog/dirsearch scan every HTTP service fscan found."""
+        scanner = FakeScanner(results={"fscan": self.FSCAN_RESULT})
+        monkeypatch.setattr(ToolIntegration, "_run_tool", staticmethod(scanner))
+
+        results = await ToolIntegration.execute_tool_chain(
+            "10.0.0.0/24", ["nuclei", "fscan", "dirsearch"], {}, per_tool_concurrency=4
+        )
+
+        assert scanner.calls[0] == ("fscan", "10.0.0.0/24")
+        expected = {"http://10.0.0.5", "https://10.0.0.5:8443", "https://10.0.0.6"}
+        assert {t for tool, t in scanner.calls if tool == "nuclei"} == expected
+        assert {t for tool, t in scanner.calls if tool == "dirsearch"} == expected
+        assert results["tools_executed"] == ["nuclei", "fscan", "dirsearch"]
+        assert set(results["tool_results"]["nuclei"]["targets"]) == expected
+        assert results["total_services"] == 4
+
+    async def test_independent_tools_run_concurrently(self, monkeypatch, all_tools_installed):
+        """Test wall time follows the critical path, not the sum."""
+        import time
+
+        scanner = FakeScanner(delay=0.2)
+        monkeypatch.setattr(ToolIntegration, "_run_tool", staticmethod(scanner))
+
+        started = time.monotonic()
+        results = await ToolIntegration.execute_tool_chain(
+            "http://example.com", ["nuclei", "afrog", "dddd"], {}
+        )
+        elapsed = time.monotonic() - started
+
+        assert elapsed < 0.4
+        assert scanner.peak_total == 3
+        assert results["tools_executed"] == ["nuclei", "afrog", "dddd"]
+
+    async def test_concurrency_limits(self, monkeypatch, all_tools_installed):
+        """Test global and per-tool limits cap running processes."""
+        scanner = FakeScanner(results={"fscan": self.FSCAN_RESULT}, delay=0.05)
+        monkeypatch.setattr(ToolIntegration, "_run_tool", staticmethod(scanner))
+
+        await ToolIntegration.execute_tool_chain(
+            "10.0.0.0/24",
+            ["fscan", "nuclei", "afrog", "dirsearch"],
+            {},
+            max_concurrency=2,
+            per_tool_concurrency=1,
+        )
+
+        assert len(scanner.calls) == 1 + 3 * 3
+        assert scanner.peak_total == 2
+        assert all(peak == 1 for peak in scanner.peak.values())
+
+    async def test_no_http_services_falls_back_to_target(self, monkeypatch, all_tools_installed):
+        """Test web tools scan the chain target when fscan finds no web service."""
+        fscan = {"tool": "fscan", "status": "success", "results": [{"port": 22, "service": "ssh"}]}
+        scanner = FakeScanner(results={"fscan": fscan}, delay=0)
+        monkeypatch.setattr(ToolIntegration, "_run_tool", staticmethod(scanner))
+
+        results = await ToolIntegration.execute_tool_chain(
+            "192.168.1.100", ["fscan", "nuclei", "dirsearch"], {}
+        )
+
+        assert scanner.calls[1:] == [("nuclei", "192.168.1.100")]
+        assert "dirsearch" not in results["tool_results"]
+
+    async def test_failed_tool_does_not_stop_chain(self, monkeypatch, all_tools_installed):
+        """Test one crashing tool leaves the rest of the chain running."""
+        scanner = FakeScanner(results={"fscan": self.FSCAN_RESULT}, delay=0, errors={"fscan", "afrog"})
+        monkeypatch.setattr(ToolIntegration, "_run_tool", staticmethod(scanner))
+
+        results = await ToolIntegration.execute_tool_chain(
+            "10.0.0.5", ["fscan", "afrog", "nuclei"], {}
+        )
+
+        assert results["tools_executed"] == ["nuclei"]
+        assert results["tool_results"]["fscan"]["status"] == "error"
+        assert results["tool_results"]["afrog"]["status"] == "error"
+        assert ("nuclei", "10.0.0.5") in scanner.calls
+
+
+# ============================================================================
+# STREAMING FINDINGS TESTS
+# ============================================================================
+
+
+class TestStreamingFindings:
+    """Test JSONL findings are parsed while the tool runs."""
+
+    @pytest.fixture
+    def fake_nuclei(self, tmp_path, monkeypatch):
+        """Put a nuclei stand-in printing JSON lines on PATH."""
+        import os
+        import sys
+
+        script = tmp_path / "nuclei"
+        script.write_text(
+            f"#!{sys.executable}\n"
+            "import json, sys, time\n"
+            "print('[INF] banner noise', flush=True)\n"
+            "for i in range(3):\n"
+            "    print(json.dumps({'template-id': f'cve-{i}', 'args': sys.argv[1:]}), flush=True)\n"
+            "    time.sleep(0.05)\n"
+            "print('{not json')\n"
+        )
+        script.chmod(0o755)
+        monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+
+    async def test_nuclei_findings_streamed(self, fake_nuclei):
+        """Test findings are yielded one by one and noise is skipped."""
+        status = {}
+
+        findings = [
+            finding async for finding in ToolIntegration.iter_findings(
+                "nuclei", "http://example.com", {"severity": "high"}, status=status
+            )
+        ]
+
+        assert [f["template-id"] for f in findings] == ["cve-0", "cve-1", "cve-2"]
+        assert findings[0]["args"][:2] == ["-target", "http://example.com"]
+        assert "-json" in findings[0]["args"]
+        assert "-o" not in findings[0]["args"]
+        assert status["returncode"] == 0
+
+    async def test_unsupported_tool(self):
+        """Test tools without JSONL output are rejected."""
+        with pytest.raises(ValueError):
+            async for _ in ToolIntegration.iter_findings("dirsearch", "http://example.com"):
+                pass
@@ -8,9 +8,10 @@ import pytest
 from unittest.mock import Mock, AsyncMock, patch, MagicMock
 from datetime import datetime, timezone
 import json
+import asyncio
 
 from app.services.tool_result_service import ToolResultService
-from app.models.task import Task
+from app.models.task import Task, TaskResult
 from app.models.asset import Asset
 from app.models.vulnerability import Vulnerability
 
@@ -695,3 +696,523 @@ class TestEdgeCases:
         # Both should be stored (allowing duplicates or deduplicating)
         assert count1 > 0
         assert count2 > 0
+
+
+# ============================================================================
+# BULK INGESTION TESTS
+# ============================================================================
+
+
+class TestBulkIngestion:
+    """Test batched INSERT ingestion of large result sets."""
+
+    @staticmethod
+    async def _store_nuclei(db_session, target, count, bulk):
+        from sqlalchemy import select
+
+        task = Task(
+            name="Bulk Scan",
+            task_type="poc_detection",
+            target_range=target,
+            status="completed",
+            created_by=1,
+        )
+        db_session.add(task)
+        await db_session.commit()
+
+        result = {
+            "status": "success",
+            "target": f"http://{target}",
+            "results": [
+                {
+                    "id": f"CVE-2021-{1000 + i}",
+                    "name": f"Finding {i}",
+                    "severity": ["critical", "high", "bogus"][i % 3],
+                    "matched_at": f"http://example.com/{i}",
+                }
+                for i in range(count)
+            ],
+        }
+        stats = await ToolResultService.process_and_store_result(
+            db_session, task.id, "nuclei", result, bulk=bulk
+        )
+
+        asset = (await db_session.execute(select(Asset).where(Asset.ip == target))).scalars().one()
+        rows = (
+            await db_session.execute(
+                select(
+                    Vulnerability.title,
+                    Vulnerability.description,
+                    Vulnerability.cve_id,
+                    Vulnerability.severity,
+                    Vulnerability.status,
+                )
+                .where(Vulnerability.asset_id == asset.id)
+                .order_by(Vulnerability.id)
+            )
+        ).all()
+        return stats, rows
+
+    @pytest.mark.asyncio
+    async def test_bulk_rows_match_orm_rows(self, db_session):
+        """Test both ingestion paths store identical rows."""
+        orm_stats, orm_rows = await self._store_nuclei(db_session, "10.10.0.1", 30, bulk=False)
+        bulk_stats, bulk_rows = await self._store_nuclei(db_session, "10.10.0.2", 30, bulk=True)
+
+        assert orm_stats["findings"] == bulk_stats["findings"] == 30
+        assert [tuple(r) for r in bulk_rows] == [
+            tuple(r) for r in orm_rows
+        ]
+        assert bulk_rows[2].severity == "medium"
+
+    @pytest.mark.asyncio
+    async def test_bulk_inserts_in_chunks(self, db_session, monkeypatch):
+        """Test rows are written one chunk per statement."""
+        from app.core.config import settings
+
+        monkeypatch.setattr(settings, "RESULT_BULK_CHUNK_SIZE", 7)
+        statements = []
+        original_execute = db_session.execute
+
+        async def execute(statement, *args, **kwargs):
+            if getattr(statement, "is_insert", False) and statement.table.name == "vulnerabilities":
+                statements.append(statement)
+            return await original_execute(statement, *args, **kwargs)
+
+        monkeypatch.setattr(db_session, "execute", execute)
+
+        stats, rows = await self._store_nuclei(db_session, "10.10.0.3", 20, bulk=True)
+
+        assert stats["findings"] == 20
+        assert len(rows) == 20
+        assert len(statements) == 3
+
+    def test_threshold_selects_bulk_mode(self, monkeypatch):
+        """Test large results default to bulk ingestion."""
+        import asyncio
+        from app.core.config import settings
+
+        monkeypatch.setattr(settings, "RESULT_BULK_INGEST_THRESHOLD", 3)
+        seen = []
+
+        async def process(db, task, result, bulk=False, asset_cache=None):
+            seen.append(bulk)
+            return 0
+
+        monkeypatch.setattr(ToolResultService, "_process_dirsearch_results", staticmethod(process))
+        db = AsyncMock()
+        db.execute.return_value = MagicMock(scalars=lambda: MagicMock(first=lambda: Task(id=1)))
+        db.add = MagicMock()
+
+        for count in (2, 3):
+            result = {"status": "success", "results": [{"path": "/"}] * count}
+            asyncio.run(ToolResultService.process_and_store_result(db, 1, "dirsearch", result))
+
+        assert seen == [False, True]
+
+
+# ============================================================================
+# Finding Deduplication Tests
+# ============================================================================
+
+
+class TestFindingDeduplication:
+    """Test repeated scans refresh findings instead of duplicating them."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("bulk", [False, True])
+    async def test_rescan_updates_last_seen(self, db_session, bulk):
+        """Test storing the same result twice keeps one row per finding."""
+        from sqlalchemy import select
+
+        target = "10.20.0.1" if bulk else "10.20.0.2"
+        await TestBulkIngestion._store_nuclei(db_session, target, 10, bulk=bulk)
+        await db_session.commit()
+
+        asset = (await db_session.execute(select(Asset).where(Asset.ip == target))).scalars().one()
+        query = select(Vulnerability.dedup_key, Vulnerability.last_seen).where(
+            Vulnerability.asset_id == asset.id
+        )
+        first = dict((await db_session.execute(query)).all())
+
+        stats, rows = await TestBulkIngestion._store_nuclei(db_session, target, 10, bulk=bulk)
+        await db_session.commit()
+        db_session.expire_all()
+        second = dict((await db_session.execute(query)).all())
+
+        assert stats["findings"] == 10
+        assert len(rows) == 10
+        assert second.keys() == first.keys()
+        assert all(second[key] >= first[key] for key in first)
+        assert any(second[key] > first[key] for key in first)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("bulk", [False, True])
+    async def test_duplicates_within_call_collapsed(self, db_session, bulk):
+        """Test identical findings in one result are stored once."""
+        task = Task(
+            name="Dup Scan",
+            task_type="poc_detection",
+            target_range="10.20.1.1",
+            status="completed",
+            created_by=1,
+        )
+        db_session.add(task)
+        await db_session.commit()
+
+        finding = {"id": "CVE-2021-44228", "name": "Log4Shell", "severity": "critical",
+                   "matched_at": "http://10.20.1.1/api"}
+        result = {
+            "status": "success",
+            "target": f"http://10.20.1.{2 if bulk else 3}",
+            "results": [dict(finding) for _ in range(5)]
+            + [dict(finding, matched_at="http://10.20.1.1/other")],
+        }
+
+        stats = await ToolResultService.process_and_store_result(
+            db_session, task.id, "nuclei", result, bulk=bulk
+        )
+
+        assert stats["findings"] == 2
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("bulk", [False, True])
+    async def test_concurrent_insert_of_same_finding_upserts(self, db_session, monkeypatch, bulk):
+        """Test a finding inserted after the existing-key lookup refreshes instead of failing."""
+        from sqlalchemy import false, func, select
+
+        target = "10.20.2.1" if bulk else "10.20.2.2"
+        await TestBulkIngestion._store_nuclei(db_session, target, 3, bulk=bulk)
+        original_execute = db_session.execute
+
+        async def execute(statement, *args, **kwargs):
+            # Another scan inserted the rows after this one looked them up
+            if getattr(statement, "is_select", False) and "dedup_key" in statement.selected_columns:
+                statement = statement.where(false())
+            return await original_execute(statement, *args, **kwargs)
+
+        monkeypatch.setattr(db_session, "execute", execute)
+        stats, rows = await TestBulkIngestion._store_nuclei(db_session, target, 3, bulk=bulk)
+        monkeypatch.undo()
+
+        assert stats["findings"] == 3
+        assert len(rows) == 3
+        asset = (await db_session.execute(select(Asset).where(Asset.ip == target))).scalars().one()
+        count = await db_session.execute(
+            select(func.count(Vulnerability.id)).where(Vulnerability.asset_id == asset.id)
+        )
+        assert count.scalar() == 3
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("bulk", [False, True])
+    async def test_reseen_fixed_finding_reopened(self, db_session, bulk):
+        """Test fixed and closed findings reported again are reopened, others keep their status."""
+        from sqlalchemy import select, update
+        from app.models.vulnerability import VulnerabilityHistory
+
+        target = "10.20.3.1" if bulk else "10.20.3.2"
+        await TestBulkIngestion._store_nuclei(db_session, target, 3, bulk=bulk)
+        asset = (await db_session.execute(select(Asset).where(Asset.ip == target))).scalars().one()
+        ids = (
+            await db_session.execute(
+                select(Vulnerability.id).where(Vulnerability.asset_id == asset.id).order_by(Vulnerability.id)
+            )
+        ).scalars().all()
+        for vuln_id, status in zip(ids, ("fixed", "closed", "false_positive")):
+            await db_session.execute(update(Vulnerability).where(Vulnerability.id == vuln_id).values(status=status))
+        await db_session.commit()
+
+        await TestBulkIngestion._store_nuclei(db_session, target, 3, bulk=bulk)
+        db_session.expire_all()
+
+        statuses = (
+            await db_session.execute(
+                select(Vulnerability.status).where(Vulnerability.id.in_(ids)).order_by(Vulnerability.id)
+            )
+        ).scalars().all()
+        history = (
+            await db_session.execute(
+                select(VulnerabilityHistory.old_status, VulnerabilityHistory.new_status)
+                .where(VulnerabilityHistory.vulnerability_id.in_(ids))
+                .order_by(VulnerabilityHistory.vulnerability_id)
+            )
+        ).all()
+        assert statuses == ["open", "open", "false_positive"]
+        assert [tuple(row) for row in history] == [("fixed", "open"), ("closed", "open")]
+
+    def test_finding_key_distinguishes_identity_fields(self):
+        """Test the key changes with each identity component."""
+        key = ToolResultService._finding_key(1, "nuclei", "CVE-1", None, "http://a/")
+
+        assert key == ToolResultService._finding_key(1, "nuclei", "CVE-1", None, "http://a/")
+        assert len(key) == 64
+        assert key != ToolResultService._finding_key(2, "nuclei", "CVE-1", None, "http://a/")
+        assert key != ToolResultService._finding_key(1, "afrog", "CVE-1", None, "http://a/")
+        assert key != ToolResultService._finding_key(1, "nuclei", "CVE-2", None, "http://a/")
+        assert key != ToolResultService._finding_key(1, "nuclei", "CVE-1", 80, "http://a/")
+        assert key != ToolResultService._finding_key(1, "nuclei", "CVE-1", None, "http://b/")
+
+
+# ============================================================================
+# Batched Asset Resolution Tests
+# ============================================================================
+
+
+class TestAssetResolution:
+    """Test resolving many result hosts to assets in batches."""
+
+    @staticmethod
+    def _count_statements(db_session, monkeypatch):
+        counts = {"select": 0, "insert": 0}
+        original_execute = db_session.execute
+
+        async def execute(statement, *args, **kwargs):
+            if getattr(statement, "is_select", False) and "assets" in {
+                getattr(t, "name", None) for t in statement.get_final_froms()
+            }:
+                counts["select"] += 1
+            elif getattr(statement, "is_insert", False) and statement.table.name == "assets":
+                counts["insert"] += 1
+            return await original_execute(statement, *args, **kwargs)
+
+        monkeypatch.setattr(db_session, "execute", execute)
+        return counts
+
+    @pytest.mark.asyncio
+    async def test_multi_host_fscan_resolves_in_one_batch(self, db_session, monkeypatch):
+        """Test every host in an fscan result gets its own asset via one lookup."""
+        from sqlalchemy import select
+
+        db_session.add(Asset(ip="10.30.0.1", hostname="existing", status="active"))
+        task = Task(
+            name="Multi Host",
+            task_type="port_scan",
+            target_range="10.30.0.0/24",
+            status="completed",
+            created_by=1,
+        )
+        db_session.add(task)
+        await db_session.commit()
+
+        counts = self._count_statements(db_session, monkeypatch)
+        result = {
+            "status": "success",
+            "target": "10.30.0.0/24",
+            "results": [
+                {"ip": f"10.30.0.{host}", "port": port, "service": "http"}
+                for host in range(1, 6)
+                for port in (80, 443)
+            ],
+        }
+
+        stats = await ToolResultService.process_and_store_result(
+            db_session, task.id, "fscan", result
+        )
+
+        assert stats["ports"] == 10
+        assert counts == {"select": 2, "insert": 1}
+
+        assets = (
+            await db_session.execute(
+                select(Asset.ip, Asset.hostname).where(Asset.ip.like("10.30.0.%"))
+            )
+        ).all()
+        assert sorted(ip for ip, _ in assets) == [f"10.30.0.{host}" for host in range(1, 6)]
+        assert dict(assets)["10.30.0.1"] == "existing"
+
+        vulns = (
+            await db_session.execute(
+                select(Asset.ip)
+                .join(Vulnerability, Vulnerability.asset_id == Asset.id)
+                .where(Asset.ip.like("10.30.0.%"))
+            )
+        ).scalars().all()
+        assert sorted(set(vulns)) == [f"10.30.0.{host}" for host in range(1, 6)]
+        assert len(vulns) == 10
+
+    @pytest.mark.asyncio
+    async def test_shared_cache_skips_lookups(self, db_session, monkeypatch):
+        """Test a shared asset cache avoids repeat queries across tools."""
+        task = Task(
+            name="Shared Cache",
+            task_type="poc_detection",
+            target_range="10.31.0.1",
+            status="completed",
+            created_by=1,
+        )
+        db_session.add(task)
+        await db_session.commit()
+
+        cache = {}
+        result = {
+            "status": "success",
+            "target": "http://10.31.0.1:8080",
+            "results": [{"path": "/admin", "status": 200}],
+        }
+        await ToolResultService.process_and_store_result(
+            db_session, task.id, "dirsearch", result, asset_cache=cache
+        )
+        assert list(cache) == ["10.31.0.1"]
+
+        counts = self._count_statements(db_session, monkeypatch)
+        result = {
+            "status": "success",
+            "target": "http://10.31.0.1",
+            "results": [{"id": "CVE-2021-1", "name": "x", "severity": "high",
+                         "matched_at": "http://10.31.0.1/"}],
+        }
+        await ToolResultService.process_and_store_result(
+            db_session, task.id, "nuclei", result, asset_cache=cache
+        )
+
+        assert counts == {"select": 0, "insert": 0}
+
+    @pytest.mark.asyncio
+    async def test_resolve_assets_ignores_conflicts(self, db_session, monkeypatch):
+        """Test an asset inserted concurrently is reused rather than duplicated."""
+        from sqlalchemy import func, insert, select
+
+        original_execute = db_session.execute
+        raced = []
+
+        async def execute(statement, *args, **kwargs):
+            # Another ingestion creates the asset between lookup and insert
+            if getattr(statement, "is_insert", False) and not raced:
+                raced.append(True)
+                await original_execute(
+                    insert(Asset).values(ip="10.32.0.1", hostname="racer", status="active")
+                )
+            return await original_execute(statement, *args, **kwargs)
+
+        monkeypatch.setattr(db_session, "execute", execute)
+        ids = await ToolResultService._resolve_assets(
+            db_session, ["10.32.0.1", "http://10.32.0.2/", "10.32.0.1"]
+        )
+
+        assert ids[0] == ids[2] != ids[1]
+        count = await original_execute(
+            select(func.count()).select_from(Asset).where(Asset.ip.like("10.32.0.%"))
+        )
+        assert count.scalar() == 2
+
+    @pytest.mark.asyncio
+    async def test_new_asset_hostname_is_parsed_host(self, db_session):
+        """Test new assets record the bare host as hostname, and none for an IP."""
+        from sqlalchemy import select
+
+        await ToolResultService._resolve_assets(
+            db_session, ["https://scan-host.example:8443/login?next=/admin", "http://10.33.0.1/path"]
+        )
+
+        assets = dict(
+            (
+                await db_session.execute(
+                    select(Asset.ip, Asset.hostname).where(Asset.ip.in_(["scan-host.example", "10.33.0.1"]))
+                )
+            ).all()
+        )
+        assert assets == {"scan-host.example": "scan-host.example", "10.33.0.1": None}
+
+
+# ============================================================================
+# Streaming Ingestion Tests
+# ============================================================================
+
+
+class TestStreamingIngestion:
+    """Test findings are stored while the producing tool is still running."""
+
+    @staticmethod
+    async def _task(db_session):
+        task = Task(
+            name="Stream Scan",
+            task_type="poc_detection",
+            target_range="10.40.0.1",
+            status="running",
+            created_by=1,
+        )
+        db_session.add(task)
+        await db_session.commit()
+        return task
+
+    @staticmethod
+    async def _findings(count, delay=0.0, fail_after=None):
+        for i in range(count):
+            if fail_after is not None and i == fail_after:
+                raise RuntimeError("tool crashed")
+            if delay:
+                await asyncio.sleep(delay)
+            yield {
+                "template-id": f"cve-{i}",
+                "id": f"CVE-2022-{i}",
+                "name": f"Finding {i}",
+                "severity": "high",
+                "matched_at": f"http://10.40.0.1/{i}",
+            }
+
+    @pytest.mark.asyncio
+    async def test_stream_stored_in_chunks(self, db_session):
+        """Test every finding is stored and progress reported per chunk."""
+        from sqlalchemy import func, select
+
+        task = await self._task(db_session)
+        progress = []
+
+        async def on_progress(update):
+            progress.append(update)
+
+        stats = await ToolResultService.ingest_stream(
+            db_session, task.id, "nuclei", "http://10.40.0.1",
+            self._findings(25), on_progress=on_progress, status={"returncode": 0},
+            chunk_size=10,
+        )
+
+        assert stats["status"] == "success"
+        assert stats["findings"] == stats["vulnerabilities"] == 25
+        assert [p["stored"] for p in progress] == [10, 20, 25]
+
+        count = await db_session.execute(
+            select(func.count()).select_from(Vulnerability)
+            .join(Asset, Asset.id == Vulnerability.asset_id)
+            .where(Asset.ip == "10.40.0.1")
+        )
+        assert count.scalar() == 25
+
+        task_result = await db_session.get(TaskResult, stats["task_result_id"])
+        assert task_result.result_data["vulnerabilities_found"] == 25
+        assert task_result.result_data["streamed"] is True
+        assert "results" not in task_result.result_data
+
+    @pytest.mark.asyncio
+    async def test_slow_stream_flushed_on_interval(self, db_session):
+        """Test findings trickling in are stored before the tool finishes."""
+        task = await self._task(db_session)
+        progress = []
+
+        async def on_progress(update):
+            progress.append(update)
+
+        await ToolResultService.ingest_stream(
+            db_session, task.id, "nuclei", "http://10.40.0.2",
+            self._findings(3, delay=0.15), on_progress=on_progress,
+            chunk_size=100, flush_interval=0.05,
+        )
+
+        assert [p["stored"] for p in progress] == [1, 2, 3]
+
+    @pytest.mark.asyncio
+    async def test_tool_failure_keeps_stored_findings(self, db_session):
+        """Test a crashing tool marks the result failed but keeps what it reported."""
+        task = await self._task(db_session)
+
+        stats = await ToolResultService.ingest_stream(
+            db_session, task.id, "nuclei", "http://10.40.0.3",
+            self._findings(10, fail_after=7), chunk_size=5,
+        )
+
+        assert stats["status"] == "error"
+        assert stats["error"] == "tool crashed"
+        assert stats["findings"] == 7
+
+        task_result = await db_session.get(TaskResult, stats["task_result_id"])
+        assert task_result.result_data["status"] == "error"